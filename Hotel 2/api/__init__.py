@@ -0,0 +1,103 @@
+# api/
+# Endpoints JSON consumidos por las páginas (fetch desde static/assets/js).
+# Cada módulo agrega sus rutas al blueprint 'api' (prefijo /api).
+
+import base64
+import json
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, session
+
+from extensions import db
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+_hits = {}                       # (endpoint, ip) -> deque de timestamps
+_hits_lock = threading.Lock()
+
+
+def staff_required(view):
+    """Sólo personal del hotel (roles de STAFF_ROLES en la sesión); si no, 403 en JSON."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        role = (session.get("user_role") or "").lower()
+        allowed = {r.lower() for r in current_app.config.get("STAFF_ROLES") or ()}
+        if not session.get("user_id") or role not in allowed:
+            return jsonify({"error": "No autorizado."}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def admin_required(view):
+    """Sólo administradores (roles de ADMIN_ROLES en la sesión); si no, 403 en JSON."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        role = (session.get("user_role") or "").lower()
+        allowed = {r.lower() for r in current_app.config.get("ADMIN_ROLES") or ()}
+        if not session.get("user_id") or role not in allowed:
+            return jsonify({"error": "No autorizado."}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def rate_limited(limit_setting, window_setting):
+    """
+    Cupo por IP para endpoints anónimos que escriben: a lo sumo
+    app.config[limit_setting] requests cada app.config[window_setting] segundos.
+    Si se pasa, 429 en JSON con Retry-After. El conteo es por worker.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limit = int(current_app.config.get(limit_setting) or 0)
+            if limit > 0:
+                window = float(current_app.config.get(window_setting) or 3600)
+                now = time.monotonic()
+                with _hits_lock:
+                    if len(_hits) > 10000:  # poda de IPs que ya no envían
+                        for key in [k for k, q in _hits.items() if not q or q[-1] <= now - window]:
+                            del _hits[key]
+                    q = _hits.setdefault((request.endpoint, request.remote_addr), deque())
+                    while q and q[0] <= now - window:
+                        q.popleft()
+                    if len(q) >= limit:
+                        retry = max(int(q[0] + window - now) + 1, 1)
+                        return jsonify({"error": "Demasiadas solicitudes. Intenta más tarde."}), 429, \
+                            {"Retry-After": str(retry)}
+                    q.append(now)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------------------------------
+# Paginación por cursor (keyset): el cursor es [valor de orden, id] en base64
+# -----------------------------------------------------------------------------
+def _encode_cursor(value, row_id):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, parse=int):
+    """(parse(valor), id) del cursor; ValueError si no es uno de los nuestros."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return parse(value), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido.") from None
+
+
+def _fetch_page(stmt, limit):
+    """(filas, hay_más): se pide una fila de más para saber si sigue otra página, sin COUNT(*)."""
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    return rows[:limit], len(rows) > limit
+
+
+from . import audit, booking, calendar, channels, guests, notifications, pricing, reports, reservations, room_status  # noqa: E402,F401  (registran las rutas)
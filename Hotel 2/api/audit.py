@@ -0,0 +1,80 @@
+# api/audit.py
+# Bitácora de admin-audit.html (services/audit.py escribe audit_events).
+#
+#   GET /api/audit?category=users&action=login_failed&q=ana@&from=2026-10-01&to=2026-10-31
+#                 &limit=50&cursor=<next_cursor de la página anterior>
+#
+# Más recientes primero. Paginación keyset sobre (created_at, id): cada página
+# sigue desde la última fila con un WHERE sobre el índice, sin OFFSET ni COUNT.
+# q busca por prefijo del actor (correo).
+
+from datetime import date, datetime, timedelta
+
+from flask import jsonify, request
+from sqlalchemy import and_, or_, select
+
+from . import _decode_cursor, _encode_cursor, _fetch_page, admin_required, api
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+FIELDS = ("id", "created_at", "actor", "role", "category", "action", "entity", "entity_id", "detail",
+          "status", "ip")
+
+
+def _limit(raw):
+    try:
+        return int(raw) if raw else DEFAULT_LIMIT
+    except ValueError:
+        raise ValueError("'limit' debe ser un número entero.") from None
+
+
+def _filters(args):
+    from models import AUDIT_CATEGORIES, AuditEvent
+
+    out = []
+    category = args.get("category")
+    if category:
+        if category not in AUDIT_CATEGORIES:
+            raise ValueError(f"category debe ser uno de: {', '.join(AUDIT_CATEGORIES)}.")
+        out.append(AuditEvent.category == category)
+    if args.get("action"):
+        out.append(AuditEvent.action == args["action"])
+    q = (args.get("q") or "").strip().lower()
+    if q:
+        out.append(AuditEvent.actor.like(q.replace("%", r"\%").replace("_", r"\_") + "%", escape="\\"))
+    try:
+        if args.get("from"):
+            out.append(AuditEvent.created_at >= datetime.combine(date.fromisoformat(args["from"]),
+                                                                 datetime.min.time()))
+        if args.get("to"):
+            out.append(AuditEvent.created_at < datetime.combine(date.fromisoformat(args["to"]) + timedelta(days=1),
+                                                                datetime.min.time()))
+    except ValueError:
+        raise ValueError("from/to deben ser AAAA-MM-DD.") from None
+    return out
+
+
+@api.get("/audit")
+@admin_required
+def audit_list():
+    from models import AuditEvent
+
+    try:
+        limit = min(max(_limit(request.args.get("limit")), 1), MAX_LIMIT)
+        stmt = select(*(getattr(AuditEvent, f) for f in FIELDS)).where(*_filters(request.args))
+        if request.args.get("cursor"):
+            created_at, last_id = _decode_cursor(request.args["cursor"], datetime.fromisoformat)
+            stmt = stmt.where(or_(AuditEvent.created_at < created_at,
+                                  and_(AuditEvent.created_at == created_at, AuditEvent.id < last_id)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stmt = stmt.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+    rows, has_more = _fetch_page(stmt, limit)
+    resp = jsonify({
+        "items": [{f: (v.isoformat() if isinstance(v, datetime) else v) for f, v in zip(FIELDS, row)}
+                  for row in rows],
+        "next_cursor": _encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
@@ -0,0 +1,128 @@
+# api/booking.py
+# Disponibilidad y alta de reservas sobre el índice en memoria
+# (services/availability.py).
+#
+#   GET  /api/availability?check_in=2025-03-01&check_out=2025-03-04&guests=2
+#        (acepta también checkin/checkout/adults/children del buscador)
+#   POST /api/reservations   {room_id, check_in, check_out, guests, guest_name, guest_email[, plan]}
+#        Anónimo: la reserva queda 'pending' (ocupa la habitación pero no cuenta
+#        como vendida) hasta que recepción la confirme; cupo por IP
+#        (RESERVATION_RATE_LIMIT por RESERVATION_RATE_WINDOW segundos).
+
+from datetime import date
+
+from flask import current_app, jsonify, request
+from sqlalchemy import select
+
+from extensions import availability, db, notifications, pricing
+from services.availability import BookingConflict
+from services.notifications import valid_email
+
+from . import api, rate_limited
+
+MAX_NIGHTS = 60
+# Largo máximo de los campos de texto (columnas de reservations / rate_plans)
+LIMITS = {"guest_name": 120, "guest_email": 160, "plan": 30}
+
+
+def _parse_stay(data):
+    """(check_in, check_out, guests) o (None, None, mensaje de error)."""
+    raw_in = data.get("check_in") or data.get("checkin")
+    raw_out = data.get("check_out") or data.get("checkout")
+    try:
+        check_in = date.fromisoformat(str(raw_in))
+        check_out = date.fromisoformat(str(raw_out))
+    except ValueError:
+        return None, None, "Fechas inválidas (formato AAAA-MM-DD)."
+    if check_in < date.today():
+        return None, None, "La fecha de entrada ya pasó."
+    if check_out <= check_in:
+        return None, None, "La salida debe ser posterior a la entrada."
+    if (check_out - check_in).days > MAX_NIGHTS:
+        return None, None, f"Máximo {MAX_NIGHTS} noches por reserva."
+    try:
+        if data.get("guests") not in (None, ""):
+            guests = int(data.get("guests"))
+        else:
+            guests = int(data.get("adults") or 1) + int(data.get("children") or 0)
+    except (TypeError, ValueError):
+        return None, None, "Número de huéspedes inválido."
+    return check_in, check_out, max(guests, 1)
+
+
+@api.get("/availability")
+def availability_search():
+    check_in, check_out, guests = _parse_stay(request.args)
+    if check_in is None:
+        return jsonify({"error": guests}), 400
+    rooms = availability.search(check_in, check_out, guests)
+    resp = jsonify({
+        "check_in": check_in.isoformat(),
+        "check_out": check_out.isoformat(),
+        "nights": (check_out - check_in).days,
+        "guests": guests,
+        "rooms": rooms,
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@api.post("/reservations")
+@rate_limited("RESERVATION_RATE_LIMIT", "RESERVATION_RATE_WINDOW")
+def reservation_create():
+    data = request.get_json(silent=True) if request.is_json else request.form
+    if not hasattr(data, "get"):
+        return jsonify({"error": "Se espera un objeto JSON."}), 400
+    check_in, check_out, guests = _parse_stay(data)
+    if check_in is None:
+        return jsonify({"error": guests}), 400
+    fields = {}
+    for name, limit in LIMITS.items():
+        value = str(data.get(name) or "").strip()
+        if len(value) > limit:
+            return jsonify({"error": f"'{name}' admite hasta {limit} caracteres."}), 400
+        fields[name] = value or None
+    if not fields["guest_name"]:
+        return jsonify({"error": "El nombre del huésped es obligatorio."}), 400
+    if fields["guest_email"] and not valid_email(fields["guest_email"]):
+        return jsonify({"error": "El correo electrónico no es válido."}), 400
+    try:
+        room_id = int(data.get("room_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "room_id inválido."}), 400
+
+    # Importe del alojamiento según la grilla (para los reportes de ingresos). El
+    # tipo sale de la BD: en un worker recién arrancado el índice aún está vacío.
+    from models import Room
+
+    room_type_id = db.session.execute(select(Room.room_type_id).where(Room.id == room_id)).scalar()
+    quote = pricing.quote(fields["plan"] or pricing.default_plan, room_type_id,
+                          check_in, check_out, guests) if room_type_id else None
+
+    try:
+        res = availability.book(room_id, check_in, check_out, guests, fields["guest_name"],
+                                guest_email=fields["guest_email"], status="pending",
+                                room_total=quote["room_subtotal"] if quote else None)
+    except BookingConflict:
+        return jsonify({"error": "La habitación ya no está disponible en esas fechas."}), 409
+    except LookupError:
+        return jsonify({"error": "Habitación inexistente."}), 404
+    except ValueError:
+        return jsonify({"error": "La habitación no admite tantos huéspedes."}), 400
+
+    # Acuse de recibo por el outbox (la entrega la hace `flask notifications worker`)
+    if res.guest_email:
+        try:
+            notifications.booking_confirmation(res)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("No se pudo encolar la confirmación de la reserva %s", res.id)
+
+    return jsonify({
+        "id": res.id,
+        "room_id": res.room_id,
+        "check_in": res.check_in.isoformat(),
+        "check_out": res.check_out.isoformat(),
+        "status": res.status,
+    }), 201
@@ -0,0 +1,68 @@
+# api/calendar.py
+# Ventanas del calendario de ocupación (services/calendar.py) para
+# admin-calendario.html: todas las habitaciones en una sola respuesta.
+#
+#   GET /api/calendar?start=2025-10-12&days=7
+#   GET /api/calendar?month=2025-10          mes completo
+#   GET /api/calendar?quarter=2025-Q4        trimestre
+#       [&format=bin]  filas crudas (un byte por día) en orden de X-Calendar-Rooms
+#
+# En JSON cada habitación trae 'days' como texto de dígitos: el índice en
+# 'states' (0 libre, 1 confirmada, 2 pendiente, 3 bloqueo, 4 mantenimiento).
+
+from datetime import date
+
+from flask import Response, jsonify, request
+
+from extensions import calendar
+
+from . import api, staff_required
+
+DEFAULT_DAYS = 7
+
+
+def _parse_window(args):
+    """(inicio, días) o (None, mensaje de error)."""
+    try:
+        if args.get("month"):
+            year, month = (int(p) for p in args["month"].split("-"))
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+            return start, (end - start).days
+        if args.get("quarter"):
+            year, q = args["quarter"].upper().split("-Q")
+            year, q = int(year), int(q)
+            if not 1 <= q <= 4:
+                raise ValueError
+            start = date(year, 3 * q - 2, 1)
+            end = date(year + q // 4, 3 * (q % 4) + 1, 1)
+            return start, (end - start).days
+        start = date.fromisoformat(args["start"]) if args.get("start") else date.today()
+        days = int(args.get("days", DEFAULT_DAYS))
+    except (ValueError, TypeError):
+        return None, "Parámetros de fecha inválidos."
+    if days < 1:
+        return None, "days debe ser mayor que cero."
+    return start, days
+
+
+@api.get("/calendar")
+@staff_required
+def calendar_window():
+    start, days = _parse_window(request.args)
+    if start is None:
+        return jsonify({"error": days}), 400
+    if days > calendar.max_window:
+        return jsonify({"error": f"Máximo {calendar.max_window} días por consulta."}), 400
+
+    if request.args.get("format") == "bin":
+        first, n, rooms, rows = calendar.window(start, days)
+        resp = Response(b"".join(rows), mimetype="application/octet-stream")
+        resp.headers["X-Calendar-Start"] = first.isoformat()
+        resp.headers["X-Calendar-Days"] = str(n)
+        resp.headers["X-Calendar-Rooms"] = ",".join(str(r["id"]) for r in rooms)
+    else:
+        resp = jsonify(calendar.window_json(start, days))
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
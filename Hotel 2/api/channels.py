@@ -0,0 +1,162 @@
+# api/channels.py
+# Canales / OTAs de admin-channels.html. La web sólo guarda la configuración
+# y marca canales; el envío lo hace `flask channels worker`
+# (services/channels.py).
+#
+#   GET   /api/channels                 canales y cambios pendientes (última sync por canal)
+#   POST  /api/channels                 conectar (o reconectar) un proveedor
+#   PATCH /api/channels/<id>            pausar / reanudar / cambiar credenciales
+#   POST  /api/channels/sync            "Sincronizar ahora" ({"full": true} = todo el horizonte)
+#
+# Recepción puede ver los canales; sólo administración los modifica: endpoint y
+# api_key deciden a dónde envía el worker los datos ARI.
+
+from flask import jsonify, request
+from sqlalchemy import select
+
+from extensions import channels as channel_sync, db
+from services.channels import ADAPTERS, PROVIDERS
+
+from . import admin_required, api, staff_required
+
+EDITABLE = ("endpoint", "api_key", "secret", "rate_limit", "batch_size")
+
+
+def _iso(value):
+    return value.isoformat(timespec="seconds") if value else None
+
+
+def _serialize(ch, pending):
+    return {
+        "id": ch.id,
+        "code": ch.code,
+        "name": ch.name,
+        "adapter": ch.adapter,
+        "endpoint": ch.endpoint,
+        "status": ch.status,
+        "has_credentials": bool(ch.api_key),
+        "rate_limit": ch.rate_limit,
+        "batch_size": ch.batch_size,
+        "pending": pending,             # None = envío completo pendiente
+        "failures": ch.failures,
+        "last_error": ch.last_error,
+        "last_sync_at": _iso(ch.last_sync_at),
+        "next_attempt_at": _iso(ch.next_attempt_at),
+    }
+
+
+def _apply(ch, data):
+    """Copia los campos editables validados; devuelve un mensaje de error o None."""
+    for field in EDITABLE:
+        if field not in data:
+            continue
+        value = data[field]
+        if field in ("rate_limit", "batch_size"):
+            try:
+                value = float(value) if field == "rate_limit" else int(value)
+            except (TypeError, ValueError):
+                return f"'{field}' debe ser numérico."
+            if value <= 0:
+                return f"'{field}' debe ser mayor que cero."
+        elif field == "endpoint":
+            value = (value or "").strip() or None
+            if value and not value.startswith(("http://", "https://")):
+                return "El endpoint debe empezar por http:// o https://."
+        else:
+            value = (value or "").strip() or None
+        setattr(ch, field, value)
+    return None
+
+
+def _restart(ch):
+    """Al (re)conectar o reanudar se reenvía el horizonte completo."""
+    ch.status = "active"
+    ch.last_sync_at = None
+    ch.next_attempt_at = None
+    ch.failures = 0
+    ch.last_error = None
+
+
+@api.get("/channels")
+@staff_required
+def channels_list():
+    from models import Channel
+
+    pending = channel_sync.pending()
+    rows = db.session.execute(select(Channel).order_by(Channel.name)).scalars().all()
+    resp = jsonify({
+        "channels": [_serialize(ch, pending.get(ch.id)) for ch in rows],
+        "providers": PROVIDERS,
+        "horizon_days": channel_sync.horizon,
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@api.post("/channels")
+@admin_required
+def channel_connect():
+    from models import Channel
+
+    data = request.get_json(silent=True) or request.form
+    code = (data.get("provider") or "").strip().lower()
+    if code not in PROVIDERS:
+        return jsonify({"error": "Proveedor desconocido."}), 400
+    adapter = data.get("adapter") or "json"
+    if adapter not in ADAPTERS:
+        return jsonify({"error": "Adaptador desconocido."}), 400
+
+    ch = db.session.execute(select(Channel).where(Channel.code == code)).scalar_one_or_none()
+    created = ch is None
+    if created:
+        ch = Channel(code=code, name=PROVIDERS[code], ari_cursor=0, failures=0)
+        db.session.add(ch)
+    ch.adapter = adapter
+    error = _apply(ch, data)
+    if error is None and not ch.endpoint:
+        error = "El endpoint del API ARI es obligatorio."
+    if error:
+        db.session.rollback()
+        return jsonify({"error": error}), 400
+    _restart(ch)
+    db.session.commit()
+    return jsonify(_serialize(ch, None)), 201 if created else 200
+
+
+@api.patch("/channels/<int:channel_id>")
+@admin_required
+def channel_update(channel_id):
+    from models import CHANNEL_STATUSES, Channel
+
+    ch = db.session.get(Channel, channel_id)
+    if ch is None:
+        return jsonify({"error": "Canal inexistente."}), 404
+    data = request.get_json(silent=True) or {}
+    error = _apply(ch, data)
+    status = data.get("status")
+    if error is None and status is not None and status not in CHANNEL_STATUSES:
+        error = f"status debe ser uno de: {', '.join(CHANNEL_STATUSES)}."
+    if error:
+        db.session.rollback()
+        return jsonify({"error": error}), 400
+    if status == "active" and ch.status != "active":
+        _restart(ch)
+    elif status:
+        ch.status = status
+    db.session.commit()
+    return jsonify(_serialize(ch, channel_sync.pending().get(ch.id)))
+
+
+@api.post("/channels/sync")
+@admin_required
+def channels_sync():
+    from models import Channel
+
+    data = request.get_json(silent=True) or {}
+    active = db.session.execute(select(Channel).where(Channel.status == "active")).scalars().all()
+    for ch in active:
+        ch.next_attempt_at = None   # el worker los toma en su próxima pasada
+        if data.get("full"):
+            ch.last_sync_at = None
+    db.session.commit()
+    return jsonify({"queued": len(active), "full": bool(data.get("full"))}), 202
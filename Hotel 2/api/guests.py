@@ -0,0 +1,59 @@
+# api/guests.py
+# Importación masiva de huéspedes desde el back-office (services/guest_import.py).
+#
+#   POST /api/guests/import     CSV o JSONL como cuerpo crudo o multipart "file"
+#        ?format=csv|jsonl      (defecto: por Content-Type o extensión del archivo)
+#        &passwords=token|hash  (defecto token: no se hashea nada dentro del request)
+#        &links=1               devuelve los enlaces para crear contraseña
+#        &dry_run=1             sólo valida y reporta duplicados
+#        &delimiter=;           separador del CSV
+#
+# Importaciones grandes con contraseñas en claro: `flask guests import`.
+
+from flask import jsonify, request
+
+from extensions import guest_import
+from services.guest_import import FORMATS, GuestImportError, read_rows
+
+from . import admin_required, api
+
+# Filas de detalle (duplicados, errores, enlaces) devueltas como máximo por lista
+REPORT_LIMIT = 1000
+
+_JSONL_TYPES = ("application/x-ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def _format(upload):
+    fmt = request.args.get("format")
+    if fmt:
+        return fmt
+    name = (upload.filename or "").lower() if upload else ""
+    if name.endswith((".jsonl", ".ndjson")) or request.mimetype in _JSONL_TYPES:
+        return "jsonl"
+    return "csv"
+
+
+@api.post("/guests/import")
+@admin_required
+def guests_import():
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    fmt = _format(upload)
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format debe ser uno de: {', '.join(FORMATS)}."}), 400
+    delimiter = request.args.get("delimiter") or ","
+    if len(delimiter) != 1:
+        return jsonify({"error": "delimiter debe ser un solo carácter."}), 400
+    try:
+        report = guest_import.run(
+            read_rows(stream, fmt, delimiter),
+            passwords=request.args.get("passwords", "token"),
+            dry_run=request.args.get("dry_run") in ("1", "true"),
+            links=request.args.get("links") in ("1", "true"),
+            max_rows=guest_import.max_rows,
+        )
+    except GuestImportError as e:
+        return jsonify({"error": str(e)}), 400
+    for key in ("duplicate_rows", "error_rows", "links"):
+        report[key] = report[key][:REPORT_LIMIT]
+    return jsonify(report), 200
@@ -0,0 +1,86 @@
+# api/notifications.py
+# Formularios públicos que terminan en un correo (services/notifications.py).
+# Reemplazan a static/forms/*.php: validan, escriben en el outbox y responden
+# sin esperar al servidor SMTP.
+#
+#   POST /api/contact        name, email, subject, message[, phone]        (contact.html)
+#   POST /api/event-quote    name, email[, phone, date, guests, type, message]   (events.html)
+#
+# Los formularios usan vendor/php-email-form/validate.js, que espera "OK" en
+# texto plano y muestra cualquier otro texto como error. Sin JavaScript
+# (sin X-Requested-With) los errores vuelven con 400 y el envío correcto
+# redirige a la página del formulario. Cupo por IP: FORM_RATE_LIMIT envíos
+# cada FORM_RATE_WINDOW segundos por formulario.
+
+from flask import Response, redirect, request
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, notifications
+from services.notifications import valid_email
+
+from . import api, rate_limited
+
+LIMITS = {"name": 120, "email": 254, "phone": 40, "subject": 200, "message": 5000,
+          "date": 10, "guests": 20, "type": 40}
+EVENT_TYPES = {"boda": "Boda", "corporativo": "Corporativo", "social": "Social / Privado", "otro": "Otro"}
+
+
+def _fields(names, required):
+    values = {}
+    for name in names:
+        value = (request.form.get(name) or "").strip()
+        if name in required and not value:
+            raise ValueError("Completa todos los campos obligatorios.")
+        if len(value) > LIMITS[name]:
+            raise ValueError("Uno de los campos es demasiado largo.")
+        # Sin saltos de línea en lo que va a encabezados (Subject, Reply-To)
+        if name != "message" and ("\r" in value or "\n" in value):
+            raise ValueError("Formato inválido.")
+        values[name] = value or None
+    if not valid_email(values["email"]):
+        raise ValueError("El correo electrónico no es válido.")
+    return values
+
+
+def _reply(page, error=None):
+    ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
+    if error is None:
+        if ajax:
+            return Response("OK", mimetype="text/plain")
+        # Página fija del formulario: nunca el Referer, que manda el cliente
+        return redirect(page, 303)
+    return Response(error, status=200 if ajax else 400, mimetype="text/plain")
+
+
+def _commit():
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Mismo mensaje enviado a la vez desde dos requests: ya está en el outbox
+        db.session.rollback()
+
+
+@api.post("/contact")
+@rate_limited("FORM_RATE_LIMIT", "FORM_RATE_WINDOW")
+def contact_submit():
+    try:
+        f = _fields(("name", "email", "phone", "subject", "message"), {"name", "email", "subject", "message"})
+    except ValueError as e:
+        return _reply("/contact.html", str(e))
+    notifications.contact(f["name"], f["email"], f["subject"], f["message"], phone=f["phone"])
+    _commit()
+    return _reply("/contact.html")
+
+
+@api.post("/event-quote")
+@rate_limited("FORM_RATE_LIMIT", "FORM_RATE_WINDOW")
+def event_quote_submit():
+    try:
+        f = _fields(("name", "email", "phone", "date", "guests", "type", "message"), {"name", "email"})
+    except ValueError as e:
+        return _reply("/events.html", str(e))
+    details = (("Fecha", f["date"]), ("Invitados", f["guests"]),
+               ("Tipo", EVENT_TYPES.get(f["type"], f["type"])))
+    notifications.event_quote(f["name"], f["email"], details, message=f["message"], phone=f["phone"])
+    _commit()
+    return _reply("/events.html")
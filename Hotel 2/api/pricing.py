@@ -0,0 +1,38 @@
+# api/pricing.py
+# Cotizaciones desde la grilla precompilada (services/pricing.py).
+#
+#   GET /api/quotes?checkin=2025-03-01&checkout=2025-03-15&adults=2[&plan=BAR][&available=1]
+#       todas las combinaciones tipo de habitación × plan en una sola llamada;
+#       con available=1 sólo los tipos con alguna habitación libre.
+
+from flask import jsonify, request
+
+from extensions import availability, pricing
+
+from . import api
+from .booking import _parse_stay
+
+
+@api.get("/quotes")
+def quotes_bulk():
+    check_in, check_out, guests = _parse_stay(request.args)
+    if check_in is None:
+        return jsonify({"error": guests}), 400
+
+    room_type_ids = None
+    if request.args.get("available") in ("1", "true"):
+        room_type_ids = {r["room_type_id"] for r in availability.search(check_in, check_out, guests)}
+
+    quotes = pricing.quote_all(check_in, check_out, guests,
+                               plan_code=request.args.get("plan") or None,
+                               room_type_ids=room_type_ids)
+    for q in quotes:
+        q.pop("total_cents", None)
+    resp = jsonify({
+        "check_in": check_in.isoformat(),
+        "check_out": check_out.isoformat(),
+        "guests": guests,
+        "quotes": quotes,
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
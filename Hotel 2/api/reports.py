@@ -0,0 +1,90 @@
+# api/reports.py
+# KPIs de los tableros desde los agregados diarios (services/rollups.py):
+# nunca recorre reservas, sólo daily_rollups por rango de fechas.
+#
+#   GET /api/kpis?from=2026-01-01&to=2027-01-01[&room_type_id=2][&group=day|month][&format=csv]
+#       ocupación (%), ADR, RevPAR, ingreso, llegadas y salidas por día o mes,
+#       más el total del período en 'summary'. Por defecto los últimos 30 días.
+
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from flask import Response, jsonify, request
+
+from extensions import rollups
+
+from . import api, staff_required
+
+DEFAULT_DAYS = 30
+CSV_COLUMNS = ("date", "rooms_available", "rooms_sold", "occupancy", "adr", "revpar",
+               "revenue", "arrivals", "departures")
+
+
+def _parse_range(args):
+    """(desde, hasta exclusivo, room_type_id, agrupación) o ValueError con el mensaje."""
+    try:
+        end = date.fromisoformat(args["to"]) if args.get("to") else date.today() + timedelta(days=1)
+        start = date.fromisoformat(args["from"]) if args.get("from") else end - timedelta(days=DEFAULT_DAYS)
+    except ValueError:
+        raise ValueError("Fechas inválidas (formato AAAA-MM-DD).") from None
+    if end <= start:
+        raise ValueError("'to' debe ser posterior a 'from'.")
+    if (end - start).days > rollups.max_range:
+        raise ValueError(f"Máximo {rollups.max_range} días por consulta.")
+    group = args.get("group", "day")
+    if group not in ("day", "month"):
+        raise ValueError("group debe ser 'day' o 'month'.")
+    try:
+        room_type_id = int(args["room_type_id"]) if args.get("room_type_id") else None
+    except ValueError:
+        raise ValueError("room_type_id inválido.") from None
+    return start, end, room_type_id, group
+
+
+def _summary(rows):
+    """Totales del período con los KPIs recalculados sobre las sumas."""
+    available = sum(r["rooms_available"] for r in rows)
+    sold = sum(r["rooms_sold"] for r in rows)
+    revenue = sum((Decimal(r["revenue"]) for r in rows), Decimal("0.00"))
+    return {
+        "rooms_available": available,
+        "rooms_sold": sold,
+        "occupancy": round(100 * sold / available, 1) if available else None,
+        "adr": str((revenue / sold).quantize(Decimal("0.01"))) if sold else None,
+        "revpar": str((revenue / available).quantize(Decimal("0.01"))) if available else None,
+        "revenue": str(revenue),
+        "arrivals": sum(r["arrivals"] for r in rows),
+        "departures": sum(r["departures"] for r in rows),
+    }
+
+
+@api.get("/kpis")
+@staff_required
+def kpis():
+    try:
+        start, end, room_type_id, group = _parse_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = rollups.series(start, end, room_type_id, group)
+    if request.args.get("format") == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        return Response(buf.getvalue(), mimetype="text/csv", headers={
+            "Content-Disposition": f'attachment; filename="kpis-{start}-{end}.csv"',
+            "Cache-Control": "no-store",
+        })
+    resp = jsonify({
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "group": group,
+        "room_type_id": room_type_id,
+        "rows": rows,
+        "summary": _summary(rows),
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
@@ -0,0 +1,246 @@
+# api/reservations.py
+# Listado de reservas para el back-office (admin-reservas-list.html y
+# dashboard) con paginación por cursor y exportación CSV en streaming.
+#
+#   GET /api/reservations?status=confirmed,pending&from=2025-10-01&to=2025-11-01
+#                        &guest=mar&channel=booking&room_id=3&id=104
+#                        &sort=-check_in&limit=50&fields=id,guest_name,check_in
+#                        &cursor=<next_cursor de la página anterior>
+#   GET /api/reservations/<id>
+#   GET /api/reservations/export.csv?<mismos filtros>
+#
+# Paginación keyset: cada página sigue desde (valor de orden, id) de la última
+# fila con un WHERE sobre índice, así la página 500 cuesta lo mismo que la 1.
+# La exportación lee con un cursor del lado del servidor y emite el CSV por
+# bloques: el año completo nunca está en memoria.
+
+import csv
+import io
+from datetime import date, datetime
+
+from flask import Response, jsonify, request
+from sqlalchemy import and_, or_, select
+
+from extensions import db
+
+from . import _decode_cursor, _encode_cursor, _fetch_page, api, staff_required
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+EXPORT_BATCH = 1000
+DEFAULT_SORT = "-check_in"
+# Celdas que Excel/LibreOffice interpretan como fórmula (guest_name y guest_email
+# llegan del formulario público de reservas)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _columns():
+    """Campos seleccionables -> columna (los de room_* requieren el join)."""
+    from models import Reservation, Room
+
+    return {
+        "id": Reservation.id,
+        "room_id": Reservation.room_id,
+        "room_code": Room.code,
+        "room_name": Room.name,
+        "guest_name": Reservation.guest_name,
+        "guest_email": Reservation.guest_email,
+        "check_in": Reservation.check_in,
+        "check_out": Reservation.check_out,
+        "guests": Reservation.guests,
+        "status": Reservation.status,
+        "channel": Reservation.channel,
+        "created_at": Reservation.created_at,
+        "updated_at": Reservation.updated_at,
+    }
+
+
+SORT_KEYS = ("check_in", "created_at", "updated_at", "id")
+
+
+# -----------------------------------------------------------------------------
+# Parámetros
+# -----------------------------------------------------------------------------
+def _parse_fields(raw, columns):
+    if not raw:
+        return list(columns)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in columns]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}.")
+    return fields
+
+
+def _date_arg(args, name):
+    try:
+        return date.fromisoformat(args[name])
+    except ValueError:
+        raise ValueError(f"Fecha inválida en '{name}' (formato AAAA-MM-DD).") from None
+
+
+def _int_arg(args, name):
+    try:
+        return int(args[name])
+    except ValueError:
+        raise ValueError(f"'{name}' debe ser un número entero.") from None
+
+
+def _filters(args):
+    """Cláusulas WHERE a partir de los filtros del query string."""
+    from models import Reservation
+
+    clauses = []
+    if args.get("id"):
+        clauses.append(Reservation.id == _int_arg(args, "id"))
+    if args.get("status"):
+        clauses.append(Reservation.status.in_([s.strip() for s in args["status"].split(",") if s.strip()]))
+    if args.get("channel"):
+        clauses.append(Reservation.channel == args["channel"])
+    if args.get("room_id"):
+        clauses.append(Reservation.room_id == _int_arg(args, "room_id"))
+    # Estadías que tocan [from, to): mismo criterio que los solapamientos
+    if args.get("from"):
+        clauses.append(Reservation.check_out > _date_arg(args, "from"))
+    if args.get("to"):
+        clauses.append(Reservation.check_in < _date_arg(args, "to"))
+    guest = (args.get("guest") or "").strip()
+    if guest:
+        if "@" in guest:
+            clauses.append(Reservation.guest_email == guest)
+        else:
+            # Prefijo (usa el índice); LIKE '%x%' recorrería la tabla
+            clauses.append(Reservation.guest_name.startswith(guest, autoescape=True))
+    return clauses
+
+
+def _parse_sort(raw):
+    raw = raw or DEFAULT_SORT
+    key = raw.lstrip("-")
+    if key not in SORT_KEYS:
+        raise ValueError(f"sort debe ser uno de: {', '.join(SORT_KEYS)} (con '-' para descendente).")
+    return key, raw.startswith("-")
+
+
+def _cursor_parser(key):
+    """El cursor sólo vale para el mismo 'sort' con el que se generó."""
+    if key == "check_in":
+        return date.fromisoformat
+    if key in ("created_at", "updated_at"):
+        return datetime.fromisoformat
+    return int
+
+
+def _query(args, fields, columns):
+    """SELECT con filtros y orden (id desempata para que el orden sea total)."""
+    from models import Reservation, Room
+
+    key, desc = _parse_sort(args.get("sort"))
+    sort_col = columns[key]
+    # Siempre se traen la columna de orden y el id para armar el cursor
+    select_cols = [columns[f].label(f) for f in fields]
+    select_cols += [sort_col.label("_sort"), Reservation.id.label("_id")]
+    stmt = select(*select_cols).select_from(Reservation)
+    if any(f.startswith("room_") and f != "room_id" for f in fields):
+        stmt = stmt.join(Room, Room.id == Reservation.room_id)
+    stmt = stmt.where(*_filters(args))
+    if desc:
+        stmt = stmt.order_by(sort_col.desc(), Reservation.id.desc())
+    else:
+        stmt = stmt.order_by(sort_col.asc(), Reservation.id.asc())
+    return stmt, key, desc, sort_col
+
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+# -----------------------------------------------------------------------------
+# Endpoints
+# -----------------------------------------------------------------------------
+@api.get("/reservations")
+@staff_required
+def reservations_list():
+    from models import Reservation
+
+    columns = _columns()
+    try:
+        fields = _parse_fields(request.args.get("fields"), columns)
+        limit = min(max(_int_arg(request.args, "limit") if request.args.get("limit") else DEFAULT_LIMIT, 1),
+                    MAX_LIMIT)
+        stmt, key, desc, sort_col = _query(request.args, fields, columns)
+        if request.args.get("cursor"):
+            value, last_id = _decode_cursor(request.args["cursor"], _cursor_parser(key))
+            if desc:
+                after = or_(sort_col < value, and_(sort_col == value, Reservation.id < last_id))
+            else:
+                after = or_(sort_col > value, and_(sort_col == value, Reservation.id > last_id))
+            stmt = stmt.where(after)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows, has_more = _fetch_page(stmt, limit)
+    items = [{f: _jsonable(getattr(row, f)) for f in fields} for row in rows]
+    resp = jsonify({
+        "items": items,
+        "next_cursor": _encode_cursor(rows[-1]._sort, rows[-1]._id) if has_more else None,
+    })
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@api.get("/reservations/<int:res_id>")
+@staff_required
+def reservation_detail(res_id):
+    from models import Reservation, Room
+
+    columns = _columns()
+    row = db.session.execute(
+        select(*(col.label(name) for name, col in columns.items()))
+        .select_from(Reservation)
+        .outerjoin(Room, Room.id == Reservation.room_id)
+        .where(Reservation.id == res_id)
+    ).first()
+    if row is None:
+        return jsonify({"error": "Reserva inexistente."}), 404
+    return jsonify({name: _jsonable(getattr(row, name)) for name in columns})
+
+
+def _csv_cell(value):
+    value = _jsonable(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+@api.get("/reservations/export.csv")
+@staff_required
+def reservations_export():
+    columns = _columns()
+    try:
+        fields = _parse_fields(request.args.get("fields"), columns)
+        stmt, _key, _desc, _col = _query(request.args, fields, columns)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Conexión propia (no la de la sesión): vive lo que dure la descarga
+    engine = db.engine
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(fields)
+        yield buf.getvalue()
+        with engine.connect().execution_options(stream_results=True, yield_per=EXPORT_BATCH) as conn:
+            result = conn.execute(stmt)
+            for batch in result.partitions():
+                buf.seek(0)
+                buf.truncate()
+                writer.writerows([_csv_cell(getattr(row, f)) for f in fields] for row in batch)
+                yield buf.getvalue()
+
+    filename = f"reservas-{date.today().isoformat()}.csv"
+    return Response(generate(), mimetype="text/csv", headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",  # nginx: no acumular la respuesta
+    })
@@ -0,0 +1,139 @@
+# api/room_status.py
+# Tablero en vivo de ops-rooms-status.html, ops-housekeeping.html y
+# ops-arrivals-departures.html (services/room_status.py).
+#
+#   GET   /api/room-status                      snapshot JSON (clientes sin SSE)
+#   GET   /api/room-status/stream               text/event-stream: snapshot + deltas
+#   PATCH /api/room-status/rooms/<id>           {"hk_status", "note"}
+#   POST  /api/room-status/tasks                {"room", "kind", "assignee", "priority"}
+#   PATCH /api/room-status/tasks/<id>           {"status": "in_progress" | "done"}
+#   POST  /api/room-status/reservations/<id>/check-in
+#   POST  /api/room-status/reservations/<id>/check-out
+#
+# Las acciones sólo escriben en la BD: el cambio llega a todas las pantallas
+# por el stream al confirmar la transacción.
+
+from datetime import date, datetime
+
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import select
+
+from extensions import db, room_status
+
+from . import api, staff_required
+
+
+@api.get("/room-status")
+@staff_required
+def room_status_snapshot():
+    resp = jsonify(room_status.snapshot())
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@api.get("/room-status/stream")
+@staff_required
+def room_status_stream():
+    # El cupo se toma aquí (bajo el lock) y lo suelta el generador al cerrarse
+    if not room_status.acquire():
+        resp = jsonify({"error": "Demasiadas pantallas conectadas; reintentando."})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "30"
+        return resp
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    return Response(stream_with_context(room_status.stream(last_id)), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",  # nginx: entregar cada evento al momento
+    })
+
+
+@api.patch("/room-status/rooms/<int:room_id>")
+@staff_required
+def room_status_update(room_id):
+    from models import HK_STATUSES, Room
+
+    room = db.session.get(Room, room_id)
+    if room is None:
+        return jsonify({"error": "Habitación inexistente."}), 404
+    data = request.get_json(silent=True) or {}
+    status = data.get("hk_status")
+    if status is not None and status not in HK_STATUSES:
+        return jsonify({"error": f"hk_status debe ser uno de: {', '.join(HK_STATUSES)}."}), 400
+    if status:
+        room.hk_status = status
+    if "note" in data:
+        room.hk_note = (data.get("note") or "").strip()[:200] or None
+    db.session.commit()
+    return jsonify({"id": room.id, "hk_status": room.hk_status, "note": room.hk_note})
+
+
+@api.post("/room-status/tasks")
+@staff_required
+def housekeeping_task_create():
+    from models import TASK_KINDS, TASK_PRIORITIES, HousekeepingTask, Room
+
+    data = request.get_json(silent=True) or request.form
+    ref = str(data.get("room") or "").strip()
+    room = db.session.execute(select(Room).where(Room.code == ref)).scalar_one_or_none() if ref else None
+    if room is None:
+        return jsonify({"error": "Habitación inexistente."}), 404
+    kind = data.get("kind") or "daily"
+    priority = data.get("priority") or "normal"
+    if kind not in TASK_KINDS or priority not in TASK_PRIORITIES:
+        return jsonify({"error": "Tipo o prioridad inválidos."}), 400
+    task = HousekeepingTask(room_id=room.id, kind=kind, priority=priority, status="pending",
+                            assignee=(data.get("assignee") or "").strip()[:80] or None)
+    db.session.add(task)
+    db.session.commit()
+    return jsonify({"id": task.id}), 201
+
+
+@api.patch("/room-status/tasks/<int:task_id>")
+@staff_required
+def housekeeping_task_update(task_id):
+    from models import HousekeepingTask, Room
+
+    task = db.session.get(HousekeepingTask, task_id)
+    if task is None:
+        return jsonify({"error": "Tarea inexistente."}), 404
+    status = (request.get_json(silent=True) or {}).get("status")
+    if status == "in_progress" and task.status == "pending":
+        task.started_at = datetime.utcnow()
+    elif status == "done" and task.status != "done":
+        task.started_at = task.started_at or datetime.utcnow()
+        task.finished_at = datetime.utcnow()
+        room = db.session.get(Room, task.room_id)
+        if room is not None and room.hk_status == "dirty":
+            room.hk_status = "clean"
+    else:
+        return jsonify({"error": "Transición de estado inválida."}), 400
+    task.status = status
+    db.session.commit()
+    return jsonify({"id": task.id, "status": task.status})
+
+
+@api.post("/room-status/reservations/<int:res_id>/<any('check-in', 'check-out'):action>")
+@staff_required
+def reservation_check(res_id, action):
+    from models import HousekeepingTask, Reservation, Room
+
+    res = db.session.get(Reservation, res_id)
+    if res is None:
+        return jsonify({"error": "Reserva inexistente."}), 404
+    today = date.today()
+    if action == "check-in":
+        if res.status not in ("pending", "confirmed") or res.check_in > today:
+            return jsonify({"error": "La reserva no puede hacer check-in hoy."}), 409
+        res.status = "checked_in"
+    else:
+        if res.status != "checked_in":
+            return jsonify({"error": "La reserva no está en casa."}), 409
+        res.status = "checked_out"
+        # La habitación queda sucia y con su tarea de salida
+        room = db.session.get(Room, res.room_id)
+        if room is not None and room.hk_status != "out_of_order":
+            room.hk_status = "dirty"
+        db.session.add(HousekeepingTask(room_id=res.room_id, kind="departure", priority="high",
+                                        status="pending"))
+    db.session.commit()
+    return jsonify({"id": res.id, "status": res.status})
@@ -5,8 +5,12 @@
 
 import os
 import sys
+import time
+from importlib.util import find_spec
 from pathlib import Path
 
+_IMPORT_T0 = time.perf_counter()
+
 # -----------------------------------------------------------------------------
 # Bootstrap de portabilidad y verificación de dependencias
 # -----------------------------------------------------------------------------
@@ -16,24 +20,16 @@ BASE_DIR = Path(__file__).resolve().parent
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
-# Carga variables de entorno desde .env si está disponible
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv(BASE_DIR / ".env")
-except Exception:
-    pass
+# El .env lo carga config.py (una sola vez, al importarse)
+
+# Verifica dependencias críticas y da un mensaje claro si faltan. find_spec sólo
+# busca el paquete: PyMySQL, cryptography, bcrypt y Flask-Migrate/alembic se
+# importan recién en el camino que los usa (conexión MySQL, hash bcrypt, flask db).
+REQUIRED_PACKAGES = ("flask", "flask_sqlalchemy", "flask_migrate", "pymysql", "cryptography", "bcrypt")
 
-# Verifica dependencias críticas y da un mensaje claro si faltan
 def _import_or_exit():
-    try:
-        from flask import Flask  # noqa: F401
-        import flask_sqlalchemy  # noqa: F401
-        import flask_migrate  # noqa: F401
-        import pymysql  # noqa: F401
-        import cryptography  # noqa: F401
-        import bcrypt  # soporte para hashes $2b$
-    except ModuleNotFoundError as e:
-        missing = str(e).split("'")[1]
+    missing = next((name for name in REQUIRED_PACKAGES if find_spec(name) is None), None)
+    if missing:
         msg = (
             f"\n[ERROR] Falta el paquete requerido: {missing}\n"
             "Instálalo en el intérprete que estés usando para ejecutar app.py.\n\n"
@@ -48,31 +44,110 @@ _import_or_exit()
 
 # Ahora sí, imports reales
 from flask import (
-    Flask, render_template, jsonify, send_from_directory, url_for,
-    request, redirect, flash, render_template_string, session
+    Flask, render_template, url_for,
+    request, redirect, flash, render_template_string, session, current_app
 )
 from sqlalchemy import text
-from werkzeug.security import generate_password_hash, check_password_hash
-import bcrypt
+from sqlalchemy.exc import IntegrityError
 from config import Config
-from extensions import db, migrate
-# from models import Room  # (opcional)
+from extensions import (
+    db, migrate, schema_cache, user_store, password_hasher, pages, assets, images,
+    availability, i18n, metrics, pricing, calendar, rollups, channels, room_status, guest_import, health,
+    audit, notifications, template_cache,
+)
+from services.guest_import import normalize_phone as _normalize_phone
+from services.password_hasher import HashingBusy
+import selfcheck
+
+_IMPORT_MS = round((time.perf_counter() - _IMPORT_T0) * 1000, 1)
 
 # -----------------------------------------------------------------------------
-# Configuración de la app (portabilidad de templates/static)
+# Registro diferido de rutas: los decoradores anotan la vista y create_app()
+# las enlaza a cada instancia (mantiene los endpoints 'login_html', etc.)
 # -----------------------------------------------------------------------------
-app = Flask(
-    __name__,
-    template_folder=str(BASE_DIR / "templates"),
-    static_folder=str(BASE_DIR / "static"),
-)
+_ROUTES = []
+_ERROR_HANDLERS = []
+
+def route(rule, **options):
+    def decorator(view):
+        _ROUTES.append((rule, view, options))
+        return view
+    return decorator
 
-# Cargar configuración (incluye SQLALCHEMY_DATABASE_URI y SECRET_KEY si lo tienes)
-app.config.from_object(Config)
+def errorhandler(code_or_exception):
+    def decorator(handler):
+        _ERROR_HANDLERS.append((code_or_exception, handler))
+        return handler
+    return decorator
 
-# Inicializar extensiones
-db.init_app(app)
-migrate.init_app(app, db)
+# -----------------------------------------------------------------------------
+# Fábrica de la app (portabilidad de templates/static)
+# -----------------------------------------------------------------------------
+def create_app(config_object=Config):
+    t0 = time.perf_counter()
+    app = Flask(
+        __name__,
+        template_folder=str(BASE_DIR / "templates"),
+        static_folder=str(BASE_DIR / "static"),
+    )
+
+    # Cargar configuración (incluye SQLALCHEMY_DATABASE_URI y SECRET_KEY si lo tienes)
+    app.config.from_object(config_object)
+
+    # IP real del cliente detrás del proxy (cupos de hashing por IP, bitácora)
+    hops = app.config.get("PROXY_FIX_HOPS", 0)
+    if hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # Inicializar extensiones (metrics primero: instala el pool y mide todo el request)
+    metrics.init_app(app)
+    db.init_app(app)
+    health.init_app(app, db)
+    audit.init_app(app, db)
+    notifications.init_app(app, db)
+    migrate.init_app(app, db)
+    schema_cache.init_app(app, db)
+    user_store.init_app(app, db, schema_cache)
+    password_hasher.init_app(app)
+    availability.init_app(app, db)
+    pricing.init_app(app, db)
+    calendar.init_app(app, db)
+    rollups.init_app(app, db)
+    channels.init_app(app, db)
+    room_status.init_app(app, db)
+    guest_import.init_app(app, db, schema_cache, password_hasher)
+
+    for rule, view, options in _ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    for code_or_exception, handler in _ERROR_HANDLERS:
+        app.register_error_handler(code_or_exception, handler)
+
+    # API JSON (/api/...): disponibilidad, reservas y cotizaciones
+    from api import api
+    app.register_blueprint(api)
+
+    # URLs de static/ con huella de contenido (antes de renderizar páginas)
+    assets.init_app(app)
+    images.init_app(app)
+
+    # Bytecode de Jinja en disco y {% cache %} (antes de que pages renderice)
+    template_cache.init_app(app)
+
+    # Traducción en el servidor (antes de pages: la caché es por locale)
+    i18n.init_app(app)
+
+    # Páginas de templates/ (después de las rutas explícitas, que tienen prioridad)
+    pages.init_app(app)
+
+    app.cli.add_command(selfcheck.self_check_command)
+    app.extensions["startup"] = {
+        "import_ms": _IMPORT_MS,
+        "create_app_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    if app.config.get("STARTUP_SELF_CHECK"):
+        selfcheck.log_settings(app)
+    return app
 
 # -----------------------------------------------------------------------------
 # Helpers mínimos para registro/login
@@ -85,49 +160,6 @@ def _first_of(form, keys):
             return str(v).strip()
     return None
 
-def _normalize_phone(s):
-    if not s:
-        return "00000000"
-    s = str(s).strip()
-    # conserva + al inicio, elimina espacios
-    if s.startswith("+"):
-        return "+" + "".join(ch for ch in s[1:] if ch.isdigit())
-    return "".join(ch for ch in s if ch.isdigit())
-
-def _find_users_table():
-    """Detecta automáticamente una tabla de usuarios (case-insensitive)."""
-    candidate_tables = [
-        os.getenv("USERS_TABLE", "").strip() or None,
-        "users", "user", "usuarios", "usuario", "Users", "Usuarios", "Usuario"
-    ]
-    candidate_tables = [t for t in candidate_tables if t]
-
-    schema = db.engine.url.database  # nombre de BD actual (MySQL)
-    for tbl in candidate_tables:
-        q = text("""
-            SELECT TABLE_NAME
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE TABLE_SCHEMA = :sch AND LOWER(TABLE_NAME) = LOWER(:tbl)
-            LIMIT 1
-        """)
-        row = db.session.execute(q, {"sch": schema, "tbl": tbl}).first()
-        if row:
-            return row[0]  # devuelve el nombre real con su casing
-    return None
-
-def _available_columns(table):
-    """
-    Devuelve un dict {col_lower: col_real} para mapear case-insensitive.
-    """
-    schema = db.engine.url.database
-    q = text("""
-        SELECT COLUMN_NAME
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = :sch AND TABLE_NAME = :tbl
-    """)
-    rows = db.session.execute(q, {"sch": schema, "tbl": table}).all()
-    return {r[0].lower(): r[0] for r in rows}  # lower -> real
-
 def _put_if_exists(cols_map, payload, candidates, value):
     """
     Si alguna columna (por nombres candidatos, en minúscula) existe en cols_map,
@@ -141,284 +173,40 @@ def _put_if_exists(cols_map, payload, candidates, value):
             payload[col_real] = value
             return
 
-def _verify_password(stored_hash: str, candidate: str) -> bool:
-    """
-    Soporta:
-      - PBKDF2/Scrypt de Werkzeug (prefijo 'pbkdf2:' o 'scrypt:')
-      - bcrypt ($2a$ / $2b$ / $2y$)
-    """
-    if not stored_hash or not candidate:
-        return False
-
-    s = stored_hash.strip()
-    # bcrypt
-    if s.startswith("$2a$") or s.startswith("$2b$") or s.startswith("$2y$"):
-        try:
-            return bcrypt.checkpw(candidate.encode("utf-8"), s.encode("utf-8"))
-        except Exception:
-            return False
-
-    # Por defecto intenta verificación nativa de Werkzeug (pbkdf2:, scrypt:, etc.)
-    try:
-        return check_password_hash(s, candidate)
-    except Exception:
-        return False
-
-def _default_role_id():
-    """
-    Devuelve un Codigo_Rol por defecto:
-    - 'Cliente' si existe
-    - luego 'Usuario'
-    - si no, el mínimo Codigo_Rol disponible
-    """
-    try:
-        row = db.session.execute(
-            text("SELECT Codigo_Rol FROM Rol WHERE LOWER(Nombre)=LOWER('Cliente') LIMIT 1")
-        ).first()
-        if row: return row[0]
-        row = db.session.execute(
-            text("SELECT Codigo_Rol FROM Rol WHERE LOWER(Nombre)=LOWER('Usuario') LIMIT 1")
-        ).first()
-        if row: return row[0]
-        row = db.session.execute(
-            text("SELECT MIN(Codigo_Rol) FROM Rol")
-        ).first()
-        if row and row[0] is not None: return row[0]
-    except Exception:
-        pass
-    return None  # si no hay tabla Rol, no forzamos nada
-
-# -----------------------------------------------------------------------------
-# Endpoint de verificación de base de datos
-# -----------------------------------------------------------------------------
-@app.get("/db-ping")
-def db_ping():
-    try:
-        result = db.session.execute(text("SELECT 1")).scalar()
-        ok = (result == 1)
-        return jsonify({"database": "ok" if ok else "unknown"}), 200 if ok else 500
-    except Exception as e:
-        return jsonify({"database": "error", "detail": str(e)}), 500
+def _hash_keys(account=None):
+    """Claves de admisión del pool de hashing: IP del cliente y cuenta."""
+    keys = [("ip", request.remote_addr)]
+    if account:
+        keys.append(("acct", account.lower()))
+    return keys
 
 # =========================
 # Manejo de errores
 # =========================
-@app.errorhandler(404)
+@errorhandler(404)
 def not_found(e):
-    return render_template("/404.html"), 404
+    return pages.response("404.html", status=404)
+
+@errorhandler(HashingBusy)
+def hashing_busy(e):
+    # Ruta rápida: no esperamos turno en el pool, devolvemos 429 de inmediato
+    flash("Hay demasiados intentos en este momento. Intenta de nuevo en unos segundos.", "warning")
+    page = {"register_html": "/register.html", "set_password_html": "/set-password.html"}.get(
+        request.endpoint, "/login.html")
+    return render_template(page), 429, {"Retry-After": str(e.retry_after)}
 
 # =========================
-# Rutas de páginas (las tuyas)
+# Rutas con lógica (las páginas de templates/ las publica services/pages.py)
 # =========================
-@app.route("/about.html")
-def about_html():
-    return render_template("/about.html")
-
-@app.route("/admin-audit.html")
-def admin_audit_html():
-    return render_template("/admin-audit.html")
-
-@app.route("/admin-calendario.html")
-def admin_calendario_html():
-    return render_template("/admin-calendario.html")
-
-@app.route("/admin-channels.html")
-def admin_channels_html():
-    return render_template("/admin-channels.html")
-
-@app.route("/admin-dashboard.html")
-def admin_dashboard_html():
-    return render_template("/admin-dashboard.html")
-
-@app.route("/admin-hotel.html")
-def admin_hotel_html():
-    return render_template("/admin-hotel.html")
-
-@app.route("/admin-rates.html")
-def admin_rates_html():
-    return render_template("/admin-rates.html")
-
-@app.route("/admin-reserva-detalle.html")
-def admin_reserva_detalle_html():
-    return render_template("/admin-reserva-detalle.html")
-
-@app.route("/admin-reservas-dashboard.html")
-def admin_reservas_dashboard_html():
-    return render_template("/admin-reservas-dashboard.html")
-
-@app.route("/admin-reservas-list.html")
-def admin_reservas_list_html():
-    return render_template("/admin-reservas-list.html")
-
-@app.route("/admin-rooms.html")
-def admin_rooms_html():
-    return render_template("/admin-rooms.html")
-
-@app.route("/admin-taxes.html")
-def admin_taxes_html():
-    return render_template("/admin-taxes.html")
-
-@app.route("/amenities.html")
-def amenities_html():
-    return render_template("/amenities.html")
-
-@app.route("/booking-checkout.html")
-def booking_checkout_html():
-    return render_template("/booking-checkout.html")
-
-@app.route("/booking-confirmation.html")
-def booking_confirmation_html():
-    return render_template("/booking-confirmation.html")
-
-@app.route("/booking-details.html")
-def booking_details_html():
-    return render_template("/booking-details.html")
-
-@app.route("/booking-results.html")
-def booking_results_html():
-    return render_template("/booking-results.html")
-
-@app.route("/booking-search.html")
-def booking_search_html():
-    return render_template("/booking-search.html")
-
-@app.route("/booking.html")
-def booking_html():
-    return render_template("/booking.html")
-
-@app.route("/contact.html")
-def contact_html():
-    return render_template("/contact.html")
-
-@app.route("/events.html")
-def events_html():
-    return render_template("/events.html")
-
-@app.route("/fin-close.html")
-def fin_close_html():
-    return render_template("/fin-close.html")
-
-@app.route("/fin-dashboard.html")
-def fin_dashboard_html():
-    return render_template("/fin-dashboard.html")
-
-@app.route("/fin-invoices.html")
-def fin_invoices_html():
-    return render_template("/fin-invoices.html")
-
-@app.route("/fin-payments.html")
-def fin_payments_html():
-    return render_template("/fin-payments.html")
-
-@app.route("/forgot-password.html")
-def forgot_password_html():
-    return render_template("/forgot-password.html")
-
-@app.route("/gallery.html")
-def gallery_html():
-    return render_template("/gallery.html")
-
-@app.route("/index.html")
-def index_html():
-    return render_template("/index.html")
-
-@app.route("/")
-def index():
-    return render_template("/index.html")
-
-@app.route("/location.html")
-def location_html():
-    return render_template("/location.html")
-
-@app.route("/login.html", methods=["GET"])  # GET normal
-def login_html():
-    return render_template("/login.html")
-
-@app.route("/offers.html")
-def offers_html():
-    return render_template("/offers.html")
-
-@app.route("/ops-arrivals-departures.html")
-def ops_arrivals_departures_html():
-    return render_template("/ops-arrivals-departures.html")
-
-@app.route("/ops-dashboard.html")
-def ops_dashboard_html():
-    return render_template("/ops-dashboard.html")
-
-@app.route("/ops-housekeeping.html")
-def ops_housekeeping_html():
-    return render_template("/ops-housekeeping.html")
-
-@app.route("/ops-incidents.html")
-def ops_incidents_html():
-    return render_template("/ops-incidents.html")
-
-@app.route("/ops-inventory.html")
-def ops_inventory_html():
-    return render_template("/ops-inventory.html")
-
-@app.route("/ops-maintenance.html")
-def ops_maintenance_html():
-    return render_template("/ops-maintenance.html")
-
-@app.route("/ops-reports.html")
-def ops_reports_html():
-    return render_template("/ops-reports.html")
-
-@app.route("/ops-rooms-status.html")
-def ops_rooms_status_html():
-    return render_template("/ops-rooms-status.html")
-
-@app.route("/ops-shift-log.html")
-def ops_shift_log_html():
-    return render_template("/ops-shift-log.html")
-
-@app.route("/portal-dashboard.html")
-def portal_dashboard_html():
-    return render_template("/portal-dashboard.html")
-
-@app.route("/portal-facturas.html")
-def portal_facturas_html():
-    return render_template("/portal-facturas.html")
-
-@app.route("/portal-pagos.html")
-def portal_pagos_html():
-    return render_template("/portal-pagos.html")
-
-@app.route("/portal-perfil.html")
-def portal_perfil_html():
-    return render_template("/portal-perfil.html")
-
-@app.route("/portal-preferencias.html")
-def portal_preferencias_html():
-    return render_template("/portal-preferencias.html")
-
-@app.route("/portal-reserva-detalle.html")
-def portal_reserva_detalle_html():
-    return render_template("/portal-reserva-detalle.html")
-
-@app.route("/portal-reservas.html")
-def portal_reservas_html():
-    return render_template("/portal-reservas.html")
-
-@app.route("/portal-soporte.html")
-def portal_soporte_html():
-    return render_template("/portal-soporte.html")
-
-@app.route("/privacy.html")
-def privacy_html():
-    return render_template("/privacy.html")
-
 # ===== Registro: acepta GET/POST, guarda en BD y redirige a login con mensaje =====
-@app.route("/register.html", methods=["GET", "POST"])
-@app.route("/register", methods=["GET", "POST"])
+@route("/register.html", methods=["GET", "POST"])
+@route("/register", methods=["GET", "POST"])
 def register_html():
     if request.method == "POST":
         # Campos del formulario (en distintos nombres posibles)
         first_name = _first_of(request.form, ["firstName", "first_name", "nombre", "name"])
         last_name  = _first_of(request.form, ["lastName", "last_name", "apellido"])
-        email      = _first_of(request.form, ["email", "correo"])
+        email      = (_first_of(request.form, ["email", "correo"]) or "").lower()  # como el import y el login
         username   = _first_of(request.form, ["username", "userName", "user_name", "usuario"])  # opcional si tu tabla no lo usa
         phone      = _normalize_phone(_first_of(request.form, ["telefono", "phone", "tel"]))
         password   = _first_of(request.form, ["password", "contrasena", "clave"])
@@ -442,15 +230,16 @@ def register_html():
         else:
             full_name = first_name or last_name or username or email or "Usuario"
 
-        pwd_hash = generate_password_hash(password)
+        pwd_hash = password_hasher.hash(password, _hash_keys(email))
 
         # Detectar tabla y columnas (case-insensitive)
-        table = _find_users_table()
+        schema = schema_cache.snapshot()
+        table = schema.users_table
         if not table:
             flash("No se encontró una tabla de usuarios en la base de datos.", "error")
             return render_template("/register.html"), 500
 
-        cols_map = _available_columns(table)  # {lower: RealName}
+        cols_map = schema.columns  # {lower: RealName}
 
         payload = {}
 
@@ -471,7 +260,7 @@ def register_html():
 
         # NUEVO: Rol por defecto si no viene del form
         if not rol_val:
-            rol_val = _default_role_id()
+            rol_val = schema.default_role_id
         _put_if_exists(cols_map, payload, ["Rol_Id", "rol_id", "role_id", "Codigo_Rol"], rol_val)
 
         # Estado (por defecto Activo)
@@ -492,6 +281,7 @@ def register_html():
         try:
             db.session.execute(sql, payload)
             db.session.commit()
+            audit.record("register", category="users", entity="Usuario", actor=email or None)
 
             # Página mínima con mensaje visible + redirección automática a /login.html
             return render_template_string("""
@@ -517,6 +307,7 @@ def register_html():
             """)
         except Exception as e:
             db.session.rollback()
+            schema_cache.note_error(e)
             flash(f"Error al registrar el usuario: {e}", "error")
             return render_template("/register.html"), 500
 
@@ -525,9 +316,9 @@ def register_html():
 
 # ===== Login: procesa POST desde el formulario (sin tocar templates) =====
 # Cubrimos tres posibles actions del form:
-@app.route("/login.html", methods=["POST"])       # si el form postea a /login.html
-@app.route("/dashboard.html", methods=["POST"])   # si postea a dashboard.html
-@app.route("/login", methods=["POST"])            # alterno por si cambias el form
+@route("/login.html", methods=["POST"])       # si el form postea a /login.html
+@route("/dashboard.html", methods=["POST"])   # si postea a dashboard.html
+@route("/login", methods=["POST"])            # alterno por si cambias el form
 def login_post():
     # Acepta distintos nombres de campo
     email = _first_of(request.form, ["email", "correo", "user", "username", "userName"])
@@ -537,51 +328,47 @@ def login_post():
         flash("Ingresa correo/usuario y contraseña.", "warning")
         return redirect(url_for("login_html"))
 
-    # Detecta tabla Usuario y columnas reales
-    table = _find_users_table()
-    if not table:
+    # Detecta tabla Usuario y columnas reales (cacheado por proceso)
+    schema = schema_cache.snapshot()
+    if not schema.users_table:
         flash("No se encontró una tabla de usuarios en la base de datos.", "error")
         return redirect(url_for("login_html"))
 
-    # Trae al usuario por Correo (fallback por Nombre)
-    sql = text(f"""
-        SELECT u.*, r.Nombre AS Rol_Nombre
-        FROM {table} u
-        LEFT JOIN Rol r ON r.Codigo_Rol = u.Rol_Id
-        WHERE u.Correo = :val
-        LIMIT 1
-    """)
-    row = db.session.execute(sql, {"val": email}).mappings().first()
-
-    if not row:
-        sql2 = text(f"""
-            SELECT u.*, r.Nombre AS Rol_Nombre
-            FROM {table} u
-            LEFT JOIN Rol r ON r.Codigo_Rol = u.Rol_Id
-            WHERE u.Nombre = :val
-            LIMIT 1
-        """)
-        row = db.session.execute(sql2, {"val": email}).mappings().first()
+    # Trae al usuario por Correo (fallback por Nombre) en una sola consulta
+    row = user_store.find_for_login(email, schema)
 
     if not row:
+        audit.record("login_failed", actor=email.lower(), detail="usuario no encontrado")
         flash("Usuario no encontrado.", "danger")
         return redirect(url_for("login_html"))
 
     # Estado debe estar Activo
     if str(row.get("Estado", "")).lower() != "activo":
+        audit.record("login_failed", actor=email.lower(), actor_id=row.get("Codigo_Usuario"),
+                     detail="usuario inactivo")
         flash("Tu usuario está inactivo. Contacta al administrador.", "danger")
         return redirect(url_for("login_html"))
 
-    # Verificar contraseña (PBKDF2/Scrypt o bcrypt)
-    if not _verify_password(row.get("Contrasena", ""), password):
+    # Verificar contraseña (PBKDF2/Scrypt o bcrypt) en el pool de hashing
+    stored_hash = row.get("Contrasena", "")
+    keys = _hash_keys(email)
+    if not password_hasher.verify(stored_hash, password, keys):
+        audit.record("login_failed", actor=email.lower(), actor_id=row.get("Codigo_Usuario"),
+                     detail="contraseña incorrecta")
         flash("Credenciales inválidas.", "danger")
         return redirect(url_for("login_html"))
 
+    # Migra hashes legados (p.ej. bcrypt $2b$) al algoritmo objetivo
+    new_hash = password_hasher.maybe_rehash(stored_hash, password, keys)
+    if new_hash:
+        user_store.update_password(row.get("Codigo_Usuario"), new_hash)
+
     # Autenticación OK → guardamos sesión mínima
     session["user_id"] = row.get("Codigo_Usuario")
     session["user_email"] = row.get("Correo")
     session["user_name"] = row.get("Nombre")
     session["user_role"] = row.get("Rol_Nombre")  # p.ej. 'Administrador', 'Cliente', etc.
+    audit.record("login")
 
     # Redirección según rol
     role = (row.get("Rol_Nombre") or "").lower()
@@ -590,44 +377,77 @@ def login_post():
     else:
         return redirect(url_for("portal_dashboard_html"))
 
+# ===== Crear contraseña: enlaces firmados de las cuentas importadas (services/guest_import.py) =====
+@route("/set-password.html", methods=["GET", "POST"])
+def set_password_html():
+    token = request.values.get("token", "")
+    claims = guest_import.read_token(token)
+    row = user_store.find_for_login(claims[0]) if claims else None
+    # El token deja de servir en cuanto la contraseña cambia
+    if not row or str(row.get("Correo", "")).lower() != claims[0] \
+            or not guest_import.token_matches(claims[1], row.get("Contrasena")):
+        return render_template("/set-password.html", token=None), 400
+
+    if request.method == "GET":
+        return render_template("/set-password.html", token=token, email=row.get("Correo"))
+
+    password = request.form.get("password") or ""
+    if len(password) < 8 or password != request.form.get("password2"):
+        flash("Las contraseñas deben coincidir y tener al menos 8 caracteres.", "warning")
+        return render_template("/set-password.html", token=token, email=row.get("Correo")), 400
+
+    new_hash = password_hasher.hash(password, _hash_keys(claims[0]))
+    if not user_store.update_password(row.get("Codigo_Usuario"), new_hash):
+        flash("No se pudo guardar la contraseña. Intenta de nuevo.", "danger")
+        return render_template("/set-password.html", token=token, email=row.get("Correo")), 500
+    audit.record("password_set", category="users", entity="Usuario", actor=row.get("Correo"),
+                 actor_id=row.get("Codigo_Usuario"))
+    flash("Contraseña creada. Ya puedes iniciar sesión.", "success")
+    return redirect(url_for("login_html"))
+
+# ===== Olvidé mi contraseña: enlace a set-password.html por el outbox de correo =====
+@route("/forgot-password.html", methods=["POST"])
+def forgot_password_post():
+    email = (_first_of(request.form, ["email", "correo"]) or "").lower()
+    stored = guest_import.current_hash(email) if email else None
+    if stored is not None and not guest_import.base_url:
+        current_app.logger.error("forgot-password: PUBLIC_BASE_URL vacío, no se envía el enlace a %s", email)
+    elif stored is not None:
+        notifications.password_reset(email, guest_import.link(email, stored, emailed=True))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otro request encoló el mismo enlace a la vez (dedupe del outbox): ya va en camino
+            db.session.rollback()
+        audit.record("password_reset", category="users", entity="Usuario", actor=email)
+    # Misma respuesta exista o no la cuenta
+    flash("Si el correo está registrado, te enviamos un enlace para crear una contraseña nueva.", "info")
+    return redirect(url_for("forgot_password_html"))
+
 # ===== Logout =====
-@app.get("/logout")
+@route("/logout", methods=["GET"])
 def logout():
+    if session.get("user_id"):
+        audit.record("logout")
     session.clear()
     flash("Sesión cerrada.", "info")
     return redirect(url_for("login_html"))
 
-@app.route("/restaurant.html")
-def restaurant_html():
-    return render_template("/restaurant.html")
-
-@app.route("/room-details.html")
-def room_details_html():
-    return render_template("/room-details.html")
-
-@app.route("/rooms.html")
-def rooms_html():
-    return render_template("/rooms.html")
-
-@app.route("/starter-page.html")
-def starter_page_html():
-    return render_template("/starter-page.html")
-
-@app.route("/terms.html")
-def terms_html():
-    return render_template("/terms.html")
-
 # -----------------------------------------------------------------------------
 # Ruta física de assets (si la utilizas en algún endpoint)
 # -----------------------------------------------------------------------------
 ASSETS_ROOT = os.path.join(
-    app.static_folder,
+    BASE_DIR, "static",
     'Hotel', 'Hotel Villa Grace', 'LuxuryHotel-pro', 'assets'
 )
 
 # -----------------------------------------------------------------------------
-# Entry point
+# Entry point (sólo desarrollo; en producción: gunicorn -c gunicorn.conf.py wsgi:app)
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
-    app.secret_key = app.config.get("SECRET_KEY", "cambia-esta-clave-ultra-secreta")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app = create_app()
+    app.run(
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", "5000")),
+        debug=os.environ.get("FLASK_DEBUG", "1") == "1",
+    )
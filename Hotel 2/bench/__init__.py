@@ -0,0 +1,11 @@
+"""
+Suite de benchmarks reproducible (carga HTTP y micro-benchmarks).
+
+  python -m bench seed                      # BD SQLite con Usuario/Rol, habitaciones y reservas
+  python -m bench load --concurrency 16     # tráfico concurrente contra un servidor local
+  python -m bench micro                     # funciones calientes, dentro del proceso
+  python -m bench startup --runs 5          # arranque en frío (python -X importtime)
+  python -m bench compare a.json b.json     # diferencias entre dos corridas
+
+Se ejecuta desde "Hotel 2/". Los resultados quedan en bench/results/*.json.
+"""
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from . import load, micro, mock_ota, mock_smtp, report, seed, startup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks de Hotel Villa Grace.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="crea la BD de prueba")
+    p.add_argument("--db", default=seed.DEFAULT_DB, help="URL SQLAlchemy (defecto bench/bench.db)")
+    p.add_argument("--users", type=int, default=1000)
+    p.add_argument("--rooms", type=int, default=40)
+    p.add_argument("--reservations", type=int, default=5000)
+    p.add_argument("--reset", action="store_true", help="borra la BD SQLite antes de sembrar")
+    p.add_argument("--allow-remote", action="store_true", help="permite sembrar una BD no SQLite")
+
+    p = sub.add_parser("load", help="tráfico HTTP concurrente")
+    p.add_argument("--scenarios", help="lista separada por comas (defecto: todos)")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--duration", type=float, default=10.0, help="segundos por escenario")
+    p.add_argument("--warmup", type=int, default=5, help="requests de calentamiento por hilo")
+    p.add_argument("--url", help="servidor ya levantado (no se arranca ni se siembra nada)")
+    p.add_argument("--server", choices=("gunicorn", "werkzeug"), default="gunicorn")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--db", default=seed.DEFAULT_DB)
+    p.add_argument("--users", type=int, default=1000, help="usuarios sembrados (para login_valid)")
+    p.add_argument("--env", action="append", default=[], metavar="CLAVE=VALOR",
+                   help="variable extra para el servidor (repetible)")
+    p.add_argument("-o", "--output", help="ruta del JSON de resultados")
+
+    p = sub.add_parser("micro", help="micro-benchmarks dentro del proceso")
+    p.add_argument("--db", default=seed.DEFAULT_DB)
+    p.add_argument("--min-time", type=float, default=0.5, help="segundos mínimos por caso")
+    p.add_argument("--only", help="casos separados por comas")
+    p.add_argument("-o", "--output", help="ruta del JSON de resultados")
+
+    p = sub.add_parser("startup", help="arranque en frío: imports, create_app y primer request")
+    p.add_argument("--db", default=seed.DEFAULT_DB)
+    p.add_argument("--runs", type=int, default=5, help="procesos nuevos a medir")
+    p.add_argument("--path", default="/", help="URL del primer request")
+    p.add_argument("--budget-ms", type=float, help="falla (código 1) si la mediana de ttfr lo supera")
+    p.add_argument("-o", "--output", help="ruta del JSON de resultados")
+
+    p = sub.add_parser("mock-ota", help="OTA local para probar la distribución de canales")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--token", help="Bearer esperado (defecto: no se comprueba)")
+    p.add_argument("--rate", type=float, default=5.0, help="requests por segundo antes de responder 429")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="probabilidad de responder 503")
+    p.add_argument("--latency", type=float, default=0.0, help="segundos de demora por request")
+
+    p = sub.add_parser("mock-smtp", help="servidor SMTP local para probar el outbox de correo")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8025)
+    p.add_argument("--fail-rate", type=float, default=0.0, help="probabilidad de responder 451 al DATA")
+    p.add_argument("--latency", type=float, default=0.0, help="segundos de demora del saludo")
+    p.add_argument("--mbox", help="agrega los mensajes recibidos a este archivo mbox")
+
+    p = sub.add_parser("compare", help="compara dos JSON de resultados")
+    p.add_argument("a")
+    p.add_argument("b")
+    p.add_argument("--metric")
+
+    args = parser.parse_args(argv)
+    # Los módulos de la app se importan relativos a "Hotel 2/"
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+
+    if args.command == "seed":
+        seed.seed(args.db, args.users, args.rooms, args.reservations, reset=args.reset,
+                  allow_remote=args.allow_remote)
+    elif args.command == "load":
+        overrides = dict(kv.split("=", 1) for kv in args.env)
+        params, results = load.run(
+            scenarios=args.scenarios.split(",") if args.scenarios else None,
+            concurrency=args.concurrency, duration=args.duration, warmup=args.warmup,
+            url=args.url, server=args.server, db_url=args.db, workers=args.workers,
+            threads=args.threads, users=args.users, env_overrides=overrides,
+        )
+        report.print_table(results, ["throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors"])
+        print("→", report.save("load", params, results, args.output))
+    elif args.command == "micro":
+        params, results = micro.run(args.db, args.min_time, args.only.split(",") if args.only else None)
+        print("→", report.save("micro", params, results, args.output))
+    elif args.command == "startup":
+        params, results = startup.run(args.db, args.runs, args.path)
+        report.print_table(results, ["median_ms", "min_ms", "max_ms"])
+        print("→", report.save("startup", params, results, args.output))
+        if args.budget_ms and results["ttfr"]["median_ms"] > args.budget_ms:
+            print(f"ttfr {results['ttfr']['median_ms']} ms > presupuesto {args.budget_ms:.0f} ms")
+            return 1
+    elif args.command == "mock-ota":
+        server, ota = mock_ota.serve(args.host, args.port, token=args.token, rate=args.rate,
+                                     fail_rate=args.fail_rate, latency=args.latency)
+        print(f"OTA de prueba en http://{args.host}:{args.port} (Ctrl+C para salir)")
+        try:
+            while True:
+                time.sleep(10)
+                print(json.dumps(ota.snapshot()["counters"]))
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.command == "mock-smtp":
+        server, sink = mock_smtp.serve(args.host, args.port, fail_rate=args.fail_rate,
+                                       latency=args.latency, mbox=args.mbox)
+        print(f"SMTP de prueba en {args.host}:{args.port} (Ctrl+C para salir)")
+        try:
+            while True:
+                time.sleep(10)
+                print(json.dumps(sink.snapshot()["counters"]))
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        report.compare(args.a, args.b, args.metric)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
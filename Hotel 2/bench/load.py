@@ -0,0 +1,227 @@
+"""
+Carga HTTP concurrente contra el sitio, un escenario a la vez para que cada
+uno tenga sus propios percentiles. Sin dependencias fuera de la biblioteca
+estándar: http.client con una conexión keep-alive por hilo.
+"""
+
+import http.client
+import itertools
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from .report import RESULTS_DIR, summarize
+from .seed import BENCH_PASSWORD, DEFAULT_DB, user_email
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORM = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+# -----------------------------------------------------------------------------
+# Escenarios: función (n, worker) -> (método, ruta, cuerpo, headers, estados OK)
+# -----------------------------------------------------------------------------
+def _get(path):
+    return lambda n, w: ("GET", path, None, {}, (200,))
+
+
+def _login(email_fn, password, expected):
+    def make(n, w):
+        body = urlencode({"email": email_fn(n), "password": password})
+        return "POST", "/login", body, FORM, expected
+    return make
+
+
+def _register(nonce):
+    def make(n, w):
+        body = urlencode({"firstName": "Bench", "lastName": f"W{w}", "email": f"reg-{nonce}-{w}-{n}@example.com",
+                          "telefono": "+506 6000 0000", "password": BENCH_PASSWORD})
+        return "POST", "/register", body, FORM, (200,)
+    return make
+
+
+def _active_email(users):
+    # bench0 es administrador y los i % 50 == 0 están inactivos (ver seed.py)
+    def email(n):
+        i = 1 + n % max(users - 1, 1)
+        if i % 50 == 0:
+            i = i + 1 if i + 1 < users else 1
+        return user_email(i)
+    return email
+
+
+def build_scenarios(users, static_paths, nonce):
+    active = _active_email(users)
+    statics = itertools.cycle(static_paths or ["/static/assets/css/main.css"])
+    lock = threading.Lock()
+
+    def static(n, w):
+        with lock:
+            path = next(statics)
+        return "GET", path, None, {"Accept-Encoding": "br, gzip"}, (200,)
+
+    return {
+        "home": _get("/"),
+        "rooms": _get("/rooms.html"),
+        "login_valid": _login(active, BENCH_PASSWORD, (302,)),
+        "login_invalid": _login(active, "wrong-password", (302,)),
+        "login_unknown": _login(lambda n: f"nobody{n}@example.com", BENCH_PASSWORD, (302,)),
+        "register": _register(nonce),
+        "static": static,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Servidor local
+# -----------------------------------------------------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, db_url, workers, threads, env_overrides):
+    """Arranca gunicorn (o el servidor de Werkzeug) en un subproceso; devuelve (proc, url, log)."""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": db_url, "FLASK_DEBUG": "0", "STARTUP_SELF_CHECK": "0",
+        "PORT": str(port), "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads),
+        # Sin el cupo por IP del pool de hashing: toda la carga sale de 127.0.0.1
+        "PASSWORD_HASH_PER_KEY": "100000",
+    })
+    env.update(env_overrides)
+    if kind == "gunicorn" and shutil.which("gunicorn") is None and sys.platform != "win32":
+        kind = "werkzeug"
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "wsgi:app"]
+    else:
+        cmd = [sys.executable, "app.py"]
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    log_path = os.path.join(RESULTS_DIR, "server.log")
+    log = open(log_path, "w", encoding="utf-8")
+    proc = subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"El servidor terminó al arrancar (ver {log_path})")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/404-bench-probe")
+            conn.getresponse().read()
+            conn.close()
+            return proc, url, kind
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"El servidor no respondió en 30 s (ver {log_path})")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# -----------------------------------------------------------------------------
+# Cliente
+# -----------------------------------------------------------------------------
+def discover_static(base_url, limit=6):
+    """URLs de CSS/JS (con huella si hay manifiesto) que referencia la portada."""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    conn.request("GET", "/")
+    html = conn.getresponse().read().decode("utf-8", "replace")
+    conn.close()
+    paths = re.findall(r"""["'](/static/[^"']+\.(?:css|js))["']""", html)
+    return list(dict.fromkeys(paths))[:limit]
+
+
+def run_scenario(base_url, make_request, concurrency, duration, warmup):
+    parts = urlsplit(base_url)
+    latencies, statuses = [], Counter()
+    errors = 0
+    lock = threading.Lock()
+    counter = itertools.count()
+    stop_at = [float("inf")]  # se fija cuando todos terminaron el calentamiento
+    started = threading.Barrier(concurrency + 1)
+
+    def worker(w):
+        nonlocal errors
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local_lat, local_status, local_err = [], Counter(), 0
+
+        def one(record):
+            nonlocal local_err
+            method, path, body, headers, ok = make_request(next(counter), w)
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status = "exc"
+            elapsed = time.perf_counter() - t0
+            if record:
+                local_lat.append(elapsed)
+                local_status[status] += 1
+                if status not in ok:
+                    local_err += 1
+
+        for _ in range(warmup):
+            one(False)
+        started.wait()
+        while time.perf_counter() < stop_at[0]:
+            one(True)
+        conn.close()
+        with lock:
+            latencies.extend(local_lat)
+            statuses.update(local_status)
+            errors += local_err
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(concurrency)]
+    for t in threads:
+        t.start()
+    started.wait()
+    t0 = time.perf_counter()
+    stop_at[0] = t0 + duration
+    for t in threads:
+        t.join()
+    return summarize(latencies, time.perf_counter() - t0, statuses, errors)
+
+
+def run(scenarios=None, concurrency=8, duration=10.0, warmup=5, url=None, server="gunicorn",
+        db_url=DEFAULT_DB, workers=2, threads=4, users=1000, env_overrides=None, log=print):
+    """Corre los escenarios y devuelve (params, results)."""
+    proc = None
+    kind = "externo"
+    if url is None:
+        proc, url, kind = start_server(server, db_url, workers, threads, env_overrides or {})
+    try:
+        static_paths = discover_static(url)
+        table = build_scenarios(users, static_paths, nonce=f"{int(time.time())}-{os.getpid()}")
+        names = scenarios or list(table)
+        results = {}
+        for name in names:
+            log(f"  {name}: {concurrency} hilos x {duration:g} s ...")
+            results[name] = run_scenario(url, table[name], concurrency, duration, warmup)
+    finally:
+        if proc is not None:
+            stop_server(proc)
+    params = {"scenarios": names, "concurrency": concurrency, "duration_s": duration,
+              "warmup": warmup, "server": kind, "workers": workers, "threads": threads,
+              "db": db_url if proc is not None else None, "url": None if proc is not None else url,
+              "static_paths": static_paths, "env_overrides": env_overrides or {}}
+    return params, results
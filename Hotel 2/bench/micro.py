@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks de las funciones calientes, dentro del proceso y contra la
+BD sembrada: cuánto cuesta cada llamada sin red ni servidor de por medio.
+"""
+
+import os
+import time
+from datetime import date, timedelta
+
+from .seed import BENCH_PASSWORD, DEFAULT_DB, user_email
+
+
+def _timeit(fn, min_time=0.5, min_runs=5):
+    """Repite fn hasta juntar min_time segundos; devuelve (llamadas, µs/llamada)."""
+    fn()  # calentamiento (cachés, compilación de sentencias)
+    runs, elapsed, batch = 0, 0.0, 1
+    while elapsed < min_time or runs < min_runs:
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        elapsed += time.perf_counter() - t0
+        runs += batch
+        batch = min(batch * 2, 1000)
+    return runs, elapsed / runs * 1e6
+
+
+def run(db_url=DEFAULT_DB, min_time=0.5, only=None, log=print):
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("STARTUP_SELF_CHECK", "0")
+    from app import create_app
+    from flask import render_template
+    from extensions import availability, i18n, password_hasher, pricing, user_store
+    from services.i18n import i18n_key, iter_texts
+
+    app = create_app()
+    client = app.test_client()
+    html = client.get("/").get_data(as_text=True)
+    first_text = next(t for t in ("Habitaciones", "Reservar", "Inicio") if t in html)
+    # Diccionario sintético que cubre todos los textos de la portada
+    i18n.dicts.setdefault("en", {i18n_key(t): t.upper() for t in iter_texts(html)})
+    stored_hash = None
+    with app.app_context():
+        row = user_store.find_for_login(user_email(1))
+        stored_hash = row["Contrasena"] if row else None
+
+    def in_app(fn):
+        def wrapped():
+            with app.app_context():
+                fn()
+        return wrapped
+
+    def in_request(fn):
+        def wrapped():
+            with app.test_request_context():
+                fn()
+        return wrapped
+
+    today = date.today()
+    cases = {
+        "page_cached_index": lambda: client.get("/"),
+        "page_dynamic_login": lambda: client.get("/login.html"),
+        "render_portal_dashboard": in_request(lambda: render_template("portal-dashboard.html")),
+        "static_hashed_css": lambda: client.get("/static/assets/css/main.css"),
+        "i18n_key": lambda: i18n_key(first_text),
+        "i18n_translate_index": lambda: i18n.translate_html(html, "en"),
+        "user_store_find": in_app(lambda: user_store.find_for_login(user_email(1))),
+        "availability_search": in_app(lambda: availability.search(today + timedelta(days=30),
+                                                                  today + timedelta(days=33), 2)),
+        "pricing_quote_all_14n": in_app(lambda: pricing.quote_all(today + timedelta(days=30),
+                                                                   today + timedelta(days=44), 2)),
+        "password_verify": lambda: password_hasher.verify(stored_hash, BENCH_PASSWORD),
+    }
+    results = {}
+    for name, fn in cases.items():
+        if only and name not in only:
+            continue
+        calls, per_call = _timeit(fn, min_time)
+        results[name] = {"calls": calls, "per_call_us": round(per_call, 2),
+                         "ops_per_s": round(1e6 / per_call, 1)}
+        log(f"  {name:<24} {per_call:>12.2f} µs/llamada  ({calls} llamadas)")
+    params = {"db": db_url, "min_time_s": min_time, "cases": list(results)}
+    return params, results
@@ -0,0 +1,120 @@
+"""
+OTA de mentira para probar el channel manager sin salir de la máquina.
+
+    python -m bench mock-ota --port 8765 --rate 5 --fail-rate 0.1
+
+- POST /ari     recibe {"updates": [...]} con Authorization: Bearer <token>;
+                responde 429 + Retry-After si se supera --rate por segundo y
+                503 con probabilidad --fail-rate (para ver los reintentos).
+- GET  /state   último valor recibido por (tipo, room_type, plan, fecha)
+                expandido día a día, y contadores.
+- POST /reset   vacía el estado.
+
+Endpoint del canal en admin-channels.html: http://127.0.0.1:8765
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockOta:
+    def __init__(self, token=None, rate=5.0, fail_rate=0.0, latency=0.0):
+        self.token = token
+        self.rate = rate
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.state = {}     # "avail|DBL|-|2026-10-20" -> valor
+            self.counters = {"requests": 0, "accepted": 0, "updates": 0, "throttled": 0,
+                             "failed": 0, "unauthorized": 0}
+            self.window = []    # instantes de los requests del último segundo
+
+    def handle(self, headers, body):
+        """(status, headers, cuerpo dict) para un POST /ari."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.token and headers.get("Authorization") != f"Bearer {self.token}":
+                self.counters["unauthorized"] += 1
+                return 401, {}, {"error": "unauthorized"}
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 1.0]
+            if self.rate and len(self.window) >= self.rate:
+                self.counters["throttled"] += 1
+                return 429, {"Retry-After": "1"}, {"error": "rate limited"}
+            self.window.append(now)
+            if random.random() < self.fail_rate:
+                self.counters["failed"] += 1
+                return 503, {}, {"error": "temporarily unavailable"}
+            try:
+                updates = json.loads(body)["updates"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {}, {"error": "bad payload"}
+            for u in updates:
+                day, last = date.fromisoformat(u["from"]), date.fromisoformat(u["to"])
+                value = u.get("available", u.get("amount"))
+                while day <= last:
+                    self.state[f"{u['type']}|{u['room_type']}|{u.get('plan') or '-'}|{day}"] = value
+                    day += timedelta(days=1)
+            self.counters["accepted"] += 1
+            self.counters["updates"] += len(updates)
+            return 200, {}, {"ok": True, "updates": len(updates)}
+
+    def snapshot(self):
+        with self.lock:
+            return {"counters": dict(self.counters), "state": dict(self.state)}
+
+
+def _handler(ota):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/state":
+                self._send(200, ota.snapshot())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path == "/ari":
+                status, headers, payload = ota.handle(self.headers, body)
+                self._send(status, payload, headers)
+            elif self.path == "/reset":
+                ota.reset()
+                self._send(200, {"ok": True})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def log_message(self, *_args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8765, **kwargs):
+    """Arranca la OTA en un hilo; devuelve (servidor, MockOta)."""
+    ota = MockOta(**kwargs)
+    server = ThreadingHTTPServer((host, port), _handler(ota))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, ota
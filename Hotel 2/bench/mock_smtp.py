@@ -0,0 +1,131 @@
+"""
+Servidor SMTP de mentira para probar el outbox de correo sin enviar nada.
+
+    python -m bench mock-smtp --port 8025 [--fail-rate 0.1] [--latency 0.5] [--mbox enviados.mbox]
+
+- Acepta EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP y QUIT (sin TLS ni AUTH:
+  MAIL_SECURITY=none y sin MAIL_USERNAME).
+- --fail-rate responde 451 al DATA con esa probabilidad (para ver los
+  reintentos); los destinatarios @reject.invalid reciben 550 (error permanente).
+- --latency demora el saludo, como un servidor real lejano: se ve el ahorro
+  de reutilizar la conexión.
+- Cuenta conexiones y mensajes y, con --mbox, los agrega en formato mbox.
+
+En la app: MAIL_HOST=127.0.0.1 MAIL_PORT=8025 MAIL_SECURITY=none
+"""
+
+import random
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+
+class MockSmtp:
+    def __init__(self, fail_rate=0.0, latency=0.0, mbox=None):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.mbox = mbox
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.messages = []  # (remitente, [destinatarios], mensaje)
+            self.counters = {"connections": 0, "messages": 0, "failed": 0, "rejected": 0}
+
+    def deliver(self, sender, recipients, data):
+        """Código SMTP para un DATA completo."""
+        with self.lock:
+            if random.random() < self.fail_rate:
+                self.counters["failed"] += 1
+                return "451 4.3.0 Intente más tarde"
+            msg = message_from_bytes(data, policy=default_policy)
+            self.messages.append((sender, recipients, msg))
+            self.counters["messages"] += 1
+            if self.mbox:
+                with open(self.mbox, "ab") as fh:
+                    fh.write(f"From {sender or 'MAILER-DAEMON'} {time.asctime()}\n".encode())
+                    fh.write(data.replace(b"\nFrom ", b"\n>From ") + b"\n\n")
+        return "250 2.0.0 OK"
+
+    def snapshot(self):
+        with self.lock:
+            return {"counters": dict(self.counters),
+                    "messages": [{"from": s, "to": r, "subject": m["Subject"],
+                                  "id": m["X-Notification-Id"]} for s, r, m in self.messages]}
+
+
+def _handler(sink):
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            with sink.lock:
+                sink.counters["connections"] += 1
+            if sink.latency:
+                time.sleep(sink.latency)
+            self.reply("220 mock-smtp listo")
+            sender, recipients = None, []
+            while True:
+                line = self.rfile.readline(65536)
+                if not line:
+                    return
+                verb, _, arg = line.decode("utf-8", "replace").strip().partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    self.wfile.write(b"250-mock-smtp\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+                elif verb == "HELO":
+                    self.reply("250 mock-smtp")
+                elif verb == "MAIL":
+                    sender, recipients = arg.split(":", 1)[-1].split()[0].strip("<>"), []
+                    self.reply("250 2.1.0 OK")
+                elif verb == "RCPT":
+                    rcpt = arg.split(":", 1)[-1].split()[0].strip("<>")
+                    if rcpt.lower().endswith("@reject.invalid"):
+                        with sink.lock:
+                            sink.counters["rejected"] += 1
+                        self.reply("550 5.1.1 Destinatario inexistente")
+                    else:
+                        recipients.append(rcpt)
+                        self.reply("250 2.1.5 OK")
+                elif verb == "DATA":
+                    if not recipients:
+                        self.reply("554 5.5.1 Sin destinatarios")
+                        continue
+                    self.reply("354 Termine con <CRLF>.<CRLF>")
+                    chunks = []
+                    while True:
+                        chunk = self.rfile.readline(1 << 20)
+                        if not chunk or chunk in (b".\r\n", b".\n"):
+                            break
+                        chunks.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    self.reply(sink.deliver(sender, recipients, b"".join(chunks)))
+                    sender, recipients = None, []
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    self.reply("250 2.0.0 OK")
+                elif verb == "NOOP":
+                    self.reply("250 2.0.0 OK")
+                elif verb == "QUIT":
+                    self.reply("221 2.0.0 Adiós")
+                    return
+                else:
+                    self.reply("502 5.5.2 Comando no soportado")
+
+    return Handler
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(host="127.0.0.1", port=8025, **kwargs):
+    """Arranca el servidor en un hilo; devuelve (servidor, MockSmtp)."""
+    sink = MockSmtp(**kwargs)
+    server = _Server((host, port), _handler(sink))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, sink
@@ -0,0 +1,104 @@
+"""Percentiles, metadatos de la corrida y persistencia/comparación en JSON."""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values, p):
+    """Percentil con interpolación lineal sobre una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies, elapsed, statuses, errors):
+    """Resumen de un escenario: latencias en ms, throughput en req/s."""
+    lat = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None  # noqa: E731
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+        "throughput_rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": ms(sum(lat) / len(lat)) if lat else None,
+        "p50_ms": ms(percentile(lat, 50)),
+        "p95_ms": ms(percentile(lat, 95)),
+        "p99_ms": ms(percentile(lat, 99)),
+        "max_ms": ms(lat[-1]) if lat else None,
+    }
+
+
+def _git(*args):
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                             cwd=os.path.dirname(RESULTS_DIR))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save(kind, params, results, path=None):
+    """Escribe bench/results/<kind>-<fecha>-<commit>.json (o path) y devuelve la ruta."""
+    env = environment()
+    doc = {"kind": kind, "env": env, "params": params, "results": results}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{kind}-{stamp}-{env['commit'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(doc, fh, indent=2, sort_keys=True)
+    return path
+
+
+def print_table(results, columns):
+    names = list(results)
+    width = max([len(n) for n in names] + [8])
+    print(f"{'':{width}}  " + "  ".join(f"{c:>12}" for c in columns))
+    for name in names:
+        row = results[name]
+        print(f"{name:{width}}  " + "  ".join(
+            f"{'-' if row.get(c) is None else row.get(c):>12}" for c in columns))
+
+
+def compare(path_a, path_b, metric=None):
+    """Imprime la variación de cada métrica entre dos corridas del mismo tipo."""
+    with open(path_a, encoding="utf-8") as fh:
+        a = json.load(fh)
+    with open(path_b, encoding="utf-8") as fh:
+        b = json.load(fh)
+    if a["kind"] != b["kind"]:
+        raise SystemExit(f"No comparables: {a['kind']} vs {b['kind']}")
+    metrics = [metric] if metric else {
+        "load": ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"],
+        "startup": ["median_ms"],
+    }.get(a["kind"], ["per_call_us"])
+    print(f"A: {a['env']['commit']} {a['env']['timestamp']}   B: {b['env']['commit']} {b['env']['timestamp']}")
+    for name in sorted(set(a["results"]) & set(b["results"])):
+        parts = []
+        for m in metrics:
+            va, vb = a["results"][name].get(m), b["results"][name].get(m)
+            if va is None or vb is None:
+                continue
+            delta = (vb - va) / va * 100 if va else 0.0
+            parts.append(f"{m} {va} -> {vb} ({delta:+.1f}%)")
+        print(f"  {name}: " + "; ".join(parts))
@@ -0,0 +1,107 @@
+"""
+BD de prueba: esquema Usuario/Rol equivalente al de producción más las tablas
+de los modelos (vía migraciones), con datos deterministas (semilla fija).
+"""
+
+import os
+import random
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = "sqlite:///" + os.path.join(BENCH_DIR, "bench.db").replace(os.sep, "/")
+BENCH_PASSWORD = "bench-Pass-123"
+ROLES = ((1, "Administrador"), (2, "Cliente"), (3, "Recepcionista"))
+
+# Tablas de usuarios con los nombres reales; metadata propia para no
+# mezclarlas con los modelos (que sí gestionan las migraciones).
+_meta = sa.MetaData()
+ROL = sa.Table(
+    "Rol", _meta,
+    sa.Column("Codigo_Rol", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("Nombre", sa.String(50), nullable=False),
+)
+USUARIO = sa.Table(
+    "Usuario", _meta,
+    sa.Column("Codigo_Usuario", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("Nombre", sa.String(120), nullable=False),
+    sa.Column("Correo", sa.String(160), nullable=False, unique=True),
+    sa.Column("Telefono", sa.String(20), nullable=False),
+    sa.Column("Contrasena", sa.String(255), nullable=False),
+    sa.Column("Cedula_Pasaporte", sa.String(30)),
+    sa.Column("Rol_Id", sa.Integer, sa.ForeignKey("Rol.Codigo_Rol")),
+    sa.Column("Estado", sa.String(20), nullable=False),
+    sa.Column("Codigo_Cliente", sa.String(30)),
+)
+
+
+def user_email(i):
+    return f"bench{i}@example.com"
+
+
+def seed(db_url=DEFAULT_DB, users=1000, rooms=40, reservations=5000, reset=False,
+         allow_remote=False, seed_value=42, log=print):
+    """Crea y llena la BD de benchmark. Devuelve un dict con lo sembrado."""
+    if not db_url.startswith("sqlite") and not allow_remote:
+        raise SystemExit("Por seguridad sólo se siembra SQLite; use --allow-remote para "
+                         "una BD desechable compatible con MySQL.")
+    if reset and db_url.startswith("sqlite:///"):
+        path = db_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("STARTUP_SELF_CHECK", "0")
+    from flask_migrate import upgrade
+
+    from app import create_app
+    from extensions import db
+    from models import Reservation, Room
+    from services.password_hasher import hash_password
+
+    app = create_app()
+    rng = random.Random(seed_value)
+    with app.app_context():
+        engine = db.engine
+        _meta.create_all(engine)
+        upgrade(directory=os.path.join(os.path.dirname(BENCH_DIR), "migrations"))
+
+        with engine.begin() as conn:
+            if conn.execute(sa.select(sa.func.count()).select_from(USUARIO)).scalar():
+                log("La BD ya tiene datos (use --reset para recrearla).")
+                return {"db": db_url, "seeded": False}
+            conn.execute(ROL.insert(), [{"Codigo_Rol": c, "Nombre": n} for c, n in ROLES])
+            # Un solo hash: sembrar miles con scrypt no aporta nada al benchmark
+            pwd_hash = hash_password(BENCH_PASSWORD, app.config["PASSWORD_HASH_METHOD"])
+            conn.execute(USUARIO.insert(), [
+                {"Nombre": f"bench{i}", "Correo": user_email(i), "Telefono": f"{60000000 + i}",
+                 "Contrasena": pwd_hash, "Cedula_Pasaporte": f"{100000000 + i}",
+                 "Rol_Id": 1 if i == 0 else 2, "Estado": "Activo" if i % 50 else "Inactivo",
+                 "Codigo_Cliente": None}
+                for i in range(users)
+            ])
+
+        room_rows = [Room(code=f"{100 * (1 + i // 10) + i % 10 + 1}", name=f"Habitación {i + 1}",
+                          capacity=rng.choice((2, 2, 3, 4))) for i in range(rooms)]
+        db.session.add_all(room_rows)
+        db.session.flush()
+        start = date.today() - timedelta(days=90)
+        batch = []
+        for i in range(reservations):
+            check_in = start + timedelta(days=rng.randrange(365))
+            check_out = check_in + timedelta(days=rng.choice((1, 1, 2, 3, 4, 7)))
+            batch.append(Reservation(
+                room_id=rng.choice(room_rows).id, guest_name=f"Huésped {i}",
+                guest_email=f"guest{i}@example.com", check_in=check_in,
+                check_out=check_out,
+                guests=rng.choice((1, 2, 2, 3)),
+                status=rng.choice(("confirmed",) * 8 + ("cancelled", "pending")),
+                channel=rng.choice(("direct", "direct", "booking", "expedia")),
+                room_total=(check_out - check_in).days * rng.randrange(120, 320),
+            ))
+        db.session.add_all(batch)
+        db.session.commit()
+
+    log(f"Sembrado {db_url}: {users} usuarios, {rooms} habitaciones, {reservations} reservas")
+    return {"db": db_url, "seeded": True, "users": users, "rooms": rooms, "reservations": reservations}
@@ -0,0 +1,89 @@
+"""
+Arranque en frío: cada corrida es un intérprete nuevo que importa app, llama a
+create_app() y atiende el primer request (test client, sin red). Mide:
+
+- import          módulos de app.py (flask, sqlalchemy, servicios, modelos)
+- create_app      extensiones, rutas, manifiesto de assets, páginas
+- first_request   primer GET (compila el template, abre la BD si hace falta)
+- ttfr            desde lanzar el proceso hasta tener la primera respuesta
+
+y, con una corrida extra bajo `python -X importtime`, el tiempo propio de
+import agrupado por paquete de primer nivel ("pkg:sqlalchemy", ...), para ver
+qué dependencia creció entre commits.
+
+    python -m bench startup --runs 7 --budget-ms 1500
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from .seed import DEFAULT_DB
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app as appmod
+t1 = time.perf_counter()
+app = appmod.create_app()
+t2 = time.perf_counter()
+status = app.test_client().get(sys.argv[1]).status_code
+t3 = time.perf_counter()
+print(json.dumps({"done": time.time(), "import": (t1 - t0) * 1000, "create_app": (t2 - t1) * 1000,
+                  "first_request": (t3 - t2) * 1000, "status": status}))
+"""
+
+
+def _probe(path, env, importtime=False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE, path]
+    started = time.time()
+    out = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=120)
+    if out.returncode != 0:
+        raise SystemExit(f"El arranque falló:\n{out.stderr[-2000:]}")
+    sample = json.loads(out.stdout.strip().splitlines()[-1])
+    sample["ttfr"] = (sample.pop("done") - started) * 1000
+    return sample, out.stderr
+
+
+def parse_importtime(stderr):
+    """{paquete de primer nivel: ms de import propios} de la salida de -X importtime."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _label, self_us, _cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        totals[name.split(".")[0]] += int(self_us) / 1000
+    return dict(totals)
+
+
+def _row(values):
+    return {
+        "median_ms": round(statistics.median(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+
+def run(db_url=DEFAULT_DB, runs=5, path="/", top=12, log=print):
+    env = dict(os.environ, DATABASE_URL=db_url, STARTUP_SELF_CHECK="0")
+    _probe(path, env)  # descarta la primera: compila los .pyc
+    samples = []
+    for i in range(runs):
+        sample, _ = _probe(path, env)
+        if sample["status"] >= 500:
+            raise SystemExit(f"GET {path} respondió {sample['status']}")
+        samples.append(sample)
+        log(f"  corrida {i + 1}: ttfr {sample['ttfr']:.0f} ms")
+    results = {phase: _row([s[phase] for s in samples])
+               for phase in ("import", "create_app", "first_request", "ttfr")}
+
+    _, stderr = _probe(path, env, importtime=True)
+    packages = sorted(parse_importtime(stderr).items(), key=lambda kv: -kv[1])[:top]
+    for name, ms in packages:
+        results[f"pkg:{name}"] = {"median_ms": round(ms, 1)}
+    params = {"db": db_url, "runs": runs, "path": path}
+    return params, results
@@ -2,17 +2,57 @@ import os
 from urllib.parse import quote_plus
 
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
+# Único punto que carga .env (app.py, wsgi.py y el CLI pasan por aquí). En
+# producción no suele haber .env y python-dotenv ni siquiera se importa.
+_ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(_ENV_FILE):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(_ENV_FILE)
+    except Exception:
+        pass
+
+
+# Perfiles del pool de conexiones de SQLAlchemy (por proceso/worker).
+# pool_recycle queda por debajo del idle timeout de Azure (~4 min) y del
+# wait_timeout de MySQL, para no reutilizar conexiones que el servidor ya cortó.
+ENGINE_PROFILES = {
+    # Servidor de desarrollo: un solo proceso, pocas conexiones
+    "dev": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 10},
+    # Worker de Gunicorn con hilos (gthread): pool ~= hilos por worker
+    "web": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 10},
+    # Procesos de fondo/CLI (backfills, importaciones): conexiones largas
+    "worker": {"pool_size": 2, "max_overflow": 0, "pool_timeout": 30},
+}
+
+
+def _engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS según DB_POOL_PROFILE y overrides DB_POOL_*."""
+    if not uri.startswith("mysql"):
+        return {}  # SQLite/otros: se respetan los pools por defecto del dialecto
+    profile = os.environ.get("DB_POOL_PROFILE", "web")
+    opts = dict(ENGINE_PROFILES.get(profile, ENGINE_PROFILES["web"]))
+    for key, env in (("pool_size", "DB_POOL_SIZE"), ("max_overflow", "DB_MAX_OVERFLOW"),
+                     ("pool_timeout", "DB_POOL_TIMEOUT")):
+        if os.environ.get(env):
+            opts[key] = int(os.environ[env])
+    opts["pool_recycle"] = int(os.environ.get("DB_POOL_RECYCLE", "230"))
+    opts["pool_pre_ping"] = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+    opts["connect_args"] = {
+        "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5")),
+    }
+    return opts
 
 
 class Config:
     
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-change-me")
 
+    # Proxies delante de la app (el front end de Azure = 1): request.remote_addr y
+    # el esquema salen de X-Forwarded-For/-Proto. 0 = conexión directa (desarrollo).
+    # Con 0 detrás de un proxy todos los clientes comparten la IP del proxy.
+    PROXY_FIX_HOPS = int(os.environ.get("PROXY_FIX_HOPS", "0"))
+
    
     DB_USER_RAW = os.environ.get("DB_USER", "root")
     DB_PASSWORD_RAW = os.environ.get("DB_PASSWORD", "1234")
@@ -25,11 +65,154 @@ class Config:
     DB_PASSWORD = quote_plus(DB_PASSWORD_RAW)
 
    
-    SQLALCHEMY_DATABASE_URI = (
+    # DATABASE_URL permite apuntar a otra BD (p.ej. SQLite local) sin tocar DB_*
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or (
         f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
         "?charset=utf8mb4"
     )
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Caché de páginas renderizadas (ver services/pages.py)
+    PAGE_CACHE = os.environ.get("PAGE_CACHE", "1") == "1"
+    PAGE_CACHE_WARM = os.environ.get("PAGE_CACHE_WARM", "0") == "1"
+
+    # Bytecode de Jinja compartido y {% cache %} de fragmentos (ver services/template_cache.py)
+    JINJA_BYTECODE_CACHE = os.environ.get("JINJA_BYTECODE_CACHE", "1") == "1"
+    JINJA_BYTECODE_DIR = os.environ.get("JINJA_BYTECODE_DIR")  # None = instance/jinja-cache
+    FRAGMENT_CACHE = os.environ.get("FRAGMENT_CACHE", "memory")  # memory | shared | none
+    FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "512"))
+    FRAGMENT_CACHE_DIR = os.environ.get("FRAGMENT_CACHE_DIR")  # None = /dev/shm/hotel-fragments-*
+
+    # URLs de assets con huella de contenido (ver services/assets.py)
+    ASSET_FINGERPRINT = os.environ.get("ASSET_FINGERPRINT", "1") == "1"
+    ASSET_PRECOMPRESSED = os.environ.get("ASSET_PRECOMPRESSED", "1") == "1"
+    # Sin ASSET_MANIFEST desplegado: copia del calculado al arrancar (None = tmp del sistema)
+    ASSET_MANIFEST_CACHE = os.environ.get("ASSET_MANIFEST_CACHE")
+
+    # Traducción en el servidor (ver services/i18n.py); el primero es el original
+    I18N_LOCALES = tuple(os.environ.get("I18N_LOCALES", "es,en,fr").split(","))
+
+    # Instrumentación y /metrics (ver services/metrics.py)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+    METRICS_SLOW_REQUEST_MS = float(os.environ.get("METRICS_SLOW_REQUEST_MS", "1000"))
+
+    # Sondas /healthz y /readyz: chequeo de BD en segundo plano (ver services/health.py)
+    HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "5"))
+    HEALTH_STALE_AFTER = float(os.environ.get("HEALTH_STALE_AFTER", "0")) or None
+
+    # Bitácora de auditoría: cola en memoria y escritura por lotes (ver services/audit.py)
+    AUDIT_ENABLED = os.environ.get("AUDIT_ENABLED", "1") == "1"
+    AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "200"))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1"))
+    AUDIT_SPILL_DIR = os.environ.get("AUDIT_SPILL_DIR") or None
+    AUDIT_REPLAY_INTERVAL = float(os.environ.get("AUDIT_REPLAY_INTERVAL", "30"))
+
+    # Correo saliente por outbox y `flask notifications worker` (ver services/notifications.py)
+    MAIL_HOST = os.environ.get("MAIL_HOST") or None
+    MAIL_PORT = int(os.environ.get("MAIL_PORT", "587"))
+    MAIL_USERNAME = os.environ.get("MAIL_USERNAME") or None
+    MAIL_PASSWORD = os.environ.get("MAIL_PASSWORD") or None
+    MAIL_SECURITY = os.environ.get("MAIL_SECURITY", "starttls")   # starttls | ssl | none
+    MAIL_FROM = os.environ.get("MAIL_FROM", "Hotel Villa Grace <no-reply@hotelvillagrace.com>")
+    MAIL_TIMEOUT = float(os.environ.get("MAIL_TIMEOUT", "10"))
+    CONTACT_INBOX = os.environ.get("CONTACT_INBOX", "reservas@hotelvillagrace.com")
+    NOTIFY_WORKERS = int(os.environ.get("NOTIFY_WORKERS", "4"))
+    NOTIFY_BATCH_SIZE = int(os.environ.get("NOTIFY_BATCH_SIZE", "100"))
+    NOTIFY_INTERVAL = float(os.environ.get("NOTIFY_INTERVAL", "2"))
+    NOTIFY_MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", "8"))
+    NOTIFY_RETRY_BASE = float(os.environ.get("NOTIFY_RETRY_BASE", "30"))
+
+    # Autodiagnóstico al arrancar (ver selfcheck.py)
+    STARTUP_SELF_CHECK = os.environ.get("STARTUP_SELF_CHECK", "1") == "1"
+    # Presupuesto de arranque (imports de app.py + create_app); avisa si se pasa
+    STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1500"))
+
+    # Alta anónima de reservas (POST /api/reservations, ver api/booking.py): cupo por IP y worker
+    RESERVATION_RATE_LIMIT = int(os.environ.get("RESERVATION_RATE_LIMIT", "5"))
+    RESERVATION_RATE_WINDOW = float(os.environ.get("RESERVATION_RATE_WINDOW", "600"))
+    # Formularios de contacto y cotización de eventos (ver api/notifications.py): ídem, por formulario
+    FORM_RATE_LIMIT = int(os.environ.get("FORM_RATE_LIMIT", "5"))
+    FORM_RATE_WINDOW = float(os.environ.get("FORM_RATE_WINDOW", "600"))
+
+    # Índice de disponibilidad en memoria (ver services/availability.py)
+    AVAILABILITY_SYNC_INTERVAL = float(os.environ.get("AVAILABILITY_SYNC_INTERVAL", "5"))
+    AVAILABILITY_REBUILD_INTERVAL = float(os.environ.get("AVAILABILITY_REBUILD_INTERVAL", "600"))
+    AVAILABILITY_SYNC_OVERLAP = float(os.environ.get("AVAILABILITY_SYNC_OVERLAP", "60"))
+
+    # Grilla de tarifas precompilada (ver services/pricing.py)
+    PRICING_HORIZON_DAYS = int(os.environ.get("PRICING_HORIZON_DAYS", "730"))
+    PRICING_SYNC_INTERVAL = float(os.environ.get("PRICING_SYNC_INTERVAL", "30"))
+    PRICING_CURRENCY = os.environ.get("PRICING_CURRENCY", "USD")
+    PRICING_DEFAULT_PLAN = os.environ.get("PRICING_DEFAULT_PLAN", "BAR")
+
+    # Calendario de ocupación en memoria (ver services/calendar.py)
+    CALENDAR_PAST_DAYS = int(os.environ.get("CALENDAR_PAST_DAYS", "62"))
+    CALENDAR_FUTURE_DAYS = int(os.environ.get("CALENDAR_FUTURE_DAYS", "400"))
+    CALENDAR_MAX_WINDOW = int(os.environ.get("CALENDAR_MAX_WINDOW", "120"))
+    CALENDAR_SYNC_INTERVAL = float(os.environ.get("CALENDAR_SYNC_INTERVAL", "5"))
+    CALENDAR_REBUILD_INTERVAL = float(os.environ.get("CALENDAR_REBUILD_INTERVAL", "600"))
+    CALENDAR_SYNC_OVERLAP = float(os.environ.get("CALENDAR_SYNC_OVERLAP", "60"))
+
+    # Agregados diarios de los tableros (ver services/rollups.py)
+    ROLLUP_REFRESH_INTERVAL = float(os.environ.get("ROLLUP_REFRESH_INTERVAL", "60"))
+    ROLLUP_CHUNK_DAYS = int(os.environ.get("ROLLUP_CHUNK_DAYS", "31"))
+    ROLLUP_MAX_RANGE_DAYS = int(os.environ.get("ROLLUP_MAX_RANGE_DAYS", "1830"))
+
+    # Distribución ARI a canales / OTAs (ver services/channels.py)
+    CHANNEL_SYNC_INTERVAL = float(os.environ.get("CHANNEL_SYNC_INTERVAL", "2"))
+    CHANNEL_SETTLE_SECONDS = float(os.environ.get("CHANNEL_SETTLE_SECONDS", "5"))
+    CHANNEL_HORIZON_DAYS = int(os.environ.get("CHANNEL_HORIZON_DAYS", "365"))
+    CHANNEL_MAX_RETRIES = int(os.environ.get("CHANNEL_MAX_RETRIES", "4"))
+    CHANNEL_BACKOFF_BASE = float(os.environ.get("CHANNEL_BACKOFF_BASE", "1"))
+    CHANNEL_BACKOFF_MAX = float(os.environ.get("CHANNEL_BACKOFF_MAX", "900"))
+    CHANNEL_CONCURRENCY = int(os.environ.get("CHANNEL_CONCURRENCY", "2"))
+    CHANNEL_TIMEOUT = float(os.environ.get("CHANNEL_TIMEOUT", "15"))
+
+    # Tablero en vivo de operaciones por SSE (ver services/room_status.py)
+    ROOM_STATUS_SYNC_INTERVAL = float(os.environ.get("ROOM_STATUS_SYNC_INTERVAL", "2"))
+    ROOM_STATUS_REBUILD_INTERVAL = float(os.environ.get("ROOM_STATUS_REBUILD_INTERVAL", "300"))
+    ROOM_STATUS_SYNC_OVERLAP = float(os.environ.get("ROOM_STATUS_SYNC_OVERLAP", "60"))
+    ROOM_STATUS_BACKLOG = int(os.environ.get("ROOM_STATUS_BACKLOG", "1000"))
+    ROOM_STATUS_HEARTBEAT = float(os.environ.get("ROOM_STATUS_HEARTBEAT", "15"))
+    ROOM_STATUS_STREAM_SECONDS = float(os.environ.get("ROOM_STATUS_STREAM_SECONDS", "600"))
+    # Con gthread cada stream ocupa un hilo: por defecto la mitad de GUNICORN_THREADS
+    ROOM_STATUS_MAX_CLIENTS = int(os.environ.get("ROOM_STATUS_MAX_CLIENTS")
+                                  or max(int(os.environ.get("GUNICORN_THREADS", "4")) // 2, 1))
+
+    # Roles (Rol.Nombre) con acceso a los endpoints del back-office
+    STAFF_ROLES = tuple(
+        r.strip() for r in os.environ.get("STAFF_ROLES", "Administrador,Recepcionista").split(",") if r.strip()
+    )
+    # ...y a los de administración (importaciones, usuarios)
+    ADMIN_ROLES = tuple(
+        r.strip() for r in os.environ.get("ADMIN_ROLES", "Administrador").split(",") if r.strip()
+    )
+
+    # Caché del esquema de usuarios (segundos; 0 = no vence nunca)
+    SCHEMA_CACHE_TTL = int(os.environ.get("SCHEMA_CACHE_TTL", "300"))
+    # ...y del resultado "no hay tabla de usuarios" (BD sin migrar todavía)
+    SCHEMA_CACHE_NEGATIVE_TTL = int(os.environ.get("SCHEMA_CACHE_NEGATIVE_TTL", "30"))
+
+    # Pool de hashing de contraseñas (ver services/password_hasher.py)
+    PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "0")) or None
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", "16"))
+    PASSWORD_HASH_PER_KEY = int(os.environ.get("PASSWORD_HASH_PER_KEY", "2"))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", "5"))
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_REHASH_ON_LOGIN = os.environ.get("PASSWORD_REHASH_ON_LOGIN", "1") == "1"
+
+    # Importación masiva de huéspedes (ver services/guest_import.py)
+    GUEST_IMPORT_BATCH = int(os.environ.get("GUEST_IMPORT_BATCH", "1000"))
+    GUEST_IMPORT_HASH_WORKERS = int(os.environ.get("GUEST_IMPORT_HASH_WORKERS", "0")) or None
+    GUEST_IMPORT_MAX_ROWS = int(os.environ.get("GUEST_IMPORT_MAX_ROWS", "50000"))
+    SET_PASSWORD_MAX_AGE = int(os.environ.get("SET_PASSWORD_MAX_AGE", str(14 * 86400)))
+    # Origen de los enlaces del CLI y de los correos, p.ej. https://villagrace.com
+    # (sin él no se envían enlaces de recuperación por correo)
+    PUBLIC_BASE_URL = os.environ.get("PUBLIC_BASE_URL", "")
 
     
@@ -1,5 +1,44 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+
+from services.assets import AssetManifest
+from services.audit import AuditLog
+from services.availability import AvailabilityIndex
+from services.calendar import OccupancyCalendar
+from services.channels import ChannelSync
+from services.i18n import Translator
+from services.guest_import import GuestImporter
+from services.health import HealthMonitor
+from services.images import ResponsiveImages
+from services.metrics import Metrics
+from services.migrations import DeferredMigrate
+from services.notifications import Notifier
+from services.pages import PageRegistry
+from services.pricing import PricingEngine
+from services.rollups import Rollups
+from services.room_status import RoomStatusBoard
+from services.password_hasher import PasswordHasher
+from services.schema_cache import SchemaCache
+from services.template_cache import TemplateCache
+from services.user_store import UserStore
 
 db = SQLAlchemy()
-migrate = Migrate()
+migrate = DeferredMigrate()
+schema_cache = SchemaCache()
+user_store = UserStore()
+password_hasher = PasswordHasher()
+pages = PageRegistry()
+assets = AssetManifest()
+images = ResponsiveImages()
+availability = AvailabilityIndex()
+i18n = Translator()
+metrics = Metrics()
+pricing = PricingEngine()
+calendar = OccupancyCalendar()
+rollups = Rollups()
+channels = ChannelSync()
+room_status = RoomStatusBoard()
+guest_import = GuestImporter()
+health = HealthMonitor()
+audit = AuditLog()
+notifications = Notifier()
+template_cache = TemplateCache()
@@ -0,0 +1,51 @@
+# gunicorn.conf.py
+# Configuración de Gunicorn guiada por variables de entorno.
+# Uso:  gunicorn -c gunicorn.conf.py wsgi:app
+
+import multiprocessing
+import os
+
+# El .env del repo es de desarrollo (FLASK_DEBUG=1); load_dotenv no pisa
+# variables ya definidas, así que fijamos aquí el valor de producción.
+os.environ.setdefault("FLASK_DEBUG", "0")
+# En App Service la app siempre está detrás del front end de Azure (un proxy)
+os.environ.setdefault("PROXY_FIX_HOPS", "1")
+
+# Azure App Service expone el puerto en PORT/WEBSITES_PORT
+bind = f"0.0.0.0:{os.environ.get('PORT') or os.environ.get('WEBSITES_PORT') or '8000'}"
+
+# Un proceso por núcleo (x2 + 1) y hilos dentro de cada uno: las vistas pasan
+# la mayor parte del tiempo esperando a MySQL o al pool de hashing.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Reciclar workers periódicamente evita que una fuga de memoria se acumule
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Sin preload: cada worker crea su propio engine/pool tras el fork
+preload_app = False
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
+
+
+def when_ready(server):
+    # Autodiagnóstico una sola vez, en el master, antes de aceptar tráfico. Sin
+    # create_app(): el master no sirve requests, le basta la config y un SELECT 1.
+    from flask import Flask
+    from config import Config
+    from selfcheck import effective_settings, ping_database
+
+    app = Flask("hotel", root_path=os.path.dirname(os.path.abspath(__file__)))
+    app.config.from_object(Config)
+    server.log.info("gunicorn: workers=%s threads=%s bind=%s", workers, threads, bind)
+    server.log.info("self-check: %s", effective_settings(app))
+    ok, ms, detail = ping_database(app.config)
+    server.log.info("self-check db: %s (%s ms, %s)", "ok" if ok else "ERROR", ms, detail)
@@ -0,0 +1,75 @@
+"""login lookup indexes (Correo, Nombre, Rol.Codigo_Rol)
+
+Revision ID: 3f1a9c2d7b10
+Revises: 
+Create Date: 2026-10-17 09:12:00.000000
+
+La tabla de usuarios no está modelada en SQLAlchemy (su nombre se detecta en
+runtime), así que esta migración la resuelve igual que SchemaCache y sólo crea
+los índices que falten.
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+USERS_TABLE_CANDIDATES = ("users", "user", "usuarios", "usuario")
+
+# (nombre de índice, columna) sobre la tabla de usuarios
+USER_INDEXES = (
+    ("ix_usuario_correo", "correo"),
+    ("ix_usuario_nombre", "nombre"),
+)
+
+
+def _users_table(inspector):
+    existing = {t.lower(): t for t in inspector.get_table_names()}
+    candidates = [os.getenv("USERS_TABLE", "").strip() or None, *USERS_TABLE_CANDIDATES]
+    for tbl in (c.lower() for c in candidates if c):
+        if tbl in existing:
+            return existing[tbl]
+    return None
+
+
+def _is_indexed(inspector, table, column):
+    """True si la columna ya encabeza algún índice, unique o PK."""
+    column = column.lower()
+    pk = inspector.get_pk_constraint(table).get("constrained_columns") or []
+    if pk and pk[0].lower() == column:
+        return True
+    for ix in inspector.get_indexes(table) + inspector.get_unique_constraints(table):
+        cols = ix.get("column_names") or []
+        if cols and cols[0] and cols[0].lower() == column:
+            return True
+    return False
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    table = _users_table(inspector)
+    if table:
+        columns = {c["name"].lower(): c["name"] for c in inspector.get_columns(table)}
+        for ix_name, col in USER_INDEXES:
+            if col in columns and not _is_indexed(inspector, table, col):
+                op.create_index(ix_name, table, [columns[col]])
+
+    if "rol" in {t.lower() for t in inspector.get_table_names()}:
+        rol = next(t for t in inspector.get_table_names() if t.lower() == "rol")
+        if not _is_indexed(inspector, rol, "codigo_rol"):
+            op.create_index("ix_rol_codigo_rol", rol, ["Codigo_Rol"], unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in inspector.get_table_names():
+        for ix in inspector.get_indexes(table):
+            if ix["name"] in {"ix_usuario_correo", "ix_usuario_nombre", "ix_rol_codigo_rol"}:
+                op.drop_index(ix["name"], table_name=table)
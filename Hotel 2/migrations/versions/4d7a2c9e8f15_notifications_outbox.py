@@ -0,0 +1,43 @@
+"""notifications outbox for contact forms and transactional email
+
+Revision ID: 4d7a2c9e8f15
+Revises: 9b2e7f4c1d38
+Create Date: 2026-10-17 23:55:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d7a2c9e8f15'
+down_revision = '9b2e7f4c1d38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=30), nullable=False),
+        sa.Column("dedupe_key", sa.String(length=64), nullable=False, unique=True),
+        sa.Column("to_addr", sa.String(length=254), nullable=False),
+        sa.Column("reply_to", sa.String(length=254)),
+        sa.Column("subject", sa.String(length=200), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=10), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_by", sa.String(length=32)),
+        sa.Column("locked_until", sa.DateTime()),
+        sa.Column("last_error", sa.String(length=300)),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime()),
+    )
+    op.create_index("ix_notifications_due", "notifications", ["status", "next_attempt_at"])
+
+
+def downgrade():
+    op.drop_index("ix_notifications_due", table_name="notifications")
+    op.drop_table("notifications")
@@ -0,0 +1,55 @@
+"""rooms and reservations
+
+Revision ID: 8c4e2a61d5f3
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-17 11:40:00.000000
+
+La tabla rooms ya estaba modelada (models/room.py) pero puede existir de un
+db.create_all() previo: sólo se crea si falta.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2a61d5f3'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "rooms" not in tables:
+        op.create_table(
+            "rooms",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("code", sa.String(length=50), nullable=False, unique=True),
+            sa.Column("name", sa.String(length=120), nullable=False),
+            sa.Column("capacity", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+    op.create_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False),
+        sa.Column("guest_name", sa.String(length=120), nullable=False),
+        sa.Column("guest_email", sa.String(length=160)),
+        sa.Column("check_in", sa.Date(), nullable=False),
+        sa.Column("check_out", sa.Date(), nullable=False),
+        sa.Column("guests", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("channel", sa.String(length=30), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_reservations_room_dates", "reservations", ["room_id", "check_in", "check_out"])
+    op.create_index("ix_reservations_updated_at", "reservations", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_reservations_updated_at", table_name="reservations")
+    op.drop_index("ix_reservations_room_dates", table_name="reservations")
+    op.drop_table("reservations")
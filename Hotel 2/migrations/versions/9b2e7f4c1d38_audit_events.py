@@ -0,0 +1,45 @@
+"""audit log for admin-audit.html
+
+Revision ID: 9b2e7f4c1d38
+Revises: c6d1f8a24e53
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e7f4c1d38'
+down_revision = 'c6d1f8a24e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("uid", sa.String(length=32), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("actor_id", sa.Integer()),
+        sa.Column("actor", sa.String(length=120)),
+        sa.Column("role", sa.String(length=40)),
+        sa.Column("category", sa.String(length=20), nullable=False),
+        sa.Column("action", sa.String(length=30), nullable=False),
+        sa.Column("entity", sa.String(length=60)),
+        sa.Column("entity_id", sa.String(length=60)),
+        sa.Column("detail", sa.String(length=300)),
+        sa.Column("status", sa.SmallInteger()),
+        sa.Column("ip", sa.String(length=45)),
+    )
+    op.create_index("ix_audit_events_created", "audit_events", ["created_at", "id"])
+    op.create_index("ix_audit_events_category", "audit_events", ["category", "created_at", "id"])
+    op.create_index("ix_audit_events_actor", "audit_events", ["actor", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_audit_events_actor", table_name="audit_events")
+    op.drop_index("ix_audit_events_category", table_name="audit_events")
+    op.drop_index("ix_audit_events_created", table_name="audit_events")
+    op.drop_table("audit_events")
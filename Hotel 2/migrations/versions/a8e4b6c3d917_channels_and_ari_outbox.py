@@ -0,0 +1,55 @@
+"""channels and ARI outbox for the channel manager
+
+Revision ID: a8e4b6c3d917
+Revises: f3c9d2b7a605
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e4b6c3d917'
+down_revision = 'f3c9d2b7a605'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "channels",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(length=30), nullable=False, unique=True),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("adapter", sa.String(length=30), nullable=False),
+        sa.Column("endpoint", sa.String(length=300)),
+        sa.Column("api_key", sa.String(length=200)),
+        sa.Column("secret", sa.String(length=200)),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("rate_limit", sa.Float(), nullable=False),
+        sa.Column("batch_size", sa.Integer(), nullable=False),
+        sa.Column("ari_cursor", sa.Integer(), nullable=False),
+        sa.Column("failures", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime()),
+        sa.Column("last_sync_at", sa.DateTime()),
+        sa.Column("last_error", sa.String(length=300)),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "ari_changes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("room_type_id", sa.Integer()),
+        sa.Column("plan_code", sa.String(length=30)),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_ari_changes_created_at", "ari_changes", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_ari_changes_created_at", table_name="ari_changes")
+    op.drop_table("ari_changes")
+    op.drop_table("channels")
@@ -0,0 +1,84 @@
+"""pricing: room types, rate plans, rate rules and tax rules
+
+Revision ID: b71d0e94c2a8
+Revises: 8c4e2a61d5f3
+Create Date: 2026-10-17 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d0e94c2a8'
+down_revision = '8c4e2a61d5f3'
+branch_labels = None
+depends_on = None
+
+
+def _stamps():
+    return sa.Column("updated_at", sa.DateTime(), nullable=False)
+
+
+def upgrade():
+    op.create_table(
+        "room_types",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(length=30), nullable=False, unique=True),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("base_rate", sa.Numeric(10, 2), nullable=False),
+        sa.Column("max_occupancy", sa.Integer(), nullable=False),
+        _stamps(),
+    )
+    op.create_table(
+        "rate_plans",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(length=30), nullable=False, unique=True),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("policy", sa.String(length=200)),
+        sa.Column("adjust_pct", sa.Numeric(6, 2), nullable=False),
+        sa.Column("adjust_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        _stamps(),
+    )
+    op.create_table(
+        "rate_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("rate_plan_id", sa.Integer(), sa.ForeignKey("rate_plans.id")),
+        sa.Column("room_type_id", sa.Integer(), sa.ForeignKey("room_types.id")),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("end_date", sa.Date()),
+        sa.Column("weekdays", sa.Integer()),
+        sa.Column("min_nights", sa.Integer()),
+        sa.Column("adjust_pct", sa.Numeric(6, 2), nullable=False),
+        sa.Column("adjust_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        _stamps(),
+    )
+    op.create_table(
+        "tax_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(length=30), nullable=False, unique=True),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("rate", sa.Numeric(10, 2), nullable=False),
+        sa.Column("applies_to", sa.String(length=20), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        _stamps(),
+    )
+    with op.batch_alter_table("rooms") as batch:
+        batch.add_column(sa.Column("room_type_id", sa.Integer()))
+        batch.create_foreign_key("fk_rooms_room_type_id", "room_types", ["room_type_id"], ["id"])
+
+
+def downgrade():
+    with op.batch_alter_table("rooms") as batch:
+        batch.drop_constraint("fk_rooms_room_type_id", type_="foreignkey")
+        batch.drop_column("room_type_id")
+    op.drop_table("tax_rules")
+    op.drop_table("rate_rules")
+    op.drop_table("rate_plans")
+    op.drop_table("room_types")
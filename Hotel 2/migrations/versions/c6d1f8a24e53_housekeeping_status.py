@@ -0,0 +1,51 @@
+"""room housekeeping status and housekeeping tasks for the live ops pages
+
+Revision ID: c6d1f8a24e53
+Revises: a8e4b6c3d917
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d1f8a24e53'
+down_revision = 'a8e4b6c3d917'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("rooms") as batch:
+        batch.add_column(sa.Column("hk_status", sa.String(length=20), nullable=False, server_default="clean"))
+        batch.add_column(sa.Column("hk_note", sa.String(length=200)))
+        batch.add_column(sa.Column("updated_at", sa.DateTime(), nullable=False,
+                                   server_default=sa.func.current_timestamp()))
+    op.create_index("ix_rooms_updated_at", "rooms", ["updated_at"])
+    op.create_table(
+        "housekeeping_tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("assignee", sa.String(length=80)),
+        sa.Column("priority", sa.String(length=10), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_housekeeping_tasks_status", "housekeeping_tasks", ["status", "created_at"])
+    op.create_index("ix_housekeeping_tasks_updated_at", "housekeeping_tasks", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_housekeeping_tasks_updated_at", table_name="housekeeping_tasks")
+    op.drop_index("ix_housekeeping_tasks_status", table_name="housekeeping_tasks")
+    op.drop_table("housekeeping_tasks")
+    op.drop_index("ix_rooms_updated_at", table_name="rooms")
+    with op.batch_alter_table("rooms") as batch:
+        batch.drop_column("updated_at")
+        batch.drop_column("hk_note")
+        batch.drop_column("hk_status")
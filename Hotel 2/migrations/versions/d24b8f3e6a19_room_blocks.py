@@ -0,0 +1,37 @@
+"""room blocks (out-of-order / maintenance) for the occupancy calendar
+
+Revision ID: d24b8f3e6a19
+Revises: b71d0e94c2a8
+Create Date: 2026-10-17 16:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd24b8f3e6a19'
+down_revision = 'b71d0e94c2a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "room_blocks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("reason", sa.String(length=200)),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_room_blocks_room_dates", "room_blocks", ["room_id", "start_date", "end_date"])
+    op.create_index("ix_room_blocks_updated_at", "room_blocks", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_room_blocks_updated_at", table_name="room_blocks")
+    op.drop_index("ix_room_blocks_room_dates", table_name="room_blocks")
+    op.drop_table("room_blocks")
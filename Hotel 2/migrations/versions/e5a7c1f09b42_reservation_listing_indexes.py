@@ -0,0 +1,34 @@
+"""reservation listing indexes (keyset pagination and back-office filters)
+
+Revision ID: e5a7c1f09b42
+Revises: d24b8f3e6a19
+Create Date: 2026-10-17 17:05:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c1f09b42'
+down_revision = 'd24b8f3e6a19'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_reservations_check_in", ["check_in", "id"]),
+    ("ix_reservations_created_at", ["created_at", "id"]),
+    ("ix_reservations_status_check_in", ["status", "check_in"]),
+    ("ix_reservations_channel_check_in", ["channel", "check_in"]),
+    ("ix_reservations_guest_name", ["guest_name"]),
+    ("ix_reservations_guest_email", ["guest_email"]),
+)
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, "reservations", columns)
+
+
+def downgrade():
+    for name, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name="reservations")
@@ -0,0 +1,54 @@
+"""daily rollups for dashboards, plus reservations.room_total
+
+Revision ID: f3c9d2b7a605
+Revises: e5a7c1f09b42
+Create Date: 2026-10-17 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c9d2b7a605'
+down_revision = 'e5a7c1f09b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("reservations") as batch:
+        batch.add_column(sa.Column("room_total", sa.Numeric(10, 2)))
+    op.create_table(
+        "daily_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("room_type_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("rooms_total", sa.Integer(), nullable=False),
+        sa.Column("rooms_out_of_order", sa.Integer(), nullable=False),
+        sa.Column("rooms_sold", sa.Integer(), nullable=False),
+        sa.Column("room_revenue", sa.Numeric(12, 2), nullable=False),
+        sa.Column("arrivals", sa.Integer(), nullable=False),
+        sa.Column("departures", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "rollup_state",
+        sa.Column("name", sa.String(length=40), primary_key=True),
+        sa.Column("watermark", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "rollup_dirty",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_dirty")
+    op.drop_table("rollup_state")
+    op.drop_table("daily_rollups")
+    with op.batch_alter_table("reservations") as batch:
+        batch.drop_column("room_total")
@@ -1 +1,9 @@
-from .room import Room  
+from .room import Room, HK_STATUSES
+from .room_block import RoomBlock, BLOCK_KINDS
+from .reservation import Reservation, ACTIVE_STATUSES, SOLD_STATUSES
+from .pricing import RoomType, RatePlan, RateRule, TaxRule
+from .rollup import DailyRollup, RollupState, RollupDirty
+from .channel import Channel, AriChange, ARI_AVAILABILITY, ARI_RATE, ARI_KINDS, CHANNEL_STATUSES
+from .housekeeping import HousekeepingTask, TASK_KINDS, TASK_PRIORITIES, TASK_STATUSES
+from .audit import AuditEvent, AUDIT_CATEGORIES
+from .notification import Notification, NOTIFICATION_KINDS, NOTIFICATION_STATUSES
@@ -0,0 +1,36 @@
+from datetime import datetime
+from extensions import db
+
+# Categorías del filtro de admin-audit.html
+AUDIT_CATEGORIES = ("auth", "users", "rates", "channels", "reservations", "rooms")
+
+
+class AuditEvent(db.Model):
+    """
+    Bitácora: una fila por login, logout, registro o acción administrativa.
+    La escribe services/audit.py por lotes; uid evita duplicados al reenviar
+    lo que quedó en disco mientras la BD no estaba.
+    """
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        db.Index("ix_audit_events_created", "created_at", "id"),
+        db.Index("ix_audit_events_category", "category", "created_at", "id"),
+        db.Index("ix_audit_events_actor", "actor", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    uid = db.Column(db.String(32), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # hora del evento
+    actor_id = db.Column(db.Integer)                                 # Usuario.Codigo_Usuario
+    actor = db.Column(db.String(120))                                # correo (o el intentado)
+    role = db.Column(db.String(40))
+    category = db.Column(db.String(20), nullable=False)
+    action = db.Column(db.String(30), nullable=False)                # login, logout, CREATE, ...
+    entity = db.Column(db.String(60))
+    entity_id = db.Column(db.String(60))
+    detail = db.Column(db.String(300))
+    status = db.Column(db.SmallInteger)                              # HTTP de la respuesta
+    ip = db.Column(db.String(45))
+
+    def __repr__(self) -> str:
+        return f"<AuditEvent {self.id} {self.action} {self.actor}>"
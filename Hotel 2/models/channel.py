@@ -0,0 +1,52 @@
+from datetime import datetime
+from extensions import db
+
+# Estados de un canal (OTA) y tipos de cambio ARI que se distribuyen
+CHANNEL_STATUSES = ("active", "paused", "disconnected")
+ARI_AVAILABILITY = "avail"      # habitaciones libres por tipo y día
+ARI_RATE = "rate"               # tarifa por noche por tipo, plan y día
+ARI_KINDS = (ARI_AVAILABILITY, ARI_RATE)
+
+
+class Channel(db.Model):
+    __tablename__ = "channels"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(30), unique=True, nullable=False)     # booking, expedia, ...
+    name = db.Column(db.String(120), nullable=False)
+    adapter = db.Column(db.String(30), nullable=False, default="json")
+    endpoint = db.Column(db.String(300))                              # URL base del API ARI
+    api_key = db.Column(db.String(200))
+    secret = db.Column(db.String(200))
+    status = db.Column(db.String(20), nullable=False, default="active")
+    rate_limit = db.Column(db.Float, nullable=False, default=2.0)     # requests por segundo
+    batch_size = db.Column(db.Integer, nullable=False, default=500)   # actualizaciones por request
+    # Progreso de la distribución (ver services/channels.py)
+    ari_cursor = db.Column(db.Integer, nullable=False, default=0)     # último ari_changes.id enviado
+    failures = db.Column(db.Integer, nullable=False, default=0)       # fallos consecutivos
+    next_attempt_at = db.Column(db.DateTime)
+    last_sync_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(300))
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<Channel {self.code} {self.status}>"
+
+
+class AriChange(db.Model):
+    """
+    Outbox de cambios ARI: un rango de días por fila, escrito en la misma
+    transacción que el cambio. room_type_id / plan_code nulos = todos.
+    """
+    __tablename__ = "ari_changes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)
+    room_type_id = db.Column(db.Integer)
+    plan_code = db.Column(db.String(30))
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)                   # exclusivo
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<AriChange {self.id} {self.kind} type={self.room_type_id} {self.start_date}→{self.end_date}>"
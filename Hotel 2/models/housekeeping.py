@@ -0,0 +1,28 @@
+from datetime import datetime
+from extensions import db
+
+TASK_KINDS = ("departure", "daily", "deep")          # salida, diaria, profunda
+TASK_PRIORITIES = ("normal", "high")
+TASK_STATUSES = ("pending", "in_progress", "done")
+
+
+class HousekeepingTask(db.Model):
+    __tablename__ = "housekeeping_tasks"
+    __table_args__ = (
+        db.Index("ix_housekeeping_tasks_status", "status", "created_at"),
+        db.Index("ix_housekeeping_tasks_updated_at", "updated_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id"), nullable=False)
+    kind = db.Column(db.String(20), nullable=False, default="daily")
+    assignee = db.Column(db.String(80))
+    priority = db.Column(db.String(10), nullable=False, default="normal")
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<HousekeepingTask {self.id} room={self.room_id} {self.kind} {self.status}>"
@@ -0,0 +1,37 @@
+from datetime import datetime
+from extensions import db
+
+# Tipos de mensaje y estados del outbox de correo (ver services/notifications.py)
+NOTIFICATION_KINDS = ("contact", "event_quote", "booking_confirmation", "password_reset")
+NOTIFICATION_STATUSES = ("pending", "sending", "sent", "failed")
+
+
+class Notification(db.Model):
+    """
+    Outbox de correo: el request escribe la fila y responde; `flask
+    notifications worker` la entrega. dedupe_key es única: el mismo mensaje
+    enviado dos veces (doble clic, reintento del navegador) es una sola fila.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        db.Index("ix_notifications_due", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    dedupe_key = db.Column(db.String(64), unique=True, nullable=False)
+    to_addr = db.Column(db.String(254), nullable=False)
+    reply_to = db.Column(db.String(254))
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(32))                          # pasada del worker que la envía
+    locked_until = db.Column(db.DateTime)                          # vence si el worker muere
+    last_error = db.Column(db.String(300))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self) -> str:
+        return f"<Notification {self.id} {self.kind} {self.status} → {self.to_addr}>"
@@ -0,0 +1,85 @@
+from datetime import datetime
+from extensions import db
+
+# Tipos de regla de tarifa
+RULE_SEASON = "season"        # rango de fechas [start_date, end_date]
+RULE_WEEKDAY = "weekday"      # días de la semana (bit 0 = lunes)
+RULE_LOS = "los"              # estadía mínima (length of stay)
+RULE_KINDS = (RULE_SEASON, RULE_WEEKDAY, RULE_LOS)
+
+# Tipos de impuesto/cargo
+TAX_PERCENT = "percent"               # % sobre el subtotal de habitación
+TAX_PER_NIGHT = "per_night"           # monto fijo por noche
+TAX_PER_PERSON_NIGHT = "per_person_night"
+TAX_PER_STAY = "per_stay"             # monto fijo por estadía
+TAX_KINDS = (TAX_PERCENT, TAX_PER_NIGHT, TAX_PER_PERSON_NIGHT, TAX_PER_STAY)
+
+
+class RoomType(db.Model):
+    __tablename__ = "room_types"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(30), unique=True, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    base_rate = db.Column(db.Numeric(10, 2), nullable=False)        # tarifa por noche antes de reglas
+    max_occupancy = db.Column(db.Integer, nullable=False, default=2)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<RoomType {self.code} {self.base_rate}>"
+
+
+class RatePlan(db.Model):
+    """Plan vendible (BAR Flexible, No Reembolsable...): ajuste sobre la tarifa base."""
+    __tablename__ = "rate_plans"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(30), unique=True, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    policy = db.Column(db.String(200))
+    adjust_pct = db.Column(db.Numeric(6, 2), nullable=False, default=0)
+    adjust_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<RatePlan {self.code}>"
+
+
+class RateRule(db.Model):
+    """Temporada, día de semana o estadía mínima; sin plan/tipo aplica a todos."""
+    __tablename__ = "rate_rules"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    rate_plan_id = db.Column(db.Integer, db.ForeignKey("rate_plans.id"))
+    room_type_id = db.Column(db.Integer, db.ForeignKey("room_types.id"))
+    start_date = db.Column(db.Date)             # season
+    end_date = db.Column(db.Date)               # season (inclusivo)
+    weekdays = db.Column(db.Integer)            # weekday: máscara de bits, lunes = 1
+    min_nights = db.Column(db.Integer)          # los
+    adjust_pct = db.Column(db.Numeric(6, 2), nullable=False, default=0)
+    adjust_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    priority = db.Column(db.Integer, nullable=False, default=100)  # menor = se aplica antes
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<RateRule {self.kind} {self.name}>"
+
+
+class TaxRule(db.Model):
+    __tablename__ = "tax_rules"
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(30), unique=True, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    rate = db.Column(db.Numeric(10, 2), nullable=False)              # % o monto según kind
+    applies_to = db.Column(db.String(20), nullable=False, default="room")  # room | fnb | both
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<TaxRule {self.code} {self.rate}>"
@@ -0,0 +1,45 @@
+from datetime import datetime
+from extensions import db
+
+# Estados que ocupan la habitación (el resto la libera)
+ACTIVE_STATUSES = ("pending", "confirmed", "checked_in")
+# Estados que cuentan como noche vendida en los reportes (ver services/rollups.py)
+SOLD_STATUSES = ("confirmed", "checked_in", "checked_out")
+
+class Reservation(db.Model):
+    __tablename__ = "reservations"
+    __table_args__ = (
+        # Solapamiento por habitación: room_id = ? AND check_in < ? AND check_out > ?
+        db.Index("ix_reservations_room_dates", "room_id", "check_in", "check_out"),
+        # Sincronización incremental entre procesos (ver services/availability.py)
+        db.Index("ix_reservations_updated_at", "updated_at"),
+        # Listado del back-office: orden por cursor y filtros (ver api/reservations.py)
+        db.Index("ix_reservations_check_in", "check_in", "id"),
+        db.Index("ix_reservations_created_at", "created_at", "id"),
+        db.Index("ix_reservations_status_check_in", "status", "check_in"),
+        db.Index("ix_reservations_channel_check_in", "channel", "check_in"),
+        db.Index("ix_reservations_guest_name", "guest_name"),
+        db.Index("ix_reservations_guest_email", "guest_email"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id"), nullable=False)
+    guest_name = db.Column(db.String(120), nullable=False)
+    guest_email = db.Column(db.String(160))
+    check_in = db.Column(db.Date, nullable=False)
+    check_out = db.Column(db.Date, nullable=False)                  # exclusivo (día de salida)
+    guests = db.Column(db.Integer, nullable=False, default=1)
+    status = db.Column(db.String(20), nullable=False, default="confirmed")
+    channel = db.Column(db.String(30), nullable=False, default="direct")
+    room_total = db.Column(db.Numeric(10, 2))                        # alojamiento sin impuestos
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    room = db.relationship("Room", lazy="joined")
+
+    @property
+    def is_active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def __repr__(self) -> str:
+        return f"<Reservation {self.id} room={self.room_id} {self.check_in}→{self.check_out}>"
@@ -0,0 +1,47 @@
+from datetime import datetime
+from extensions import db
+
+# Agregados diarios para los tableros (ver services/rollups.py). Los KPIs
+# (ocupación, ADR, RevPAR) se derivan al leer a partir de estas sumas.
+
+class DailyRollup(db.Model):
+    __tablename__ = "daily_rollups"
+
+    day = db.Column(db.Date, primary_key=True)
+    room_type_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = sin tipo asignado
+    rooms_total = db.Column(db.Integer, nullable=False, default=0)
+    rooms_out_of_order = db.Column(db.Integer, nullable=False, default=0)       # bloqueos/mantenimiento
+    rooms_sold = db.Column(db.Integer, nullable=False, default=0)
+    room_revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    arrivals = db.Column(db.Integer, nullable=False, default=0)
+    departures = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def rooms_available(self):
+        return max(self.rooms_total - self.rooms_out_of_order, 0)
+
+    def __repr__(self) -> str:
+        return f"<DailyRollup {self.day} type={self.room_type_id} sold={self.rooms_sold}>"
+
+
+class RollupState(db.Model):
+    """Marcas de agua (updated_at ya procesado) por tabla de origen."""
+    __tablename__ = "rollup_state"
+
+    name = db.Column(db.String(40), primary_key=True)
+    watermark = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RollupDirty(db.Model):
+    """
+    Rangos de días a recalcular que la marca de agua no ve: las fechas
+    anteriores de una reserva movida y las reservas o bloqueos borrados.
+    """
+    __tablename__ = "rollup_dirty"
+
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)                   # exclusivo
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -1,14 +1,25 @@
 from datetime import datetime
-from ..extensions import db
+from extensions import db
+
+# Estado de limpieza / servicio (ver services/room_status.py)
+HK_STATUSES = ("clean", "dirty", "inspected", "out_of_order")
 
 class Room(db.Model):
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Sincronización incremental entre procesos (ver services/room_status.py)
+        db.Index("ix_rooms_updated_at", "updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), unique=True, nullable=False)    
     name = db.Column(db.String(120), nullable=False)                 
     capacity = db.Column(db.Integer, nullable=False, default=2)
+    room_type_id = db.Column(db.Integer, db.ForeignKey("room_types.id"))  # tarifa (ver models/pricing.py)
+    hk_status = db.Column(db.String(20), nullable=False, default="clean")
+    hk_note = db.Column(db.String(200))                              # "Fuga baño", ...
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self) -> str:
         return f"<Room {self.code} - {self.name}>"
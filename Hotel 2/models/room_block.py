@@ -0,0 +1,23 @@
+from datetime import datetime
+from extensions import db
+
+# Motivos de bloqueo de una habitación (no vendible esos días)
+BLOCK_KINDS = ("blocked", "maintenance")
+
+class RoomBlock(db.Model):
+    __tablename__ = "room_blocks"
+    __table_args__ = (
+        db.Index("ix_room_blocks_room_dates", "room_id", "start_date", "end_date"),
+        db.Index("ix_room_blocks_updated_at", "updated_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id"), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)                   # exclusivo, como check_out
+    kind = db.Column(db.String(20), nullable=False, default="blocked")
+    reason = db.Column(db.String(200))
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<RoomBlock {self.kind} room={self.room_id} {self.start_date}→{self.end_date}>"
@@ -1,30 +1,279 @@
+"""
+Sincroniza los assets pesados (imágenes, videos, pdf) hacia static/.
 
-from pathlib import Path
-import zipfile, shutil
+Uso:
+  python populate_static_from_original.py                 # usa Hotel.zip junto a este script
+  python populate_static_from_original.py ruta/Hotel.zip  # zip, .tar(.gz) o carpeta
+  python populate_static_from_original.py origen --dry-run --jobs 8
+
+Sólo copia lo que cambió: en un zip compara tamaño y CRC32 del miembro con el
+archivo existente; en tar/carpeta compara tamaño y mtime. También se puede
+usar como librería desde hooks de despliegue:
+
+  from populate_static_from_original import sync_assets
+  report = sync_assets("Hotel.zip")
+"""
 
-# Usage:
-# 1) Put your original 'Hotel.zip' next to this script.
-# 2) Run:  python populate_static_from_original.py
-# 3) It will copy images/videos/etc. into static/ keeping the same structure.
+import argparse
+import os
+import shutil
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 MEDIA_EXTS = {'.jpg','.jpeg','.png','.gif','.svg','.webp','.avif','.mp4','.webm','.ogg','.pdf'}
 
-base = Path(__file__).parent
-src_zip = base / 'Hotel.zip'
-static_dir = base / 'static'
-
-assert src_zip.exists(), "Coloque su Hotel.zip junto a este script."
-static_dir.mkdir(parents=True, exist_ok=True)
-
-with zipfile.ZipFile(src_zip, 'r') as z:
-    for info in z.infolist():
-        if info.is_dir(): 
-            continue
-        ext = Path(info.filename).suffix.lower()
-        if ext in MEDIA_EXTS:
-            target = static_dir / info.filename
-            target.parent.mkdir(parents=True, exist_ok=True)
-            with z.open(info) as src, open(target, 'wb') as dst:
-                shutil.copyfileobj(src, dst)
-
-print("✔ Listo. Los assets pesados fueron copiados a static/ con su misma estructura.")
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_SOURCE = BASE_DIR / 'Hotel.zip'
+STATIC_DIR = BASE_DIR / 'static'
+
+CHUNK = 1 << 20
+
+
+class SyncReport:
+    """Contadores de una sincronización."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.copied = 0
+        self.unchanged = 0
+        self.skipped = 0          # extensiones fuera de MEDIA_EXTS o rutas inválidas
+        self.bytes_copied = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.changed = []         # rutas relativas copiadas (o a copiar en dry-run)
+        self._lock = threading.Lock()
+
+    def add_copied(self, rel, size):
+        with self._lock:
+            self.copied += 1
+            self.bytes_copied += size
+            self.changed.append(rel)
+
+    def add_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def add_unchanged(self):
+        with self._lock:
+            self.unchanged += 1
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    @property
+    def throughput(self):
+        """MB/s de lo efectivamente copiado."""
+        return self.bytes_copied / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        verb = "a copiar" if self.dry_run else "copiados"
+        return (f"{self.copied} {verb} ({self.bytes_copied / 1e6:.1f} MB), "
+                f"{self.unchanged} sin cambios, {self.skipped} omitidos "
+                f"en {self.elapsed:.1f} s ({self.throughput:.1f} MB/s)")
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _safe_target(dest, name):
+    """Ruta destino dentro de dest, o None si el nombre intenta salirse (zip-slip)."""
+    target = (dest / name).resolve()
+    return target if target.is_relative_to(dest.resolve()) else None
+
+
+def _file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(CHUNK), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _write_atomic(target, src_fh, mtime=None):
+    """Escribe en un temporal junto al destino y lo renombra (sin archivos a medias)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'wb') as dst:
+            shutil.copyfileobj(src_fh, dst, CHUNK)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _same_size_mtime(target, size, mtime):
+    try:
+        st = target.stat()
+    except FileNotFoundError:
+        return False
+    return st.st_size == size and int(st.st_mtime) == int(mtime)
+
+
+def _is_media(name, exts):
+    return exts is None or Path(name).suffix.lower() in exts
+
+
+# -----------------------------------------------------------------------------
+# Fuentes
+# -----------------------------------------------------------------------------
+def _sync_zip(src, dest, exts, jobs, report, progress):
+    with zipfile.ZipFile(src) as z:
+        members = [i for i in z.infolist() if not i.is_dir()]
+
+    # Un ZipFile por hilo: cada uno con su propio descriptor y descompresor
+    local = threading.local()
+    handles = []
+
+    def handle():
+        if not hasattr(local, 'zip'):
+            local.zip = zipfile.ZipFile(src)
+            handles.append(local.zip)
+        return local.zip
+
+    def work(info):
+        target = _safe_target(dest, info.filename)
+        if target is None or not _is_media(info.filename, exts):
+            report.add_skipped()
+            return
+        if (target.exists() and target.stat().st_size == info.file_size
+                and _file_crc32(target) == info.CRC):
+            report.add_unchanged()
+        else:
+            if not report.dry_run:
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                with handle().open(info) as fh:
+                    _write_atomic(target, fh, mtime)
+            report.add_copied(info.filename, info.file_size)
+        if progress:
+            progress(report)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(work, members))
+    finally:
+        for z in handles:
+            z.close()
+
+
+def _sync_dir(src, dest, exts, jobs, report, progress):
+    files = [p for p in src.rglob('*') if p.is_file()]
+
+    def work(path):
+        rel = path.relative_to(src).as_posix()
+        target = _safe_target(dest, rel)
+        if target is None or not _is_media(rel, exts):
+            report.add_skipped()
+            return
+        st = path.stat()
+        if _same_size_mtime(target, st.st_size, st.st_mtime):
+            report.add_unchanged()
+        else:
+            if not report.dry_run:
+                with open(path, 'rb') as fh:
+                    _write_atomic(target, fh, st.st_mtime)
+            report.add_copied(rel, st.st_size)
+        if progress:
+            progress(report)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(work, files))
+
+
+def _sync_tar(src, dest, exts, report, progress):
+    # Un tar comprimido no admite acceso aleatorio: se recorre en streaming,
+    # de forma secuencial, sin cargarlo en memoria.
+    with tarfile.open(src, 'r|*') as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            target = _safe_target(dest, member.name)
+            if target is None or not _is_media(member.name, exts):
+                report.add_skipped()
+                continue
+            if _same_size_mtime(target, member.size, member.mtime):
+                report.add_unchanged()
+            else:
+                if not report.dry_run:
+                    _write_atomic(target, tar.extractfile(member), member.mtime)
+                report.add_copied(member.name, member.size)
+            if progress:
+                progress(report)
+
+
+# -----------------------------------------------------------------------------
+# API pública
+# -----------------------------------------------------------------------------
+def sync_assets(source=DEFAULT_SOURCE, dest=STATIC_DIR, exts=MEDIA_EXTS, jobs=None,
+                dry_run=False, progress=None):
+    """
+    Copia a dest los archivos de source (zip, tar[.gz|.bz2|.xz] o carpeta)
+    que no existan o hayan cambiado. exts=None copia todas las extensiones.
+    Devuelve un SyncReport.
+    """
+    source, dest = Path(source), Path(dest)
+    if not source.exists():
+        raise FileNotFoundError(f"No existe el origen: {source}")
+    dest.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or min(32, (os.cpu_count() or 1) * 4)  # E/S: más hilos que núcleos
+    report = SyncReport(dry_run=dry_run)
+
+    if source.is_dir():
+        _sync_dir(source, dest, exts, jobs, report, progress)
+    elif zipfile.is_zipfile(source):
+        _sync_zip(source, dest, exts, jobs, report, progress)
+    elif tarfile.is_tarfile(source):
+        _sync_tar(source, dest, exts, report, progress)
+    else:
+        raise ValueError(f"Formato de origen no soportado: {source}")
+    return report.finish()
+
+
+def _progress_printer(every=50):
+    def progress(report):
+        done = report.copied + report.unchanged
+        if done % every == 0:
+            elapsed = time.perf_counter() - report.started
+            print(f"  {done} archivos, {report.bytes_copied / 1e6:.1f} MB "
+                  f"({report.bytes_copied / 1e6 / max(elapsed, 1e-9):.1f} MB/s)", flush=True)
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Restaura los assets pesados en static/.")
+    parser.add_argument('source', nargs='?', default=str(DEFAULT_SOURCE),
+                        help="Hotel.zip, un .tar(.gz) o una carpeta (defecto: Hotel.zip)")
+    parser.add_argument('--dest', default=str(STATIC_DIR))
+    parser.add_argument('--jobs', type=int, default=None, help="hilos de copia")
+    parser.add_argument('--dry-run', action='store_true', help="sólo informa qué cambiaría")
+    parser.add_argument('--all-files', action='store_true',
+                        help="copia todas las extensiones, no sólo media")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not Path(args.source).exists():
+        print(f"Coloque su Hotel.zip junto a este script o indique un origen ({args.source}).",
+              file=sys.stderr)
+        return 1
+
+    report = sync_assets(args.source, args.dest, exts=None if args.all_files else MEDIA_EXTS,
+                         jobs=args.jobs, dry_run=args.dry_run,
+                         progress=None if args.quiet else _progress_printer())
+    if args.dry_run:
+        for rel in sorted(report.changed):
+            print(f"  ~ {rel}")
+    print(f"✔ Listo. {report.summary()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# selfcheck.py
+# Autodiagnóstico de arranque: informa la configuración efectiva (pool de BD,
+# hashing, modo debug) y, con `flask self-check`, prueba la conexión a la BD.
+
+import logging
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+log = logging.getLogger("hotel.selfcheck")
+
+
+def effective_settings(app):
+    """Dict con los ajustes que importan en producción."""
+    cfg = app.config
+    engine_opts = dict(cfg.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    engine_opts.pop("connect_args", None)
+    url = cfg.get("SQLALCHEMY_DATABASE_URI", "")
+    return {
+        "pid": os.getpid(),
+        "debug": app.debug,
+        "database": url.split("@")[-1].split("?")[0],  # sin credenciales
+        "engine": engine_opts,
+        "connect_timeout": (cfg.get("SQLALCHEMY_ENGINE_OPTIONS") or {}).get("connect_args", {}).get("connect_timeout"),
+        "password_hash": {
+            "executor": cfg.get("PASSWORD_HASH_EXECUTOR"),
+            "workers": cfg.get("PASSWORD_HASH_WORKERS") or os.cpu_count(),
+            "method": cfg.get("PASSWORD_HASH_METHOD"),
+        },
+        "web_concurrency": os.environ.get("WEB_CONCURRENCY"),
+        "startup_ms": app.extensions.get("startup"),
+        "warnings": _warnings(app),
+    }
+
+
+def _warnings(app):
+    out = []
+    if app.config.get("SECRET_KEY") in (None, "", "dev-secret-key-change-me"):
+        out.append("SECRET_KEY por defecto: definir SECRET_KEY en el entorno")
+    if app.debug:
+        out.append("DEBUG activo")
+    elif app.config.get("METRICS_ENABLED", True) and not app.config.get("METRICS_TOKEN"):
+        out.append("METRICS_TOKEN sin definir: /metrics responde 404")
+    startup = app.extensions.get("startup")
+    budget = app.config.get("STARTUP_BUDGET_MS")
+    if startup and budget and startup["import_ms"] + startup["create_app_ms"] > budget:
+        out.append(f"arranque de {startup['import_ms'] + startup['create_app_ms']:.0f} ms "
+                   f"(presupuesto STARTUP_BUDGET_MS={budget:.0f}): ver python -m bench startup")
+    opts = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    if app.config.get("SQLALCHEMY_DATABASE_URI", "").startswith("mysql") and not opts.get("pool_pre_ping"):
+        out.append("pool_pre_ping desactivado: posibles conexiones caídas tras inactividad")
+    return out
+
+
+def log_settings(app):
+    settings = effective_settings(app)
+    log.info("Configuración efectiva: %s", settings)
+    for w in settings["warnings"]:
+        log.warning("[self-check] %s", w)
+    return settings
+
+
+def _select_one(engine):
+    t0 = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        ok, detail = True, engine.pool.status()
+    except Exception as e:
+        ok, detail = False, e.__class__.__name__
+    return ok, round((time.perf_counter() - t0) * 1000, 1), detail
+
+
+def check_database(app):
+    """Abre una conexión del pool, ejecuta SELECT 1 y devuelve (ok, ms, detalle)."""
+    from extensions import db
+    with app.app_context():
+        return _select_one(db.engine)
+
+
+def ping_database(config):
+    """
+    Igual que check_database pero sin app ni pool: una conexión suelta que se
+    cierra al terminar. Es lo que usa el master de Gunicorn.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    connect_args = (config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}).get("connect_args", {})
+    engine = create_engine(config["SQLALCHEMY_DATABASE_URI"], poolclass=NullPool, connect_args=connect_args)
+    try:
+        return _select_one(engine)
+    finally:
+        engine.dispose()
+
+
+@click.command("self-check")
+@with_appcontext
+def self_check_command():
+    """Muestra la configuración efectiva y prueba la conexión a la BD."""
+    app = current_app._get_current_object()
+    settings = effective_settings(app)
+    for key, value in settings.items():
+        click.echo(f"{key:>16}: {value}")
+    ok, ms, detail = check_database(app)
+    click.echo(f"{'db':>16}: {'ok' if ok else 'ERROR'} en {ms} ms ({detail})")
+    if not ok:
+        raise SystemExit(1)
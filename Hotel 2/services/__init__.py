@@ -0,0 +1,20 @@
+from .assets import AssetManifest
+from .audit import AuditLog
+from .availability import AvailabilityIndex, BookingConflict
+from .calendar import OccupancyCalendar
+from .channels import ChannelSync
+from .i18n import Translator
+from .guest_import import GuestImporter, GuestImportError
+from .health import HealthMonitor
+from .images import ResponsiveImages
+from .metrics import Metrics
+from .migrations import DeferredMigrate
+from .notifications import MailError, Notifier
+from .pages import PageRegistry
+from .pricing import PricingEngine
+from .rollups import Rollups
+from .room_status import RoomStatusBoard
+from .password_hasher import HashingBusy, PasswordHasher
+from .schema_cache import SchemaCache
+from .template_cache import TemplateCache
+from .user_store import UserStore
@@ -0,0 +1,298 @@
+# services/assets.py
+# Manifiesto de assets con huella de contenido: url_for('static', ...) emite
+# rutas como assets/css/main.3f9a1c0b2d.css, que se sirven con caché
+# inmutable de un año, ETag fuerte y 304. Si existen hermanos precomprimidos
+# (.br/.gz) se elige la codificación según Accept-Encoding.
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import AppGroup
+
+try:
+    import brotli  # opcional: sólo para generar .br
+except ModuleNotFoundError:
+    brotli = None
+
+MANIFEST_NAME = "asset-manifest.json"
+HASH_LEN = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# 'dir/nombre.<hash>.ext' -> ('dir/nombre', '<hash>', '.ext')
+_HASHED_NAME = re.compile(r"^(.*)\.([0-9a-f]{%d})(\.[^./]+)$" % HASH_LEN)
+
+# Codificaciones precomprimidas, en orden de preferencia
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_EXTS = {".css", ".js", ".mjs", ".json", ".svg", ".map", ".txt", ".xml", ".ttf", ".eot"}
+_ENCODED_SUFFIXES = tuple(suffix for _enc, suffix in ENCODINGS)
+
+assets_cli = AppGroup("assets", help="Construcción de assets estáticos.")
+
+
+def file_digest(path, chunk=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def hashed_name(filename, digest):
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest[:HASH_LEN]}{ext}"
+
+
+def build_manifest(static_dir, subdir="assets", previous=None):
+    """
+    {ruta relativa a static/: {"hash", "size", "mtime"}} para todo static/<subdir>.
+    Con previous se reutiliza la huella de los archivos con igual tamaño y mtime.
+    """
+    previous = previous or {}
+    manifest = {}
+    root = os.path.join(static_dir, subdir)
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            if name.endswith(_ENCODED_SUFFIXES):
+                continue  # los hermanos .br/.gz comparten la huella del original
+            full = os.path.join(dirpath, name)
+            rel = os.path.relpath(full, static_dir).replace(os.sep, "/")
+            st = os.stat(full)
+            prev = previous.get(rel)
+            if prev and prev["size"] == st.st_size and prev["mtime"] == st.st_mtime_ns:
+                manifest[rel] = prev
+            else:
+                manifest[rel] = {"hash": file_digest(full), "size": st.st_size, "mtime": st.st_mtime_ns}
+    return manifest
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Escritura atómica: otro worker nunca lee un archivo a medias."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=0, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def scan_encoded(static_dir, subdir="assets"):
+    """{ruta: (codificaciones disponibles)} para hermanos .br/.gz al día con su original."""
+    found = {}
+    root = os.path.join(static_dir, subdir)
+    for dirpath, _dirs, files in os.walk(root):
+        names = set(files)
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTS:
+                continue
+            src_mtime = os.stat(os.path.join(dirpath, name)).st_mtime_ns
+            encs = tuple(
+                enc for enc, suffix in ENCODINGS
+                if name + suffix in names
+                and os.stat(os.path.join(dirpath, name + suffix)).st_mtime_ns >= src_mtime
+            )
+            if encs:
+                rel = os.path.relpath(os.path.join(dirpath, name), static_dir).replace(os.sep, "/")
+                found[rel] = encs
+    return found
+
+
+def precompress(static_dir, subdir="assets", force=False, min_size=1024):
+    """
+    Escribe hermanos .gz (y .br si está el módulo brotli) para los assets de
+    texto. Omite los que ya estén al día. Devuelve (escritos, bytes_orig, bytes_br_o_gz).
+    """
+    written, raw_total, best_total = 0, 0, 0
+    root = os.path.join(static_dir, subdir)
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTS:
+                continue
+            full = os.path.join(dirpath, name)
+            st = os.stat(full)
+            if st.st_size < min_size:
+                continue  # no compensa la cabecera Content-Encoding
+            with open(full, "rb") as fh:
+                data = fh.read()
+            outputs = {".gz": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                outputs[".br"] = lambda d: brotli.compress(d, quality=11)
+            sizes = []
+            for suffix, compress in outputs.items():
+                target = full + suffix
+                if not force and os.path.exists(target) and os.stat(target).st_mtime_ns >= st.st_mtime_ns:
+                    sizes.append(os.stat(target).st_size)
+                    continue
+                blob = compress(data)
+                if len(blob) >= st.st_size:
+                    continue  # ya venía comprimido (p.ej. minificado binario)
+                with open(target, "wb") as out:
+                    out.write(blob)
+                sizes.append(len(blob))
+                written += 1
+            if sizes:
+                raw_total += st.st_size
+                best_total += min(sizes)
+    return written, raw_total, best_total
+
+
+class AssetManifest:
+    """
+    ASSET_FINGERPRINT   activa las URLs con huella (defecto True)
+    ASSET_MANIFEST      ruta del manifiesto (defecto static/asset-manifest.json);
+                        si no existe se calcula al arrancar
+    ASSET_MANIFEST_CACHE  copia del manifiesto calculado al arrancar (defecto en el
+                        tmp del sistema; "" = no guardar): los demás workers y
+                        reinicios sólo rehashean archivos con otro tamaño o mtime
+    ASSET_PRECOMPRESSED sirve hermanos .br/.gz si existen (defecto True)
+    """
+
+    def __init__(self, app=None):
+        self.entries = {}
+        self.encoded = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.static_dir = app.static_folder
+        self.enabled = app.config.get("ASSET_FINGERPRINT", True)
+        self.precompressed = app.config.get("ASSET_PRECOMPRESSED", True)
+        self.path = app.config.get("ASSET_MANIFEST") or os.path.join(self.static_dir, MANIFEST_NAME)
+        self.cache_path = app.config.get("ASSET_MANIFEST_CACHE")
+        if self.cache_path is None:
+            tag = hashlib.blake2b(os.path.abspath(self.static_dir).encode(), digest_size=6).hexdigest()
+            self.cache_path = os.path.join(tempfile.gettempdir(), f"asset-manifest-{tag}.json")
+        # En debug se revisa el mtime para no servir huellas viejas
+        self.check_mtime = app.debug
+        app.extensions["assets"] = self
+        app.cli.add_command(assets_cli)
+
+        if self.enabled:
+            self.load()
+            app.url_defaults(self._url_defaults)
+        if self.precompressed:
+            self.encoded = scan_encoded(self.static_dir)
+        app.view_functions["static"] = self.send_static
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+            return
+        cached = _read_json(self.cache_path) if self.cache_path else None
+        self.entries = build_manifest(self.static_dir, previous=cached)
+        if self.cache_path and self.entries != cached:
+            _write_json(self.cache_path, self.entries)
+
+    def url_for_file(self, filename):
+        """Nombre con huella para filename, o filename si no está en el manifiesto."""
+        entry = self._entry(filename)
+        return hashed_name(filename, entry["hash"]) if entry else filename
+
+    def send_static(self, filename):
+        """Reemplazo de la vista 'static': entiende nombres con huella y .br/.gz."""
+        m = _HASHED_NAME.match(filename) if self.enabled else None
+        if m:
+            original = m.group(1) + m.group(3)
+            entry = self._entry(original)
+            if entry and entry["hash"].startswith(m.group(2)):
+                resp = self._send(original, etag=entry["hash"], max_age=31536000)
+                resp.headers["Cache-Control"] = IMMUTABLE
+                return resp
+            if entry:
+                # Huella vieja (deploy anterior): se sirve el actual sin inmutable
+                return self._send(original, max_age=0)
+        return self._send(filename, max_age=current_app.get_send_file_max_age(filename))
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _entry(self, filename):
+        entry = self.entries.get(filename)
+        if entry is None or not self.check_mtime:
+            return entry
+        full = os.path.join(self.static_dir, filename)
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        if st.st_mtime_ns != entry["mtime"]:
+            with self._lock:
+                entry = {"hash": file_digest(full), "size": st.st_size, "mtime": st.st_mtime_ns}
+                self.entries[filename] = entry
+        return entry
+
+    def _send(self, filename, etag=True, max_age=None):
+        encs = self.encoded.get(filename)
+        if not encs:
+            return send_from_directory(self.static_dir, filename, etag=etag, max_age=max_age)
+
+        accepted = request.accept_encodings
+        enc = next((e for e in encs if accepted[e] > 0), None)
+        if enc is None:
+            resp = send_from_directory(self.static_dir, filename, etag=etag, max_age=max_age)
+        else:
+            suffix = dict(ENCODINGS)[enc]
+            # Misma URL, otro cuerpo: el ETag debe distinguir la codificación
+            resp = send_from_directory(
+                self.static_dir, filename + suffix,
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                etag=f"{etag}-{enc}" if isinstance(etag, str) else True,
+                max_age=max_age,
+            )
+            resp.headers["Content-Encoding"] = enc
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = self.url_for_file(values["filename"])
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app assets manifest
+# -----------------------------------------------------------------------------
+@assets_cli.command("manifest")
+def manifest_command():
+    """Calcula la huella de static/assets y escribe el manifiesto."""
+    ext = current_app.extensions["assets"]
+    manifest = build_manifest(ext.static_dir)
+    with open(ext.path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=0, sort_keys=True)
+    ext.entries = manifest
+    total = sum(e["size"] for e in manifest.values())
+    click.echo(f"{len(manifest)} archivos ({total / 1e6:.1f} MB) -> {ext.path}")
+
+
+@assets_cli.command("compress")
+@click.option("--force", is_flag=True, help="Recomprimir aunque el hermano esté al día.")
+def compress_command(force):
+    """Escribe hermanos .br/.gz de los assets de texto (CSS, JS, SVG...)."""
+    if brotli is None:
+        click.echo("Aviso: módulo brotli no instalado, sólo se generan .gz "
+                   "(python -m pip install Brotli)")
+    ext = current_app.extensions["assets"]
+    written, raw, best = precompress(ext.static_dir, force=force)
+    ext.encoded = scan_encoded(ext.static_dir)
+    click.echo(f"{written} archivos escritos; {raw / 1e6:.1f} MB -> {best / 1e6:.1f} MB")
@@ -0,0 +1,366 @@
+# services/audit.py
+# Bitácora de auditoría (audit_events, admin-audit.html): logins, logouts,
+# registros y acciones administrativas sobre /api.
+#
+# - record() arma el evento con los datos del request y lo deja en una cola
+#   acotada en memoria: no toca la BD ni espera, el login no se entera.
+# - Un hilo escritor por proceso vacía la cola en INSERT multi-fila cuando
+#   junta AUDIT_BATCH_SIZE eventos o pasan AUDIT_FLUSH_INTERVAL segundos.
+# - Si la BD falla, el lote se agrega a un JSONL en AUDIT_SPILL_DIR (uno por
+#   proceso) y se reenvía solo cuando la BD vuelve (cada
+#   AUDIT_REPLAY_INTERVAL segundos) o con `flask audit replay`. Si la cola se
+#   llena (escritor colgado en una BD que no responde) el evento va directo
+#   al archivo. Cada evento lleva un uid: reenviar dos veces no duplica.
+# - Las acciones sobre /api se registran en un after_request: cualquier
+#   POST/PUT/PATCH/DELETE con sesión que termine en 2xx. Nunca se guardan
+#   cuerpos ni contraseñas.
+
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import click
+from flask import current_app, has_request_context, request, session
+from flask.cli import AppGroup
+from sqlalchemy import insert, select
+
+from services.worker_thread import ProcessThread
+
+log = logging.getLogger("hotel.audit")
+
+audit_cli = AppGroup("audit", help="Bitácora de auditoría.")
+
+# Módulo de api/ -> categoría del filtro de admin-audit.html
+API_CATEGORIES = {
+    "guests": "users",
+    "pricing": "rates",
+    "channels": "channels",
+    "booking": "reservations",
+    "reservations": "reservations",
+    "room_status": "rooms",
+    "calendar": "rooms",
+}
+API_ACTIONS = {"POST": "CREATE", "PUT": "UPDATE", "PATCH": "UPDATE", "DELETE": "DELETE"}
+# Eventos por INSERT al reenviar un archivo del disco
+REPLAY_CHUNK = 500
+
+
+class AuditLog:
+    """
+    AUDIT_ENABLED          registra eventos (defecto True)
+    AUDIT_QUEUE_SIZE       eventos en memoria por proceso antes de ir a disco (defecto 10000)
+    AUDIT_BATCH_SIZE       eventos por INSERT (defecto 200)
+    AUDIT_FLUSH_INTERVAL   segundos máximos que un evento espera en la cola (defecto 1)
+    AUDIT_SPILL_DIR        JSONL de respaldo con la BD caída (defecto <instance>/audit-spill)
+    AUDIT_REPLAY_INTERVAL  segundos entre reenvíos de lo que quedó en disco (defecto 30)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.app = None
+        self._queue = queue.Queue()
+        self._spill_lock = threading.Lock()
+        self._thread = ProcessThread(self._run, "audit-writer")
+        self._stop = threading.Event()
+        self._replayed_at = 0.0
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0, "failures": 0}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.app = app
+        self.enabled = app.config.get("AUDIT_ENABLED", True)
+        self.batch_size = int(app.config.get("AUDIT_BATCH_SIZE", 200))
+        self.flush_interval = float(app.config.get("AUDIT_FLUSH_INTERVAL", 1))
+        self.replay_interval = float(app.config.get("AUDIT_REPLAY_INTERVAL", 30))
+        self.spill_dir = app.config.get("AUDIT_SPILL_DIR") or os.path.join(app.instance_path, "audit-spill")
+        self._queue = queue.Queue(maxsize=int(app.config.get("AUDIT_QUEUE_SIZE", 10000)))
+        app.extensions["audit"] = self
+        app.cli.add_command(audit_cli)
+        if self.enabled:
+            app.after_request(self._after_request)
+            atexit.register(self.close)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def record(self, action, category="auth", entity=None, entity_id=None, detail=None,
+               actor=None, actor_id=None, status=None):
+        """Encola un evento; actor/rol/IP salen de la sesión y el request si no se pasan."""
+        if not self.enabled:
+            return
+        event = {
+            "uid": uuid.uuid4().hex,
+            "created_at": datetime.utcnow().isoformat(),
+            "actor_id": actor_id,
+            "actor": actor,
+            "role": None,
+            "category": category,
+            "action": action,
+            "entity": entity,
+            "entity_id": None if entity_id is None else str(entity_id)[:60],
+            "detail": None if detail is None else str(detail)[:300],
+            "status": status,
+            "ip": None,
+        }
+        if has_request_context():
+            if actor is None:
+                event["actor"] = session.get("user_email")
+                event["actor_id"] = session.get("user_id")
+            event["role"] = session.get("user_role")
+            event["ip"] = request.remote_addr
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+            self._stats["queued"] += 1
+        except queue.Full:
+            self._spill([event])
+
+    def flush(self):
+        """Escribe ya lo que haya en la cola (CLI, pruebas, cierre del proceso)."""
+        batch = self._drain(self._queue.qsize())
+        if batch:
+            self._write(batch)
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._thread.join(timeout)
+        self.flush()
+
+    def replay(self, include_claimed=False):
+        """Reenvía los JSONL de AUDIT_SPILL_DIR; devuelve cuántos eventos se insertaron."""
+        patterns = ["*.jsonl"] + (["*.replay"] if include_claimed else [])
+        paths = sorted(p for pattern in patterns for p in glob.glob(os.path.join(self.spill_dir, pattern)))
+        inserted = 0
+        for path in paths:
+            claimed = path
+            try:
+                claimed = self._claim(path)
+                if claimed is None:
+                    continue
+                inserted += self._replay_file(claimed)
+            except FileNotFoundError:
+                continue  # otro proceso lo reclamó primero
+            except Exception:
+                log.warning("No se pudo reenviar %s; queda para el próximo intento", path, exc_info=True)
+                if claimed != path and os.path.exists(claimed):
+                    os.replace(claimed, _unclaimed_name(path))
+                break
+            os.remove(claimed)
+        self._stats["replayed"] += inserted
+        return inserted
+
+    def pending_files(self):
+        return glob.glob(os.path.join(self.spill_dir, "*.jsonl")) + glob.glob(os.path.join(self.spill_dir, "*.replay"))
+
+    def stats(self):
+        out = dict(self._stats)
+        out.update(queue=self._queue.qsize(), queue_max=self._queue.maxsize,
+                   spill_files=len(self.pending_files()))
+        return out
+
+    # -------------------------------------------------------------------------
+    # Acciones sobre /api
+    # -------------------------------------------------------------------------
+    def _after_request(self, response):
+        if request.blueprint != "api" or request.method not in API_ACTIONS:
+            return response
+        if not session.get("user_id") or response.status_code >= 400 or not request.endpoint:
+            return response
+        view = current_app.view_functions.get(request.endpoint)
+        module = (getattr(view, "__module__", "") or "").rsplit(".", 1)[-1]
+        args = request.view_args or {}
+        self.record(
+            API_ACTIONS[request.method],
+            category=API_CATEGORIES.get(module, module),
+            entity=request.endpoint.split(".", 1)[-1],
+            entity_id=next(iter(args.values()), None),
+            detail=f"{request.method} {request.path}",
+            status=response.status_code,
+        )
+        return response
+
+    # -------------------------------------------------------------------------
+    # Escritor
+    # -------------------------------------------------------------------------
+    def _ensure_thread(self):
+        self._thread.ensure(lambda _new_process: self._stop.clear())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_replay()
+                continue
+            # Junta hasta batch_size o hasta que el primero lleve flush_interval esperando
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                if self._write(batch):
+                    self._maybe_replay()
+            except Exception:
+                log.exception("Error en el escritor de auditoría")
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """INSERT multi-fila del lote; si la BD falla, al disco. True si se escribió."""
+        from models import AuditEvent
+
+        rows = [_row(event) for event in batch]
+        try:
+            with self.app.app_context():
+                session = self.db.session
+                try:
+                    session.execute(insert(AuditEvent), rows)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+        except Exception:
+            self._stats["failures"] += 1
+            log.warning("No se pudo escribir la bitácora (%d eventos); se guardan en disco", len(batch),
+                        exc_info=True)
+            self._spill(batch)
+            return False
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+        return True
+
+    # -------------------------------------------------------------------------
+    # Respaldo en disco
+    # -------------------------------------------------------------------------
+    def _spill(self, events):
+        path = os.path.join(self.spill_dir, f"audit-{os.getpid()}.jsonl")
+        try:
+            with self._spill_lock:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as fh:
+                    fh.writelines(json.dumps(e, separators=(",", ":")) + "\n" for e in events)
+        except OSError:
+            log.error("Se perdieron %d eventos de auditoría: no se pudo escribir %s", len(events), path,
+                      exc_info=True)
+            return
+        self._stats["spilled"] += len(events)
+
+    def _maybe_replay(self):
+        now = time.monotonic()
+        if now - self._replayed_at < self.replay_interval:
+            return
+        self._replayed_at = now
+        if glob.glob(os.path.join(self.spill_dir, "*.jsonl")):
+            self.replay()
+
+    def _claim(self, path):
+        """
+        Renombra el archivo para reenviarlo (así otro worker no lo toma a la
+        vez). El propio se reclama bajo el lock de escritura; el de otro
+        proceso vivo se deja: lo reenvía su dueño.
+        """
+        if path.endswith(".replay"):
+            return path
+        claimed = f"{path}.{os.getpid()}.replay"
+        pid = _spill_pid(path)
+        if pid == os.getpid():
+            with self._spill_lock:
+                os.replace(path, claimed)
+            return claimed
+        if pid is not None and _alive(pid):
+            return None
+        os.replace(path, claimed)
+        return claimed
+
+    def _replay_file(self, path):
+        from models import AuditEvent
+
+        inserted = 0
+        with open(path, encoding="utf-8") as fh:
+            events = [json.loads(line) for line in fh if line.strip()]
+        with self.app.app_context():
+            session = self.db.session
+            for i in range(0, len(events), REPLAY_CHUNK):
+                chunk = events[i:i + REPLAY_CHUNK]
+                seen = set(session.execute(
+                    select(AuditEvent.uid).where(AuditEvent.uid.in_([e["uid"] for e in chunk]))).scalars())
+                rows = [_row(e) for e in chunk if e["uid"] not in seen]
+                if rows:
+                    session.execute(insert(AuditEvent), rows)
+                session.commit()
+                inserted += len(rows)
+        return inserted
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _row(event):
+    row = dict(event)
+    row["created_at"] = datetime.fromisoformat(event["created_at"])
+    return row
+
+
+def _spill_pid(path):
+    """pid del proceso que escribe audit-<pid>[.xxxx].jsonl."""
+    name = os.path.basename(path)
+    try:
+        return int(name.split("-", 1)[1].split(".", 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _unclaimed_name(path):
+    """Nombre libre para devolver un archivo reclamado (otro proceso pudo crear el original)."""
+    if not os.path.exists(path):
+        return path
+    base = path[:-len(".jsonl")]
+    return f"{base}.{uuid.uuid4().hex[:8]}.jsonl"
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app audit replay
+# -----------------------------------------------------------------------------
+@audit_cli.command("replay")
+def replay_command():
+    """Reenvía a la BD los eventos que dejaron en disco procesos ya terminados."""
+    ext = current_app.extensions["audit"]
+    t0 = time.perf_counter()
+    inserted = ext.replay(include_claimed=True)
+    left = ext.pending_files()
+    click.echo(f"{inserted} eventos reenviados en {(time.perf_counter() - t0) * 1000:.0f} ms; "
+               f"{len(left)} archivos pendientes en {ext.spill_dir}")
+    if left:
+        raise SystemExit(1)
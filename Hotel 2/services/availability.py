@@ -0,0 +1,308 @@
+# services/availability.py
+# Motor de disponibilidad: índice de intervalos en memoria por habitación,
+# construido desde las reservas y actualizado de forma incremental.
+#
+# - Escrituras de este proceso: se aplican al índice al hacer commit
+#   (eventos de sesión de SQLAlchemy).
+# - Escrituras de otros workers: se traen cada AVAILABILITY_SYNC_INTERVAL
+#   segundos con una consulta por updated_at (marca de agua), y el índice se
+#   reconstruye completo cada AVAILABILITY_REBUILD_INTERVAL segundos para
+#   recoger borrados físicos.
+# - La marca de agua es el mayor updated_at leído de la BD, y cada sync vuelve
+#   a leer AVAILABILITY_SYNC_OVERLAP segundos antes de ella: updated_at se fija
+#   al hacer flush con el reloj de cada worker, así que una transacción lenta
+#   (o un worker con el reloj atrasado) puede confirmar filas con un
+#   updated_at anterior a la marca. apply() es idempotente.
+# - Las lecturas usan una sesión propia: no confirman ni cierran la
+#   transacción del request que las dispara.
+
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+# models/ importa 'db' de extensions.py, que a su vez importa este módulo:
+# los modelos se importan dentro de las funciones.
+
+
+class BookingConflict(Exception):
+    """La habitación ya no está libre para esas fechas."""
+
+
+class RoomIntervals:
+    """
+    Intervalos [check_in, check_out) de una habitación ordenados por inicio,
+    con el máximo acumulado de los finales para responder solapamientos en
+    O(log n) aunque existan sobreventas (intervalos superpuestos).
+    """
+
+    __slots__ = ("items", "starts", "max_end")
+
+    def __init__(self):
+        self.items = []     # [(start, end, reservation_id)] ordenados
+        self.starts = []
+        self.max_end = []
+
+    def add(self, start, end, res_id):
+        insort(self.items, (start, end, res_id))
+        self._reindex()
+
+    def remove(self, res_id):
+        before = len(self.items)
+        self.items = [it for it in self.items if it[2] != res_id]
+        if len(self.items) != before:
+            self._reindex()
+
+    def overlaps(self, start, end):
+        # Candidatos: intervalos que empiezan antes de 'end'
+        idx = bisect_left(self.starts, end)
+        return idx > 0 and self.max_end[idx - 1] > start
+
+    def _reindex(self):
+        self.starts = [it[0] for it in self.items]
+        self.max_end = []
+        current = 0
+        for _s, e, _id in self.items:
+            current = max(current, e)
+            self.max_end.append(current)
+
+
+class AvailabilityIndex:
+    """
+    AVAILABILITY_SYNC_INTERVAL     segundos entre sincronizaciones incrementales
+    AVAILABILITY_REBUILD_INTERVAL  segundos entre reconstrucciones completas
+    AVAILABILITY_SYNC_OVERLAP      segundos que cada sync relee antes de la marca (defecto 60)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.rooms = {}          # room_id -> {"id", "code", "name", "capacity"}
+        self.intervals = {}      # room_id -> RoomIntervals
+        self.where = {}          # reservation_id -> room_id (para mover/quitar)
+        self._by_capacity = []   # [(capacity, room_id)] ordenado
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._watermark = None
+        self._synced_at = 0.0
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.sync_interval = float(app.config.get("AVAILABILITY_SYNC_INTERVAL", 5))
+        self.rebuild_interval = float(app.config.get("AVAILABILITY_REBUILD_INTERVAL", 600))
+        self.sync_overlap = timedelta(seconds=float(app.config.get("AVAILABILITY_SYNC_OVERLAP", 60)))
+        app.extensions["availability"] = self
+        _listen_session_events(self)
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+    def search(self, check_in, check_out, guests=1):
+        """Habitaciones libres en [check_in, check_out) con capacidad >= guests."""
+        self._ensure_fresh()
+        start, end = check_in.toordinal(), check_out.toordinal()
+        with self._lock:
+            first = bisect_left(self._by_capacity, (guests, -1))
+            free = [
+                self.rooms[room_id]
+                for _cap, room_id in self._by_capacity[first:]
+                if not self.intervals[room_id].overlaps(start, end)
+            ]
+        return sorted(free, key=lambda r: (r["capacity"], r["code"]))
+
+    def is_free(self, room_id, check_in, check_out):
+        self._ensure_fresh()
+        with self._lock:
+            iv = self.intervals.get(room_id)
+            return iv is not None and not iv.overlaps(check_in.toordinal(), check_out.toordinal())
+
+    # -------------------------------------------------------------------------
+    # Escritura
+    # -------------------------------------------------------------------------
+    def book(self, room_id, check_in, check_out, guests, guest_name, guest_email=None,
+             channel="direct", status="confirmed", room_total=None):
+        """
+        Crea una reserva verificando en la BD (con la fila de la habitación
+        bloqueada) que no se solape; el índice se actualiza al hacer commit.
+        """
+        from models import ACTIVE_STATUSES, Reservation, Room
+
+        session = self.db.session
+        if not self.is_free(room_id, check_in, check_out):
+            raise BookingConflict(room_id)
+        room = session.execute(
+            select(Room).where(Room.id == room_id).with_for_update()
+        ).scalar_one_or_none()
+        if room is None:
+            raise LookupError(room_id)
+        if guests > room.capacity:
+            raise ValueError("capacity")
+        clash = session.execute(
+            select(Reservation.id).where(
+                Reservation.room_id == room_id,
+                Reservation.status.in_(ACTIVE_STATUSES),
+                Reservation.check_in < check_out,
+                Reservation.check_out > check_in,
+            ).limit(1)
+        ).first()
+        if clash:
+            session.rollback()
+            raise BookingConflict(room_id)
+        res = Reservation(room_id=room_id, check_in=check_in, check_out=check_out,
+                          guests=guests, guest_name=guest_name, guest_email=guest_email,
+                          channel=channel, status=status, room_total=room_total)
+        session.add(res)
+        session.commit()
+        return res
+
+    def apply(self, res_id, room_id, check_in, check_out, status):
+        """Aplica al índice el estado actual de una reserva (alta, cambio o baja)."""
+        from models import ACTIVE_STATUSES
+
+        with self._lock:
+            if self._loaded_at is None:
+                return  # aún no cargado: la carga inicial la incluirá
+            old_room = self.where.pop(res_id, None)
+            if old_room is not None and old_room in self.intervals:
+                self.intervals[old_room].remove(res_id)
+            if status in ACTIVE_STATUSES and room_id in self.intervals:
+                self.intervals[room_id].add(check_in.toordinal(), check_out.toordinal(), res_id)
+                self.where[res_id] = room_id
+
+    def forget(self, res_id):
+        with self._lock:
+            room_id = self.where.pop(res_id, None)
+            if room_id is not None and room_id in self.intervals:
+                self.intervals[room_id].remove(res_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rooms": len(self.rooms),
+                "reservations": len(self.where),
+                "loaded_age": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+            }
+
+    # -------------------------------------------------------------------------
+    # Carga y sincronización
+    # -------------------------------------------------------------------------
+    def _ensure_fresh(self):
+        if self._due() is None:
+            return
+        with self._lock:
+            # Otro hilo pudo refrescar mientras esperábamos el lock
+            due = self._due()
+            if due == "rebuild":
+                self._rebuild()
+            elif due == "sync":
+                self._sync()
+
+    def _due(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > self.rebuild_interval:
+            return "rebuild"
+        if now - self._synced_at > self.sync_interval:
+            return "sync"
+        return None
+
+    def _rebuild(self):
+        from models import ACTIVE_STATUSES, Reservation, Room
+
+        with self._lock, Session(self.db.engine) as session:
+            today = date.today()
+            rooms = session.execute(
+                select(Room.id, Room.code, Room.name, Room.capacity, Room.room_type_id)).all()
+            self.rooms = {r.id: {"id": r.id, "code": r.code, "name": r.name, "capacity": r.capacity,
+                                 "room_type_id": r.room_type_id}
+                          for r in rooms}
+            self.intervals = {room_id: RoomIntervals() for room_id in self.rooms}
+            self._by_capacity = sorted((r["capacity"], room_id) for room_id, r in self.rooms.items())
+            self.where = {}
+
+            # Sólo importan las reservas que aún no terminaron
+            rows = session.execute(
+                select(Reservation.id, Reservation.room_id, Reservation.check_in,
+                       Reservation.check_out, Reservation.updated_at)
+                .where(Reservation.status.in_(ACTIVE_STATUSES), Reservation.check_out > today)
+            ).all()
+            watermark = None
+            for r in rows:
+                if r.room_id in self.intervals:
+                    self.intervals[r.room_id].items.append(
+                        (r.check_in.toordinal(), r.check_out.toordinal(), r.id))
+                    self.where[r.id] = r.room_id
+                if watermark is None or r.updated_at > watermark:
+                    watermark = r.updated_at
+            for iv in self.intervals.values():
+                iv.items.sort()
+                iv._reindex()
+
+            self._watermark = watermark or session.execute(
+                select(Reservation.updated_at).order_by(Reservation.updated_at.desc()).limit(1)
+            ).scalar()
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def _sync(self):
+        """Trae reservas modificadas por otros procesos desde la última marca."""
+        from models import Reservation
+
+        with self._lock, Session(self.db.engine) as session:
+            self._synced_at = time.monotonic()
+            stmt = select(Reservation.id, Reservation.room_id, Reservation.check_in,
+                          Reservation.check_out, Reservation.status, Reservation.updated_at)
+            if self._watermark is not None:
+                # Ventana de solapamiento: filas confirmadas tarde con updated_at viejo
+                stmt = stmt.where(Reservation.updated_at >= self._watermark - self.sync_overlap)
+            rows = session.execute(stmt.order_by(Reservation.updated_at)).all()
+            for r in rows:
+                if r.room_id not in self.rooms:
+                    self._loaded_at = None  # habitación nueva: reconstruir
+                    break
+                self.apply(r.id, r.room_id, r.check_in, r.check_out, r.status)
+                if self._watermark is None or r.updated_at > self._watermark:
+                    self._watermark = r.updated_at
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: aplicar al índice sólo lo que realmente se confirmó
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _listen_session_events(index):
+    from models import Reservation
+
+    if id(index) in _listening:
+        return
+    _listening.add(id(index))
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, _ctx):
+        pending = session.info.setdefault("availability_changes", {})
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, Reservation):
+                pending[obj.id] = (obj.room_id, obj.check_in, obj.check_out, obj.status)
+        for obj in session.deleted:
+            if isinstance(obj, Reservation):
+                pending[obj.id] = None
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session):
+        for res_id, change in session.info.pop("availability_changes", {}).items():
+            if change is None:
+                index.forget(res_id)
+            else:
+                index.apply(res_id, *change)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("availability_changes", None)
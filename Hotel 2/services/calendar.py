@@ -0,0 +1,305 @@
+# services/calendar.py
+# Calendario de ocupación: un byte por habitación y día con el estado
+# (libre, confirmada, pendiente, bloqueo, mantenimiento) en una sola
+# bytearray de habitaciones × días. Una ventana de 90 días para todas las
+# habitaciones es un slice por fila, sin expandir reservas en cada vista.
+#
+# Igual que services/availability.py: las escrituras de este proceso se
+# aplican al confirmar la transacción, las de otros workers se leen por
+# updated_at cada CALENDAR_SYNC_INTERVAL segundos (releyendo
+# CALENDAR_SYNC_OVERLAP segundos antes de la marca) y la grilla se reconstruye
+# al cambiar el día y cada CALENDAR_REBUILD_INTERVAL (borrados físicos). Las
+# lecturas van por una sesión propia, nunca por la del request.
+
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+FREE, CONFIRMED, PENDING, BLOCKED, MAINTENANCE = range(5)
+STATE_NAMES = ("free", "confirmed", "pending", "blocked", "maintenance")
+# Estado de reserva -> celda (el resto no ocupa)
+RESERVATION_STATES = {"confirmed": CONFIRMED, "checked_in": CONFIRMED, "pending": PENDING}
+BLOCK_STATES = {"blocked": BLOCKED, "maintenance": MAINTENANCE}
+# Para el JSON: cada fila como texto "0011120..."
+_DIGITS = bytes.maketrans(bytes(range(len(STATE_NAMES))), b"01234")
+
+
+class OccupancyCalendar:
+    """
+    CALENDAR_PAST_DAYS        días hacia atrás que se mantienen (defecto 62)
+    CALENDAR_FUTURE_DAYS      días hacia adelante (defecto 400)
+    CALENDAR_MAX_WINDOW       máximo de días por consulta (defecto 120)
+    CALENDAR_SYNC_INTERVAL    segundos entre sincronizaciones incrementales
+    CALENDAR_REBUILD_INTERVAL segundos entre reconstrucciones completas
+    CALENDAR_SYNC_OVERLAP     segundos que cada sync relee antes de la marca (defecto 60)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.rooms = []          # [{"id", "code", "name", "room_type_id"}] en el orden de las filas
+        self.row_of = {}         # room_id -> índice de fila
+        self.grid = bytearray()  # filas de self.days bytes
+        self.start = None        # fecha de la columna 0
+        self.days = 0
+        self._sources = {}       # ("r"|"b", id) -> (room_id, inicio, fin, estado) en ordinales
+        self._by_room = {}       # room_id -> set de claves de _sources
+        self._lock = threading.RLock()
+        self._built_for = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._watermarks = {"r": None, "b": None}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.past_days = int(app.config.get("CALENDAR_PAST_DAYS", 62))
+        self.future_days = int(app.config.get("CALENDAR_FUTURE_DAYS", 400))
+        self.max_window = int(app.config.get("CALENDAR_MAX_WINDOW", 120))
+        self.sync_interval = float(app.config.get("CALENDAR_SYNC_INTERVAL", 5))
+        self.rebuild_interval = float(app.config.get("CALENDAR_REBUILD_INTERVAL", 600))
+        self.sync_overlap = timedelta(seconds=float(app.config.get("CALENDAR_SYNC_OVERLAP", 60)))
+        app.extensions["calendar"] = self
+        _listen_session_events(self)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def window(self, start, days):
+        """
+        (inicio efectivo, días, habitaciones, filas) para [start, start+days),
+        recortado a lo que cubre la grilla. Las filas son bytes (un estado por día).
+        """
+        self._ensure_fresh()
+        days = max(0, min(days, self.max_window))
+        with self._lock:
+            lo = max((start - self.start).days, 0)
+            hi = min((start - self.start).days + days, self.days)
+            if hi <= lo:
+                return start, 0, list(self.rooms), []
+            d = self.days
+            rows = [bytes(self.grid[i * d + lo:i * d + hi]) for i in range(len(self.rooms))]
+            return self.start + timedelta(days=lo), hi - lo, list(self.rooms), rows
+
+    def window_json(self, start, days):
+        first, n, rooms, rows = self.window(start, days)
+        return {
+            "start": first.isoformat(),
+            "days": n,
+            "states": STATE_NAMES,
+            "rooms": [dict(room, days=row.translate(_DIGITS).decode("ascii"))
+                      for room, row in zip(rooms, rows)],
+        }
+
+    def apply(self, kind, source_id, room_id, start, end, state):
+        """Alta/cambio/baja de una reserva ("r") o bloqueo ("b"); state None la quita."""
+        with self._lock:
+            if self._built_for is None:
+                return  # la próxima reconstrucción la incluye
+            key = (kind, source_id)
+            old = self._sources.pop(key, None)
+            if old is not None:
+                self._by_room.get(old[0], set()).discard(key)
+            if state and room_id in self.row_of:
+                self._sources[key] = (room_id, start.toordinal(), end.toordinal(), state)
+                self._by_room.setdefault(room_id, set()).add(key)
+            for rid in {old[0] if old else None, room_id} - {None}:
+                self._paint(rid)
+
+    def free_by_type(self, start, days):
+        """
+        {room_type_id: [habitaciones libres por día]} para [start, start+days),
+        recortado a la grilla; las habitaciones sin tipo no cuentan.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            lo = max((start - self.start).days, 0)
+            hi = min((start - self.start).days + days, self.days)
+            if hi <= lo:
+                return self.start + timedelta(days=lo), {}
+            d = self.days
+            rows_by_type = {}
+            for i, room in enumerate(self.rooms):
+                if room["room_type_id"] is not None:
+                    rows_by_type.setdefault(room["room_type_id"], []).append(
+                        self.grid[i * d + lo:i * d + hi])
+        # Una columna por día: cuántas filas del tipo están en FREE
+        free = {type_id: [col.count(FREE) for col in zip(*rows)]
+                for type_id, rows in rows_by_type.items()}
+        return self.start + timedelta(days=lo), free
+
+    def refresh(self):
+        """Trae ya mismo los cambios de otros procesos (sin esperar el intervalo)."""
+        self._synced_at = 0.0
+        self._ensure_fresh()
+
+    def invalidate(self):
+        with self._lock:
+            self._built_for = None
+
+    def stats(self):
+        with self._lock:
+            return {"rooms": len(self.rooms), "days": self.days, "bytes": len(self.grid),
+                    "sources": len(self._sources),
+                    "start": self.start.isoformat() if self.start else None}
+
+    # -------------------------------------------------------------------------
+    # Carga y sincronización
+    # -------------------------------------------------------------------------
+    def _ensure_fresh(self):
+        if self._due() is None:
+            return
+        with self._lock:
+            # Otro hilo pudo refrescar mientras esperábamos el lock
+            due = self._due()
+            if due == "rebuild":
+                self._rebuild()
+            elif due == "sync":
+                self._sync()
+
+    def _due(self):
+        now = time.monotonic()
+        if self._built_for != date.today() or now - self._built_at > self.rebuild_interval:
+            return "rebuild"
+        if now - self._synced_at > self.sync_interval:
+            return "sync"
+        return None
+
+    def _rebuild(self):
+        from models import Reservation, Room, RoomBlock
+
+        with self._lock, Session(self.db.engine) as session:
+            today = date.today()
+            self.start = today - timedelta(days=self.past_days)
+            self.days = self.past_days + self.future_days
+            end = self.start + timedelta(days=self.days)
+
+            rooms = session.execute(
+                select(Room.id, Room.code, Room.name, Room.room_type_id).order_by(Room.code)).all()
+            self.rooms = [{"id": r.id, "code": r.code, "name": r.name, "room_type_id": r.room_type_id}
+                          for r in rooms]
+            self.row_of = {r["id"]: i for i, r in enumerate(self.rooms)}
+            self.grid = bytearray(len(self.rooms) * self.days)
+            self._sources, self._by_room = {}, {}
+
+            # Sólo lo que toca la ventana: check_out > inicio y check_in < fin
+            res = session.execute(
+                select(Reservation.id, Reservation.room_id, Reservation.check_in,
+                       Reservation.check_out, Reservation.status, Reservation.updated_at)
+                .where(Reservation.status.in_(tuple(RESERVATION_STATES)),
+                       Reservation.check_out > self.start, Reservation.check_in < end)
+            ).all()
+            blocks = session.execute(
+                select(RoomBlock.id, RoomBlock.room_id, RoomBlock.start_date, RoomBlock.end_date,
+                       RoomBlock.kind, RoomBlock.updated_at)
+                .where(RoomBlock.end_date > self.start, RoomBlock.start_date < end)
+            ).all()
+            for r in res:
+                self._add(("r", r.id), r.room_id, r.check_in, r.check_out, RESERVATION_STATES[r.status])
+            for b in blocks:
+                self._add(("b", b.id), b.room_id, b.start_date, b.end_date, BLOCK_STATES.get(b.kind, BLOCKED))
+            for room_id in self._by_room:
+                self._paint(room_id)
+
+            self._watermarks = {
+                "r": session.execute(select(Reservation.updated_at)
+                                     .order_by(Reservation.updated_at.desc()).limit(1)).scalar(),
+                "b": session.execute(select(RoomBlock.updated_at)
+                                     .order_by(RoomBlock.updated_at.desc()).limit(1)).scalar(),
+            }
+            self._built_for = today
+            self._built_at = self._synced_at = time.monotonic()
+
+    def _sync(self):
+        from models import Reservation, RoomBlock
+
+        with self._lock, Session(self.db.engine) as session:
+            self._synced_at = time.monotonic()
+            for kind, model, cols, state_of in (
+                ("r", Reservation,
+                 (Reservation.room_id, Reservation.check_in, Reservation.check_out, Reservation.status),
+                 lambda status: RESERVATION_STATES.get(status)),
+                ("b", RoomBlock,
+                 (RoomBlock.room_id, RoomBlock.start_date, RoomBlock.end_date, RoomBlock.kind),
+                 lambda k: BLOCK_STATES.get(k, BLOCKED)),
+            ):
+                stmt = select(model.id, *cols, model.updated_at)
+                watermark = self._watermarks[kind]
+                if watermark is not None:
+                    # Ventana de solapamiento: filas confirmadas tarde con updated_at viejo
+                    stmt = stmt.where(model.updated_at >= watermark - self.sync_overlap)
+                for row in session.execute(stmt.order_by(model.updated_at)).all():
+                    if row[1] not in self.row_of:
+                        self._built_for = None  # habitación nueva: reconstruir
+                        break
+                    self.apply(kind, row[0], row[1], row[2], row[3], state_of(row[4]))
+                    if self._watermarks[kind] is None or row[-1] > self._watermarks[kind]:
+                        self._watermarks[kind] = row[-1]
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _add(self, key, room_id, start, end, state):
+        if room_id not in self.row_of:
+            return
+        self._sources[key] = (room_id, start.toordinal(), end.toordinal(), state)
+        self._by_room.setdefault(room_id, set()).add(key)
+
+    def _paint(self, room_id):
+        """Repinta la fila de una habitación desde sus fuentes (los estados mayores ganan)."""
+        row = self.row_of.get(room_id)
+        if row is None:
+            return
+        base = self.start.toordinal()
+        line = bytearray(self.days)
+        spans = sorted((self._sources[k] for k in self._by_room.get(room_id, ())), key=lambda s: s[3])
+        for _room, start, end, state in spans:
+            lo, hi = max(start - base, 0), min(end - base, self.days)
+            if hi > lo:
+                line[lo:hi] = bytes((state,)) * (hi - lo)
+        self.grid[row * self.days:(row + 1) * self.days] = line
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: aplicar sólo lo confirmado
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _listen_session_events(calendar):
+    from models import Reservation, RoomBlock
+
+    if id(calendar) in _listening:
+        return
+    _listening.add(id(calendar))
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, _ctx):
+        pending = session.info.setdefault("calendar_changes", {})
+        for obj in (*session.new, *session.dirty):
+            if isinstance(obj, Reservation):
+                pending[("r", obj.id)] = (obj.room_id, obj.check_in, obj.check_out,
+                                          RESERVATION_STATES.get(obj.status))
+            elif isinstance(obj, RoomBlock):
+                pending[("b", obj.id)] = (obj.room_id, obj.start_date, obj.end_date,
+                                          BLOCK_STATES.get(obj.kind, BLOCKED))
+        for obj in session.deleted:
+            if isinstance(obj, Reservation):
+                pending[("r", obj.id)] = None
+            elif isinstance(obj, RoomBlock):
+                pending[("b", obj.id)] = None
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session):
+        for (kind, source_id), change in session.info.pop("calendar_changes", {}).items():
+            if change is None:
+                calendar.apply(kind, source_id, None, None, None, None)
+            else:
+                calendar.apply(kind, source_id, *change)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("calendar_changes", None)
@@ -0,0 +1,639 @@
+# services/channels.py
+# Channel manager: distribución de disponibilidad y tarifas (ARI) a las OTAs.
+#
+# - Productores: un hook before_flush escribe en ari_changes (outbox) el
+#   rango de días tocado por cada cambio de reservas, bloqueos, habitaciones
+#   y tarifas, en la misma transacción. La petición web no habla con ninguna
+#   OTA.
+# - Worker (`flask channels worker`, un único proceso): cada
+#   CHANNEL_SYNC_INTERVAL segundos lee los cambios posteriores al cursor de
+#   cada canal, los expande a claves (tipo, día) / (plan, tipo, día) en un
+#   set —diez ediciones del mismo día son una sola actualización—, calcula el
+#   valor vigente desde el calendario y la grilla de tarifas, une días
+#   consecutivos con el mismo valor en rangos y envía lotes de batch_size a
+#   todos los canales a la vez con asyncio.
+# - Cada canal tiene su límite de requests por segundo (token bucket),
+#   reintentos con backoff exponencial + jitter (respetando Retry-After) y,
+#   si la pasada falla, next_attempt_at con backoff creciente. Los valores
+#   enviados son absolutos: reenviar un lote ya entregado no hace daño.
+#
+# No hay cliente HTTP asíncrono entre las dependencias: _http_post es un
+# POST HTTP/1.1 mínimo sobre asyncio.open_connection. bench/mock_ota.py
+# levanta una OTA local para probarlo.
+
+import asyncio
+import json
+import random
+import ssl
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+channels_cli = AppGroup("channels", help="Distribución ARI a canales (OTAs).")
+
+# Proveedores que ofrece el modal de admin-channels.html
+PROVIDERS = {"booking": "Booking.com", "airbnb": "Airbnb", "expedia": "Expedia", "agoda": "Agoda"}
+
+
+class ChannelError(Exception):
+    """Fallo al enviar a un canal; retry_after en segundos si el canal lo indicó."""
+
+    def __init__(self, message, status=None, retry_after=None, retryable=True):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+# -----------------------------------------------------------------------------
+# HTTP asíncrono mínimo
+# -----------------------------------------------------------------------------
+async def _http_post(url, body, headers, timeout):
+    """POST con Connection: close; devuelve (status, headers en minúsculas, cuerpo)."""
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if https else None),
+        timeout)
+    try:
+        head = [f"POST {path} HTTP/1.1", f"Host: {parts.netloc}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: close",
+                *(f"{k}: {v}" for k, v in headers.items())]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)  # hasta que el servidor cierre
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise ChannelError("Respuesta HTTP inválida.") from None
+    resp_headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        resp_headers[name.strip().lower()] = value.strip()
+    if "chunked" in resp_headers.get("transfer-encoding", "").lower():
+        payload = _dechunk(payload)
+    return status, resp_headers, payload
+
+
+def _dechunk(data):
+    out, pos = bytearray(), 0
+    while True:
+        end = data.find(b"\r\n", pos)
+        if end < 0:
+            break
+        size = int(data[pos:end].split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        out += data[end + 2:end + 2 + size]
+        pos = end + 2 + size + 2
+    return bytes(out)
+
+
+def _retry_after(headers):
+    try:
+        return max(float(headers["retry-after"]), 0.0)
+    except (KeyError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket por canal: 'rate' requests por segundo con ráfagas de hasta 'burst'."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = max(float(rate or 0), 0.01)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Tras un 429: vacía el cubo para que nadie más envíe durante 'seconds'."""
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+# -----------------------------------------------------------------------------
+# Adaptadores
+# -----------------------------------------------------------------------------
+class JsonAriAdapter:
+    """
+    POST {endpoint}/ari con {"updates": [...]} y Authorization: Bearer api_key.
+    Es el formato de bench/mock_ota.py; otros proveedores registran su
+    adaptador en ADAPTERS y traducen las mismas actualizaciones.
+    """
+
+    def __init__(self, channel, timeout):
+        self.url = channel["endpoint"].rstrip("/") + "/ari"
+        self.headers = {"Authorization": f"Bearer {channel['api_key']}"} if channel["api_key"] else {}
+        self.timeout = timeout
+
+    async def send(self, updates):
+        body = json.dumps({"updates": updates}, separators=(",", ":")).encode()
+        try:
+            status, headers, payload = await _http_post(self.url, body, self.headers, self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ChannelError(f"Sin conexión con {self.url}: {e.__class__.__name__}") from None
+        if status < 300:
+            return
+        detail = payload[:120].decode("utf-8", "replace")
+        raise ChannelError(f"HTTP {status}: {detail}", status, _retry_after(headers),
+                           retryable=status in (408, 425, 429) or status >= 500)
+
+
+ADAPTERS = {"json": JsonAriAdapter}
+
+
+class ChannelSync:
+    """
+    CHANNEL_SYNC_INTERVAL    segundos entre pasadas del worker (defecto 2)
+    CHANNEL_SETTLE_SECONDS   antigüedad mínima de un cambio para enviarlo (defecto 5)
+    CHANNEL_HORIZON_DAYS     días hacia adelante que se distribuyen (defecto 365)
+    CHANNEL_MAX_RETRIES      reintentos por lote dentro de una pasada (defecto 4)
+    CHANNEL_BACKOFF_BASE     segundos del primer reintento, se duplica (defecto 1)
+    CHANNEL_BACKOFF_MAX      tope de espera entre pasadas fallidas (defecto 900)
+    CHANNEL_CONCURRENCY      lotes en vuelo por canal (defecto 2)
+    CHANNEL_TIMEOUT          segundos por request (defecto 15)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.last_run = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.interval = float(app.config.get("CHANNEL_SYNC_INTERVAL", 2))
+        self.settle = float(app.config.get("CHANNEL_SETTLE_SECONDS", 5))
+        self.horizon = int(app.config.get("CHANNEL_HORIZON_DAYS", 365))
+        self.max_retries = int(app.config.get("CHANNEL_MAX_RETRIES", 4))
+        self.backoff_base = float(app.config.get("CHANNEL_BACKOFF_BASE", 1))
+        self.backoff_max = float(app.config.get("CHANNEL_BACKOFF_MAX", 900))
+        self.concurrency = int(app.config.get("CHANNEL_CONCURRENCY", 2))
+        self.timeout = float(app.config.get("CHANNEL_TIMEOUT", 15))
+        app.extensions["channels"] = self
+        app.cli.add_command(channels_cli)
+        _listen_session_events(self)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def pending(self):
+        """{channel_id: cambios del outbox aún no enviados} (None = envío completo pendiente)."""
+        from models import AriChange, Channel
+
+        # Una sola consulta: cada canal con las filas del outbox posteriores a su cursor
+        rows = self.db.session.execute(
+            select(Channel.id, Channel.last_sync_at, func.count(AriChange.id))
+            .outerjoin(AriChange, AriChange.id > Channel.ari_cursor)
+            .group_by(Channel.id, Channel.last_sync_at)
+        ).all()
+        return {ch_id: None if last_sync_at is None else count for ch_id, last_sync_at, count in rows}
+
+    def sync_once(self):
+        """Una pasada del worker: envía a cada canal activo lo pendiente y compacta el outbox."""
+        from models import AriChange, Channel
+
+        t0 = time.perf_counter()
+        session = self.db.session
+        now = datetime.utcnow()
+        head = self._settled_head(now)
+        due = session.execute(
+            select(Channel).where(
+                Channel.status == "active", Channel.endpoint.is_not(None),
+                (Channel.next_attempt_at.is_(None)) | (Channel.next_attempt_at <= now),
+                (Channel.last_sync_at.is_(None)) | (Channel.ari_cursor < head),
+            ).order_by(Channel.id)
+        ).scalars().all()
+
+        # Los canales con el mismo cursor comparten claves y actualizaciones
+        by_cursor = {}
+        for ch in due:
+            by_cursor.setdefault(None if ch.last_sync_at is None else ch.ari_cursor, []).append(ch)
+        updates_for = {}
+        if by_cursor:
+            values = self._current_values()
+            for cursor in by_cursor:
+                keys = self._keys(cursor, head)
+                updates_for[cursor] = self._updates(keys, values)
+
+        jobs = []
+        for cursor, channels in by_cursor.items():
+            for ch in channels:
+                jobs.append(({"id": ch.id, "code": ch.code, "adapter": ch.adapter, "endpoint": ch.endpoint,
+                              "api_key": ch.api_key, "secret": ch.secret, "rate_limit": ch.rate_limit,
+                              "batch_size": ch.batch_size or 500}, updates_for[cursor]))
+        # La sesión no queda abierta mientras se espera a las OTAs
+        session.commit()
+        results = asyncio.run(self._push_all(jobs)) if jobs else []
+
+        report = []
+        for (job, updates), (error, stats) in zip(jobs, results):
+            ch = session.get(Channel, job["id"])
+            if ch is None:
+                continue
+            if error is None:
+                ch.ari_cursor = head
+                ch.last_sync_at = now
+                ch.failures = 0
+                ch.next_attempt_at = None
+                ch.last_error = None
+            else:
+                ch.failures = (ch.failures or 0) + 1
+                ch.next_attempt_at = datetime.utcnow() + timedelta(seconds=self._backoff(ch.failures, self.backoff_max))
+                ch.last_error = error[:300]
+            report.append({"channel": job["code"], "ok": error is None, "updates": len(updates),
+                           "error": error, **stats})
+
+        # Compactar: lo que ya vieron todos los canales activos sobra. La fila
+        # del cursor se conserva: con la tabla vacía SQLite (y MySQL < 8 al
+        # reiniciar) reutilizaría ids por debajo de los cursores
+        cursors = session.execute(
+            select(Channel.ari_cursor).where(Channel.status == "active", Channel.last_sync_at.is_not(None))
+        ).scalars().all()
+        floor = min(cursors) if cursors else head
+        if floor:
+            session.execute(delete(AriChange).where(AriChange.id < floor))
+        session.commit()
+
+        self.last_run = {"at": now.isoformat(timespec="seconds"), "head": head, "channels": report,
+                         "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        return self.last_run
+
+    def enqueue_full(self, session, kinds=None):
+        """Encola el horizonte completo (p.ej. tras cargar tarifas fuera del ORM)."""
+        from models import ARI_KINDS, AriChange
+
+        today = date.today()
+        for kind in kinds or ARI_KINDS:
+            session.add(AriChange(kind=kind, start_date=today, end_date=today + timedelta(days=self.horizon)))
+
+    # -------------------------------------------------------------------------
+    # Claves y valores
+    # -------------------------------------------------------------------------
+    def _settled_head(self, now):
+        """
+        Último id que se puede enviar: los cambios de los últimos
+        CHANNEL_SETTLE_SECONDS se dejan para la próxima pasada, así una
+        transacción que confirma tarde no queda detrás del cursor.
+        """
+        from models import AriChange
+
+        session = self.db.session
+        first_recent = session.execute(
+            select(func.min(AriChange.id)).where(AriChange.created_at > now - timedelta(seconds=self.settle))
+        ).scalar()
+        if first_recent is not None:
+            return first_recent - 1
+        return session.execute(select(func.max(AriChange.id))).scalar() or 0
+
+    def _keys(self, cursor, head):
+        """
+        Claves a enviar: {("avail", tipo): {ordinal}, ("rate", plan, tipo): {ordinal}}.
+        cursor None = envío completo del horizonte.
+        """
+        from models import ARI_AVAILABILITY, ARI_KINDS, AriChange
+
+        today = date.today()
+        lo_limit, hi_limit = today.toordinal(), today.toordinal() + self.horizon
+        if cursor is None:
+            rows = [(kind, None, None, lo_limit, hi_limit) for kind in ARI_KINDS]
+        else:
+            rows = [(r.kind, r.room_type_id, r.plan_code, r.start_date.toordinal(), r.end_date.toordinal())
+                    for r in self.db.session.execute(
+                        select(AriChange.kind, AriChange.room_type_id, AriChange.plan_code,
+                               AriChange.start_date, AriChange.end_date)
+                        .where(AriChange.id > cursor, AriChange.id <= head)
+                    ).all()]
+
+        products = current_app.extensions["pricing"].products()
+        type_ids = {type_id for _plan, type_id, _code in products} | self._room_type_ids()
+        keys = {}
+        for kind, type_id, plan, lo, hi in rows:
+            days = range(max(lo, lo_limit), min(hi, hi_limit))
+            if not days:
+                continue
+            if kind == ARI_AVAILABILITY:
+                for t in ([type_id] if type_id is not None else type_ids):
+                    keys.setdefault((kind, t), set()).update(days)
+            else:
+                for p, t, _code in products:
+                    if (plan is None or plan == p) and (type_id is None or type_id == t):
+                        keys.setdefault((kind, p, t), set()).update(days)
+        return keys
+
+    def _room_type_ids(self):
+        calendar = current_app.extensions["calendar"]
+        return {room["room_type_id"] for room in calendar.rooms if room["room_type_id"] is not None}
+
+    def _current_values(self):
+        """(inicio, {tipo: [libres por día]}, pricing, {tipo: código}) vigentes ahora."""
+        from models import RoomType
+
+        calendar = current_app.extensions["calendar"]
+        pricing = current_app.extensions["pricing"]
+        # El worker no recibe los commits de la web: reconstruir recoge también
+        # borrados físicos y cambios de tipo de habitación
+        calendar.invalidate()
+        start, free = calendar.free_by_type(date.today(), self.horizon)
+        pricing.refresh()
+        codes = dict(self.db.session.execute(select(RoomType.id, RoomType.code)).all())
+        return start, free, pricing, codes
+
+    def _updates(self, keys, values):
+        """Une días consecutivos con el mismo valor en una actualización con rango."""
+        from models import ARI_AVAILABILITY
+
+        start, free, pricing, codes = values
+        base = start.toordinal()
+        updates = []
+        for key in sorted(keys, key=lambda k: tuple(str(x) for x in k)):
+            kind, type_id = key[0], key[-1]
+            code = codes.get(type_id)
+            if code is None:
+                continue
+            if kind == ARI_AVAILABILITY:
+                counts = free.get(type_id)
+                value_at = (lambda o: counts[o - base] if counts and 0 <= o - base < len(counts) else 0)
+            else:
+                plan = key[1]
+                value_at = (lambda o, plan=plan: pricing.nightly(plan, type_id, date.fromordinal(o)))
+            run = None
+            for o in sorted(keys[key]):
+                value = value_at(o)
+                if value is None:
+                    continue
+                if run and run[1] == o and run[2] == value:
+                    run[1] = o + 1
+                    continue
+                if run:
+                    updates.append(self._update(key, code, run, pricing))
+                run = [o, o + 1, value]
+            if run:
+                updates.append(self._update(key, code, run, pricing))
+        return updates
+
+    @staticmethod
+    def _update(key, code, run, pricing):
+        from models import ARI_AVAILABILITY
+
+        lo, hi, value = run
+        item = {"type": key[0], "room_type": code,
+                "from": date.fromordinal(lo).isoformat(), "to": date.fromordinal(hi - 1).isoformat()}
+        if key[0] == ARI_AVAILABILITY:
+            item["available"] = value
+        else:
+            item.update(plan=key[1], amount=f"{value / 100:.2f}", currency=pricing.currency)
+        return item
+
+    # -------------------------------------------------------------------------
+    # Envío
+    # -------------------------------------------------------------------------
+    def _backoff(self, attempt, cap):
+        return min(cap, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _push_all(self, jobs):
+        return await asyncio.gather(*(self._push_channel(ch, updates) for ch, updates in jobs))
+
+    async def _push_channel(self, channel, updates):
+        """Envía los lotes de un canal; devuelve (error | None, estadísticas)."""
+        stats = {"requests": 0, "retries": 0}
+        adapter_cls = ADAPTERS.get(channel["adapter"])
+        if adapter_cls is None:
+            return f"Adaptador desconocido: {channel['adapter']}", stats
+        adapter = adapter_cls(channel, self.timeout)
+        limiter = RateLimiter(channel["rate_limit"])
+        slots = asyncio.Semaphore(max(self.concurrency, 1))
+        size = max(channel["batch_size"], 1)
+
+        async def send(batch):
+            async with slots:
+                for attempt in range(self.max_retries + 1):
+                    await limiter.acquire()
+                    stats["requests"] += 1
+                    try:
+                        return await adapter.send(batch)
+                    except ChannelError as e:
+                        if not e.retryable or attempt == self.max_retries:
+                            raise
+                        delay = e.retry_after if e.retry_after is not None else self._backoff(attempt, 60)
+                        if e.status == 429:
+                            limiter.pause(delay)
+                        stats["retries"] += 1
+                        await asyncio.sleep(delay)
+
+        tasks = [asyncio.ensure_future(send(updates[i:i + size])) for i in range(0, len(updates), size)]
+        try:
+            await asyncio.gather(*tasks)
+        except ChannelError as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return str(e), stats
+        return None, stats
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: escribir el outbox en la misma transacción
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _merge(changes):
+    """Une rangos solapados o contiguos del mismo (kind, tipo, plan)."""
+    by_scope = {}
+    for kind, type_id, plan, lo, hi in changes:
+        by_scope.setdefault((kind, type_id, plan), []).append((lo, hi))
+    for (kind, type_id, plan), spans in by_scope.items():
+        spans.sort()
+        cur_lo, cur_hi = spans[0]
+        for lo, hi in spans[1:]:
+            if lo <= cur_hi:
+                cur_hi = max(cur_hi, hi)
+            else:
+                yield kind, type_id, plan, cur_lo, cur_hi
+                cur_lo, cur_hi = lo, hi
+        yield kind, type_id, plan, cur_lo, cur_hi
+
+
+def _listen_session_events(ext):
+    from models import (ARI_AVAILABILITY, ARI_RATE, AriChange, RatePlan, RateRule, Reservation, Room,
+                        RoomBlock, RoomType)
+
+    if id(ext) in _listening:
+        return
+    _listening.add(id(ext))
+    # modelo -> (inicio, fin, campos que cambian la disponibilidad)
+    stays = {Reservation: ("check_in", "check_out", ("room_id", "check_in", "check_out", "status")),
+             RoomBlock: ("start_date", "end_date", ("room_id", "start_date", "end_date", "kind"))}
+
+    @event.listens_for(Session, "before_flush")
+    def _record(session, _ctx, _instances):
+        today = date.today()
+        horizon_end = today + timedelta(days=ext.horizon)
+        changes = []
+
+        def add(kind, type_id, plan, lo, hi):
+            if lo is None or hi is None:
+                return
+            lo, hi = max(lo, today), min(hi, horizon_end)
+            if hi > lo:
+                changes.append((kind, type_id, plan, lo, hi))
+
+        def room_type(room_id):
+            if room_id is None:
+                return None
+            with session.no_autoflush:
+                room = session.get(Room, room_id)
+            return room.room_type_id if room is not None else None
+
+        def plan_code(plan_id):
+            if plan_id is None:
+                return None
+            with session.no_autoflush:
+                plan = session.get(RatePlan, plan_id)
+            return plan.code if plan is not None else None
+
+        def stay(obj, values):
+            lo, hi, _fields = stays[type(obj)]
+            type_id = room_type(values["room_id"])
+            if type_id is not None:
+                add(ARI_AVAILABILITY, type_id, None, values[lo], values[hi])
+
+        def rule(values):
+            if values["kind"] == "season" and values["start_date"] and values["end_date"]:
+                lo, hi = values["start_date"], values["end_date"] + timedelta(days=1)  # end inclusivo
+            else:
+                lo, hi = today, horizon_end
+            add(ARI_RATE, values["room_type_id"], plan_code(values["rate_plan_id"]), lo, hi)
+
+        def current(obj, fields):
+            return {f: getattr(obj, f) for f in fields}
+
+        def previous(obj, fields):
+            attrs = inspect(obj).attrs
+            return {f: (attrs[f].history.deleted or [getattr(obj, f)])[0] for f in fields}
+
+        rule_fields = ("kind", "start_date", "end_date", "room_type_id", "rate_plan_id")
+        for obj in (*session.new, *session.deleted):
+            if type(obj) in stays:
+                stay(obj, current(obj, stays[type(obj)][2]))
+            elif isinstance(obj, Room) and obj.room_type_id is not None:
+                add(ARI_AVAILABILITY, obj.room_type_id, None, today, horizon_end)
+            elif isinstance(obj, RateRule):
+                rule(current(obj, rule_fields))
+            elif isinstance(obj, RatePlan):
+                add(ARI_RATE, None, obj.code, today, horizon_end)
+            elif isinstance(obj, RoomType):
+                # Un tipo nuevo aún no tiene id: se marca para todos los tipos
+                add(ARI_RATE, obj.id, None, today, horizon_end)
+        for obj in session.dirty:
+            if not session.is_modified(obj):
+                continue
+            if type(obj) in stays:
+                fields = stays[type(obj)][2]
+                attrs = inspect(obj).attrs
+                if any(attrs[f].history.has_changes() for f in fields):
+                    stay(obj, previous(obj, fields))
+                    stay(obj, current(obj, fields))
+            elif isinstance(obj, Room):
+                if inspect(obj).attrs["room_type_id"].history.has_changes():
+                    for type_id in {previous(obj, ("room_type_id",))["room_type_id"], obj.room_type_id} - {None}:
+                        add(ARI_AVAILABILITY, type_id, None, today, horizon_end)
+            elif isinstance(obj, RateRule):
+                rule(previous(obj, rule_fields))
+                rule(current(obj, rule_fields))
+            elif isinstance(obj, RatePlan):
+                add(ARI_RATE, None, obj.code, today, horizon_end)
+            elif isinstance(obj, RoomType):
+                add(ARI_RATE, obj.id, None, today, horizon_end)
+
+        # Una carga masiva (seed, import) deja pocas filas, no una por reserva
+        for kind, type_id, plan, lo, hi in _merge(changes):
+            session.add(AriChange(kind=kind, room_type_id=type_id, plan_code=plan, start_date=lo, end_date=hi))
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app channels worker | sync | resync
+# -----------------------------------------------------------------------------
+def _echo_run(run):
+    for ch in run["channels"]:
+        status = "ok" if ch["ok"] else f"error: {ch['error']}"
+        click.echo(f"  {ch['channel']}: {ch['updates']} actualizaciones, {ch['requests']} requests, "
+                   f"{ch['retries']} reintentos — {status}")
+
+
+@channels_cli.command("worker")
+def worker_command():
+    """Distribuye los cambios de forma continua (un solo proceso por despliegue)."""
+    ext = current_app.extensions["channels"]
+    click.echo(f"Worker de canales: cada {ext.interval:g} s (Ctrl+C para salir)")
+    while True:
+        try:
+            run = ext.sync_once()
+            if run["channels"]:
+                click.echo(f"{run['at']} cursor {run['head']} en {run['ms']} ms")
+                _echo_run(run)
+        except Exception:
+            current_app.logger.exception("Fallo en la pasada de sincronización de canales")
+            ext.db.session.rollback()
+        time.sleep(ext.interval)
+
+
+@channels_cli.command("sync")
+def sync_command():
+    """Una sola pasada (ignora el backoff de los canales con fallos)."""
+    from models import Channel
+
+    ext = current_app.extensions["channels"]
+    for ch in ext.db.session.execute(select(Channel)).scalars():
+        ch.next_attempt_at = None
+    ext.db.session.commit()
+    run = ext.sync_once()
+    _echo_run(run)
+    click.echo(f"{len(run['channels'])} canales en {run['ms']} ms")
+
+
+@channels_cli.command("resync")
+@click.option("--channel", "code", default=None, help="código del canal (defecto: todos)")
+def resync_command(code):
+    """Marca uno o todos los canales para reenviar el horizonte completo."""
+    from models import Channel
+
+    ext = current_app.extensions["channels"]
+    stmt = select(Channel)
+    if code:
+        stmt = stmt.where(Channel.code == code)
+    channels = ext.db.session.execute(stmt).scalars().all()
+    if not channels:
+        raise click.ClickException("No hay canales que coincidan.")
+    for ch in channels:
+        ch.last_sync_at = None
+        ch.next_attempt_at = None
+    ext.db.session.commit()
+    click.echo(f"{len(channels)} canales marcados para envío completo")
@@ -0,0 +1,507 @@
+# services/guest_import.py
+# Alta masiva de huéspedes/usuarios (migración desde el PMS anterior, grupos)
+# desde CSV o JSONL, sobre la misma tabla de usuarios y mapa de columnas que
+# register_html (services/schema_cache.py).
+#
+# - El archivo se lee en streaming: nunca está entero en memoria.
+# - Cada lote de GUEST_IMPORT_BATCH filas es una consulta de duplicados
+#   (Correo IN ...), un INSERT executemany y un commit.
+# - Las contraseñas en claro se hashean en paralelo (hashlib/bcrypt sueltan el
+#   GIL); con passwords="token" no se hashea nada: la cuenta queda sin
+#   contraseña usable y se emite un enlace firmado para crearla.
+# - Los hashes ya existentes (bcrypt, pbkdf2:, scrypt:) se copian tal cual; el
+#   login los migra al algoritmo objetivo (PASSWORD_REHASH_ON_LOGIN).
+# - Los Correo repetidos en el archivo o ya presentes en la BD no se insertan
+#   y salen en el reporte, así que reimportar el mismo archivo es seguro.
+#
+#   flask --app app guests import huespedes.csv [--passwords token --links enlaces.csv]
+#   flask --app app guests link ana@example.com
+
+import csv
+import hashlib
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+import click
+from flask import current_app, has_request_context, url_for
+from flask.cli import AppGroup
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+
+from .password_hasher import _BCRYPT_PREFIXES, hash_password
+
+guests_cli = AppGroup("guests", help="Importación masiva de huéspedes.")
+
+FORMATS = ("csv", "jsonl")
+PASSWORD_MODES = ("hash", "token")
+
+# Valor de Contrasena de una cuenta importada sin contraseña: ningún
+# verificador lo acepta (como "!" en /etc/shadow)
+UNUSABLE_PASSWORD = "!"
+_HASH_PREFIXES = _BCRYPT_PREFIXES + ("pbkdf2:", "scrypt:")
+
+# Campo -> encabezados/claves aceptados en el archivo (en minúscula), los
+# mismos alias que acepta el formulario de registro
+FIELDS = {
+    "first_name": ("firstname", "first_name", "nombre", "name"),
+    "last_name": ("lastname", "last_name", "apellido"),
+    "username": ("username", "user_name", "usuario"),
+    "email": ("email", "correo"),
+    "phone": ("telefono", "phone", "tel"),
+    "password": ("password", "contrasena", "clave"),
+    "password_hash": ("password_hash", "contrasena_hash", "hash"),
+    "cedula": ("cedula", "cedula_pasaporte", "dni", "documento", "document",
+               "identificacion", "identification"),
+    "rol": ("rol", "rol_id", "role", "role_id", "codigo_rol"),
+    "estado": ("estado",),
+    "codigo_cliente": ("codigo_cliente",),
+}
+
+# Campo normalizado -> columnas candidatas de la tabla (como _put_if_exists)
+COLUMNS = {
+    "nombre": ("Nombre",),
+    "email": ("Correo", "email", "correo"),
+    "phone": ("Telefono", "phone", "tel"),
+    "password": ("Contrasena", "password", "password_hash", "pwd", "contrasena"),
+    "cedula": ("Cedula_Pasaporte", "cedula", "cedula_pasaporte", "dni", "documento",
+               "document", "identificacion"),
+    "rol": ("Rol_Id", "rol_id", "role_id", "Codigo_Rol"),
+    "estado": ("Estado", "estado"),
+    "codigo_cliente": ("Codigo_Cliente", "codigo_cliente"),
+}
+
+
+class GuestImportError(ValueError):
+    """El archivo o la tabla de usuarios no permiten importar (responder 400)."""
+
+
+def normalize_phone(s):
+    if not s:
+        return "00000000"
+    s = str(s).strip()
+    # conserva + al inicio, elimina espacios
+    if s.startswith("+"):
+        return "+" + "".join(ch for ch in s[1:] if ch.isdigit())
+    return "".join(ch for ch in s if ch.isdigit())
+
+
+# -----------------------------------------------------------------------------
+# Lectura en streaming: (línea, {clave en minúscula: valor})
+# -----------------------------------------------------------------------------
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    if not hasattr(stream, "read1"):
+        stream = io.BufferedReader(stream)
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+# El texto se decodifica por bloques: no hay un número de línea fiable que informar
+_NOT_UTF8 = "El archivo no está en UTF-8 (guárdelo en UTF-8 y vuelva a subirlo)."
+
+
+def read_rows(stream, fmt, delimiter=","):
+    """
+    Genera (número de línea, fila) de un archivo CSV con encabezado o JSONL.
+    Un archivo que no es UTF-8 o un CSV mal formado levantan GuestImportError.
+    """
+    stream = _text_stream(stream)
+    if fmt == "csv":
+        if len(delimiter) != 1:
+            raise GuestImportError("El separador del CSV debe ser un solo carácter.")
+        reader = csv.reader(stream, delimiter=delimiter)
+        try:
+            header = next(reader, None)
+            if not header:
+                return
+            keys = [h.strip().lower() for h in header]
+            for values in reader:
+                if any(v.strip() for v in values):
+                    yield reader.line_num, dict(zip(keys, values))
+        except UnicodeDecodeError:
+            raise GuestImportError(_NOT_UTF8) from None
+        except csv.Error as e:
+            raise GuestImportError(f"CSV inválido en la línea {reader.line_num}: {e}") from None
+    elif fmt == "jsonl":
+        try:
+            for line_no, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    yield line_no, None
+                    continue
+                yield line_no, ({str(k).lower(): v for k, v in obj.items()} if isinstance(obj, dict) else None)
+        except UnicodeDecodeError:
+            raise GuestImportError(_NOT_UTF8) from None
+    else:
+        raise GuestImportError(f"Formato no soportado: {fmt} (use {' o '.join(FORMATS)}).")
+
+
+def _pick(raw, field):
+    for key in FIELDS[field]:
+        value = raw.get(key)
+        if value is not None and str(value).strip() != "":
+            return str(value).strip()
+    return None
+
+
+def _fingerprint(stored_hash):
+    return hashlib.sha256((stored_hash or "").encode("utf-8")).hexdigest()[:16]
+
+
+class GuestImporter:
+    """
+    GUEST_IMPORT_BATCH          filas por INSERT executemany y commit (defecto 1000)
+    GUEST_IMPORT_HASH_WORKERS   hilos de hashing durante un import (defecto: núcleos)
+    GUEST_IMPORT_MAX_ROWS       filas máximas por import desde la API (0 = sin límite)
+    SET_PASSWORD_MAX_AGE        segundos de validez de los enlaces para crear contraseña
+    PUBLIC_BASE_URL             origen de los enlaces (obligatorio para los que salen por correo)
+    """
+
+    def __init__(self, app=None, db=None, schema_cache=None, password_hasher=None):
+        self.db = None
+        self.schema_cache = None
+        self.password_hasher = None
+        self._statements = {}
+        if app is not None:
+            self.init_app(app, db, schema_cache, password_hasher)
+
+    def init_app(self, app, db, schema_cache, password_hasher):
+        self.db = db
+        self.schema_cache = schema_cache
+        self.password_hasher = password_hasher
+        cfg = app.config
+        self.batch_size = max(int(cfg.get("GUEST_IMPORT_BATCH", 1000)), 1)
+        self.hash_workers = int(cfg.get("GUEST_IMPORT_HASH_WORKERS") or 0) or None
+        self.max_rows = int(cfg.get("GUEST_IMPORT_MAX_ROWS", 50000))
+        self.token_max_age = int(cfg.get("SET_PASSWORD_MAX_AGE", 14 * 86400))
+        self.base_url = (cfg.get("PUBLIC_BASE_URL") or "").rstrip("/")
+        self._signer = URLSafeTimedSerializer(cfg["SECRET_KEY"], salt="set-password")
+        app.extensions["guest_import"] = self
+        app.cli.add_command(guests_cli)
+
+    # -------------------------------------------------------------------------
+    # Import
+    # -------------------------------------------------------------------------
+    def run(self, rows, passwords="hash", dry_run=False, links=False, max_rows=0, progress=None):
+        """
+        Importa las filas de read_rows() y devuelve el reporte (dict).
+        passwords: "hash" hashea las contraseñas del archivo (las filas sin
+        contraseña reciben enlace); "token" no hashea ninguna.
+        """
+        if passwords not in PASSWORD_MODES:
+            raise GuestImportError(f"passwords debe ser uno de: {', '.join(PASSWORD_MODES)}.")
+        schema = self.schema_cache.snapshot()
+        if not schema.users_table:
+            raise GuestImportError("No se encontró una tabla de usuarios en la base de datos.")
+        if "correo" not in schema.columns:
+            raise GuestImportError("La tabla de usuarios no tiene columna Correo.")
+        roles = self._roles()
+
+        report = {
+            "read": 0, "inserted": 0, "duplicates": 0, "errors": 0, "hashed": 0,
+            "kept_hashes": 0, "tokens": 0, "batches": 0, "truncated": False, "dry_run": dry_run,
+            "duplicate_rows": [], "error_rows": [], "links": [],
+        }
+        seen = {}  # correo -> primera línea del archivo
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="import-hash") as pool:
+            batch = []
+            for line, raw in rows:
+                if max_rows and report["read"] >= max_rows:
+                    report["truncated"] = True
+                    break
+                report["read"] += 1
+                try:
+                    guest = self._normalize(raw, roles, schema.default_role_id)
+                except ValueError as e:
+                    report["errors"] += 1
+                    report["error_rows"].append({"line": line, "error": str(e)})
+                    continue
+                first = seen.get(guest["email"])
+                if first is not None:
+                    report["duplicates"] += 1
+                    report["duplicate_rows"].append(
+                        {"line": line, "correo": guest["email"], "reason": "archivo", "first_line": first})
+                    continue
+                seen[guest["email"]] = line
+                batch.append((line, guest))
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, schema, passwords, dry_run, links, pool, report)
+                    batch = []
+                    if progress:
+                        progress(report)
+            if batch:
+                self._flush(batch, schema, passwords, dry_run, links, pool, report)
+                if progress:
+                    progress(report)
+        report["seconds"] = round(time.perf_counter() - t0, 3)
+        return report
+
+    def _normalize(self, raw, roles, default_role):
+        if raw is None:
+            raise ValueError("Fila ilegible.")
+        email = (_pick(raw, "email") or "").lower()
+        if "@" not in email:
+            raise ValueError("Correo ausente o inválido.")
+        first, last = _pick(raw, "first_name"), _pick(raw, "last_name")
+        if first and last:
+            name = f"{first} {last}"
+        else:
+            name = first or last or _pick(raw, "username") or email
+        rol = _pick(raw, "rol")
+        if rol is None:
+            rol = default_role
+        elif rol.isdigit():
+            rol = int(rol)
+        elif rol.lower() in roles:
+            rol = roles[rol.lower()]
+        else:
+            raise ValueError(f"Rol desconocido: {rol}.")
+        stored = _pick(raw, "password_hash")
+        if stored and not stored.startswith(_HASH_PREFIXES):
+            raise ValueError("password_hash no es bcrypt, pbkdf2 ni scrypt.")
+        return {
+            "nombre": name,
+            "email": email,
+            "phone": normalize_phone(_pick(raw, "phone")) or "00000000",
+            "hash": stored,
+            "password": None if stored else _pick(raw, "password"),
+            "cedula": _pick(raw, "cedula"),
+            "rol": rol,
+            "estado": _pick(raw, "estado") or "Activo",
+            "codigo_cliente": _pick(raw, "codigo_cliente"),
+        }
+
+    def _flush(self, batch, schema, passwords, dry_run, links, pool, report):
+        report["batches"] += 1
+        existing = self._existing(schema, [g["email"] for _, g in batch])
+        fresh = []
+        for line, guest in batch:
+            if guest["email"] in existing:
+                report["duplicates"] += 1
+                report["duplicate_rows"].append({"line": line, "correo": guest["email"], "reason": "existente"})
+            else:
+                fresh.append((line, guest))
+        if dry_run or not fresh:
+            return
+
+        # Hash en paralelo sólo de lo que hace falta
+        to_hash = [g for _, g in fresh if passwords == "hash" and g["password"]]
+        if to_hash:
+            method = self.password_hasher.method
+            for guest, h in zip(to_hash, pool.map(hash_password, [g["password"] for g in to_hash], repeat(method))):
+                guest["hash"] = h
+        for _, guest in fresh:
+            if guest.pop("password", None) and guest["hash"] and passwords == "hash":
+                guest["origin"] = "hashed"
+            else:
+                guest["origin"] = "kept_hashes" if guest["hash"] else "tokens"
+
+        stmt, params = self._insert(schema, [g for _, g in fresh])
+        try:
+            self.db.session.execute(stmt, params)
+            self.db.session.commit()
+        except IntegrityError as e:
+            # Otro proceso insertó alguno de estos Correo entre la consulta y el
+            # INSERT: se descartan y el resto del lote se reintenta una vez
+            self.db.session.rollback()
+            existing = self._existing(schema, [g["email"] for _, g in fresh])
+            if not existing:
+                self._batch_failed(fresh, e, report)
+                return
+            for line, guest in fresh:
+                if guest["email"] in existing:
+                    report["duplicates"] += 1
+                    report["duplicate_rows"].append({"line": line, "correo": guest["email"], "reason": "existente"})
+            fresh = [(line, g) for line, g in fresh if g["email"] not in existing]
+            if not fresh:
+                return
+            stmt, params = self._insert(schema, [g for _, g in fresh])
+            try:
+                self.db.session.execute(stmt, params)
+                self.db.session.commit()
+            except IntegrityError as e2:
+                self.db.session.rollback()
+                self._batch_failed(fresh, e2, report)
+                return
+        except Exception as e:
+            self.db.session.rollback()
+            self.schema_cache.note_error(e)
+            raise
+
+        report["inserted"] += len(fresh)
+        for _, guest in fresh:
+            report[guest["origin"]] += 1
+            if links and guest["origin"] == "tokens":
+                report["links"].append({"correo": guest["email"],
+                                        "link": self.link(guest["email"], UNUSABLE_PASSWORD)})
+
+    @staticmethod
+    def _batch_failed(fresh, exc, report):
+        detail = str(getattr(exc, "orig", exc)).splitlines()[0][:200]
+        report["errors"] += len(fresh)
+        report["error_rows"].extend({"line": line, "error": f"Lote rechazado por la BD: {detail}"}
+                                    for line, _ in fresh)
+
+    def _existing(self, schema, emails):
+        """Correo (en minúscula) del lote que ya están en la tabla, en una consulta."""
+        key = ("existing", schema.users_table)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            correo = schema.columns["correo"]
+            stmt = self._statements[key] = text(
+                f"SELECT {correo} FROM {schema.users_table} WHERE LOWER({correo}) IN :emails"
+            ).bindparams(bindparam("emails", expanding=True))
+        # LOWER(): filas viejas o de otra vía pueden tener mayúsculas, y SQLite
+        # (o una collation *_bin en MySQL) compara distinguiendo
+        rows = self.db.session.execute(stmt, {"emails": emails}).scalars()
+        return {str(e).lower() for e in rows}
+
+    def _insert(self, schema, guests):
+        """(INSERT de la tabla con las columnas que existen, parámetros del executemany)."""
+        cols = {}
+        for field, candidates in COLUMNS.items():
+            for cand in candidates:
+                real = schema.columns.get(cand.lower())
+                if real:
+                    cols[field] = real
+                    break
+        key = ("insert", schema.users_table, tuple(cols.values()))
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._statements[key] = text(
+                f"INSERT INTO {schema.users_table} ({', '.join(cols.values())}) "
+                f"VALUES ({', '.join(f':{c}' for c in cols.values())})"
+            )
+        values = {"password": lambda g: g["hash"] or UNUSABLE_PASSWORD}
+        params = [{real: values[f](g) if f in values else g[f] for f, real in cols.items()} for g in guests]
+        return stmt, params
+
+    def _roles(self):
+        """{nombre de rol en minúscula: Codigo_Rol} para filas con el rol por nombre."""
+        try:
+            rows = self.db.session.execute(text("SELECT Codigo_Rol, Nombre FROM Rol")).all()
+        except Exception:
+            self.db.session.rollback()
+            return {}
+        return {str(name).lower(): code for code, name in rows}
+
+    # -------------------------------------------------------------------------
+    # Enlaces para crear contraseña (set-password.html)
+    # -------------------------------------------------------------------------
+    def make_token(self, email, stored_hash):
+        """
+        Token firmado con el correo y una huella del hash actual: deja de
+        servir en cuanto la contraseña cambia (un solo uso) o al vencer.
+        """
+        return self._signer.dumps({"c": email.lower(), "f": _fingerprint(stored_hash)})
+
+    def read_token(self, token):
+        """(correo, huella) de un token vigente, o None."""
+        try:
+            data = self._signer.loads(token or "", max_age=self.token_max_age)
+            return data["c"], data["f"]
+        except (BadSignature, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def token_matches(fingerprint, stored_hash):
+        return fingerprint == _fingerprint(stored_hash)
+
+    def link(self, email, stored_hash, emailed=False):
+        """
+        Enlace a set-password.html. Los que salen por correo (emailed=True) sólo
+        usan PUBLIC_BASE_URL: con el Host del request, cualquiera podría pedir
+        un reset con 'Host: otro-dominio' y recibir el token en su servidor.
+        """
+        token = self.make_token(email, stored_hash)
+        if self.base_url:
+            return f"{self.base_url}/set-password.html?token={token}"
+        if emailed:
+            raise RuntimeError("PUBLIC_BASE_URL no está configurado: no se envían enlaces por correo.")
+        if has_request_context():
+            return url_for("set_password_html", token=token, _external=True)
+        return f"/set-password.html?token={token}"
+
+    def current_hash(self, email):
+        """Contrasena actual del usuario con ese Correo (None si no existe)."""
+        schema = self.schema_cache.snapshot()
+        cols = schema.columns
+        if not schema.users_table or "correo" not in cols or "contrasena" not in cols:
+            return None
+        row = self.db.session.execute(
+            text(f"SELECT {cols['contrasena']} FROM {schema.users_table} WHERE LOWER({cols['correo']}) = :c"),
+            {"c": email.lower()},
+        ).first()
+        return row[0] if row else None
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app guests import | link
+# -----------------------------------------------------------------------------
+@guests_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None,
+              help="defecto: por la extensión (.jsonl/.ndjson = jsonl)")
+@click.option("--delimiter", default=",", show_default=True, help="separador del CSV")
+@click.option("--passwords", type=click.Choice(PASSWORD_MODES), default="hash", show_default=True,
+              help="hash: hashea las del archivo; token: ninguna, sólo enlaces")
+@click.option("--links", "links_path", type=click.Path(dir_okay=False, writable=True), default=None,
+              help="CSV de salida con correo,enlace para crear la contraseña")
+@click.option("--report", "report_path", type=click.Path(dir_okay=False, writable=True), default=None,
+              help="CSV de salida con duplicados y errores por línea")
+@click.option("--dry-run", is_flag=True, help="sólo valida y reporta duplicados")
+def import_command(path, fmt, delimiter, passwords, links_path, report_path, dry_run):
+    """Importa huéspedes desde un CSV con encabezado o un JSONL."""
+    ext = current_app.extensions["guest_import"]
+    fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv")
+    with click.open_file(path, "rb") as fh:
+        try:
+            report = ext.run(
+                read_rows(fh, fmt, delimiter), passwords=passwords, dry_run=dry_run,
+                links=bool(links_path),
+                progress=lambda r: click.echo(f"  {r['read']} leídas, {r['inserted']} insertadas", err=True),
+            )
+        except GuestImportError as e:
+            raise click.ClickException(str(e))
+    if links_path:
+        with open(links_path, "w", newline="", encoding="utf-8") as out:
+            w = csv.writer(out)
+            w.writerow(["correo", "enlace"])
+            w.writerows((x["correo"], x["link"]) for x in report["links"])
+    if report_path:
+        with open(report_path, "w", newline="", encoding="utf-8") as out:
+            w = csv.writer(out)
+            w.writerow(["linea", "correo", "motivo"])
+            rows = [(d["line"], d["correo"], f"duplicado ({d['reason']})") for d in report["duplicate_rows"]]
+            rows += [(e["line"], "", e["error"]) for e in report["error_rows"]]
+            w.writerows(sorted(rows))
+    click.echo(
+        f"{report['read']} leídas, {report['inserted']} insertadas, {report['duplicates']} duplicadas, "
+        f"{report['errors']} con error ({report['hashed']} hasheadas, {report['kept_hashes']} hashes "
+        f"copiados, {report['tokens']} con enlace) en {report['seconds']:.1f} s"
+        + (" [simulación]" if dry_run else "")
+    )
+    if not report_path:
+        for d in report["duplicate_rows"][:20]:
+            click.echo(f"  línea {d['line']}: {d['correo']} duplicado ({d['reason']})")
+        if report["duplicates"] > 20:
+            click.echo(f"  … y {report['duplicates'] - 20} más (use --report)")
+
+
+@guests_cli.command("link")
+@click.argument("email")
+def link_command(email):
+    """Emite un enlace nuevo para que el usuario cree su contraseña."""
+    ext = current_app.extensions["guest_import"]
+    stored = ext.current_hash(email.strip().lower())
+    if stored is None:
+        raise click.ClickException(f"No existe un usuario con Correo {email}.")
+    click.echo(ext.link(email.strip().lower(), stored))
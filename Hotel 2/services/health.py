@@ -0,0 +1,169 @@
+# services/health.py
+# Sondas de salud para el balanceador, Azure y los monitores de uptime.
+#
+#   GET /healthz   vivo: el proceso responde (no toca la BD ni el pool)
+#   GET /readyz    listo: último resultado del chequeo de BD en segundo plano;
+#                  el detalle (BD, pool, servicios en memoria) sólo con
+#                  'Authorization: Bearer <METRICS_TOKEN>' o en DEBUG
+#
+# Las sondas se multiplican con las instancias y no deben competir con el
+# tráfico real por conexiones: un hilo por proceso hace SELECT 1 cada
+# HEALTH_CHECK_INTERVAL segundos y /readyz sólo lee ese resultado. Si el hilo
+# se queda colgado (BD que no responde), el resultado envejece y /readyz
+# pasa a 503 al superar HEALTH_STALE_AFTER. Los errores se loguean completos;
+# al cliente sólo llega el tipo de excepción.
+
+import logging
+import os
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from services.worker_thread import ProcessThread
+
+log = logging.getLogger("hotel.health")
+
+# Segundos que /readyz espera el primer chequeo de un proceso recién arrancado
+FIRST_CHECK_WAIT = 2
+
+
+class HealthMonitor:
+    """
+    HEALTH_CHECK_INTERVAL  segundos entre chequeos de BD (defecto 5)
+    HEALTH_STALE_AFTER     antigüedad máxima del último chequeo para estar listo
+                           (defecto 3 intervalos)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.app = None
+        self.started_at = time.time()
+        self._thread = ProcessThread(self._run, "health-check")
+        self._checked = threading.Event()
+        self._result = None
+        self._failures = 0
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.app = app
+        self.interval = float(app.config.get("HEALTH_CHECK_INTERVAL", 5))
+        self.stale_after = float(app.config.get("HEALTH_STALE_AFTER") or self.interval * 3)
+        app.extensions["health"] = self
+        app.add_url_rule("/healthz", "healthz", self.liveness, methods=["GET"])
+        app.add_url_rule("/readyz", "readyz", self.readiness, methods=["GET"])
+        # Nombre anterior de la sonda: mismos datos que /readyz
+        app.add_url_rule("/db-ping", "db_ping", self.readiness, methods=["GET"])
+
+    # -------------------------------------------------------------------------
+    # Vistas
+    # -------------------------------------------------------------------------
+    def liveness(self):
+        return jsonify({"status": "ok", "pid": os.getpid(),
+                        "uptime": round(time.time() - self.started_at, 1)}), 200
+
+    def readiness(self):
+        report = self.report()
+        code = 200 if report["status"] == "ok" else 503
+        if not self._detail_allowed():
+            return jsonify({"status": report["status"]}), code
+        return jsonify(report), code
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def report(self):
+        """Estado listo/no listo sin consultar la BD (arranca el hilo si hace falta)."""
+        self._ensure_thread()
+        # Recién arrancado: espera (poco) el primer chequeo del hilo
+        self._checked.wait(FIRST_CHECK_WAIT)
+        result = self._result
+        out = {"pid": os.getpid(), "pool": self.pool_stats(), "dependencies": self._dependencies()}
+        if result is None:
+            out.update(status="starting", database=None)
+            return out
+        age = time.monotonic() - result["at"]
+        status = "ok" if result["ok"] and age <= self.stale_after else "unavailable"
+        out.update(status=status, database={
+            "ok": result["ok"],
+            "latency_ms": result["latency_ms"],
+            "age": round(age, 1),
+            "stale": age > self.stale_after,
+            "error": result["error"],
+            "consecutive_failures": self._failures,
+        })
+        return out
+
+    def pool_stats(self):
+        pool = self._engine_pool()
+        if not isinstance(pool, QueuePool):
+            return {"class": type(pool).__name__} if pool is not None else None
+        return {"size": pool.size(), "checked_out": pool.checkedout(), "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0)}
+
+    def check(self):
+        """Un chequeo de BD (SELECT 1 con una conexión del pool); guarda el resultado."""
+        t0 = time.perf_counter()
+        try:
+            with self.app.app_context():
+                with self.db.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, e.__class__.__name__
+            log.warning("Chequeo de BD fallido", exc_info=True)
+        self._failures = 0 if ok else self._failures + 1
+        self._result = {"ok": ok, "error": error, "at": time.monotonic(),
+                        "latency_ms": round((time.perf_counter() - t0) * 1000, 1)}
+        self._checked.set()
+        return self._result
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _detail_allowed(self):
+        """Mismo criterio que /metrics: token de métricas, o DEBUG si no hay token."""
+        token = current_app.config.get("METRICS_TOKEN")
+        if not token:
+            return current_app.debug
+        return request.headers.get("Authorization") == f"Bearer {token}"
+
+    def _engine_pool(self):
+        try:
+            with self.app.app_context():
+                return self.db.engine.pool
+        except Exception:
+            return None
+
+    def _dependencies(self):
+        """Servicios en memoria que sirven requests sin BD: edad y tamaño de cada uno."""
+        out = {}
+        for name in ("schema_cache", "availability", "calendar", "pricing", "room_status", "password_hasher"):
+            service = self.app.extensions.get(name)
+            if service is not None and hasattr(service, "stats"):
+                try:
+                    out[name] = service.stats()
+                except Exception:
+                    out[name] = {"error": True}
+        return out
+
+    def _ensure_thread(self):
+        self._thread.ensure(self._reset)
+
+    def _reset(self, new_process):
+        # Un proceso nuevo (fork) no hereda el resultado del anterior
+        if new_process:
+            self._result, self._failures = None, 0
+            self._checked = threading.Event()
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception:
+                log.exception("Error en el hilo de chequeo de salud")
+            time.sleep(self.interval)
@@ -0,0 +1,235 @@
+# services/i18n.py
+# Traducción en el servidor con los diccionarios de static/assets/i18n/auto/
+# (<locale>.json, {"k<djb2>": "texto traducido"}). Las claves son las mismas
+# que calculaba i18n-auto.js en el navegador: djb2 del texto normalizado de
+# cada nodo de texto y de los atributos placeholder/title/alt/aria-label.
+#
+# El HTML se traduce una vez al renderizar; PageRegistry guarda el resultado
+# por (página, locale), así que inglés y francés también salen de caché.
+#
+# Diccionario fuente para traductores:
+#   flask --app app i18n extract
+
+import html
+import json
+import os
+import re
+import threading
+
+import click
+from flask import current_app, g, request
+from flask.cli import AppGroup
+from markupsafe import escape
+
+DICT_DIR = "assets/i18n/auto"
+SOURCE_NAME = "_source.json"
+TRANSLATED_ATTRS = ("placeholder", "title", "alt", "aria-label")
+
+i18n_cli = AppGroup("i18n", help="Diccionarios de traducción.")
+
+# Comentarios y elementos cuyo contenido no se traduce (como DISALLOWED en el JS)
+# se tratan como un solo token opaco.
+_TOKENS = re.compile(
+    r"<!--.*?-->"
+    r"|<(script|style|noscript|iframe|code|pre)\b[^>]*>.*?</\1\s*>"
+    r"|<[^>]*>",
+    re.S | re.I,
+)
+_ATTR = re.compile(
+    r"""(\s(%s)\s*=\s*)("[^"]*"|'[^']*')""" % "|".join(TRANSLATED_ATTRS),
+    re.I,
+)
+_META_DESCRIPTION = re.compile(r"""<meta\b[^>]*\bname\s*=\s*["']description["']""", re.I)
+_CONTENT_ATTR = re.compile(r"""(\scontent\s*=\s*)("[^"]*"|'[^']*')""", re.I)
+_HTML_LANG = re.compile(r"""(<html\b[^>]*?\blang\s*=\s*)("[^"]*"|'[^']*')""", re.I)
+_SPACES = re.compile(r"\s+")
+
+
+# -----------------------------------------------------------------------------
+# Claves (idénticas a hash() de static/assets/js/i18n-auto.js)
+# -----------------------------------------------------------------------------
+def normalize(text):
+    return _SPACES.sub(" ", (text or "").replace("\u00a0", " ")).strip()
+
+
+def _int32(x):
+    x &= 0xFFFFFFFF
+    return x - 0x100000000 if x & 0x80000000 else x
+
+
+def i18n_key(text):
+    """djb2 sobre unidades UTF-16 con la aritmética de 32 bits de JS."""
+    s = normalize(text).encode("utf-16-le")
+    h = 5381
+    for i in range(0, len(s), 2):
+        h = _int32(_int32(h << 5) + h) ^ (s[i] | s[i + 1] << 8)
+    return "k%x" % (h & 0xFFFFFFFF)
+
+
+def iter_texts(markup):
+    """Textos traducibles de un HTML renderizado (nodos de texto y atributos)."""
+    pos = 0
+    for m in _TOKENS.finditer(markup):
+        yield from _texts_of_data(markup[pos:m.start()])
+        tag = m.group(0)
+        if not tag.startswith("<!--") and m.group(1) is None:
+            for am in _ATTR.finditer(tag):
+                yield html.unescape(am.group(3)[1:-1])
+            if _META_DESCRIPTION.match(tag):
+                cm = _CONTENT_ATTR.search(tag)
+                if cm:
+                    yield html.unescape(cm.group(2)[1:-1])
+        pos = m.end()
+    yield from _texts_of_data(markup[pos:])
+
+
+def _texts_of_data(raw):
+    text = normalize(html.unescape(raw))
+    if text:
+        yield text
+
+
+# -----------------------------------------------------------------------------
+# Extensión
+# -----------------------------------------------------------------------------
+class Translator:
+    """
+    I18N_LOCALES         locales publicados (defecto es,en,fr; el primero es el original)
+    I18N_COOKIE          cookie con la preferencia del visitante (defecto 'locale')
+    I18N_DICT_DIR        carpeta de los <locale>.json (defecto static/assets/i18n/auto)
+    """
+
+    def __init__(self, app=None):
+        self.dicts = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.locales = tuple(app.config.get("I18N_LOCALES") or ("es", "en", "fr"))
+        self.default = self.locales[0]
+        self.cookie = app.config.get("I18N_COOKIE", "locale")
+        self.dict_dir = app.config.get("I18N_DICT_DIR") or os.path.join(app.static_folder, DICT_DIR)
+        self.load()
+        app.extensions["i18n"] = self
+        app.add_template_filter(self.gettext, "t")
+        app.add_template_global(self.locale, "current_locale")
+        app.after_request(self._translate_response)
+        app.cli.add_command(i18n_cli)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def load(self):
+        """(Re)carga los diccionarios; los locales sin archivo quedan sin traducir."""
+        dicts = {}
+        for locale in self.locales[1:]:
+            path = os.path.join(self.dict_dir, f"{locale}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as fh:
+                    dicts[locale] = json.load(fh)
+        with self._lock:
+            self.dicts = dicts
+
+    def locale(self):
+        """Locale del request: cookie, luego Accept-Language, luego el original."""
+        if "locale" not in g:
+            chosen = request.cookies.get(self.cookie)
+            if chosen not in self.locales:
+                chosen = request.accept_languages.best_match(self.locales, self.default)
+            g.locale = chosen
+        return g.locale
+
+    def needs_translation(self, locale):
+        return locale != self.default and bool(self.dicts.get(locale))
+
+    def gettext(self, text, locale=None):
+        """Filtro |t para textos que no pasan por el HTML (p.ej. atributos data-*)."""
+        locale = locale or self.locale()
+        return self.dicts.get(locale, {}).get(i18n_key(text), text)
+
+    def translate_html(self, markup, locale):
+        """Traduce nodos de texto, atributos, <title>, meta description y <html lang>."""
+        table = self.dicts.get(locale)
+        if not table:
+            return markup
+        out = []
+        pos = 0
+        for m in _TOKENS.finditer(markup):
+            out.append(self._data(markup[pos:m.start()], table))
+            tag = m.group(0)
+            if not tag.startswith("<!--") and m.group(1) is None:
+                tag = self._tag(tag, table, locale)
+            out.append(tag)
+            pos = m.end()
+        out.append(self._data(markup[pos:], table))
+        return "".join(out)
+
+    def stats(self):
+        return {locale: len(table) for locale, table in self.dicts.items()}
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _data(self, raw, table):
+        text = normalize(html.unescape(raw))
+        if not text:
+            return raw
+        translated = table.get(i18n_key(text))
+        if translated is None:
+            return raw
+        # Se conservan los espacios de alrededor (indentación del template)
+        lead = raw[:len(raw) - len(raw.lstrip())]
+        trail = raw[len(raw.rstrip()):]
+        return f"{lead}{escape(translated)}{trail}"
+
+    def _tag(self, tag, table, locale):
+        tag = _ATTR.sub(lambda m: self._attr(m, 3, table), tag)
+        if _META_DESCRIPTION.match(tag):
+            tag = _CONTENT_ATTR.sub(lambda m: self._attr(m, 2, table), tag, count=1)
+        if tag[:5].lower() == "<html":
+            tag = _HTML_LANG.sub(lambda m: f'{m.group(1)}"{locale}"', tag)
+        return tag
+
+    @staticmethod
+    def _attr(m, quoted_group, table):
+        quoted = m.group(quoted_group)
+        translated = table.get(i18n_key(html.unescape(quoted[1:-1])))
+        if translated is None:
+            return m.group(0)
+        return f"{m.group(1)}{quoted[0]}{escape(translated)}{quoted[0]}"
+
+    def _translate_response(self, response):
+        """Traduce las respuestas HTML que no vienen ya traducidas de PageRegistry."""
+        if (response.mimetype != "text/html" or response.direct_passthrough
+                or "Content-Language" in response.headers or response.status_code == 304):
+            return response
+        locale = self.locale()
+        response.headers["Content-Language"] = locale
+        response.vary.update(("Cookie", "Accept-Language"))
+        if self.needs_translation(locale):
+            response.set_data(self.translate_html(response.get_data(as_text=True), locale))
+        return response
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app i18n extract
+# -----------------------------------------------------------------------------
+@i18n_cli.command("extract")
+def extract_command():
+    """Escribe _source.json ({clave: texto original}) con los textos de todas las páginas."""
+    pages = current_app.extensions["pages"]
+    ext = current_app.extensions["i18n"]
+    source = {}
+    with current_app.test_request_context():
+        for template in sorted(pages.static_pages | pages.dynamic_pages):
+            markup = current_app.jinja_env.get_template(template).render()
+            for text in iter_texts(markup):
+                source.setdefault(i18n_key(text), text)
+    os.makedirs(ext.dict_dir, exist_ok=True)
+    path = os.path.join(ext.dict_dir, SOURCE_NAME)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(source, fh, ensure_ascii=False, indent=0, sort_keys=True)
+    for locale, table in sorted(ext.dicts.items()):
+        click.echo(f"{locale}: {sum(1 for k in source if k in table)}/{len(source)} traducidos")
+    click.echo(f"{len(source)} textos -> {path}")
@@ -0,0 +1,195 @@
+# services/images.py
+# Derivados responsivos de imágenes (WebP/AVIF en varios anchos) y el helper
+# Jinja picture() que emite <picture>/srcset a partir del manifiesto.
+#
+# Generación (incremental, en paralelo):
+#   flask --app app assets images [--jobs N] [--force]
+
+import json
+import os
+import tempfile
+from concurrent.futures import as_completed
+
+import click
+from flask import current_app, url_for
+from markupsafe import Markup, escape
+
+from services.assets import assets_cli, file_digest
+
+DERIVED_DIR = "assets/img/_derived"
+DERIVED_MANIFEST = "manifest.json"
+SOURCE_EXTS = {".jpg", ".jpeg", ".png"}
+DEFAULT_SOURCES = ("assets/img/Hotel Villa Grace Images",)
+DEFAULT_WIDTHS = (480, 960, 1600)
+# Orden de preferencia en <picture>: el navegador toma el primer <source> que soporte
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 50, "webp": 78}
+
+
+# -----------------------------------------------------------------------------
+# Trabajo por imagen (nivel módulo: se ejecuta en un ProcessPool)
+# -----------------------------------------------------------------------------
+def _render_variants(src, rel, out_root, widths, formats):
+    """Genera los derivados de una imagen y devuelve su entrada de manifiesto."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            # Los PNG con paleta (modo P) llevan la transparencia en info, no en una banda
+            alpha = "A" in im.getbands() or "transparency" in im.info
+            im = im.convert("RGBA" if alpha else "RGB")
+        width, height = im.size
+        # Sin ampliar: anchos menores al original, y el original si no hay ninguno
+        targets = sorted({w for w in widths if w < width} or {width})
+
+        # 'assets/img/Galería/x.jpg' -> '<DERIVED_DIR>/Galería/x-480.webp'
+        stem = os.path.splitext(rel.removeprefix("assets/img/"))[0]
+        variants = {fmt: [] for fmt in formats}
+        for w in targets:
+            h = round(height * w / width)
+            resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+            for fmt in formats:
+                out_rel = f"{stem}-{w}.{fmt}"
+                out = os.path.join(out_root, out_rel)
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                resized.save(out, fmt.upper(), quality=QUALITY[fmt])
+                variants[fmt].append([w, out_rel])
+    return {"width": width, "height": height, "variants": variants}
+
+
+def _source_files(static_dir, sources):
+    for src_dir in sources:
+        root = os.path.join(static_dir, src_dir)
+        for dirpath, _dirs, files in os.walk(root):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in SOURCE_EXTS:
+                    full = os.path.join(dirpath, name)
+                    yield full, os.path.relpath(full, static_dir).replace(os.sep, "/")
+
+
+def build_derivatives(static_dir, sources=DEFAULT_SOURCES, widths=DEFAULT_WIDTHS,
+                      jobs=None, force=False, log=print):
+    """
+    Genera los derivados que falten o cuya fuente cambió (por hash).
+    Devuelve (generadas, omitidas).
+    """
+    try:
+        from PIL import features
+    except ModuleNotFoundError:
+        raise click.ClickException(
+            "Falta Pillow para generar imágenes derivadas:\n"
+            "  python -m pip install Pillow"
+        )
+    formats = tuple(f for f in FORMATS if features.check(f))
+    out_root = os.path.join(static_dir, DERIVED_DIR)
+    manifest_path = os.path.join(out_root, DERIVED_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+
+    pending = []
+    for full, rel in _source_files(static_dir, sources):
+        digest = file_digest(full)
+        entry = manifest.get(rel)
+        if (entry and entry["hash"] == digest and entry["widths"] == list(widths)
+                and all(entry["variants"].get(f) for f in formats)
+                and all(os.path.exists(os.path.join(out_root, p))
+                        for vs in entry["variants"].values() for _w, p in vs)):
+            continue
+        pending.append((full, rel, digest))
+
+    live = {rel for _full, rel in _source_files(static_dir, sources)}
+    skipped = len(live) - len(pending)
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing: sólo en este comando
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(_render_variants, full, rel, out_root, widths, formats): (rel, digest)
+            for full, rel, digest in pending
+        }
+        for i, fut in enumerate(as_completed(futures), 1):
+            rel, digest = futures[fut]
+            entry = fut.result()
+            entry.update(hash=digest, widths=list(widths))
+            manifest[rel] = entry
+            log(f"[{i}/{len(pending)}] {rel}")
+
+    # Fuentes borradas desaparecen del manifiesto
+    manifest = {rel: e for rel, e in manifest.items() if rel in live}
+    os.makedirs(out_root, exist_ok=True)
+    # Temporal + rename: un worker que arranca a mitad no lee un JSON a medias
+    fd, tmp = tempfile.mkstemp(dir=out_root, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=0, sort_keys=True)
+        os.replace(tmp, manifest_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return len(pending), skipped
+
+
+# -----------------------------------------------------------------------------
+# Helper Jinja
+# -----------------------------------------------------------------------------
+class ResponsiveImages:
+    """Expone picture() a los templates leyendo el manifiesto de derivados."""
+
+    def __init__(self, app=None):
+        self.entries = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        path = os.path.join(app.static_folder, DERIVED_DIR, DERIVED_MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+        app.extensions["images"] = self
+        app.add_template_global(self.picture, "picture")
+
+    def srcset(self, filename, fmt):
+        entry = self.entries.get(filename)
+        if not entry or not entry["variants"].get(fmt):
+            return ""
+        return ", ".join(
+            f"{url_for('static', filename=f'{DERIVED_DIR}/{p}')} {w}w"
+            for w, p in entry["variants"][fmt]
+        )
+
+    def picture(self, filename, alt="", sizes="100vw", loading=None, **attrs):
+        """<picture> con <source> AVIF/WebP y un <img> del original como respaldo."""
+        entry = self.entries.get(filename)
+        img_attrs = {"src": url_for("static", filename=filename), "alt": alt,
+                     "loading": loading, "decoding": "async"}
+        if entry:
+            img_attrs.setdefault("width", entry["width"])
+            img_attrs.setdefault("height", entry["height"])
+        img_attrs.update(attrs)
+        img = "<img " + " ".join(
+            f'{k}="{escape(v)}"' for k, v in img_attrs.items() if v is not None
+        ) + ">"
+        if not entry:
+            return Markup(img)
+
+        sources = "".join(
+            f'<source type="image/{fmt}" srcset="{escape(self.srcset(filename, fmt))}" sizes="{escape(sizes)}">'
+            for fmt in FORMATS if entry["variants"].get(fmt)
+        )
+        return Markup(f"<picture>{sources}{img}</picture>")
+
+
+@assets_cli.command("images")
+@click.option("--jobs", type=int, default=None, help="Procesos en paralelo (defecto: núcleos).")
+@click.option("--force", is_flag=True, help="Regenerar aunque la fuente no haya cambiado.")
+@click.option("--widths", default=",".join(map(str, DEFAULT_WIDTHS)), show_default=True)
+def images_command(jobs, force, widths):
+    """Genera derivados WebP/AVIF de las imágenes de la galería."""
+    widths = tuple(int(w) for w in widths.split(","))
+    done, skipped = build_derivatives(current_app.static_folder, widths=widths,
+                                      jobs=jobs, force=force, log=click.echo)
+    click.echo(f"{done} generadas, {skipped} sin cambios.")
@@ -0,0 +1,289 @@
+# services/metrics.py
+# Instrumentación por request: latencia por endpoint, consultas SQL y tiempo
+# de BD por request, render de templates y espera por conexiones del pool.
+# Se publica en /metrics con el formato de texto de Prometheus.
+#
+# Con Gunicorn cada worker tiene sus propios contadores: /metrics muestra los
+# del worker que atiende el scrape (etiqueta pid en hotel_process_info).
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+log = logging.getLogger("hotel.metrics")
+
+PREFIX = "hotel_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+# Consultas distintas que se listan en el log de requests lentos
+SLOW_LOG_TOP = 10
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout (incluye abrir conexiones nuevas)."""
+
+    observer = None
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if TimedQueuePool.observer is not None:
+                TimedQueuePool.observer(time.perf_counter() - t0)
+
+
+class Metrics:
+    """
+    METRICS_ENABLED          activa la instrumentación (defecto True)
+    METRICS_TOKEN            /metrics exige 'Authorization: Bearer <token>'; sin token sólo
+                             responde con DEBUG (si no, 404)
+    METRICS_SLOW_REQUEST_MS  loguea requests más lentos que esto con su desglose SQL (0 = no)
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)       # (nombre, labels) -> valor
+        self.histograms = {}                   # (nombre, labels) -> Histogram
+        self.in_flight = 0
+        self.engine = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Debe llamarse antes de db.init_app (instala la clase de pool)."""
+        self.enabled = app.config.get("METRICS_ENABLED", True)
+        self.token = app.config.get("METRICS_TOKEN")
+        self.slow_ms = float(app.config.get("METRICS_SLOW_REQUEST_MS", 0) or 0)
+        app.extensions["metrics"] = self
+        app.add_url_rule("/metrics", "metrics", self.view, methods=["GET"])
+        if not self.enabled:
+            return
+
+        if app.config.get("SQLALCHEMY_DATABASE_URI", "").startswith("mysql"):
+            opts = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+            opts.setdefault("poolclass", TimedQueuePool)
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opts
+            TimedQueuePool.observer = self._observe_pool_wait
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        _listen_engine_events(self)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def inc(self, name, labels=(), value=1):
+        with self._lock:
+            self.counters[(name, labels)] += value
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        with self._lock:
+            hist = self.histograms.get((name, labels))
+            if hist is None:
+                hist = self.histograms[(name, labels)] = Histogram(buckets)
+            hist.observe(value)
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus."""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda kv: kv[0])
+            snapshot = [(key, list(h.counts), h.sum, h.count, h.buckets) for key, h in histograms]
+            in_flight = self.in_flight
+
+        lines.append(f"# TYPE {PREFIX}process_info gauge")
+        lines.append(f'{PREFIX}process_info{{pid="{os.getpid()}"}} 1')
+        lines.append(f"# TYPE {PREFIX}http_requests_in_flight gauge")
+        lines.append(f"{PREFIX}http_requests_in_flight {in_flight}")
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+
+        for (name, labels), counts, total, count, buckets in snapshot:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                le = (("le", f"{bound:g}"),)
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels + le)} {cumulative}")
+            le = (("le", "+Inf"),)
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels + le)} {count}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+
+        pool = getattr(self.engine, "pool", None)
+        if isinstance(pool, QueuePool):
+            lines.append(f"# TYPE {PREFIX}db_pool_connections gauge")
+            lines.append(f'{PREFIX}db_pool_connections{{state="checked_out"}} {pool.checkedout()}')
+            lines.append(f'{PREFIX}db_pool_connections{{state="idle"}} {pool.checkedin()}')
+            lines.append(f'{PREFIX}db_pool_connections{{state="overflow"}} {max(pool.overflow(), 0)}')
+            lines.append(f"{PREFIX}db_pool_size {pool.size()}")
+        return "\n".join(lines) + "\n"
+
+    def view(self):
+        if not self.token:
+            # Sin token las métricas sólo se ven en desarrollo
+            if not current_app.debug:
+                abort(404)
+        elif request.headers.get("Authorization") != f"Bearer {self.token}":
+            abort(401)
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    # -------------------------------------------------------------------------
+    # Hooks de request
+    # -------------------------------------------------------------------------
+    def _before_request(self):
+        g._metrics = {"t0": time.perf_counter(), "queries": 0, "db": 0.0, "pool_wait": 0.0,
+                      "templates": 0.0, "status": 500, "sql": defaultdict(lambda: [0, 0.0])}
+        with self._lock:
+            self.in_flight += 1
+
+    def _after_request(self, response):
+        state = g.get("_metrics")
+        if state is not None:
+            state["status"] = response.status_code
+            state["stream"] = response.mimetype == "text/event-stream"
+        return response
+
+    def _teardown_request(self, exc):
+        state = g.pop("_metrics", None)
+        if state is None:
+            return
+        elapsed = time.perf_counter() - state["t0"]
+        endpoint = request.endpoint or "<unmatched>"
+        method = request.method
+        with self._lock:
+            self.in_flight -= 1
+        self.inc("http_requests_total", (("endpoint", endpoint), ("method", method),
+                                         ("status", str(state["status"]))))
+        self.observe("http_request_duration_seconds", elapsed, (("endpoint", endpoint), ("method", method)))
+        self.observe("http_request_db_queries", state["queries"], (("endpoint", endpoint),), COUNT_BUCKETS)
+        self.observe("http_request_db_seconds", state["db"], (("endpoint", endpoint),), QUERY_BUCKETS)
+
+        # Un stream SSE dura minutos a propósito: no es un request lento
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms and not state.get("stream"):
+            top = sorted(state["sql"].items(), key=lambda kv: kv[1][1], reverse=True)[:SLOW_LOG_TOP]
+            breakdown = "".join(
+                f"\n    {n}x {secs * 1000:7.1f} ms  {stmt}" for stmt, (n, secs) in top
+            )
+            log.warning(
+                "Request lento: %s %s -> %s en %.0f ms (BD %.0f ms en %d consultas, "
+                "espera de pool %.0f ms, templates %.0f ms)%s",
+                method, request.path, state["status"], elapsed * 1000, state["db"] * 1000,
+                state["queries"], state["pool_wait"] * 1000, state["templates"] * 1000, breakdown,
+            )
+
+    # -------------------------------------------------------------------------
+    # Templates, SQL y pool
+    # -------------------------------------------------------------------------
+    def _before_render(self, _app, template, context, **_extra):
+        if has_request_context():
+            g.setdefault("_metrics_render", []).append(time.perf_counter())
+
+    def _after_render(self, _app, template, context, **_extra):
+        stack = g.get("_metrics_render") if has_request_context() else None
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        self.observe("template_render_seconds", elapsed, (("template", template.name or "<string>"),))
+        state = g.get("_metrics")
+        if state is not None and not stack:
+            state["templates"] += elapsed  # sólo el nivel externo (sin doble conteo)
+
+    def _observe_query(self, statement, elapsed):
+        self.observe("db_query_duration_seconds", elapsed,
+                     (("operation", statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"),),
+                     QUERY_BUCKETS)
+        state = g.get("_metrics") if has_request_context() else None
+        if state is not None:
+            state["queries"] += 1
+            state["db"] += elapsed
+            if self.slow_ms:
+                entry = state["sql"][" ".join(statement.split())[:200]]
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def _observe_pool_wait(self, elapsed):
+        self.observe("db_pool_checkout_wait_seconds", elapsed, (), QUERY_BUCKETS)
+        state = g.get("_metrics") if has_request_context() else None
+        if state is not None:
+            state["pool_wait"] += elapsed
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+_listening = set()
+
+
+def _listen_engine_events(metrics):
+    """Eventos a nivel de clase Engine: cubre el engine de db aunque se recree."""
+    if id(metrics) in _listening:
+        return
+    _listening.add(id(metrics))
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+        metrics.engine = conn.engine
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_t0")
+        if stack:
+            metrics._observe_query(statement, time.perf_counter() - stack.pop())
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(ctx):
+        stack = ctx.connection.info.get("_metrics_t0") if ctx.connection is not None else None
+        if stack:
+            stack.pop()
+        metrics.inc("db_errors_total")
@@ -0,0 +1,76 @@
+# services/migrations.py
+# Flask-Migrate diferido. flask_migrate importa alembic (y con él mako,
+# pygments y los dialectos DDL) al cargarse: ~150 ms de arranque por worker
+# que sólo usan `flask db ...` y bench/seed.py. init_app deja un grupo `db` y
+# un app.extensions["migrate"] que crean el Migrate real al primer uso.
+
+import click
+
+
+class DeferredMigrate:
+    """Misma interfaz que flask_migrate.Migrate para init_app(app, db, **opciones)."""
+
+    def __init__(self, app=None, db=None, **kwargs):
+        self.db = db
+        self.kwargs = kwargs
+        self._migrate = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db=None, **kwargs):
+        self.db = db or self.db
+        self.kwargs.update(kwargs)
+        app.extensions["migrate"] = _MigrateConfigProxy(self, app)
+        app.cli.add_command(_DbGroup(self, app))
+
+    def load(self, app):
+        """Config real de Flask-Migrate para app (importa flask_migrate la primera vez)."""
+        current = app.extensions.get("migrate")
+        if current is not None and not isinstance(current, _MigrateConfigProxy):
+            return current
+        if self._migrate is None:
+            from flask_migrate import Migrate
+
+            self._migrate = Migrate(db=self.db, **self.kwargs)
+        # Reemplaza el proxy y el grupo `db` por los reales
+        self._migrate.init_app(app, self.db)
+        return app.extensions["migrate"]
+
+
+class _MigrateConfigProxy:
+    """app.extensions["migrate"] hasta que alguien (env.py, upgrade()) lo use."""
+
+    def __init__(self, owner, app):
+        self._owner = owner
+        self._app = app
+
+    def __getattr__(self, name):
+        return getattr(self._owner.load(self._app), name)
+
+
+class _DbGroup(click.Group):
+    """`flask db`: resuelve los subcomandos con el grupo real de Flask-Migrate."""
+
+    def __init__(self, owner, app):
+        super().__init__("db", help="Perform database migrations.")
+        self._owner = owner
+        self._app = app
+
+    def _real(self):
+        self._owner.load(self._app)
+        from flask_migrate.cli import db
+
+        return db
+
+    def parse_args(self, ctx, args):
+        # Opciones (-d, -x) y callback del grupo real: deja g.directory/g.x_arg
+        real = self._real()
+        self.params = real.params
+        self.callback = real.callback
+        return super().parse_args(ctx, args)
+
+    def list_commands(self, ctx):
+        return self._real().list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        return self._real().get_command(ctx, cmd_name)
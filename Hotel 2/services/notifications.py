@@ -0,0 +1,426 @@
+# services/notifications.py
+# Correo saliente por outbox (tabla notifications): formulario de contacto,
+# cotizaciones de eventos, confirmaciones de reserva y enlaces de contraseña.
+#
+# - El request sólo valida y escribe la fila (enqueue + commit): nunca espera
+#   un handshake SMTP. dedupe_key es única, así un doble envío del formulario
+#   o una confirmación repetida es una sola fila.
+# - Worker (`flask notifications worker`, uno o más procesos): reclama un lote
+#   de filas vencidas (status + claimed_by + locked_until, así dos procesos no
+#   toman la misma), lo reparte entre NOTIFY_WORKERS hilos y cada hilo lo
+#   envía por su conexión SMTP, que se reutiliza entre mensajes y pasadas
+#   (se cierra tras NOTIFY_IDLE_TIMEOUT sin uso y se reabre si el servidor la
+#   cortó).
+# - Errores 4xx / de red: se reintenta con backoff exponencial + jitter hasta
+#   NOTIFY_MAX_ATTEMPTS. 5xx o destinatario rechazado: 'failed' sin reintentar.
+#   Si un worker muere con filas reclamadas, vuelven a la cola al vencer el
+#   lease. Cada mensaje lleva X-Notification-Id para que el receptor pueda
+#   descartar el duplicado de un reenvío tras un corte a mitad de DATA.
+#
+# Sin servidor SMTP real: `python -m bench mock-smtp --port 8025` y
+# MAIL_HOST=127.0.0.1 MAIL_PORT=8025 MAIL_SECURITY=none.
+
+import hashlib
+import logging
+import random
+import re
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import make_msgid
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, func, or_, select, update
+
+log = logging.getLogger("hotel.notifications")
+
+notifications_cli = AppGroup("notifications", help="Correo saliente (outbox).")
+
+EMAIL_RE = re.compile(r"^[^@\s<>\"']+@[^@\s<>\"']+\.[^@\s<>\"']+$")
+SECURITY_MODES = ("starttls", "ssl", "none")
+# Ventana en la que un mismo correo recibe a lo sumo un enlace de contraseña
+PASSWORD_RESET_WINDOW = 900
+
+
+class MailError(Exception):
+    """Fallo al enviar un mensaje; permanent = no tiene sentido reintentar."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def valid_email(value):
+    return bool(value) and len(value) <= 254 and bool(EMAIL_RE.match(value))
+
+
+class Notifier:
+    """
+    MAIL_HOST / MAIL_PORT        servidor SMTP (sin MAIL_HOST el worker no arranca)
+    MAIL_USERNAME / MAIL_PASSWORD
+    MAIL_SECURITY                starttls | ssl | none (defecto starttls)
+    MAIL_FROM                    remitente de todos los mensajes
+    MAIL_TIMEOUT                 segundos por operación SMTP (defecto 10)
+    CONTACT_INBOX                destino del formulario de contacto y de cotizaciones
+    NOTIFY_WORKERS               hilos de envío, cada uno con su conexión (defecto 4)
+    NOTIFY_BATCH_SIZE            mensajes reclamados por pasada (defecto 100)
+    NOTIFY_INTERVAL              segundos entre pasadas sin trabajo (defecto 2)
+    NOTIFY_MAX_ATTEMPTS          intentos antes de marcar 'failed' (defecto 8)
+    NOTIFY_RETRY_BASE            segundos del primer reintento; se duplica (defecto 30)
+    NOTIFY_LEASE                 segundos que una fila reclamada queda tomada (defecto 300)
+    NOTIFY_IDLE_TIMEOUT          segundos sin uso tras los que se cierra una conexión (defecto 60)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self._local = threading.local()
+        self._connections = []              # [(hilo, smtp)] para cerrarlas al salir
+        self._conn_lock = threading.Lock()
+        self._pool = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        cfg = app.config
+        self.host = cfg.get("MAIL_HOST")
+        self.port = int(cfg.get("MAIL_PORT") or 587)
+        self.username = cfg.get("MAIL_USERNAME")
+        self.password = cfg.get("MAIL_PASSWORD")
+        self.security = cfg.get("MAIL_SECURITY", "starttls")
+        self.sender = cfg.get("MAIL_FROM") or "Hotel Villa Grace <no-reply@hotelvillagrace.com>"
+        self.timeout = float(cfg.get("MAIL_TIMEOUT", 10))
+        self.inbox = cfg.get("CONTACT_INBOX") or "reservas@hotelvillagrace.com"
+        self.workers = int(cfg.get("NOTIFY_WORKERS", 4))
+        self.batch_size = int(cfg.get("NOTIFY_BATCH_SIZE", 100))
+        self.interval = float(cfg.get("NOTIFY_INTERVAL", 2))
+        self.max_attempts = int(cfg.get("NOTIFY_MAX_ATTEMPTS", 8))
+        self.retry_base = float(cfg.get("NOTIFY_RETRY_BASE", 30))
+        self.lease = float(cfg.get("NOTIFY_LEASE", 300))
+        self.idle_timeout = float(cfg.get("NOTIFY_IDLE_TIMEOUT", 60))
+        if self.security not in SECURITY_MODES:
+            raise ValueError(f"MAIL_SECURITY debe ser uno de: {', '.join(SECURITY_MODES)}")
+        app.extensions["notifications"] = self
+        app.cli.add_command(notifications_cli)
+
+    # -------------------------------------------------------------------------
+    # Productores (dentro del request; el commit es del llamador)
+    # -------------------------------------------------------------------------
+    def enqueue(self, kind, to, subject, body, reply_to=None, dedupe_key=None):
+        """
+        Agrega el mensaje a la sesión actual. Sin dedupe_key se usa un hash del
+        contenido. Devuelve la fila, o None si ya había una con la misma clave.
+        Un destinatario o Reply-To inválido (p.ej. con saltos de línea) es
+        ValueError: nunca llega al outbox.
+        """
+        from models import Notification
+
+        if not valid_email(to) or (reply_to and not valid_email(reply_to)):
+            raise ValueError(f"Dirección de correo inválida para {kind}.")
+        key = hashlib.sha256("\x1f".join(
+            (kind, to.lower(), dedupe_key or f"{reply_to}\x1f{subject}\x1f{body}")).encode()).hexdigest()
+        session = self.db.session
+        if session.execute(select(Notification.id).where(Notification.dedupe_key == key)).first():
+            return None
+        note = Notification(kind=kind, dedupe_key=key, to_addr=to, reply_to=reply_to,
+                            subject=subject[:200], body=body, status="pending",
+                            next_attempt_at=datetime.utcnow())
+        session.add(note)
+        return note
+
+    def contact(self, name, email, subject, message, phone=None):
+        body = (f"Nombre: {name}\nCorreo: {email}\nTeléfono: {phone or '—'}\n\n{message}\n")
+        return self.enqueue("contact", self.inbox, f"[Contacto web] {subject}", body, reply_to=email)
+
+    def event_quote(self, name, email, fields, message=None, phone=None):
+        lines = [f"Nombre: {name}", f"Correo: {email}", f"Teléfono: {phone or '—'}"]
+        lines += [f"{label}: {value or '—'}" for label, value in fields]
+        body = "\n".join(lines) + (f"\n\n{message}\n" if message else "\n")
+        return self.enqueue("event_quote", self.inbox, f"[Cotización de evento] {name}", body,
+                            reply_to=email)
+
+    def booking_confirmation(self, res):
+        """Confirmación de la reserva, o acuse de recibo si aún está 'pending'."""
+        code = f"VG-{res.check_in.year}-{res.id}"
+        confirmed = res.status == "confirmed"
+        state = "está confirmada" if confirmed else "quedó registrada; te avisaremos al confirmarla"
+        body = (f"Hola {res.guest_name}:\n\n"
+                f"Tu reserva {code} {state}.\n\n"
+                f"Llegada: {res.check_in.isoformat()}\nSalida: {res.check_out.isoformat()}\n"
+                f"Huéspedes: {res.guests}\n\n"
+                "Te esperamos en Hotel Villa Grace.\n")
+        subject = f"Reserva {code} {'confirmada' if confirmed else 'recibida'}"
+        return self.enqueue("booking_confirmation", res.guest_email, subject, body,
+                            dedupe_key=f"reservation:{res.id}:{res.status}")
+
+    def password_reset(self, email, link):
+        body = ("Recibimos un pedido para crear una contraseña nueva para tu cuenta.\n\n"
+                f"Abre este enlace para elegirla:\n{link}\n\n"
+                "Si no fuiste tú, ignora este correo: tu contraseña actual sigue igual.\n")
+        window = int(time.time() // PASSWORD_RESET_WINDOW)
+        return self.enqueue("password_reset", email, "Crea tu contraseña nueva", body,
+                            dedupe_key=f"window:{window}")
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+    def deliver_once(self):
+        """Una pasada: reclama un lote, lo envía en paralelo y guarda el resultado."""
+        t0 = time.perf_counter()
+        token, batch = self._claim()
+        results = []
+        if batch:
+            chunks = [batch[i::self.workers] for i in range(min(self.workers, len(batch)))]
+            for chunk_results in self._executor().map(self._send_chunk, chunks):
+                results.extend(chunk_results)
+            self._finish(token, results)
+        sent = sum(1 for _, error in results if error is None)
+        return {"claimed": len(batch), "sent": sent, "failed": len(results) - sent,
+                "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+    def counts(self):
+        from models import Notification
+
+        rows = self.db.session.execute(
+            select(Notification.status, func.count()).group_by(Notification.status)).all()
+        return dict(rows)
+
+    def close(self):
+        with self._conn_lock:
+            connections, self._connections = self._connections, []
+        for _thread, smtp in connections:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="smtp")
+        return self._pool
+
+    def _due(self, now):
+        from models import Notification
+
+        return or_(and_(Notification.status == "pending", Notification.next_attempt_at <= now),
+                   and_(Notification.status == "sending", Notification.locked_until < now))
+
+    def _claim(self):
+        """(token, [dict]) con las filas tomadas por esta pasada."""
+        from models import Notification
+
+        session = self.db.session
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        ids = session.execute(
+            select(Notification.id).where(self._due(now))
+            .order_by(Notification.next_attempt_at, Notification.id).limit(self.batch_size)
+        ).scalars().all()
+        if ids:
+            # Vuelve a filtrar por _due: otro proceso pudo tomar alguna entre medio
+            session.execute(
+                update(Notification).where(Notification.id.in_(ids), self._due(now))
+                .values(status="sending", claimed_by=token, locked_until=now + timedelta(seconds=self.lease))
+                .execution_options(synchronize_session=False))
+        session.commit()
+        if not ids:
+            return token, []
+        rows = session.execute(
+            select(Notification.id, Notification.to_addr, Notification.reply_to, Notification.subject,
+                   Notification.body, Notification.attempts)
+            .where(Notification.claimed_by == token, Notification.status == "sending")
+        ).all()
+        session.commit()
+        return token, [row._asdict() for row in rows]
+
+    def _finish(self, token, results):
+        from models import Notification
+
+        session = self.db.session
+        now = datetime.utcnow()
+        mine = and_(Notification.claimed_by == token, Notification.status == "sending")
+        sent = [msg["id"] for msg, error in results if error is None]
+        if sent:
+            session.execute(update(Notification).where(Notification.id.in_(sent), mine)
+                            .values(status="sent", sent_at=now, claimed_by=None, locked_until=None,
+                                    last_error=None).execution_options(synchronize_session=False))
+        for msg, error in results:
+            if error is None:
+                continue
+            attempts = msg["attempts"] + 1
+            final = error.permanent or attempts >= self.max_attempts
+            delay = min(self.retry_base * 2 ** (attempts - 1), 6 * 3600) * random.uniform(1, 1.2)
+            session.execute(update(Notification).where(Notification.id == msg["id"], mine).values(
+                status="failed" if final else "pending", attempts=attempts, claimed_by=None, locked_until=None,
+                next_attempt_at=now + timedelta(seconds=delay), last_error=str(error)[:300],
+            ).execution_options(synchronize_session=False))
+            log.warning("Correo %s a %r: %s (intento %d%s)", msg["id"], msg["to_addr"], error, attempts,
+                        ", sin más reintentos" if final else "")
+        session.commit()
+
+    # -------------------------------------------------------------------------
+    # SMTP (una conexión por hilo, reutilizada)
+    # -------------------------------------------------------------------------
+    def _send_chunk(self, messages):
+        results = []
+        for i, msg in enumerate(messages):
+            try:
+                email = self._message(msg)
+            except (ValueError, TypeError) as e:
+                # Encabezado imposible de armar (filas viejas, datos corruptos): no se reintenta
+                results.append((msg, MailError(f"mensaje inválido: {e}", permanent=True)))
+                continue
+            try:
+                self._send(email)
+                results.append((msg, None))
+            except Exception as e:
+                if not isinstance(e, MailError):
+                    # Cualquier otro error no puede dejar el lote en 'sending' hasta el lease
+                    log.exception("Error inesperado enviando el correo %s", msg["id"])
+                    e = MailError(f"{e.__class__.__name__}: {e}")
+                results.append((msg, e))
+                if not e.permanent and getattr(self._local, "smtp", None) is None:
+                    # Servidor inalcanzable: el resto del lote se reintenta más tarde
+                    results.extend((other, e) for other in messages[i + 1:])
+                    break
+        return results
+
+    def _message(self, msg):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = msg["to_addr"]
+        if msg["reply_to"]:
+            email["Reply-To"] = msg["reply_to"]
+        email["Subject"] = msg["subject"]
+        email["Message-ID"] = make_msgid(domain=self.sender.rsplit("@", 1)[-1].rstrip(">"))
+        email["X-Notification-Id"] = str(msg["id"])
+        email.set_content(msg["body"])
+        return email
+
+    def _send(self, email):
+        # Un reintento inmediato si la conexión reutilizada estaba cortada
+        for attempt in (1, 2):
+            smtp = self._connection()
+            try:
+                smtp.send_message(email)
+                self._local.used_at = time.monotonic()
+                return
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reason = next(iter(e.recipients.values()))
+                raise MailError(f"destinatario rechazado: {code} {_text(reason)}", permanent=True)
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    raise MailError(f"{e.smtp_code} {_text(e.smtp_error)}", permanent=True)
+                if e.smtp_code == 421:  # el servidor cierra la sesión
+                    self._drop_connection()
+                raise MailError(f"{e.smtp_code} {_text(e.smtp_error)}")
+            except OSError as e:  # SMTPServerDisconnected y demás SMTPException son OSError
+                self._drop_connection()
+                if attempt == 2:
+                    raise MailError(f"conexión: {e.__class__.__name__} {e}")
+
+    def _connection(self):
+        smtp = getattr(self._local, "smtp", None)
+        if smtp is not None and time.monotonic() - self._local.used_at > self.idle_timeout:
+            self._drop_connection()
+            smtp = None
+        if smtp is None:
+            try:
+                smtp = self._open()
+            except (smtplib.SMTPException, OSError) as e:
+                raise MailError(f"no se pudo conectar a {self.host}:{self.port}: {e.__class__.__name__} {e}")
+            self._local.smtp = smtp
+            self._local.used_at = time.monotonic()
+            with self._conn_lock:
+                self._connections.append((threading.current_thread(), smtp))
+        return smtp
+
+    def _open(self):
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _drop_connection(self):
+        smtp = getattr(self._local, "smtp", None)
+        self._local.smtp = None
+        if smtp is None:
+            return
+        with self._conn_lock:
+            self._connections = [(t, s) for t, s in self._connections if s is not smtp]
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+
+def _text(value):
+    return value.decode(errors="replace") if isinstance(value, bytes) else str(value)
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app notifications worker | deliver | test
+# -----------------------------------------------------------------------------
+@notifications_cli.command("worker")
+def worker_command():
+    """Entrega el outbox de forma continua (Ctrl+C para salir)."""
+    ext = current_app.extensions["notifications"]
+    if not ext.host:
+        raise click.ClickException("Defina MAIL_HOST (y MAIL_PORT/MAIL_SECURITY) para enviar correo.")
+    click.echo(f"Worker de correo: {ext.workers} conexiones a {ext.host}:{ext.port} (Ctrl+C para salir)")
+    try:
+        while True:
+            try:
+                run = ext.deliver_once()
+            except Exception:
+                current_app.logger.exception("Fallo en la pasada de envío de correo")
+                ext.db.session.rollback()
+                run = {"claimed": 0}
+            if run["claimed"]:
+                click.echo(f"{run['sent']} enviados, {run['failed']} con error en {run['ms']} ms")
+            if run["claimed"] < ext.batch_size:
+                time.sleep(ext.interval)  # con un lote lleno, seguir sin esperar
+    finally:
+        ext.close()
+
+
+@notifications_cli.command("deliver")
+def deliver_command():
+    """Una sola pasada y el estado del outbox."""
+    ext = current_app.extensions["notifications"]
+    if not ext.host:
+        raise click.ClickException("Defina MAIL_HOST (y MAIL_PORT/MAIL_SECURITY) para enviar correo.")
+    try:
+        run = ext.deliver_once()
+    finally:
+        ext.close()
+    click.echo(f"{run['sent']} enviados, {run['failed']} con error en {run['ms']} ms; outbox: {ext.counts()}")
+
+
+@notifications_cli.command("test")
+@click.argument("email")
+def test_command(email):
+    """Encola un mensaje de prueba para EMAIL."""
+    ext = current_app.extensions["notifications"]
+    if not valid_email(email):
+        raise click.ClickException("Correo inválido.")
+    ext.enqueue("contact", email, "Prueba de correo", "Mensaje de prueba de Hotel Villa Grace.\n",
+                dedupe_key=uuid.uuid4().hex)
+    ext.db.session.commit()
+    click.echo(f"Encolado para {email}; outbox: {ext.counts()}")
@@ -0,0 +1,171 @@
+# services/pages.py
+# Registro de páginas guiado por templates/: cada <nombre>.html se publica en
+# /<nombre>.html (y index.html también en /). Las páginas que no usan contexto
+# de request se renderizan una sola vez y se sirven desde memoria con ETag y
+# Content-Length precalculados. Con services/i18n.py la caché es por
+# (página, locale).
+
+import hashlib
+import os
+import re
+import threading
+
+from flask import Response, render_template, request
+
+# Templates que se cachean pero no se publican como página propia
+EXCLUDED_TEMPLATES = {"404.html"}
+
+# Si el template usa alguno de estos nombres depende del request/sesión y se
+# renderiza en cada hit (p.ej. login.html muestra mensajes flash). Los que usan
+# {% cache %} (portal-*, admin-*) ya cachean sus fragmentos por rol de sesión, y
+# la página entera no se guarda aparte.
+_DYNAMIC_MARKERS = re.compile(
+    r"get_flashed_messages|\bsession\b|\brequest\b|current_user|\bg\.|{%-?\s*cache\b"
+)
+
+
+def endpoint_for(template):
+    """'admin-audit.html' -> 'admin_audit_html' (los nombres históricos de app.py)."""
+    return template[:-len(".html")].replace("-", "_") + "_html"
+
+
+class CachedPage:
+    __slots__ = ("body", "etag", "mtime")
+
+    def __init__(self, body, etag, mtime):
+        self.body = body
+        self.etag = etag
+        self.mtime = mtime
+
+
+class PageRegistry:
+    """
+    Publica automáticamente las páginas de templates/.
+
+    PAGE_CACHE          activa la caché de páginas estáticas (defecto True)
+    PAGE_CACHE_RELOAD   revisa el mtime del template en cada hit (defecto: app.debug)
+    PAGE_CACHE_WARM     renderiza todas las páginas estáticas al arrancar
+    """
+
+    def __init__(self, app=None):
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.templates = set()
+        self._dynamic = {}  # template -> bool; se decide al primer hit, no al arrancar
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.template_dir = app.template_folder
+        self.enabled = app.config.get("PAGE_CACHE", True)
+        self.auto_reload = app.config.get("PAGE_CACHE_RELOAD", app.debug)
+        app.extensions["pages"] = self
+
+        for template in sorted(os.listdir(self.template_dir)):
+            if not template.endswith(".html"):
+                continue
+            self.templates.add(template)
+            if template in EXCLUDED_TEMPLATES:
+                continue
+            # Las rutas explícitas (p.ej. register_html con POST) tienen prioridad
+            endpoint = endpoint_for(template)
+            if endpoint not in app.view_functions:
+                app.add_url_rule(f"/{template}", endpoint, self._view(template), methods=["GET"])
+
+        if "index" not in app.view_functions:
+            app.add_url_rule("/", "index", self._view("index.html"), methods=["GET"])
+
+        if app.config.get("PAGE_CACHE_WARM"):
+            self.warm()
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    @property
+    def static_pages(self):
+        return {t for t in self.templates if not self._is_dynamic(t)}
+
+    @property
+    def dynamic_pages(self):
+        return {t for t in self.templates if self._is_dynamic(t)}
+
+    def response(self, template, status=200):
+        """Respuesta para el template: desde caché si es estático, si no renderizado."""
+        if not self.enabled or template not in self.templates or self._is_dynamic(template):
+            # Las dinámicas las traduce el after_request de services/i18n.py
+            return Response(render_template(template), status=status, mimetype="text/html")
+
+        i18n = self.app.extensions.get("i18n")
+        locale = i18n.locale() if i18n else None
+        page = self._get(template, locale)
+        resp = Response(page.body, status=status, mimetype="text/html")
+        resp.set_etag(page.etag)
+        resp.headers["Content-Length"] = str(len(page.body))
+        resp.headers["Cache-Control"] = "no-cache"  # revalidar: 304 si no cambió
+        if i18n:
+            resp.headers["Content-Language"] = locale
+            resp.vary.update(("Cookie", "Accept-Language"))
+        return resp.make_conditional(request) if status == 200 else resp
+
+    def warm(self):
+        """Renderiza todas las páginas estáticas en cada locale (p.ej. al arrancar un worker)."""
+        i18n = self.app.extensions.get("i18n")
+        locales = i18n.locales if i18n else (None,)
+        with self.app.test_request_context():
+            for template in sorted(self.static_pages):
+                for locale in locales:
+                    self._get(template, locale)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        return {
+            "static": len(self.static_pages),
+            "dynamic": len(self.dynamic_pages),
+            "cached": len(self._cache),
+            "bytes": sum(len(p.body) for p in self._cache.values()),
+        }
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _view(self, template):
+        def view():
+            return self.response(template)
+        view.__name__ = endpoint_for(template)
+        return view
+
+    def _is_dynamic(self, template):
+        dynamic = self._dynamic.get(template)
+        if dynamic is None:
+            with open(os.path.join(self.template_dir, template), encoding="utf-8") as fh:
+                dynamic = self._dynamic[template] = bool(_DYNAMIC_MARKERS.search(fh.read()))
+        return dynamic
+
+    def _mtime(self, template):
+        return os.stat(os.path.join(self.template_dir, template)).st_mtime_ns
+
+    def _get(self, template, locale=None):
+        i18n = self.app.extensions.get("i18n")
+        if not (i18n and i18n.needs_translation(locale)):
+            locale = None  # sin diccionario: comparte el render original
+        key = (template, locale)
+        page = self._cache.get(key)
+        if page is not None and not self.auto_reload:
+            return page
+        mtime = self._mtime(template)
+        if page is not None and page.mtime == mtime:
+            return page
+        with self._lock:
+            page = self._cache.get(key)
+            if page is None or page.mtime != mtime:
+                markup = render_template(template)
+                if locale:
+                    markup = i18n.translate_html(markup, locale)
+                body = markup.encode("utf-8")
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                page = self._cache[key] = CachedPage(body, etag, mtime)
+        return page
@@ -0,0 +1,227 @@
+# services/password_hasher.py
+# Servicio de hashing de contraseñas: ejecuta bcrypt/PBKDF2/scrypt en un pool
+# acotado fuera del hilo del request, con control de admisión por IP/cuenta
+# y rehash transparente al algoritmo objetivo tras un login correcto.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# bcrypt (y ProcessPoolExecutor, que arrastra multiprocessing) se importan sólo
+# al tocar un hash $2b$ / con PASSWORD_HASH_EXECUTOR=process: no en el arranque
+
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+class HashingBusy(Exception):
+    """El pool de hashing está saturado (o la clave superó su cupo): responder 429."""
+
+    def __init__(self, reason="saturated", retry_after=2):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# -----------------------------------------------------------------------------
+# Funciones de trabajo (nivel módulo para que sean picklables en ProcessPool)
+# -----------------------------------------------------------------------------
+def verify_password(stored_hash, candidate):
+    """
+    Soporta:
+      - PBKDF2/Scrypt de Werkzeug (prefijo 'pbkdf2:' o 'scrypt:')
+      - bcrypt ($2a$ / $2b$ / $2y$)
+    """
+    if not stored_hash or not candidate:
+        return False
+
+    s = stored_hash.strip()
+    # bcrypt
+    if s.startswith(_BCRYPT_PREFIXES):
+        import bcrypt
+        try:
+            return bcrypt.checkpw(candidate.encode("utf-8"), s.encode("utf-8"))
+        except Exception:
+            return False
+
+    # Por defecto intenta verificación nativa de Werkzeug (pbkdf2:, scrypt:, etc.)
+    try:
+        return check_password_hash(s, candidate)
+    except Exception:
+        return False
+
+
+def hash_password(password, method):
+    """Genera el hash con el método objetivo ('scrypt', 'pbkdf2:sha256:600000', 'bcrypt:12'...)."""
+    if method.startswith("bcrypt"):
+        import bcrypt
+        _, _, rounds = method.partition(":")
+        salt = bcrypt.gensalt(rounds=int(rounds or 12))
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("ascii")
+    return generate_password_hash(password, method=method)
+
+
+def _hash_prefix(stored_hash):
+    """Parte del hash que identifica algoritmo y coste (sin sal ni digest)."""
+    s = stored_hash.strip()
+    if s.startswith(_BCRYPT_PREFIXES):
+        # '$2b$12$': $2a$/$2y$ se normalizan a $2b$ (mismo algoritmo, mismo coste),
+        # así que sólo un coste distinto del objetivo provoca el rehash
+        return "$2b$" + s[4:7]
+    return s.split("$", 1)[0]
+
+
+class PasswordHasher:
+    """
+    Pool acotado para hashing de contraseñas.
+
+    Configuración (app.config):
+      PASSWORD_HASH_EXECUTOR   'thread' (defecto) o 'process'
+      PASSWORD_HASH_WORKERS    tamaño del pool (defecto: núcleos)
+      PASSWORD_HASH_QUEUE      trabajos en espera admitidos además de los workers
+      PASSWORD_HASH_PER_KEY    trabajos simultáneos por IP o por cuenta
+      PASSWORD_HASH_TIMEOUT    segundos máximos esperando un resultado
+      PASSWORD_HASH_METHOD     algoritmo/coste objetivo para hashes nuevos
+      PASSWORD_REHASH_ON_LOGIN migra hashes legados tras un login correcto
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._slots = None
+        self._target_prefix = None
+        self._stats = {"submitted": 0, "rejected": 0, "timeouts": 0, "rehashed": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        self.kind = cfg.get("PASSWORD_HASH_EXECUTOR", "thread")
+        self.workers = int(cfg.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 2)
+        self.queue_size = int(cfg.get("PASSWORD_HASH_QUEUE", self.workers * 4))
+        self.per_key = int(cfg.get("PASSWORD_HASH_PER_KEY", 2))
+        self.timeout = float(cfg.get("PASSWORD_HASH_TIMEOUT", 5))
+        self.method = cfg.get("PASSWORD_HASH_METHOD", "scrypt")
+        self.rehash_on_login = bool(cfg.get("PASSWORD_REHASH_ON_LOGIN", True))
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        app.extensions["password_hasher"] = self
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def verify(self, stored_hash, candidate, keys=()):
+        """Verifica en el pool. keys: identificadores de admisión (IP, cuenta)."""
+        if not stored_hash or not candidate:
+            return False
+        return self._run(verify_password, (stored_hash, candidate), keys)
+
+    def hash(self, password, keys=()):
+        return self._run(hash_password, (password, self.method), keys)
+
+    def needs_rehash(self, stored_hash):
+        """
+        True si el hash no usa el algoritmo/coste objetivo (p.ej. bcrypt legado).
+        Puede lanzar HashingBusy la primera vez (ver _target).
+        """
+        if not stored_hash:
+            return False
+        return _hash_prefix(stored_hash) != self._target()
+
+    def maybe_rehash(self, stored_hash, password, keys=()):
+        """
+        Devuelve el hash nuevo si corresponde migrarlo, o None.
+        Nunca lanza HashingBusy: si el pool está ocupado se reintenta en otro login.
+        """
+        if not self.rehash_on_login:
+            return None
+        try:
+            if not self.needs_rehash(stored_hash):
+                return None
+            new_hash = self.hash(password, keys)
+        except HashingBusy:
+            return None
+        self._stats["rehashed"] += 1
+        return new_hash
+
+    def stats(self):
+        out = dict(self._stats)
+        out.update(executor=self.kind, workers=self.workers, queue=self.queue_size,
+                   inflight=sum(self._inflight.values()))
+        return out
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _run(self, fn, args, keys):
+        keys = tuple(k for k in keys if k)
+        self._admit(keys)
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(keys)
+            raise
+        # El cupo se libera cuando termina el trabajo, no cuando se deja de esperar
+        fut.add_done_callback(lambda _f: self._release(keys))
+        self._stats["submitted"] += 1
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._stats["timeouts"] += 1
+            raise HashingBusy("timeout")
+
+    def _target(self):
+        """
+        Prefijo del método objetivo. Se calcula una vez por proceso con un hash
+        de referencia hecho en el pool (scrypt cuesta decenas de ms: ni en el
+        arranque ni en el hilo del request).
+        """
+        if self._target_prefix is None:
+            self._target_prefix = _hash_prefix(self._run(hash_password, ("x", self.method), ()))
+        return self._target_prefix
+
+    def _admit(self, keys):
+        if not self._slots.acquire(blocking=False):
+            self._stats["rejected"] += 1
+            raise HashingBusy("saturated")
+        with self._lock:
+            if any(self._inflight.get(k, 0) >= self.per_key for k in keys):
+                self._slots.release()
+                self._stats["rejected"] += 1
+                raise HashingBusy("per-key")
+            for k in keys:
+                self._inflight[k] = self._inflight.get(k, 0) + 1
+
+    def _release(self, keys):
+        with self._lock:
+            for k in keys:
+                n = self._inflight.get(k, 0) - 1
+                if n > 0:
+                    self._inflight[k] = n
+                else:
+                    self._inflight.pop(k, None)
+        self._slots.release()
+
+    def _get_executor(self):
+        # Se crea perezosamente y se recrea tras un fork (workers de Gunicorn)
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    if self.kind == "process":
+                        from concurrent.futures import ProcessPoolExecutor
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="pwhash")
+                    self._executor_pid = pid
+        return self._executor
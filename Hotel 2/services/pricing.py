@@ -0,0 +1,411 @@
+# services/pricing.py
+# Motor de tarifas: compila planes, reglas (temporada, día de semana) e
+# impuestos en una grilla de precios por (plan, tipo de habitación) × fecha,
+# guardada como sumas acumuladas en centavos (array('q')). Cotizar una
+# estadía es restar dos posiciones: O(1) sin importar las noches ni las reglas.
+#
+# Las reglas de estadía mínima (los) y los impuestos dependen de la estadía,
+# no de la fecha, y se aplican al cotizar sobre el subtotal.
+#
+# La grilla se recompila al confirmar cambios de tarifas en este proceso, al
+# cambiar el día y cuando otro proceso modifica las tablas (se comprueba cada
+# PRICING_SYNC_INTERVAL segundos con COUNT/MAX(updated_at)). Al cambiar el día
+# la grilla de ayer sigue cotizando (los offsets salen de su fecha de inicio)
+# mientras un hilo de fondo compila la nueva. Las lecturas usan una sesión
+# propia: cotizar dentro de un request no confirma ni expira su transacción.
+
+import json
+import logging
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+log = logging.getLogger("hotel.pricing")
+
+pricing_cli = AppGroup("pricing", help="Tarifas e impuestos.")
+
+
+def _cents(value):
+    return int((Decimal(value) * 100).quantize(Decimal("1"), ROUND_HALF_UP))
+
+
+def _money(cents):
+    return f"{Decimal(cents) / 100:.2f}"
+
+
+def _adjust(cents, pct, amount):
+    """Aplica +pct% y +monto (en unidades) a un precio en centavos."""
+    return int((Decimal(cents) * (1 + Decimal(pct or 0) / 100)).quantize(Decimal("1"), ROUND_HALF_UP)) \
+        + _cents(amount or 0)
+
+
+class PriceGrid:
+    """Precios noche a noche de un (plan, tipo) desde 'start', como suma acumulada."""
+
+    __slots__ = ("start", "prefix", "los")
+
+    def __init__(self, start, nightly, los):
+        self.start = start
+        self.prefix = array("q", [0])
+        total = 0
+        for cents in nightly:
+            total += cents
+            self.prefix.append(total)
+        self.los = los  # [(min_nights, pct, amount)] de mayor a menor min_nights
+
+    @property
+    def days(self):
+        return len(self.prefix) - 1
+
+    def subtotal(self, offset, nights):
+        return self.prefix[offset + nights] - self.prefix[offset]
+
+
+class PricingEngine:
+    """
+    PRICING_HORIZON_DAYS     días cotizables desde hoy (defecto 730)
+    PRICING_SYNC_INTERVAL    segundos entre chequeos de cambios de otros procesos
+    PRICING_CURRENCY         moneda informada en las cotizaciones (defecto USD)
+    PRICING_DEFAULT_PLAN     plan con el que se valoran las reservas sin plan (defecto BAR)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.app = None
+        # Estado compilado, reemplazado de una vez: (grids, plans, room_types, taxes)
+        #   grids       (plan_code, room_type_id) -> PriceGrid
+        #   plans       plan_code -> {"code", "name", "policy"}
+        #   room_types  room_type_id -> {"id", "code", "name", "max_occupancy"}
+        #   taxes       ((code, name, kind, pct Decimal | centavos), ...)
+        self._state = ({}, {}, {}, ())
+        self._lock = threading.RLock()
+        self._compiling = threading.Lock()  # compilación de fondo en curso (cambio de día)
+        self._built_for = None
+        self._version = None
+        self._checked_at = 0.0
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.app = app
+        self.horizon = int(app.config.get("PRICING_HORIZON_DAYS", 730))
+        self.sync_interval = float(app.config.get("PRICING_SYNC_INTERVAL", 30))
+        self.currency = app.config.get("PRICING_CURRENCY", "USD")
+        self.default_plan = app.config.get("PRICING_DEFAULT_PLAN", "BAR")
+        app.extensions["pricing"] = self
+        app.cli.add_command(pricing_cli)
+        _listen_session_events(self)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def quote(self, plan_code, room_type_id, check_in, check_out, guests=1):
+        """Cotización de una estadía, o None si el plan/tipo no existe o cae fuera de la grilla."""
+        self._ensure_fresh()
+        state = self._state
+        grid = state[0].get((plan_code, room_type_id))
+        if grid is None:
+            return None
+        return self._quote(state, grid, plan_code, room_type_id, check_in, check_out, guests)
+
+    def quote_all(self, check_in, check_out, guests=1, plan_code=None, room_type_ids=None):
+        """Cotiza todos los tipos (y planes) para la estadía en una sola pasada."""
+        self._ensure_fresh()
+        state = self._state
+        grids, _plans, room_types, _taxes = state
+        out = []
+        for (code, type_id), grid in grids.items():
+            if plan_code and code != plan_code:
+                continue
+            if room_type_ids is not None and type_id not in room_type_ids:
+                continue
+            if guests > room_types[type_id]["max_occupancy"]:
+                continue
+            q = self._quote(state, grid, code, type_id, check_in, check_out, guests)
+            if q is not None:
+                out.append(q)
+        out.sort(key=lambda q: (q["room_type"]["code"], q["total_cents"]))
+        return out
+
+    def nightly(self, plan_code, room_type_id, day):
+        """Precio de una noche en centavos (antes de impuestos), o None fuera de la grilla."""
+        grid = self._state[0].get((plan_code, room_type_id))
+        if grid is None:
+            return None
+        offset = (day - grid.start).days
+        if offset < 0 or offset >= grid.days:
+            return None
+        return grid.subtotal(offset, 1)
+
+    def products(self):
+        """[(plan_code, room_type_id, room_type_code)] vendibles con la grilla actual."""
+        self._ensure_fresh()
+        grids, _plans, room_types, _taxes = self._state
+        return [(code, type_id, room_types[type_id]["code"]) for code, type_id in grids]
+
+    def refresh(self):
+        """Comprueba ya mismo si otro proceso cambió las tarifas (sin esperar el intervalo)."""
+        self._checked_at = 0.0
+        self._ensure_fresh()
+
+    def invalidate(self):
+        with self._lock:
+            self._built_for = None
+
+    def stats(self):
+        grids = self._state[0]
+        return {
+            "grids": len(grids),
+            "days": next(iter(grids.values())).days if grids else 0,
+            "bytes": sum(g.prefix.itemsize * len(g.prefix) for g in grids.values()),
+            "built_for": self._built_for.isoformat() if self._built_for else None,
+        }
+
+    # -------------------------------------------------------------------------
+    # Cotización
+    # -------------------------------------------------------------------------
+    def _quote(self, state, grid, plan_code, room_type_id, check_in, check_out, guests):
+        _grids, plans, room_types, tax_rules = state
+        nights = (check_out - check_in).days
+        offset = (check_in - grid.start).days
+        if nights <= 0 or offset < 0 or offset + nights > grid.days:
+            return None
+        room = grid.subtotal(offset, nights)
+        discount = 0
+        for min_nights, pct, amount_cents in grid.los:
+            if nights >= min_nights:
+                discount = room - _adjust(room, pct, 0) - amount_cents * nights
+                break
+        room -= discount
+
+        taxes, tax_total = [], 0
+        for code, name, kind, value in tax_rules:
+            if kind == "percent":
+                cents = int((room * value / 100).quantize(Decimal("1"), ROUND_HALF_UP))
+            elif kind == "per_night":
+                cents = value * nights
+            elif kind == "per_person_night":
+                cents = value * nights * guests
+            else:
+                cents = value
+            taxes.append({"code": code, "name": name, "amount": _money(cents)})
+            tax_total += cents
+
+        total = room + tax_total
+        return {
+            "plan": plans[plan_code],
+            "room_type": room_types[room_type_id],
+            "nights": nights,
+            "currency": self.currency,
+            "room_subtotal": _money(room),
+            "los_discount": _money(discount),
+            "taxes": taxes,
+            "total": _money(total),
+            "total_cents": total,
+            "avg_nightly": _money(room // nights),
+        }
+
+    # -------------------------------------------------------------------------
+    # Compilación
+    # -------------------------------------------------------------------------
+    def _ensure_fresh(self):
+        today = date.today()
+        built_for = self._built_for
+        if built_for is not None and built_for < today:
+            self._compile_in_background(today)
+        elif built_for != today:
+            self._compile(today)
+        elif time.monotonic() - self._checked_at > self.sync_interval:
+            self._checked_at = time.monotonic()
+            with Session(self.db.engine) as session:
+                version = self._read_version(session)
+            if version != self._version:
+                self._compile(today)
+
+    def _compile_in_background(self, today):
+        """Cambio de día: un solo hilo compila; los requests siguen con la grilla de ayer."""
+        if not self._compiling.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                with self.app.app_context():
+                    self._compile(today)
+            except Exception:
+                log.exception("Error al compilar la grilla de tarifas del %s", today)
+            finally:
+                self._compiling.release()
+
+        threading.Thread(target=run, name="pricing-compile", daemon=True).start()
+
+    @staticmethod
+    def _read_version(session):
+        from models import RatePlan, RateRule, RoomType, TaxRule
+
+        return tuple(
+            tuple(session.execute(select(func.count(), func.max(m.updated_at)).select_from(m)).one())
+            for m in (RoomType, RatePlan, RateRule, TaxRule)
+        )
+
+    def _compile(self, today):
+        from models import RatePlan, RateRule, RoomType, TaxRule
+
+        with self._lock, Session(self.db.engine) as session:
+            version = self._read_version(session)
+            if self._built_for == today and self._version == version:
+                return  # otro hilo ya compiló mientras esperábamos el lock
+            types = session.execute(select(RoomType)).scalars().all()
+            plans = session.execute(select(RatePlan).where(RatePlan.active.is_(True))).scalars().all()
+            rules = session.execute(
+                select(RateRule).where(RateRule.active.is_(True))
+                .order_by(RateRule.priority, RateRule.id)
+            ).scalars().all()
+            taxes = session.execute(
+                select(TaxRule).where(TaxRule.active.is_(True), TaxRule.applies_to.in_(("room", "both")))
+                .order_by(TaxRule.id)
+            ).scalars().all()
+
+            days = [today + timedelta(days=i) for i in range(self.horizon)]
+            grids = {}
+            for plan in plans:
+                for rt in types:
+                    applicable = [r for r in rules
+                                  if r.rate_plan_id in (None, plan.id) and r.room_type_id in (None, rt.id)]
+                    base = _adjust(_cents(rt.base_rate), plan.adjust_pct, plan.adjust_amount)
+                    nightly = [self._nightly(base, day, applicable) for day in days]
+                    los = sorted(
+                        ((r.min_nights or 1, r.adjust_pct, _cents(r.adjust_amount or 0))
+                         for r in applicable if r.kind == "los"),
+                        key=lambda t: -t[0],
+                    )
+                    grids[(plan.code, rt.id)] = PriceGrid(today, nightly, los)
+
+            self._state = (
+                grids,
+                {p.code: {"code": p.code, "name": p.name, "policy": p.policy} for p in plans},
+                {t.id: {"id": t.id, "code": t.code, "name": t.name, "max_occupancy": t.max_occupancy}
+                 for t in types},
+                tuple((t.code, t.name, t.kind, Decimal(t.rate) if t.kind == "percent" else _cents(t.rate))
+                      for t in taxes),
+            )
+            self._version = version
+            self._built_for = today
+            self._checked_at = time.monotonic()
+
+    @staticmethod
+    def _nightly(base, day, rules):
+        cents = base
+        for r in rules:
+            if r.kind == "season":
+                if r.start_date and r.end_date and r.start_date <= day <= r.end_date:
+                    cents = _adjust(cents, r.adjust_pct, r.adjust_amount)
+            elif r.kind == "weekday":
+                if r.weekdays and r.weekdays >> day.weekday() & 1:
+                    cents = _adjust(cents, r.adjust_pct, r.adjust_amount)
+        return max(cents, 0)
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: cualquier cambio de tarifas confirmado recompila
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _listen_session_events(engine):
+    from models import RatePlan, RateRule, RoomType, TaxRule
+
+    if id(engine) in _listening:
+        return
+    _listening.add(id(engine))
+    pricing_models = (RoomType, RatePlan, RateRule, TaxRule)
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, _ctx):
+        if any(isinstance(o, pricing_models) for o in (*session.new, *session.dirty, *session.deleted)):
+            session.info["pricing_changed"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session):
+        if session.info.pop("pricing_changed", False):
+            engine.invalidate()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("pricing_changed", None)
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app pricing load tarifas.json | pricing quote
+# -----------------------------------------------------------------------------
+def _assign(obj, values):
+    for k, v in values.items():
+        setattr(obj, k, date.fromisoformat(v) if k.endswith("_date") and v else v)
+
+
+@pricing_cli.command("load")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+def load_command(path):
+    """Carga tipos, planes, reglas e impuestos desde JSON (upsert por código)."""
+    from models import RatePlan, RateRule, Room, RoomType, TaxRule
+
+    db = current_app.extensions["pricing"].db
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+
+    def upsert(model, key, values):
+        obj = db.session.execute(select(model).filter_by(**{key: values[key]})).scalar_one_or_none()
+        if obj is None:
+            obj = model()
+            db.session.add(obj)
+        _assign(obj, values)
+        return obj
+
+    types = {t["code"]: upsert(RoomType, "code", t) for t in data.get("room_types", [])}
+    plans = {p["code"]: upsert(RatePlan, "code", p) for p in data.get("rate_plans", [])}
+    for t in data.get("taxes", []):
+        upsert(TaxRule, "code", t)
+    db.session.flush()
+
+    # Las reglas no tienen código: se reemplazan completas
+    if "rules" in data:
+        db.session.execute(RateRule.__table__.delete())
+        for r in data["rules"]:
+            r = dict(r)
+            plan, rtype = r.pop("plan", None), r.pop("room_type", None)
+            rule = RateRule(rate_plan_id=plans[plan].id if plan else None,
+                            room_type_id=types[rtype].id if rtype else None)
+            _assign(rule, r)
+            db.session.add(rule)
+    for room_code, type_code in data.get("rooms", {}).items():
+        room = db.session.execute(select(Room).filter_by(code=room_code)).scalar_one_or_none()
+        if room is not None:
+            room.room_type_id = types[type_code].id
+    db.session.commit()
+    click.echo(f"{len(types)} tipos, {len(plans)} planes, {len(data.get('rules', []))} reglas, "
+               f"{len(data.get('taxes', []))} impuestos")
+
+
+@pricing_cli.command("quote")
+@click.argument("check_in")
+@click.argument("check_out")
+@click.option("--guests", type=int, default=2, show_default=True)
+@click.option("--plan", default=None)
+def quote_command(check_in, check_out, guests, plan):
+    """Cotiza todos los tipos de habitación para una estadía."""
+    engine = current_app.extensions["pricing"]
+    t0 = time.perf_counter()
+    quotes = engine.quote_all(date.fromisoformat(check_in), date.fromisoformat(check_out), guests, plan)
+    elapsed = (time.perf_counter() - t0) * 1e6
+    for q in quotes:
+        click.echo(f"{q['room_type']['code']:<12} {q['plan']['code']:<10} {q['total']:>10} {q['currency']} "
+                   f"({q['nights']} noches, promedio {q['avg_nightly']})")
+    click.echo(f"{len(quotes)} cotizaciones en {elapsed:.0f} µs (incluye compilar si hacía falta)")
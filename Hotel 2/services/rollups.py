@@ -0,0 +1,433 @@
+# services/rollups.py
+# Agregados diarios por tipo de habitación (daily_rollups) para los tableros:
+# habitaciones totales y fuera de servicio, noches vendidas, ingreso de
+# alojamiento, llegadas y salidas. Ocupación, ADR y RevPAR se derivan al leer,
+# así 12 meses de tablero son una lectura por rango de la clave primaria.
+#
+# - refresh: recalcula sólo los días tocados por reservas/bloqueos con
+#   updated_at >= la marca de agua, más los rangos de rollup_dirty (fechas
+#   anteriores de reservas movidas y borrados, que la marca no ve).
+# - backfill: recalcula un rango histórico por bloques en un pool de procesos;
+#   los workers sólo leen y calculan, el proceso principal escribe.
+#
+#   flask --app app rollups backfill --from 2024-01-01 --to 2027-01-01 --workers 4
+#   flask --app app rollups refresh        (cron; las lecturas también lo hacen cada
+#                                           ROLLUP_REFRESH_INTERVAL segundos)
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+log = logging.getLogger("hotel.rollups")
+
+rollups_cli = AppGroup("rollups", help="Agregados diarios para los tableros.")
+
+# Estadías más largas que esto no se buscan hacia atrás al recalcular un día
+MAX_STAY_DAYS = 366
+# Margen de la marca de agua: una transacción que tomó su updated_at antes de
+# la última lectura pero confirmó después no se pierde (se relee un rato)
+WATERMARK_LAG = timedelta(minutes=2)
+# Columnas de reservas/bloqueos que cambian los agregados
+_RESERVATION_FIELDS = ("room_id", "check_in", "check_out", "status", "room_total")
+_BLOCK_FIELDS = ("room_id", "start_date", "end_date")
+
+
+def _cents(value):
+    return int((Decimal(value) * 100).to_integral_value()) if value is not None else 0
+
+
+# -----------------------------------------------------------------------------
+# Cálculo (sólo lectura: corre igual en el proceso principal o en un worker)
+# -----------------------------------------------------------------------------
+def compute_range(session, start, end):
+    """
+    Filas de daily_rollups para [start, end) como tuplas picklables:
+    (día ordinal, room_type_id, total, fuera de servicio, vendidas, ingreso en centavos,
+     llegadas, salidas). Incluye un registro por tipo y día aunque no haya ventas.
+    """
+    from models import SOLD_STATUSES, Reservation, Room, RoomBlock
+
+    type_of = {r.id: r.room_type_id or 0
+               for r in session.execute(select(Room.id, Room.room_type_id)).all()}
+    inventory = defaultdict(int)
+    for type_id in type_of.values():
+        inventory[type_id] += 1
+
+    lo, hi = start.toordinal(), end.toordinal()
+    acc = {(d, t): [n, 0, 0, 0, 0, 0] for d in range(lo, hi) for t, n in inventory.items()}
+
+    reservations = session.execute(
+        select(Reservation.room_id, Reservation.check_in, Reservation.check_out, Reservation.room_total)
+        .where(Reservation.status.in_(SOLD_STATUSES),
+               Reservation.check_in < end,
+               Reservation.check_in >= start - timedelta(days=MAX_STAY_DAYS),
+               Reservation.check_out >= start)
+    ).all()
+    for r in reservations:
+        t = type_of.get(r.room_id)
+        if t is None:
+            continue
+        first, last = r.check_in.toordinal(), r.check_out.toordinal()
+        nights = last - first
+        if nights <= 0:
+            continue
+        # El ingreso se reparte por noche; el resto de la división va a la primera
+        total = _cents(r.room_total)
+        nightly, rest = divmod(total, nights)
+        for d in range(max(first, lo), min(last, hi)):
+            row = acc[(d, t)]
+            row[2] += 1
+            row[3] += nightly + (rest if d == first else 0)
+        if lo <= first < hi:
+            acc[(first, t)][4] += 1
+        if lo <= last < hi:
+            acc[(last, t)][5] += 1
+
+    blocks = session.execute(
+        select(RoomBlock.room_id, RoomBlock.start_date, RoomBlock.end_date)
+        .where(RoomBlock.start_date < end, RoomBlock.end_date > start)
+    ).all()
+    for b in blocks:
+        t = type_of.get(b.room_id)
+        if t is None:
+            continue
+        for d in range(max(b.start_date.toordinal(), lo), min(b.end_date.toordinal(), hi)):
+            acc[(d, t)][1] += 1
+
+    return [(d, t, *values) for (d, t), values in sorted(acc.items())]
+
+
+def _chunks(start, end, days):
+    while start < end:
+        stop = min(start + timedelta(days=days), end)
+        yield start, stop
+        start = stop
+
+
+# Pool de procesos del backfill: cada worker crea su propia app y conexión
+_worker_app = None
+
+
+def _init_worker():
+    global _worker_app
+    from app import create_app
+
+    _worker_app = create_app()
+
+
+def _compute_chunk(bounds):
+    start, end = bounds
+    with _worker_app.app_context():
+        return start, end, compute_range(_worker_app.extensions["rollups"].db.session, start, end)
+
+
+# -----------------------------------------------------------------------------
+# Extensión
+# -----------------------------------------------------------------------------
+class Rollups:
+    """
+    ROLLUP_REFRESH_INTERVAL  segundos entre refrescos incrementales al leer (0 = sólo CLI)
+    ROLLUP_CHUNK_DAYS        días por bloque en refresh/backfill (defecto 31)
+    ROLLUP_MAX_RANGE_DAYS    máximo de días por consulta de la API (defecto 1830)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.refresh_interval = float(app.config.get("ROLLUP_REFRESH_INTERVAL", 60))
+        self.chunk_days = int(app.config.get("ROLLUP_CHUNK_DAYS", 31))
+        self.max_range = int(app.config.get("ROLLUP_MAX_RANGE_DAYS", 1830))
+        app.extensions["rollups"] = self
+        app.cli.add_command(rollups_cli)
+        _listen_session_events()
+
+    # -------------------------------------------------------------------------
+    # Lectura
+    # -------------------------------------------------------------------------
+    def series(self, start, end, room_type_id=None, group="day"):
+        """KPIs por día (o mes) en [start, end) sumando los tipos (o uno solo)."""
+        from models import DailyRollup
+
+        self._ensure_fresh()
+        stmt = (
+            select(DailyRollup.day,
+                   func.sum(DailyRollup.rooms_total), func.sum(DailyRollup.rooms_out_of_order),
+                   func.sum(DailyRollup.rooms_sold), func.sum(DailyRollup.room_revenue),
+                   func.sum(DailyRollup.arrivals), func.sum(DailyRollup.departures))
+            .where(DailyRollup.day >= start, DailyRollup.day < end)
+            .group_by(DailyRollup.day).order_by(DailyRollup.day)
+        )
+        if room_type_id is not None:
+            stmt = stmt.where(DailyRollup.room_type_id == room_type_id)
+        # Sesión propia: leer no confirma la transacción del request
+        with Session(self.db.engine) as session:
+            rows = session.execute(stmt).all()
+
+        buckets = {}
+        for day, total, ooo, sold, revenue, arrivals, departures in rows:
+            key = day.replace(day=1) if group == "month" else day
+            b = buckets.setdefault(key, [0, 0, 0, Decimal(0), 0, 0])
+            b[0] += max(int(total) - int(ooo), 0)
+            b[1] += int(ooo)
+            b[2] += int(sold)
+            b[3] += Decimal(str(revenue or 0))
+            b[4] += int(arrivals)
+            b[5] += int(departures)
+        return [_kpis(key, *values) for key, values in buckets.items()]
+
+    # -------------------------------------------------------------------------
+    # Escritura
+    # -------------------------------------------------------------------------
+    def write(self, start, end, rows):
+        """Reemplaza los días [start, end) por las filas calculadas."""
+        from models import DailyRollup
+
+        session = self.db.session
+        now = datetime.utcnow()
+        session.execute(delete(DailyRollup).where(DailyRollup.day >= start, DailyRollup.day < end))
+        if rows:
+            session.execute(insert(DailyRollup), [
+                {"day": date.fromordinal(d), "room_type_id": t, "rooms_total": total,
+                 "rooms_out_of_order": ooo, "rooms_sold": sold,
+                 "room_revenue": Decimal(revenue) / 100, "arrivals": arrivals,
+                 "departures": departures, "updated_at": now}
+                for d, t, total, ooo, sold, revenue, arrivals, departures in rows
+            ])
+        session.commit()
+
+    def recompute(self, start, end):
+        session = self.db.session
+        for lo, hi in _chunks(start, end, self.chunk_days):
+            self.write(lo, hi, compute_range(session, lo, hi))
+
+    def backfill(self, start, end, workers=None, progress=None):
+        """Recalcula [start, end) completo; devuelve el número de días escritos."""
+        # Las marcas se toman antes de leer: lo que cambie durante el backfill
+        # lo vuelve a procesar el siguiente refresh
+        marks = self._current_marks()
+        bounds = list(_chunks(start, end, self.chunk_days))
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(bounds) <= 1:
+            for lo, hi in bounds:
+                self.write(lo, hi, compute_range(self.db.session, lo, hi))
+                if progress:
+                    progress(lo, hi)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(bounds)),
+                                     initializer=_init_worker) as pool:
+                for lo, hi, rows in pool.map(_compute_chunk, bounds):
+                    self.write(lo, hi, rows)
+                    if progress:
+                        progress(lo, hi)
+        self._save_marks(marks)
+        return (end - start).days
+
+    def refresh(self):
+        """
+        Recalcula los días afectados desde la última marca. Devuelve los días
+        recalculados, o None si nunca se hizo un backfill.
+        """
+        from models import Reservation, RollupDirty, RollupState, RoomBlock
+
+        session = self.db.session
+        state = {s.name: s.watermark for s in session.execute(select(RollupState)).scalars()}
+        if not state:
+            session.commit()
+            return None
+
+        days = set()
+        seen = {}
+        for name, model, lo_col, hi_col in (
+            ("reservations", Reservation, Reservation.check_in, Reservation.check_out),
+            ("room_blocks", RoomBlock, RoomBlock.start_date, RoomBlock.end_date),
+        ):
+            stmt = select(lo_col, hi_col, model.updated_at)
+            if state.get(name) is not None:
+                stmt = stmt.where(model.updated_at >= state[name])
+            for lo, hi, updated_at in session.execute(stmt).all():
+                # +1: la salida cuenta en 'departures' del día de check_out
+                days.update(range(lo.toordinal(), hi.toordinal() + 1))
+                if seen.get(name) is None or updated_at > seen[name]:
+                    seen[name] = updated_at
+
+        dirty = session.execute(select(RollupDirty.id, RollupDirty.start_date, RollupDirty.end_date)).all()
+        for _id, lo, hi in dirty:
+            days.update(range(lo.toordinal(), hi.toordinal() + 1))
+        session.commit()
+
+        for lo, hi in _runs(sorted(days)):
+            self.recompute(date.fromordinal(lo), date.fromordinal(hi))
+        if dirty:
+            session.execute(delete(RollupDirty).where(RollupDirty.id <= max(d[0] for d in dirty)))
+
+        horizon = datetime.utcnow() - WATERMARK_LAG
+        marks = {}
+        for name, mark in state.items():
+            latest = seen.get(name)
+            if latest is not None:
+                latest = min(latest, horizon)
+            marks[name] = max(filter(None, (mark, latest)), default=None)
+        self._save_marks(marks)
+        return len(days)
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _ensure_fresh(self):
+        if not self.refresh_interval or time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # otro hilo ya está refrescando: se lee lo que hay
+        try:
+            self._refreshed_at = time.monotonic()
+            self.refresh()
+        except IntegrityError:
+            # Otro worker recalculó los mismos días a la vez: el próximo refresh lo repite
+            self.db.session.rollback()
+            log.warning("Refresh de rollups concurrente; se reintentará")
+        except SQLAlchemyError:
+            # Deadlock o lock wait timeout contra el refresh de otro worker (o la BD
+            # caída): la lectura sigue con los agregados que haya
+            self.db.session.rollback()
+            log.exception("Falló el refresh de rollups; se reintentará")
+        finally:
+            self._lock.release()
+
+    def _current_marks(self):
+        from models import Reservation, RoomBlock
+
+        session = self.db.session
+        marks = {
+            "reservations": session.execute(select(func.max(Reservation.updated_at))).scalar(),
+            "room_blocks": session.execute(select(func.max(RoomBlock.updated_at))).scalar(),
+        }
+        session.commit()
+        return marks
+
+    def _save_marks(self, marks):
+        from models import RollupState
+
+        session = self.db.session
+        for name, watermark in marks.items():
+            row = session.get(RollupState, name)
+            if row is None:
+                session.add(RollupState(name=name, watermark=watermark))
+            else:
+                row.watermark = watermark
+        session.commit()
+
+
+def _runs(ordinals):
+    """[1,2,3,7,8] -> [(1,4), (7,9)] (rangos semiabiertos)."""
+    runs = []
+    for d in ordinals:
+        if runs and runs[-1][1] == d:
+            runs[-1][1] = d + 1
+        else:
+            runs.append([d, d + 1])
+    return [tuple(r) for r in runs]
+
+
+def _kpis(day, available, ooo, sold, revenue, arrivals, departures):
+    revenue = revenue.quantize(Decimal("0.01"))
+    return {
+        "date": day.isoformat(),
+        "rooms_available": available,
+        "rooms_out_of_order": ooo,
+        "rooms_sold": sold,
+        "occupancy": round(100 * sold / available, 1) if available else None,
+        "adr": str((revenue / sold).quantize(Decimal("0.01"))) if sold else None,
+        "revpar": str((revenue / available).quantize(Decimal("0.01"))) if available else None,
+        "revenue": str(revenue),
+        "arrivals": arrivals,
+        "departures": departures,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: rangos que la marca de agua no puede ver
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _listen_session_events():
+    from models import Reservation, RollupDirty, RoomBlock
+
+    if "rollups" in _listening:
+        return
+    _listening.add("rollups")
+    tracked = ((Reservation, "check_in", "check_out", _RESERVATION_FIELDS),
+               (RoomBlock, "start_date", "end_date", _BLOCK_FIELDS))
+
+    @event.listens_for(Session, "before_flush")
+    def _mark_dirty(session, _ctx, _instances):
+        ranges = []
+        for obj in session.deleted:
+            for model, lo, hi, _fields in tracked:
+                if isinstance(obj, model):
+                    ranges.append((getattr(obj, lo), getattr(obj, hi)))
+        for obj in session.dirty:
+            for model, lo, hi, fields in tracked:
+                if not isinstance(obj, model):
+                    continue
+                attrs = inspect(obj).attrs
+                if any(attrs[f].history.has_changes() for f in fields):
+                    # Las fechas anteriores (las nuevas las trae la marca de agua)
+                    old_lo = (attrs[lo].history.deleted or [getattr(obj, lo)])[0]
+                    old_hi = (attrs[hi].history.deleted or [getattr(obj, hi)])[0]
+                    ranges.append((old_lo, old_hi))
+        for lo, hi in ranges:
+            if lo is not None and hi is not None:
+                session.add(RollupDirty(start_date=lo, end_date=hi))
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app rollups backfill | refresh
+# -----------------------------------------------------------------------------
+@rollups_cli.command("backfill")
+@click.option("--from", "start", default=None, help="AAAA-MM-DD (defecto: primera reserva)")
+@click.option("--to", "end", default=None, help="AAAA-MM-DD exclusivo (defecto: hoy + 1 año)")
+@click.option("--workers", type=int, default=None, help="procesos (defecto: núcleos)")
+def backfill_command(start, end, workers):
+    """Recalcula los agregados de un rango histórico en un pool de procesos."""
+    from models import Reservation
+
+    ext = current_app.extensions["rollups"]
+    if start:
+        start = date.fromisoformat(start)
+    else:
+        start = ext.db.session.execute(select(func.min(Reservation.check_in))).scalar() or date.today()
+    end = date.fromisoformat(end) if end else date.today() + timedelta(days=366)
+    t0 = time.perf_counter()
+    days = ext.backfill(start, end, workers,
+                        progress=lambda lo, hi: click.echo(f"  {lo} → {hi}"))
+    click.echo(f"{days} días ({start} → {end}) en {time.perf_counter() - t0:.1f} s")
+
+
+@rollups_cli.command("refresh")
+def refresh_command():
+    """Recalcula los días tocados desde la última marca de agua."""
+    ext = current_app.extensions["rollups"]
+    t0 = time.perf_counter()
+    days = ext.refresh()
+    if days is None:
+        raise click.ClickException("No hay marcas de agua: ejecute primero 'rollups backfill'.")
+    click.echo(f"{days} días recalculados en {(time.perf_counter() - t0) * 1000:.0f} ms")
@@ -0,0 +1,383 @@
+# services/room_status.py
+# Tablero en vivo de habitaciones, limpieza y llegadas/salidas del día para
+# las páginas de operaciones, distribuido por Server-Sent Events.
+#
+# Cada proceso mantiene los "documentos" del día (room:<id>, task:<id>,
+# arrival:<id>, departure:<id>) y un número de secuencia. Un cambio se
+# publica una sola vez: se calcula la diferencia de documentos, se guarda en
+# un backlog acotado y se despierta a todos los streams con una Condition;
+# cada cliente lee del backlog lo posterior a su secuencia. Los frames
+# serializados se reutilizan entre clientes.
+#
+# Protocolo: el primer frame es un snapshot (id "<época>:<seq>"); después
+# llegan deltas {"changes": [{"key", "doc" | null}]}. Al reconectar,
+# EventSource reenvía Last-Event-ID y, si la época coincide y el backlog aún
+# cubre esa secuencia, sólo se envían los cambios perdidos; si no, un
+# snapshot nuevo.
+#
+# Igual que services/calendar.py: los commits de este proceso se aplican al
+# confirmar; los de otros workers se leen por updated_at cada
+# ROOM_STATUS_SYNC_INTERVAL segundos (releyendo ROOM_STATUS_SYNC_OVERLAP
+# segundos antes de la marca), y ese intervalo es por proceso, no por
+# cliente: decenas de tablets abiertas cuestan una consulta por tabla cada
+# intervalo (ninguna si no hay cambios que traer ni clientes conectados). Las
+# lecturas usan una sesión propia, no la del request o stream que las dispara.
+
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+
+# Marca de agua para una tabla que estaba vacía en la última lectura
+EPOCH = datetime(1970, 1, 1)
+# Estados de reserva que aparecen en llegadas / salidas del día
+ARRIVAL_STATUSES = ("pending", "confirmed", "checked_in")
+DEPARTURE_STATUSES = ("confirmed", "checked_in", "checked_out")
+
+
+def _floor(code):
+    """Piso a partir del código ("317" -> 3); None si no es numérico."""
+    return int(code[:-2]) if code.isdigit() and len(code) >= 3 else None
+
+
+def _iso(value):
+    return value.isoformat(timespec="seconds") if isinstance(value, datetime) else (
+        value.isoformat() if isinstance(value, date) else value)
+
+
+class RoomStatusBoard:
+    """
+    ROOM_STATUS_SYNC_INTERVAL     segundos entre lecturas de cambios de otros procesos (defecto 2)
+    ROOM_STATUS_REBUILD_INTERVAL  segundos entre reconstrucciones completas (defecto 300)
+    ROOM_STATUS_SYNC_OVERLAP      segundos que cada lectura relee antes de la marca (defecto 60)
+    ROOM_STATUS_BACKLOG           publicaciones guardadas para reanudar (defecto 1000)
+    ROOM_STATUS_HEARTBEAT         segundos entre keep-alive del stream (defecto 15)
+    ROOM_STATUS_STREAM_SECONDS    duración máxima de un stream; el cliente reanuda (defecto 600)
+    ROOM_STATUS_MAX_CLIENTS       streams simultáneos por proceso (defecto 2)
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.epoch = secrets.token_hex(4)   # las secuencias valen sólo en este proceso
+        self.seq = 0
+        self.docs = {}                      # clave -> documento publicado
+        self.clients = 0
+        self._rooms, self._res, self._tasks = {}, {}, {}
+        self._backlog = deque()             # (seq, [cambios])
+        self._frames = {}                   # frames serializados de la secuencia actual
+        self._cond = threading.Condition(threading.RLock())
+        self._refreshing = threading.Lock()
+        self._day = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._watermarks = {}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.sync_interval = float(app.config.get("ROOM_STATUS_SYNC_INTERVAL", 2))
+        self.rebuild_interval = float(app.config.get("ROOM_STATUS_REBUILD_INTERVAL", 300))
+        self.sync_overlap = timedelta(seconds=float(app.config.get("ROOM_STATUS_SYNC_OVERLAP", 60)))
+        self._backlog = deque(maxlen=int(app.config.get("ROOM_STATUS_BACKLOG", 1000)))
+        self.heartbeat = float(app.config.get("ROOM_STATUS_HEARTBEAT", 15))
+        self.stream_seconds = float(app.config.get("ROOM_STATUS_STREAM_SECONDS", 600))
+        self.max_clients = int(app.config.get("ROOM_STATUS_MAX_CLIENTS", 2))
+        app.extensions["room_status"] = self
+        _listen_session_events(self)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def snapshot(self):
+        self._ensure_fresh()
+        with self._cond:
+            return {"id": f"{self.epoch}:{self.seq}", "date": self._day.isoformat(), "docs": dict(self.docs)}
+
+    def acquire(self):
+        """Reserva un stream; False si el proceso ya tiene max_clients abiertos."""
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.clients -= 1
+
+    def stream(self, last_event_id=None):
+        """
+        Frames SSE: snapshot (o sólo lo perdido, si se puede reanudar) y luego deltas.
+        El cupo se reserva antes con acquire() y se libera al cerrar el stream.
+        """
+        try:
+            self._ensure_fresh()
+            epoch, _, raw = (last_event_id or "").partition(":")
+            with self._cond:
+                seq = int(raw) if epoch == self.epoch and raw.isdigit() else -1
+                first = self._frame_since(seq)
+                seq = self.seq
+            yield f"retry: {int(self.sync_interval * 1000) + 1000}\n\n"
+            if first:
+                yield first
+            deadline = time.monotonic() + self.stream_seconds
+            last_write = time.monotonic()
+            while time.monotonic() < deadline:
+                self._ensure_fresh()
+                with self._cond:
+                    if self.seq == seq:
+                        self._cond.wait(timeout=min(self.sync_interval, self.heartbeat))
+                    frame = self._frame_since(seq)
+                    seq = self.seq
+                if frame:
+                    yield frame
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write >= self.heartbeat:
+                    yield ": ping\n\n"
+                    last_write = time.monotonic()
+        finally:
+            self.release()
+
+    def apply(self, changes):
+        """Cambios confirmados en este proceso: [(fuente, id, fila | None)]."""
+        with self._cond:
+            if self._day is None:
+                return  # la primera carga los incluye
+            for source, row_id, row in changes:
+                self._put(source, row_id, row)
+            self._publish()
+
+    def stats(self):
+        with self._cond:
+            return {"seq": self.seq, "epoch": self.epoch, "docs": len(self.docs), "clients": self.clients,
+                    "backlog": len(self._backlog)}
+
+    # -------------------------------------------------------------------------
+    # Documentos y publicación
+    # -------------------------------------------------------------------------
+    def _put(self, source, row_id, row):
+        """Guarda (o quita) una fila de origen; sólo se conservan las que tocan hoy."""
+        today = self._day
+        target = {"room": self._rooms, "res": self._res, "task": self._tasks}[source]
+        keep = row is not None
+        if keep and source == "res":
+            keep = row["check_in"] <= today <= row["check_out"]
+        elif keep and source == "task":
+            keep = row["status"] != "done" or (row["finished_at"] or datetime.min).date() >= today
+        if keep:
+            target[row_id] = row
+        else:
+            target.pop(row_id, None)
+
+    def _derive(self):
+        today = self._day
+        docs = {}
+        in_house, arriving, leaving = {}, {}, {}
+        for r in self._res.values():
+            room = self._rooms.get(r["room_id"])
+            code = room["code"] if room else None
+            if r["status"] == "checked_in" and r["check_out"] >= today:
+                in_house[r["room_id"]] = r
+            if r["check_in"] == today and r["status"] in ARRIVAL_STATUSES:
+                arriving[r["room_id"]] = r
+                docs[f"arrival:{r['id']}"] = {"id": r["id"], "guest": r["guest"], "room": code,
+                                              "room_id": r["room_id"], "status": r["status"]}
+            if r["check_out"] == today and r["status"] in DEPARTURE_STATUSES:
+                leaving[r["room_id"]] = r
+                docs[f"departure:{r['id']}"] = {"id": r["id"], "guest": r["guest"], "room": code,
+                                                "room_id": r["room_id"], "status": r["status"]}
+        for room in self._rooms.values():
+            stay = in_house.get(room["id"])
+            docs[f"room:{room['id']}"] = {
+                "id": room["id"], "code": room["code"], "name": room["name"], "floor": _floor(room["code"]),
+                "hk": room["hk"], "note": room["note"],
+                "occupied": stay is not None,
+                "guest": stay["guest"] if stay else None,
+                "until": stay["check_out"].isoformat() if stay else None,
+                "arrival": room["id"] in arriving and arriving[room["id"]]["status"] != "checked_in",
+                "departure": room["id"] in leaving and leaving[room["id"]]["status"] == "checked_in",
+            }
+        for t in self._tasks.values():
+            room = self._rooms.get(t["room_id"])
+            docs[f"task:{t['id']}"] = {
+                "id": t["id"], "room_id": t["room_id"], "room": room["code"] if room else None,
+                "kind": t["kind"], "assignee": t["assignee"], "priority": t["priority"], "status": t["status"],
+                "started_at": _iso(t["started_at"]), "finished_at": _iso(t["finished_at"]),
+            }
+        return docs
+
+    def _publish(self):
+        """Publica la diferencia con lo ya publicado (con el lock tomado)."""
+        docs = self._derive()
+        changes = [{"key": k, "doc": d} for k, d in docs.items() if self.docs.get(k) != d]
+        changes += [{"key": k, "doc": None} for k in self.docs.keys() - docs.keys()]
+        if not changes:
+            return
+        self.docs = docs
+        self.seq += 1
+        self._backlog.append((self.seq, changes))
+        self._frames = {}
+        self._cond.notify_all()
+
+    def _frame_since(self, seq):
+        """Frame SSE para un cliente en 'seq': '' al día, delta, o snapshot si no se puede reanudar."""
+        if seq == self.seq:
+            return ""
+        key = seq if self._backlog and self._backlog[0][0] <= seq + 1 and seq >= 0 else "snapshot"
+        frame = self._frames.get(key)
+        if frame is None:
+            if key == "snapshot":
+                name, data = "snapshot", {"date": self._day.isoformat(), "docs": self.docs}
+            else:
+                merged = {}
+                for s, changes in self._backlog:
+                    if s > seq:
+                        for change in changes:
+                            merged[change["key"]] = change["doc"]
+                name, data = "delta", {"changes": [{"key": k, "doc": d} for k, d in merged.items()]}
+            frame = (f"id: {self.epoch}:{self.seq}\nevent: {name}\n"
+                     f"data: {json.dumps(data, separators=(',', ':'), ensure_ascii=False)}\n\n")
+            self._frames[key] = frame
+        return frame
+
+    # -------------------------------------------------------------------------
+    # Carga y sincronización
+    # -------------------------------------------------------------------------
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        stale = self._day != date.today() or now - self._built_at > self.rebuild_interval
+        if not stale and now - self._synced_at <= self.sync_interval:
+            return
+        # Un solo hilo lee la BD; los demás siguen con lo publicado (salvo la primera carga)
+        if not self._refreshing.acquire(blocking=self._day is None):
+            return
+        try:
+            if self._day != date.today() or time.monotonic() - self._built_at > self.rebuild_interval:
+                self._rebuild()
+            elif time.monotonic() - self._synced_at > self.sync_interval:
+                self._sync()
+        finally:
+            self._refreshing.release()
+
+    def _queries(self, since=None):
+        """(fuente, modelo, SELECT) de las filas que importan hoy, opcionalmente desde una marca."""
+        from models import HousekeepingTask, Reservation, Room
+
+        today = date.today()
+        rooms = select(Room.id, Room.code, Room.name, Room.hk_status, Room.hk_note, Room.updated_at)
+        res = select(Reservation.id, Reservation.room_id, Reservation.guest_name, Reservation.check_in,
+                     Reservation.check_out, Reservation.status, Reservation.updated_at)
+        tasks = select(HousekeepingTask.id, HousekeepingTask.room_id, HousekeepingTask.kind,
+                       HousekeepingTask.assignee, HousekeepingTask.priority, HousekeepingTask.status,
+                       HousekeepingTask.started_at, HousekeepingTask.finished_at, HousekeepingTask.updated_at)
+        if since is None:
+            res = res.where(Reservation.check_in <= today, Reservation.check_out >= today)
+            tasks = tasks.where(or_(HousekeepingTask.status != "done",
+                                    HousekeepingTask.finished_at >= datetime.combine(today, datetime.min.time())))
+        out = []
+        for source, model, stmt in (("room", Room, rooms), ("res", Reservation, res),
+                                    ("task", HousekeepingTask, tasks)):
+            if since is not None:
+                # Ventana de solapamiento: filas confirmadas tarde por otro worker con un
+                # updated_at anterior a la marca; _put es idempotente
+                mark = since.get(source)
+                stmt = stmt.where(model.updated_at >= (mark - self.sync_overlap if mark else EPOCH))
+            out.append((source, stmt.order_by(model.updated_at)))
+        return out
+
+    @staticmethod
+    def _row(source, r):
+        if source == "room":
+            return {"id": r.id, "code": r.code, "name": r.name, "hk": r.hk_status, "note": r.hk_note}
+        if source == "res":
+            return {"id": r.id, "room_id": r.room_id, "guest": r.guest_name, "check_in": r.check_in,
+                    "check_out": r.check_out, "status": r.status}
+        return {"id": r.id, "room_id": r.room_id, "kind": r.kind, "assignee": r.assignee,
+                "priority": r.priority, "status": r.status, "started_at": r.started_at,
+                "finished_at": r.finished_at}
+
+    def _rebuild(self):
+        from models import HousekeepingTask, Reservation, Room
+
+        with Session(self.db.engine) as session:
+            rows = {source: session.execute(stmt).all() for source, stmt in self._queries()}
+            # Las marcas de agua salen de toda la tabla, no sólo de las filas de hoy
+            marks = {source: session.execute(select(model.updated_at).order_by(model.updated_at.desc())
+                                             .limit(1)).scalar()
+                     for source, model in (("room", Room), ("res", Reservation), ("task", HousekeepingTask))}
+        with self._cond:
+            self._day = date.today()
+            self._rooms, self._res, self._tasks = {}, {}, {}
+            for source, items in rows.items():
+                for r in items:
+                    self._put(source, r.id, self._row(source, r))
+            self._watermarks = marks
+            self._built_at = self._synced_at = time.monotonic()
+            self._publish()
+
+    def _sync(self):
+        self._synced_at = time.monotonic()
+        with Session(self.db.engine) as session:
+            rows = {source: session.execute(stmt).all()
+                    for source, stmt in self._queries(dict(self._watermarks))}
+        with self._cond:
+            for source, items in rows.items():
+                for r in items:
+                    self._put(source, r.id, self._row(source, r))
+                    mark = self._watermarks.get(source)
+                    if mark is None or r.updated_at > mark:
+                        self._watermarks[source] = r.updated_at
+            self._publish()
+
+
+# -----------------------------------------------------------------------------
+# Eventos de sesión: publicar sólo lo confirmado
+# -----------------------------------------------------------------------------
+_listening = set()
+
+
+def _listen_session_events(board):
+    from models import HousekeepingTask, Reservation, Room
+
+    if id(board) in _listening:
+        return
+    _listening.add(id(board))
+    sources = {Room: "room", Reservation: "res", HousekeepingTask: "task"}
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, _ctx):
+        pending = session.info.setdefault("room_status_changes", {})
+        for obj in (*session.new, *session.dirty):
+            source = sources.get(type(obj))
+            if source == "room":
+                pending[(source, obj.id)] = {"id": obj.id, "code": obj.code, "name": obj.name,
+                                             "hk": obj.hk_status, "note": obj.hk_note}
+            elif source == "res":
+                pending[(source, obj.id)] = {"id": obj.id, "room_id": obj.room_id, "guest": obj.guest_name,
+                                             "check_in": obj.check_in, "check_out": obj.check_out,
+                                             "status": obj.status}
+            elif source == "task":
+                pending[(source, obj.id)] = {"id": obj.id, "room_id": obj.room_id, "kind": obj.kind,
+                                             "assignee": obj.assignee, "priority": obj.priority,
+                                             "status": obj.status, "started_at": obj.started_at,
+                                             "finished_at": obj.finished_at}
+        for obj in session.deleted:
+            source = sources.get(type(obj))
+            if source:
+                pending[(source, obj.id)] = None
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session):
+        changes = session.info.pop("room_status_changes", None)
+        if changes:
+            board.apply([(source, row_id, row) for (source, row_id), row in changes.items()])
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("room_status_changes", None)
@@ -0,0 +1,180 @@
+# services/schema_cache.py
+# Caché de introspección del esquema de usuarios.
+# Resuelve una sola vez por proceso la tabla de usuarios, su mapa de columnas
+# y el rol por defecto, en lugar de consultar INFORMATION_SCHEMA en cada
+# login/registro.
+
+import os
+import threading
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import NoSuchTableError, OperationalError, ProgrammingError
+
+# Nombres candidatos (se comparan en minúscula, así que no hace falta repetir
+# variantes como "Usuarios"/"usuarios").
+USERS_TABLE_CANDIDATES = ("users", "user", "usuarios", "usuario")
+
+# Códigos MySQL que indican que el esquema cambió bajo nuestros pies:
+# 1054 = columna desconocida, 1146 = tabla inexistente.
+_SCHEMA_ERROR_CODES = {1054, 1146}
+
+
+class SchemaSnapshot:
+    """Foto inmutable del esquema resuelto."""
+
+    __slots__ = ("users_table", "columns", "default_role_id", "loaded_at")
+
+    def __init__(self, users_table, columns, default_role_id, loaded_at):
+        self.users_table = users_table
+        self.columns = columns              # {col_lower: col_real}
+        self.default_role_id = default_role_id
+        self.loaded_at = loaded_at
+
+
+class SchemaCache:
+    """
+    Caché por proceso del esquema de usuarios.
+
+    Se invalida:
+      - explícitamente con invalidate()
+      - al vencer el TTL (SCHEMA_CACHE_TTL, segundos; 0 = sin vencimiento)
+      - cuando una consulta falla por columna/tabla inexistente (note_error)
+      - tras `flask db upgrade`/`downgrade` en este proceso (migrations/env.py)
+
+    Si no hay tabla de usuarios también se cachea, pero sólo
+    SCHEMA_CACHE_NEGATIVE_TTL segundos: otro proceso puede migrar la BD.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.ttl = 300
+        self.negative_ttl = 30
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()  # el camino rápido no toma _lock (lo retiene una recarga)
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "invalidations": 0}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.ttl = float(app.config.get("SCHEMA_CACHE_TTL", 300))
+        self.negative_ttl = float(app.config.get("SCHEMA_CACHE_NEGATIVE_TTL", 30))
+        app.extensions["schema_cache"] = self
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def snapshot(self):
+        """Devuelve el SchemaSnapshot vigente, recargándolo si hace falta."""
+        snap = self._snapshot
+        if snap is not None and not self._expired(snap):
+            self._count("hits")
+            return snap
+
+        with self._lock:
+            # Otro hilo pudo recargar mientras esperábamos el lock
+            snap = self._snapshot
+            if snap is not None and not self._expired(snap):
+                self._count("hits")
+                return snap
+            self._count("misses")
+            self._snapshot = snap = self._load()
+            return snap
+
+    def users_table(self):
+        return self.snapshot().users_table
+
+    def columns(self):
+        return self.snapshot().columns
+
+    def default_role_id(self):
+        return self.snapshot().default_role_id
+
+    def invalidate(self):
+        with self._lock:
+            if self._snapshot is not None:
+                self._count("invalidations")
+            self._snapshot = None
+
+    def note_error(self, exc):
+        """
+        Invalida la caché si la excepción indica un cambio de esquema.
+        Devuelve True si se invalidó.
+        """
+        if isinstance(exc, NoSuchTableError) or _schema_error_code(exc) in _SCHEMA_ERROR_CODES:
+            self.invalidate()
+            return True
+        return False
+
+    def stats(self):
+        snap = self._snapshot
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["ttl"] = self.ttl
+        out["negative_ttl"] = self.negative_ttl
+        out["users_table"] = snap.users_table if snap else None
+        out["age"] = round(time.monotonic() - snap.loaded_at, 1) if snap else None
+        return out
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _expired(self, snap):
+        ttl = self.ttl if snap.users_table else self.negative_ttl
+        return ttl > 0 and (time.monotonic() - snap.loaded_at) > ttl
+
+    def _load(self):
+        self._count("reloads")
+        inspector = inspect(self.db.engine)
+        table = self._resolve_users_table(inspector)
+        columns = {}
+        if table:
+            columns = {c["name"].lower(): c["name"] for c in inspector.get_columns(table)}
+        return SchemaSnapshot(table, columns, self._resolve_default_role(), time.monotonic())
+
+    def _resolve_users_table(self, inspector):
+        """Detecta la tabla de usuarios (case-insensitive) con una sola consulta."""
+        candidates = [os.getenv("USERS_TABLE", "").strip() or None, *USERS_TABLE_CANDIDATES]
+        candidates = [t.lower() for t in candidates if t]
+
+        existing = {name.lower(): name for name in inspector.get_table_names()}
+        for tbl in candidates:
+            if tbl in existing:
+                return existing[tbl]  # devuelve el nombre real con su casing
+        return None
+
+    def _resolve_default_role(self):
+        """
+        Codigo_Rol por defecto en una sola consulta:
+        'Cliente', luego 'Usuario', si no el mínimo Codigo_Rol disponible.
+        """
+        try:
+            row = self.db.session.execute(text("""
+                SELECT Codigo_Rol
+                FROM Rol
+                ORDER BY CASE LOWER(Nombre)
+                           WHEN 'cliente' THEN 0
+                           WHEN 'usuario' THEN 1
+                           ELSE 2
+                         END,
+                         Codigo_Rol
+                LIMIT 1
+            """)).first()
+            return row[0] if row else None
+        except Exception:
+            self.db.session.rollback()
+            return None  # si no hay tabla Rol, no forzamos nada
+
+
+def _schema_error_code(exc):
+    if isinstance(exc, (OperationalError, ProgrammingError)):
+        args = getattr(exc.orig, "args", ())
+        if args and isinstance(args[0], int):
+            return args[0]
+    return None
@@ -0,0 +1,289 @@
+# services/template_cache.py
+# Compilación y render de templates entre workers:
+#
+# - Bytecode de Jinja en disco (JINJA_BYTECODE_DIR, defecto instance/jinja-cache):
+#   el primer worker que compila un template deja el código y los demás (y los
+#   que arranquen después) lo cargan sin volver a parsear. Se invalida solo
+#   cuando cambia el template.
+# - Caché de fragmentos con {% cache %} para las partes compartidas de las
+#   páginas que dependen de la sesión (portal-*, admin-*):
+#
+#       {% cache "head", 600 %} ... {% endcache %}
+#       {% cache "nav", 600, active %} ... {% endcache %}   (variables extra en la clave)
+#
+#   La clave es el nombre, el hash del texto del bloque, las variables extra, el
+#   rol de la sesión, el locale y la versión de los assets (las URLs con huella
+#   cambian en cada deploy). Dos páginas con el mismo bloque comparten la entrada.
+#
+#   flask --app app templates compile     compila todo antes de levantar Gunicorn
+#   flask --app app templates clear       vacía bytecode y fragmentos
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import click
+from flask import current_app, has_request_context, session
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+DEFAULT_TTL = 300
+
+templates_cli = AppGroup("templates", help="Caché de templates (bytecode y fragmentos).")
+
+
+# -----------------------------------------------------------------------------
+# Backends de fragmentos
+# -----------------------------------------------------------------------------
+class MemoryFragments:
+    """LRU en memoria del proceso (un juego por worker)."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedFragments:
+    """
+    Un archivo por fragmento en memoria compartida (/dev/shm si existe): todos
+    los workers del host ven lo que renderizó cualquiera. La primera línea es
+    el vencimiento (epoch); se escribe a un temporal y se renombra.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".html")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as fh:
+                expires = float(fh.readline())
+                if expires < time.time():
+                    return None
+                return fh.read()
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value, ttl):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(f"{time.time() + ttl:.0f}\n")
+                fh.write(value)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith((".html", ".tmp")):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".html"))
+
+
+def _shared_dir(app):
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    tag = hashlib.blake2b(app.root_path.encode(), digest_size=4).hexdigest()
+    return os.path.join(base, f"hotel-fragments-{tag}")
+
+
+# -----------------------------------------------------------------------------
+# {% cache key[, ttl[, vary...]] %} ... {% endcache %}
+# -----------------------------------------------------------------------------
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        if len(args) == 1:
+            args.append(nodes.Const(DEFAULT_TTL))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        # El texto del bloque entra en la clave: editar el template invalida la entrada
+        # sin depender del nombre del template ni de reiniciar.
+        digest = self._block_digest(parser.name, lineno, parser.stream.current.lineno)
+        args.insert(0, nodes.Const(digest))
+        return nodes.CallBlock(self.call_method("_render", [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _block_digest(self, name, first, last):
+        source = None
+        if name and self.environment.loader is not None:
+            try:
+                source = self.environment.loader.get_source(self.environment, name)[0]
+            except Exception:
+                source = None
+        if source is None:
+            text = f"{name}:{first}:{last}"
+        else:
+            text = "\n".join(source.splitlines()[first - 1:last])
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _render(self, args, caller):
+        digest, name, ttl, *vary = args
+        cache = current_app.extensions.get("template_cache")
+        if cache is None or cache.fragments is None:
+            return caller()
+        key = cache.fragment_key(digest, name, vary)
+        value = cache.fragments.get(key)
+        if value is None:
+            cache.misses += 1
+            value = str(caller())
+            cache.fragments.set(key, value, int(ttl))
+        else:
+            cache.hits += 1
+        return Markup(value)
+
+
+# -----------------------------------------------------------------------------
+# Extensión
+# -----------------------------------------------------------------------------
+class TemplateCache:
+    """
+    JINJA_BYTECODE_CACHE    bytecode de Jinja en disco (defecto True)
+    JINJA_BYTECODE_DIR      carpeta compartida (defecto instance/jinja-cache)
+    FRAGMENT_CACHE          memory (LRU por proceso), shared (memoria compartida
+                            entre workers) o none
+    FRAGMENT_CACHE_SIZE     entradas del LRU en memoria (defecto 512)
+    FRAGMENT_CACHE_DIR      carpeta del backend shared (defecto /dev/shm/hotel-fragments-*)
+    """
+
+    def __init__(self, app=None):
+        self.bytecode = None
+        self.fragments = None
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.bytecode = self.fragments = None
+        self.hits = self.misses = 0
+        self._version = None
+        app.extensions["template_cache"] = self
+        env = app.jinja_env
+        if app.config.get("JINJA_BYTECODE_CACHE", True):
+            self.bytecode_dir = app.config.get("JINJA_BYTECODE_DIR") or os.path.join(app.instance_path, "jinja-cache")
+            os.makedirs(self.bytecode_dir, exist_ok=True)
+            self.bytecode = env.bytecode_cache = FileSystemBytecodeCache(self.bytecode_dir)
+
+        backend = (app.config.get("FRAGMENT_CACHE") or "memory").lower()
+        if backend == "memory":
+            self.fragments = MemoryFragments(int(app.config.get("FRAGMENT_CACHE_SIZE") or 512))
+        elif backend == "shared":
+            self.fragments = SharedFragments(app.config.get("FRAGMENT_CACHE_DIR") or _shared_dir(app))
+        elif backend != "none":
+            raise ValueError(f"FRAGMENT_CACHE debe ser memory, shared o none (no {backend!r})")
+        # La etiqueta {% cache %} existe siempre; con 'none' sólo renderiza el bloque
+        env.add_extension(FragmentCacheExtension)
+        app.cli.add_command(templates_cli)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def fragment_key(self, digest, name, vary=()):
+        """Clave de un fragmento para el request actual (rol y locale de la sesión)."""
+        role = locale = ""
+        if has_request_context():
+            role = (session.get("user_role") or "").lower()
+            i18n = self.app.extensions.get("i18n")
+            locale = i18n.locale() if i18n else ""
+        raw = "\x1f".join(map(str, (self.version(), digest, name, role, locale, *vary)))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def version(self):
+        """Huella del manifiesto de assets: un deploy con otros assets no reusa fragmentos."""
+        if self._version is None:
+            assets = self.app.extensions.get("assets")
+            entries = sorted(assets.entries.items()) if assets is not None else ()
+            self._version = hashlib.blake2b(repr(entries).encode(), digest_size=6).hexdigest()
+        return self._version
+
+    def compile_all(self):
+        """Carga todos los templates (el bytecode queda en disco); devuelve cuántos."""
+        names = self.app.jinja_env.list_templates(filter_func=lambda n: n.endswith(".html"))
+        for name in names:
+            self.app.jinja_env.get_template(name)
+        return len(names)
+
+    def clear(self):
+        if self.bytecode is not None:
+            self.bytecode.clear()
+        if self.fragments is not None:
+            self.fragments.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        return {
+            "bytecode_dir": self.bytecode_dir if self.bytecode is not None else None,
+            "fragments": type(self.fragments).__name__ if self.fragments is not None else None,
+            "entries": len(self.fragments) if self.fragments is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# -----------------------------------------------------------------------------
+# CLI:  flask --app app templates compile | clear
+# -----------------------------------------------------------------------------
+@templates_cli.command("compile")
+def compile_command():
+    """Compila todos los templates al bytecode compartido (p.ej. en el deploy)."""
+    cache = current_app.extensions["template_cache"]
+    if cache.bytecode is None:
+        raise click.ClickException("JINJA_BYTECODE_CACHE está desactivado.")
+    t0 = time.perf_counter()
+    count = cache.compile_all()
+    click.echo(f"{count} templates compilados en {(time.perf_counter() - t0) * 1000:.0f} ms -> {cache.bytecode_dir}")
+
+
+@templates_cli.command("clear")
+def clear_command():
+    """Borra el bytecode en disco y los fragmentos cacheados."""
+    current_app.extensions["template_cache"].clear()
+    click.echo("Caché de templates vaciada.")
@@ -0,0 +1,108 @@
+# services/user_store.py
+# Acceso a datos de login: sentencias compiladas una sola vez por tabla
+# resuelta y búsqueda Correo-o-Nombre en un único viaje a la BD.
+
+import threading
+
+from sqlalchemy import text
+
+# Columnas que el login necesita; sólo se seleccionan las que existan.
+LOGIN_COLUMNS = ("Codigo_Usuario", "Nombre", "Correo", "Contrasena", "Estado", "Rol_Id")
+
+
+class UserStore:
+    """
+    Cachea las sentencias SQL de login por (tabla, columnas), de modo que el
+    text() se construye una vez y SQLAlchemy reutiliza su forma compilada.
+    """
+
+    def __init__(self, app=None, db=None, schema_cache=None):
+        self.db = None
+        self.schema_cache = None
+        self._statements = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db, schema_cache)
+
+    def init_app(self, app, db, schema_cache):
+        self.db = db
+        self.schema_cache = schema_cache
+        app.extensions["user_store"] = self
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def find_for_login(self, value, schema=None):
+        """
+        Busca un usuario por Correo y, si no hay coincidencia, por Nombre,
+        en una sola consulta (el match por Correo tiene prioridad).
+        Devuelve un mapping (o None) con las columnas de LOGIN_COLUMNS + Rol_Nombre.
+        schema: el SchemaSnapshot que ya tenga el llamador (si no, se pide uno).
+        """
+        schema = schema or self.schema_cache.snapshot()
+        if not schema.users_table:
+            return None
+        stmt = self._login_statement(schema.users_table, schema.columns)
+        try:
+            return self.db.session.execute(stmt, {"val": value}).mappings().first()
+        except Exception as e:
+            self.db.session.rollback()
+            self.schema_cache.note_error(e)
+            raise
+
+    def update_password(self, user_id, new_hash):
+        """Reemplaza el hash de contraseña (rehash tras login)."""
+        schema = self.schema_cache.snapshot()
+        cols = schema.columns
+        if not schema.users_table or "contrasena" not in cols or "codigo_usuario" not in cols:
+            return False
+        key = ("password", schema.users_table)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._statements[key] = text(
+                f"UPDATE {schema.users_table} SET {cols['contrasena']} = :h "
+                f"WHERE {cols['codigo_usuario']} = :id"
+            )
+        try:
+            self.db.session.execute(stmt, {"h": new_hash, "id": user_id})
+            self.db.session.commit()
+            return True
+        except Exception as e:
+            self.db.session.rollback()
+            self.schema_cache.note_error(e)
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+    def _login_statement(self, table, cols_map):
+        selected = tuple(cols_map[c.lower()] for c in LOGIN_COLUMNS if c.lower() in cols_map)
+        key = ("login", table, selected)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            with self._lock:
+                stmt = self._statements.get(key)
+                if stmt is None:
+                    stmt = self._statements[key] = _build_login_statement(table, selected, cols_map)
+        return stmt
+
+
+def _build_login_statement(table, selected, cols_map):
+    # "Correo = :val OR Nombre = :val" permite a MySQL un index_merge sobre
+    # ix_*_correo / ix_*_nombre; el ORDER BY respeta la prioridad del Correo.
+    correo = cols_map.get("correo", "Correo")
+    nombre = cols_map.get("nombre", "Nombre")
+    rol_id = cols_map.get("rol_id", "Rol_Id")
+    select_list = ", ".join(f"u.{c}" for c in selected) or "u.*"
+    return text(f"""
+        SELECT {select_list}, r.Nombre AS Rol_Nombre
+        FROM {table} u
+        LEFT JOIN Rol r ON r.Codigo_Rol = u.{rol_id}
+        WHERE u.{correo} = :val OR u.{nombre} = :val
+        ORDER BY CASE WHEN u.{correo} = :val THEN 0 ELSE 1 END
+        LIMIT 1
+    """)
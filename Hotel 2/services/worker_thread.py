@@ -0,0 +1,44 @@
+# services/worker_thread.py
+# Hilo de fondo por proceso (chequeo de salud, escritor de la bitácora).
+#
+# Los hilos no sobreviven a un fork: si la app se importó en el master de
+# Gunicorn (o en cualquier proceso que luego forkea), su hilo no existe en los
+# workers aunque el objeto diga lo contrario. Por eso el hilo se arranca
+# perezosamente en el primer uso dentro de cada pid, y se vuelve a arrancar si
+# murió.
+
+import os
+import threading
+
+
+class ProcessThread:
+    """Un hilo daemon por proceso que ejecuta target(); ensure() lo arranca si falta."""
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure(self, before_start=None):
+        """
+        Arranca el hilo si no corre en este proceso. before_start(new_process)
+        se llama antes de cada arranque; new_process indica que es otro pid.
+        """
+        pid = os.getpid()
+        if self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread.is_alive():
+                return
+            if before_start is not None:
+                before_start(self._pid != pid)
+            self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self._pid = pid
+            self._thread.start()
+
+    def join(self, timeout=None):
+        """Espera al hilo si es de este proceso (el de otro pid no existe aquí)."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
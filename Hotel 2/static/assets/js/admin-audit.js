@@ -0,0 +1,94 @@
+// admin-audit.js — bitácora de admin-audit.html desde /api/audit.
+// Paginación por cursor: el servidor devuelve next_cursor y aquí se guarda la
+// pila de cursores ya vistos para volver atrás sin OFFSET.
+(() => {
+  const tbody = document.querySelector("[data-audit-rows]");
+  if (!tbody) return;
+  const $ = (sel) => document.querySelector(sel);
+  const filter = (name) => $(`[data-audit-filter="${name}"]`);
+  const count = $("[data-audit-count]");
+  const prev = $("[data-audit-prev]");
+  const next = $("[data-audit-next]");
+
+  const LIMIT = 50;
+  const ACTIONS = {
+    login: "Inicio de sesión",
+    login_failed: "Login fallido",
+    logout: "Cierre de sesión",
+    register: "Registro",
+    password_set: "Contraseña creada",
+  };
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+  // Horas de la API en UTC sin zona -> hora local
+  const when = (isoUtc) => new Date(`${isoUtc}Z`).toLocaleString("es", {
+    year: "numeric", month: "2-digit", day: "2-digit", hour: "2-digit", minute: "2-digit",
+  });
+
+  const row = (e) => {
+    const failed = e.action === "login_failed";
+    const entity = [e.entity, e.entity_id].filter(Boolean).join(" #");
+    return `
+                <tr><td>${esc(when(e.created_at))}</td><td>${esc(e.actor || "—")}<div class="text-muted small">${esc(e.role || "")}</div></td>
+                  <td>${failed ? '<span class="badge text-bg-danger">' : ""}${esc(ACTIONS[e.action] || e.action)}${failed ? "</span>" : ""}</td>
+                  <td>${esc(entity || "—")}</td><td>${esc(e.detail || "")}<div class="text-muted small">${esc(e.ip || "")}</div></td></tr>`;
+  };
+
+  const query = () => {
+    const params = new URLSearchParams();
+    for (const name of ["category", "from", "to", "q"]) {
+      const value = filter(name)?.value.trim();
+      if (value) params.set(name, value);
+    }
+    return params;
+  };
+
+  let cursors = [null];   // cursor de cada página visitada
+  let nextCursor = null;
+
+  const load = () => {
+    const params = query();
+    params.set("limit", LIMIT);
+    const cursor = cursors[cursors.length - 1];
+    if (cursor) params.set("cursor", cursor);
+    tbody.setAttribute("aria-busy", "true");
+    fetch(`/api/audit?${params}`, { headers: { Accept: "application/json" } })
+      .then(async (res) => ({ ok: res.ok, data: await res.json() }))
+      .then(({ ok, data }) => {
+        if (!ok) {
+          tbody.innerHTML = `<tr><td colspan="5" class="text-muted">${esc(data.error || "No se pudo cargar la bitácora.")}</td></tr>`;
+          return;
+        }
+        nextCursor = data.next_cursor;
+        tbody.innerHTML = data.items.length
+          ? data.items.map(row).join("")
+          : '<tr><td colspan="5" class="text-muted">Sin eventos.</td></tr>';
+        const first = (cursors.length - 1) * LIMIT + 1;
+        if (count) {
+          count.textContent = data.items.length
+            ? `Mostrando ${first}–${first + data.items.length - 1}${nextCursor ? "+" : ""}` : "";
+        }
+        if (prev) prev.disabled = cursors.length <= 1;
+        if (next) next.disabled = !nextCursor;
+      })
+      .finally(() => tbody.removeAttribute("aria-busy"));
+  };
+
+  const search = () => {
+    cursors = [null];
+    load();
+  };
+
+  $("[data-audit-search]")?.addEventListener("click", (ev) => { ev.preventDefault(); search(); });
+  filter("q")?.addEventListener("keydown", (ev) => { if (ev.key === "Enter") search(); });
+  filter("category")?.addEventListener("change", search);
+  prev?.addEventListener("click", () => {
+    if (cursors.length > 1) { cursors.pop(); load(); }
+  });
+  next?.addEventListener("click", () => {
+    if (nextCursor) { cursors.push(nextCursor); load(); }
+  });
+  search();
+})();
@@ -0,0 +1,82 @@
+// admin-calendar.js — vista semanal de admin-calendario.html desde /api/calendar.
+// Una llamada por semana trae todas las habitaciones; cada fila llega como
+// texto de dígitos (un estado por día) y se pinta sin más cálculo.
+(() => {
+  const rowsBox = document.querySelector("[data-calendar-rows]");
+  if (!rowsBox) return;
+  const label = document.querySelector("[data-calendar-label]");
+  const prev = document.querySelector("[data-calendar-prev]");
+  const next = document.querySelector("[data-calendar-next]");
+
+  const DAYS = 7;
+  const MONTHS = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"];
+  // Índices de 'states' de la API -> clase y texto
+  const STATE = {
+    1: ["bg-success", "Confirmada"],
+    2: ["bg-warning", "Pendiente"],
+    3: ["bg-secondary", "Bloqueo"],
+    4: ["bg-secondary", "Mantenimiento"],
+  };
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+
+  // Fechas en UTC para no depender del huso del navegador
+  const iso = (d) => d.toISOString().slice(0, 10);
+  const addDays = (d, n) => new Date(d.getTime() + n * 86400000);
+  const sundayOf = (d) => addDays(d, -d.getUTCDay());
+  const fmt = (a, b) => (a.getUTCMonth() === b.getUTCMonth()
+    ? `${a.getUTCDate()}–${b.getUTCDate()} ${MONTHS[b.getUTCMonth()]} ${b.getUTCFullYear()}`
+    : `${a.getUTCDate()} ${MONTHS[a.getUTCMonth()]} – ${b.getUTCDate()} ${MONTHS[b.getUTCMonth()]} ${b.getUTCFullYear()}`);
+
+  const params = new URLSearchParams(location.search);
+  const today = new Date(`${params.get("start") || iso(new Date())}T00:00:00Z`);
+  let start = sundayOf(isNaN(today) ? new Date() : today);
+
+  const row = (room, days) => {
+    const cells = [];
+    for (let i = 0; i < DAYS; i++) {
+      const st = STATE[days[i]];
+      cells.push(st
+        ? `<div class="cal-cell" title="${esc(st[1])}"><span class="cal-book ${st[0]} d-block" style="inset:4px"></span></div>`
+        : `<div class="cal-cell"></div>`);
+    }
+    return `
+          <div class="cal-row mb-2">
+            <div class="flex-shrink-0 fw-semibold" style="width:140px;">${esc(room.name || room.code)}</div>
+            <div class="d-flex flex-grow-1 gap-1 w-100">${cells.join("")}</div>
+          </div>`;
+  };
+
+  const notice = (text) => {
+    rowsBox.innerHTML = `<div class="alert alert-secondary mb-0">${esc(text)}</div>`;
+  };
+
+  const load = () => {
+    if (label) label.textContent = fmt(start, addDays(start, DAYS - 1));
+    rowsBox.setAttribute("aria-busy", "true");
+    fetch(`/api/calendar?start=${iso(start)}&days=${DAYS}`, { headers: { Accept: "application/json" } })
+      .then(async (res) => ({ ok: res.ok, data: await res.json() }))
+      .then(({ ok, data }) => {
+        if (!ok) return notice(data.error || "No se pudo cargar el calendario.");
+        if (!data.rooms.length) return notice("No hay habitaciones registradas.");
+        // Días fuera de la ventana del servidor: se rellenan como libres
+        const pad = Math.round((new Date(`${data.start}T00:00:00Z`) - start) / 86400000);
+        rowsBox.innerHTML = data.rooms
+          .map((r) => row(r, "0".repeat(Math.max(pad, 0)) + r.days))
+          .join("");
+      })
+      .catch(() => notice("No se pudo cargar el calendario."))
+      .finally(() => rowsBox.removeAttribute("aria-busy"));
+  };
+
+  const step = (n) => (ev) => {
+    ev.preventDefault();
+    start = addDays(start, n);
+    load();
+  };
+  prev?.addEventListener("click", step(-DAYS));
+  next?.addEventListener("click", step(DAYS));
+  load();
+})();
@@ -0,0 +1,105 @@
+// admin-channels.js — canales de admin-channels.html desde /api/channels.
+// La página sólo configura y marca canales; el envío a las OTAs lo hace el
+// worker (`flask channels worker`), así que la tabla se refresca sola cada
+// pocos segundos para ver los pendientes bajar.
+(() => {
+  const tbody = document.querySelector("[data-channel-rows]");
+  if (!tbody) return;
+  const form = document.querySelector("[data-channel-form]");
+  const formError = document.querySelector("[data-channel-error]");
+  const msg = document.querySelector("[data-channel-msg]");
+
+  const REFRESH_MS = 5000;
+  const STATUS = {
+    active: ["bg-success", "Conectado"],
+    paused: ["bg-secondary", "Pausado"],
+    disconnected: ["bg-secondary", "No conectado"],
+  };
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+
+  // Las fechas de la API son UTC sin zona
+  const ago = (isoUtc) => {
+    if (!isoUtc) return "—";
+    const mins = Math.round((Date.now() - Date.parse(`${isoUtc}Z`)) / 60000);
+    if (mins < 1) return "Hace instantes";
+    if (mins < 60) return `Hace ${mins} min`;
+    const hours = Math.round(mins / 60);
+    return hours < 48 ? `Hace ${hours} h` : `Hace ${Math.round(hours / 24)} días`;
+  };
+
+  const row = (ch) => {
+    let [cls, label] = STATUS[ch.status] || ["bg-secondary", ch.status];
+    if (ch.status === "active" && ch.failures) [cls, label] = ["bg-danger", "Con errores"];
+    const pending = ch.pending === null ? "Envío completo" : ch.pending;
+    const action = ch.status === "active"
+      ? `<button class="btn btn-outline-secondary btn-sm" data-channel-status="paused" data-id="${ch.id}">Pausar</button>`
+      : `<button class="btn btn-outline-secondary btn-sm" data-channel-status="active" data-id="${ch.id}">Reanudar</button>`;
+    return `
+                <tr>
+                  <td>${esc(ch.name)}<div class="text-muted small">${esc(ch.endpoint)}</div></td>
+                  <td><span class="badge ${cls}">${esc(label)}</span>${ch.last_error ? `<div class="text-danger small">${esc(ch.last_error)}</div>` : ""}</td>
+                  <td>${esc(ago(ch.last_sync_at))}</td><td>${esc(pending)}</td>
+                  <td class="text-end">${action}</td>
+                </tr>`;
+  };
+
+  const request = (url, options = {}) => fetch(url, {
+    ...options,
+    headers: { Accept: "application/json", "Content-Type": "application/json" },
+  }).then(async (res) => ({ ok: res.ok, data: await res.json() }));
+
+  const load = () => request("/api/channels").then(({ ok, data }) => {
+    if (!ok) throw new Error(data.error);
+    tbody.innerHTML = data.channels.length
+      ? data.channels.map(row).join("")
+      : '<tr><td colspan="5" class="text-muted">Aún no hay canales conectados.</td></tr>';
+  }).catch((err) => {
+    tbody.innerHTML = `<tr><td colspan="5" class="text-danger">${esc(err.message || "No se pudo cargar.")}</td></tr>`;
+  });
+
+  tbody.addEventListener("click", (ev) => {
+    const btn = ev.target.closest("[data-channel-status]");
+    if (!btn) return;
+    btn.disabled = true;
+    request(`/api/channels/${btn.dataset.id}`, {
+      method: "PATCH",
+      body: JSON.stringify({ status: btn.dataset.channelStatus }),
+    }).then(load);
+  });
+
+  document.querySelectorAll("[data-channel-sync]").forEach((btn) => {
+    btn.addEventListener("click", () => {
+      const full = btn.dataset.channelSync === "full";
+      request("/api/channels/sync", { method: "POST", body: JSON.stringify({ full }) })
+        .then(({ ok, data }) => {
+          if (msg) {
+            msg.textContent = ok
+              ? `${data.queued} canales en cola${full ? " para envío completo" : ""}.`
+              : data.error;
+          }
+          load();
+        });
+    });
+  });
+
+  form?.addEventListener("submit", (ev) => {
+    ev.preventDefault();
+    const body = Object.fromEntries(new FormData(form));
+    request("/api/channels", { method: "POST", body: JSON.stringify(body) }).then(({ ok, data }) => {
+      if (!ok) {
+        if (formError) formError.textContent = data.error;
+        return;
+      }
+      if (formError) formError.textContent = "";
+      form.reset();
+      window.bootstrap?.Modal.getInstance(document.getElementById("modalChannel"))?.hide();
+      load();
+    });
+  });
+
+  load();
+  setInterval(load, REFRESH_MS);
+})();
@@ -0,0 +1,114 @@
+// admin-reservas.js — listado de admin-reservas-list.html desde /api/reservations.
+// Paginación por cursor: el servidor devuelve next_cursor y aquí se guarda la
+// pila de cursores ya vistos para volver atrás sin OFFSET.
+(() => {
+  const tbody = document.querySelector("[data-res-rows]");
+  if (!tbody) return;
+  const $ = (sel) => document.querySelector(sel);
+  const filter = (name) => $(`[data-res-filter="${name}"]`);
+  const count = $("[data-res-count]");
+  const pageLabel = $("[data-res-page]");
+  const prev = $("[data-res-prev]");
+  const next = $("[data-res-next]");
+  const exportLink = $("[data-res-export]");
+
+  const LIMIT = 25;
+  const FIELDS = "id,guest_name,guest_email,check_in,check_out,room_code,room_name,channel,status";
+  const STATUS = {
+    confirmed: ["bg-success", "Confirmada"],
+    checked_in: ["bg-success", "En casa"],
+    pending: ["bg-warning text-dark", "Pendiente"],
+    cancelled: ["bg-danger", "Cancelada"],
+    no_show: ["bg-dark", "No show"],
+    checked_out: ["bg-secondary", "Completada"],
+  };
+  const MONTHS = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"];
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+  const code = (r) => `VG-${r.check_in.slice(0, 4)}-${r.id}`;
+  const dm = (isoDate) => {
+    const [, m, d] = isoDate.split("-");
+    return [d, MONTHS[Number(m) - 1]];
+  };
+  const stay = (r) => {
+    const [d1, m1] = dm(r.check_in);
+    const [d2, m2] = dm(r.check_out);
+    return m1 === m2 ? `${d1}–${d2} ${m1}` : `${d1} ${m1} – ${d2} ${m2}`;
+  };
+
+  // "VG-2025-104" o "104" busca por código; lo demás, por huésped (prefijo o correo)
+  const query = () => {
+    const params = new URLSearchParams();
+    const q = filter("q")?.value.trim() || "";
+    const byCode = q.match(/^(?:VG-\d{4}-)?(\d+)$/i);
+    if (byCode) params.set("id", byCode[1]);
+    else if (q) params.set("guest", q);
+    for (const name of ["from", "to", "status"]) {
+      const value = filter(name)?.value;
+      if (value) params.set(name, value);
+    }
+    return params;
+  };
+
+  const row = (r) => {
+    const [cls, label] = STATUS[r.status] || ["bg-secondary", r.status];
+    return `
+              <tr>
+                <td>${esc(code(r))}</td><td>${esc(r.guest_name)}<div class="text-muted small">${esc(r.guest_email)}</div></td>
+                <td>${esc(stay(r))}</td><td>${esc(r.room_name || r.room_code)}</td><td>${esc(r.channel)}</td>
+                <td><span class="badge ${cls}">${esc(label)}</span></td>
+                <td class="text-end"><a class="btn btn-outline btn-sm" href="admin-reserva-detalle.html?id=${encodeURIComponent(r.id)}"><i class="bi bi-eye"></i></a></td>
+              </tr>`;
+  };
+
+  let cursors = [null];   // cursor de cada página visitada
+  let nextCursor = null;
+
+  const setEnabled = (li, on) => li?.classList.toggle("disabled", !on);
+
+  const load = () => {
+    const params = query();
+    params.set("fields", FIELDS);
+    params.set("limit", LIMIT);
+    const cursor = cursors[cursors.length - 1];
+    if (cursor) params.set("cursor", cursor);
+    tbody.setAttribute("aria-busy", "true");
+    fetch(`/api/reservations?${params}`, { headers: { Accept: "application/json" } })
+      .then(async (res) => ({ ok: res.ok, data: await res.json() }))
+      .then(({ ok, data }) => {
+        if (!ok) {
+          tbody.innerHTML = `<tr><td colspan="7" class="text-muted">${esc(data.error || "No se pudo cargar el listado.")}</td></tr>`;
+          return;
+        }
+        nextCursor = data.next_cursor;
+        tbody.innerHTML = data.items.length
+          ? data.items.map(row).join("")
+          : `<tr><td colspan="7" class="text-muted">Sin resultados.</td></tr>`;
+        if (count) count.textContent = `${data.items.length}${nextCursor ? "+" : ""} resultados`;
+        if (pageLabel) pageLabel.textContent = cursors.length;
+        setEnabled(prev, cursors.length > 1);
+        setEnabled(next, Boolean(nextCursor));
+      })
+      .finally(() => tbody.removeAttribute("aria-busy"));
+  };
+
+  const search = () => {
+    cursors = [null];
+    if (exportLink) exportLink.href = `/api/reservations/export.csv?${query()}`;
+    load();
+  };
+
+  $("[data-res-search]")?.addEventListener("click", (ev) => { ev.preventDefault(); search(); });
+  filter("q")?.addEventListener("keydown", (ev) => { if (ev.key === "Enter") search(); });
+  prev?.addEventListener("click", (ev) => {
+    ev.preventDefault();
+    if (cursors.length > 1) { cursors.pop(); load(); }
+  });
+  next?.addEventListener("click", (ev) => {
+    ev.preventDefault();
+    if (nextCursor) { cursors.push(nextCursor); load(); }
+  });
+  search();
+})();
@@ -0,0 +1,71 @@
+// booking-results.js — pinta la disponibilidad real desde /api/availability
+// y el precio de la estadía desde /api/quotes (una sola llamada para todos los tipos).
+// Sólo actúa si la página llega con fechas (?checkin=...&checkout=...) desde
+// el buscador; sin ellas se mantienen las tarjetas de ejemplo del template.
+(() => {
+  const container = document.querySelector("[data-availability-results]");
+  if (!container) return;
+
+  const params = new URLSearchParams(location.search);
+  if (!(params.get("checkin") || params.get("check_in"))) return;
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+
+  const notice = (text, kind = "secondary") => {
+    container.innerHTML = `<div class="alert alert-${kind} mb-0">${esc(text)}</div>`;
+  };
+
+  // Precio más bajo (entre planes) por tipo de habitación
+  const cheapest = (quotes) => {
+    const best = {};
+    for (const q of quotes || []) {
+      const id = q.room_type.id;
+      if (!best[id] || Number(q.total) < Number(best[id].total)) best[id] = q;
+    }
+    return best;
+  };
+
+  const price = (q) => q ? `
+            <div class="mb-2">
+              <span class="fw-semibold">$${esc(q.avg_nightly)}</span><span class="text-muted">/noche</span>
+              <div class="text-muted small">${esc(q.plan.name)} · Total ${esc(q.currency)} ${esc(q.total)}</div>
+            </div>` : "";
+
+  const card = (room, data, q) => `
+    <div class="card shadow-sm border-0">
+      <div class="card-body">
+        <div class="row g-3 align-items-center">
+          <div class="col-12 col-md-9">
+            <h5 class="mb-1">${esc(room.name)}</h5>
+            <div class="text-muted small">Hasta ${esc(room.capacity)} huéspedes · ${esc(data.nights)} noche(s)</div>
+          </div>
+          <div class="col-12 col-md-3 text-md-end">${price(q)}
+            <a class="btn btn-success w-100"
+               href="booking-details.html?room=${encodeURIComponent(room.id)}&checkin=${esc(data.check_in)}&checkout=${esc(data.check_out)}&guests=${esc(data.guests)}">
+              Seleccionar
+            </a>
+          </div>
+        </div>
+      </div>
+    </div>`;
+
+  container.setAttribute("aria-busy", "true");
+  const getJSON = (url) => fetch(url, { headers: { Accept: "application/json" } })
+    .then(async (res) => ({ ok: res.ok, data: await res.json() }));
+
+  Promise.all([
+    getJSON(`/api/availability?${params.toString()}`),
+    getJSON(`/api/quotes?${params.toString()}&available=1`).catch(() => ({ ok: false, data: {} })),
+  ])
+    .then(([avail, quotes]) => {
+      const data = avail.data;
+      if (!avail.ok) return notice(data.error || "No se pudo consultar la disponibilidad.", "warning");
+      if (!data.rooms.length) return notice("No hay habitaciones disponibles para esas fechas.");
+      const best = quotes.ok ? cheapest(quotes.data.quotes) : {};
+      container.innerHTML = data.rooms.map((room) => card(room, data, best[room.room_type_id])).join("");
+    })
+    .catch(() => notice("No se pudo consultar la disponibilidad.", "warning"))
+    .finally(() => container.removeAttribute("aria-busy"));
+})();
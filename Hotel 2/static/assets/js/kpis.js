@@ -0,0 +1,79 @@
+// kpis.js — KPIs de los tableros desde /api/kpis (agregados diarios).
+// - [data-kpi="occupancy|revenue|adr|revpar|arrivals|departures"]: valor de hoy
+//   ([data-kpi-bar] ajusta el ancho de la barra de progreso).
+// - form[data-kpi-report]: "Generar" llena [data-kpi-rows] y "Exportar CSV"
+//   descarga el mismo rango.
+(() => {
+  const MONTHS = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"];
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+  const money = (v) => (v == null ? "—" : `$${Number(v).toLocaleString("es", { maximumFractionDigits: 0 })}`);
+  const pct = (v) => (v == null ? "—" : `${Math.round(v)}%`);
+  const FORMAT = { occupancy: pct, revenue: money, adr: money, revpar: money };
+
+  const getJSON = (url) => fetch(url, { headers: { Accept: "application/json" } })
+    .then(async (res) => ({ ok: res.ok, data: await res.json() }));
+  // Fecha local (no UTC): "hoy" es el día del hotel, no el de Greenwich
+  const iso = (d) => `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`;
+  const today = new Date();
+  const tomorrow = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 1);
+
+  // Tarjetas del día
+  const cards = document.querySelectorAll("[data-kpi]");
+  if (cards.length) {
+    getJSON(`/api/kpis?from=${iso(today)}&to=${iso(tomorrow)}`).then(({ ok, data }) => {
+      if (!ok) return;
+      const s = data.summary;
+      cards.forEach((el) => {
+        const name = el.dataset.kpi;
+        el.textContent = (FORMAT[name] || String)(s[name] ?? "—");
+      });
+      document.querySelectorAll("[data-kpi-bar]").forEach((el) => {
+        el.style.width = `${Math.min(Number(s[el.dataset.kpiBar]) || 0, 100)}%`;
+      });
+    }).catch(() => {});
+  }
+
+  // Reportes
+  const rowsBox = document.querySelector("[data-kpi-rows]");
+  const label = (row, group) => {
+    const [y, m, d] = row.date.split("-");
+    return group === "month" ? `${MONTHS[Number(m) - 1]} ${y}` : `${Number(d)} ${MONTHS[Number(m) - 1]}`;
+  };
+  const query = (form) => {
+    const params = new URLSearchParams();
+    for (const name of ["from", "to", "group"]) {
+      const value = form.elements[name]?.value;
+      if (value) params.set(name, value);
+    }
+    return params;
+  };
+
+  document.querySelectorAll("form[data-kpi-report]").forEach((form) => {
+    form.querySelector("[data-kpi-generate]")?.addEventListener("click", () => {
+      if (!rowsBox) return;
+      const params = query(form);
+      rowsBox.setAttribute("aria-busy", "true");
+      getJSON(`/api/kpis?${params}`)
+        .then(({ ok, data }) => {
+          if (!ok) {
+            rowsBox.innerHTML = `<tr><td colspan="5" class="text-muted">${esc(data.error || "No se pudo generar el reporte.")}</td></tr>`;
+            return;
+          }
+          const rows = data.rows.map((r) => `
+                    <tr><td>${esc(label(r, data.group))}</td><td>${pct(r.occupancy)}</td><td>${money(r.adr)}</td><td>${money(r.revpar)}</td><td>${money(r.revenue)}</td></tr>`);
+          const s = data.summary;
+          rows.push(`
+                    <tr class="fw-semibold"><td>Total</td><td>${pct(s.occupancy)}</td><td>${money(s.adr)}</td><td>${money(s.revpar)}</td><td>${money(s.revenue)}</td></tr>`);
+          rowsBox.innerHTML = rows.join("");
+        })
+        .finally(() => rowsBox.removeAttribute("aria-busy"));
+    });
+    form.querySelector("[data-kpi-export]")?.addEventListener("click", () => {
+      const params = query(form);
+      params.set("format", "csv");
+      location.href = `/api/kpis?${params}`;
+    });
+  });
+})();
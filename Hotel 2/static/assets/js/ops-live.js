@@ -0,0 +1,221 @@
+// ops-live.js — ops-rooms-status.html, ops-housekeeping.html y
+// ops-arrivals-departures.html en vivo desde /api/room-status/stream (SSE).
+// El servidor manda un snapshot y luego sólo los documentos que cambian;
+// EventSource reconecta solo y reenvía Last-Event-ID para recibir lo perdido.
+// Los botones sólo llaman a la API: el cambio vuelve por el stream.
+(() => {
+  const roomsBox = document.querySelector("[data-rs-rooms]");
+  const tasksBody = document.querySelector("[data-rs-tasks]");
+  const arrivalsBody = document.querySelector("[data-rs-arrivals]");
+  const departuresBody = document.querySelector("[data-rs-departures]");
+  if (!roomsBox && !tasksBody && !arrivalsBody && !departuresBody) return;
+  const live = document.querySelectorAll("[data-rs-live]");
+  const hkForm = document.querySelector("[data-hk-form]");
+
+  const docs = new Map();
+  let roomFilter = "all";
+
+  const HK = {
+    clean: ["text-bg-success", "Limpia"],
+    inspected: ["text-bg-success", "Inspeccionada"],
+    dirty: ["text-bg-warning", "Sucia"],
+    out_of_order: ["text-bg-danger", "Fuera de serv."],
+  };
+  const TASK_KIND = { departure: "Salida", daily: "Diaria", deep: "Profunda" };
+  const TASK_STATUS = {
+    pending: ["text-bg-secondary", "Pendiente"],
+    in_progress: ["text-bg-warning", "En curso"],
+    done: ["text-bg-success", "Completada"],
+  };
+  const RES_STATUS = {
+    pending: "Pendiente", confirmed: "Confirmada", checked_in: "En casa", checked_out: "Salió",
+  };
+
+  const esc = (s) => String(s ?? "").replace(/[&<>"']/g, (c) => (
+    { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]
+  ));
+  // Horas de la API en UTC sin zona -> hora local
+  const hhmm = (isoUtc) => (isoUtc
+    ? new Date(`${isoUtc}Z`).toLocaleTimeString("es", { hour: "2-digit", minute: "2-digit" })
+    : "—");
+  const dayMonth = (isoDate) => new Date(`${isoDate}T00:00:00`)
+    .toLocaleDateString("es", { day: "numeric", month: "short" });
+  const byPrefix = (prefix) => [...docs.entries()]
+    .filter(([key]) => key.startsWith(prefix)).map(([, doc]) => doc);
+
+  // ---------------------------------------------------------------------------
+  // Render
+  // ---------------------------------------------------------------------------
+  const roomState = (r) => {
+    if (r.hk === "out_of_order") return "out_of_order";
+    if (r.occupied) return "occupied";
+    return r.hk === "dirty" ? "dirty" : "clean";
+  };
+
+  const roomCard = (r) => {
+    const [cls, label] = r.occupied && r.hk !== "out_of_order" ? ["text-bg-primary", "Ocupada"] : HK[r.hk] || HK.clean;
+    let detail = "Disponible";
+    if (r.hk === "out_of_order") detail = r.note || "Fuera de servicio";
+    else if (r.occupied) detail = r.departure ? `Salida hoy · ${r.guest}` : `ETD ${dayMonth(r.until)} · ${r.guest}`;
+    else if (r.arrival) detail = "Llegada hoy";
+    let action = "";
+    if (r.hk === "dirty") {
+      action = `<a href="ops-housekeeping.html" class="btn btn-success btn-sm">Enviar HK</a>
+                <button class="btn btn-outline-secondary btn-sm" data-rs-hk="clean" data-id="${r.id}">Marcar limpia</button>`;
+    } else if (r.hk === "out_of_order") {
+      action = `<a href="ops-maintenance.html" class="btn btn-success btn-sm">Ticket</a>
+                <button class="btn btn-outline-secondary btn-sm" data-rs-hk="clean" data-id="${r.id}">Habilitar</button>`;
+    } else if (!r.occupied) {
+      action = `<button class="btn btn-outline-secondary btn-sm" data-rs-hk="dirty" data-id="${r.id}">Marcar sucia</button>`;
+    }
+    return `
+          <div class="col-6 col-md-3">
+            <div class="border rounded-3 p-3 room-card">
+              <div class="d-flex justify-content-between">
+                <strong>${esc(r.code)}</strong><span class="badge ${cls}">${esc(label)}</span>
+              </div>
+              <div class="text-muted small">${esc(detail)}</div>
+              <div class="mt-2 d-flex gap-2">${action}</div>
+            </div>
+          </div>`;
+  };
+
+  const renderRooms = () => {
+    const rooms = byPrefix("room:")
+      .filter((r) => roomFilter === "all" || roomState(r) === roomFilter)
+      .sort((a, b) => a.code.localeCompare(b.code, "es", { numeric: true }));
+    const floors = new Map();
+    for (const r of rooms) {
+      const floor = r.floor ?? "—";
+      if (!floors.has(floor)) floors.set(floor, []);
+      floors.get(floor).push(r);
+    }
+    roomsBox.innerHTML = rooms.length ? [...floors].map(([floor, list]) => `
+        <h5 class="mb-3">Piso ${esc(floor)}</h5>
+        <div class="row g-3 mb-4">${list.map(roomCard).join("")}
+        </div>`).join("") : '<p class="text-muted">No hay habitaciones en este estado.</p>';
+  };
+
+  const renderTasks = () => {
+    const order = { in_progress: 0, pending: 1, done: 2 };
+    const tasks = byPrefix("task:").sort((a, b) => (order[a.status] - order[b.status]) || (a.id - b.id));
+    tasksBody.innerHTML = tasks.length ? tasks.map((t) => {
+      const [cls, label] = TASK_STATUS[t.status] || ["text-bg-secondary", t.status];
+      const next = { pending: ["in_progress", "Iniciar"], in_progress: ["done", "Marcar lista"] }[t.status];
+      const prio = t.priority === "high" ? ' <span class="badge text-bg-danger">Alta</span>' : "";
+      return `
+                  <tr><td>${esc(t.room)}</td><td>${esc(TASK_KIND[t.kind] || t.kind)}${prio}</td><td>${esc(t.assignee || "—")}</td>
+                    <td><span class="badge ${cls}">${esc(label)}</span></td><td>${esc(hhmm(t.started_at))}</td><td>${esc(hhmm(t.finished_at))}</td>
+                    <td class="text-end">${next ? `<button class="btn btn-success btn-sm" data-rs-task="${next[0]}" data-id="${t.id}">${next[1]}</button>` : ""}</td></tr>`;
+    }).join("") : '<tr><td colspan="7" class="text-muted">Sin tareas para hoy.</td></tr>';
+  };
+
+  const searchOf = (name) => document.querySelector(`[data-rs-search="${name}"]`)?.value.trim().toLowerCase() || "";
+
+  const renderStays = (tbody, prefix, name, actionFor) => {
+    const q = searchOf(name);
+    const items = byPrefix(prefix)
+      .filter((r) => !q || `${r.guest} ${r.room} ${r.id}`.toLowerCase().includes(q))
+      .sort((a, b) => String(a.room).localeCompare(String(b.room), "es", { numeric: true }));
+    tbody.innerHTML = items.length ? items.map((r) => `
+                      <tr><td>${esc(RES_STATUS[r.status] || r.status)}</td><td>VG-${esc(r.id)}</td><td>${esc(r.guest)}</td><td>${esc(r.room || "—")}</td>
+                        <td class="text-end">${actionFor(r)}</td></tr>`).join("")
+      : '<tr><td colspan="5" class="text-muted">Nada pendiente.</td></tr>';
+  };
+
+  const render = () => {
+    if (roomsBox) renderRooms();
+    if (tasksBody) renderTasks();
+    if (arrivalsBody) {
+      renderStays(arrivalsBody, "arrival:", "arrivals", (r) => (r.status === "checked_in" ? ""
+        : `<button class="btn btn-success btn-sm" data-rs-stay="check-in" data-id="${r.id}">Check-in</button>`));
+    }
+    if (departuresBody) {
+      renderStays(departuresBody, "departure:", "departures", (r) => (r.status !== "checked_in" ? ""
+        : `<button class="btn btn-success btn-sm" data-rs-stay="check-out" data-id="${r.id}">Liberar y enviar a HK</button>`));
+    }
+  };
+
+  // Varias ráfagas de deltas se pintan una sola vez por frame
+  let pending = false;
+  const schedule = () => {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(() => { pending = false; render(); });
+  };
+
+  // ---------------------------------------------------------------------------
+  // Stream
+  // ---------------------------------------------------------------------------
+  const setLive = (on) => live.forEach((el) => {
+    el.className = `badge ${on ? "text-bg-success" : "text-bg-secondary"}`;
+    el.textContent = on ? "En vivo" : "Reconectando…";
+  });
+
+  const connect = () => {
+    const source = new EventSource("/api/room-status/stream");
+    source.addEventListener("snapshot", (ev) => {
+      const data = JSON.parse(ev.data);
+      docs.clear();
+      for (const [key, doc] of Object.entries(data.docs)) docs.set(key, doc);
+      setLive(true);
+      schedule();
+    });
+    source.addEventListener("delta", (ev) => {
+      for (const { key, doc } of JSON.parse(ev.data).changes) {
+        if (doc === null) docs.delete(key);
+        else docs.set(key, doc);
+      }
+      schedule();
+    });
+    source.addEventListener("open", () => setLive(true));
+    source.addEventListener("error", () => {
+      setLive(false);
+      // 403/503: EventSource no reintenta solo
+      if (source.readyState === EventSource.CLOSED) setTimeout(connect, 30000);
+    });
+  };
+
+  // ---------------------------------------------------------------------------
+  // Acciones
+  // ---------------------------------------------------------------------------
+  const send = (url, method, body) => fetch(url, {
+    method,
+    headers: { Accept: "application/json", "Content-Type": "application/json" },
+    body: body ? JSON.stringify(body) : undefined,
+  }).then(async (res) => {
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || "No se pudo guardar.");
+    return data;
+  });
+  const fail = (err) => window.alert(err.message);
+
+  document.addEventListener("click", (ev) => {
+    const btn = ev.target.closest("[data-rs-hk], [data-rs-task], [data-rs-stay], [data-room-filter]");
+    if (!btn) return;
+    if (btn.dataset.roomFilter) {
+      roomFilter = btn.dataset.roomFilter;
+      document.querySelectorAll("[data-room-filter]").forEach((b) => b.classList.toggle("active", b === btn));
+      schedule();
+      return;
+    }
+    btn.disabled = true;
+    const { id } = btn.dataset;
+    let req;
+    if (btn.dataset.rsHk) req = send(`/api/room-status/rooms/${id}`, "PATCH", { hk_status: btn.dataset.rsHk });
+    else if (btn.dataset.rsTask) req = send(`/api/room-status/tasks/${id}`, "PATCH", { status: btn.dataset.rsTask });
+    else req = send(`/api/room-status/reservations/${id}/${btn.dataset.rsStay}`, "POST");
+    req.catch((err) => { btn.disabled = false; fail(err); });
+  });
+
+  document.querySelectorAll("[data-rs-search]").forEach((input) => input.addEventListener("input", schedule));
+
+  hkForm?.addEventListener("submit", (ev) => {
+    ev.preventDefault();
+    send("/api/room-status/tasks", "POST", Object.fromEntries(new FormData(hkForm)))
+      .then(() => { hkForm.querySelector("[name=room]").value = ""; })
+      .catch(fail);
+  });
+
+  connect();
+})();